@@ -15,7 +15,11 @@ import qrcode
 import os
 import sys
 import subprocess
+import queue
+import threading
 from datetime import datetime
+from print_queue import get_print_queue
+import location_barcodes
 
 class BarcodePrinter:
     def __init__(self, root):
@@ -425,6 +429,14 @@ class BarcodePrinter:
                 
                 img = barcode_instance.render(options)
             
+            # 라벨 프린터가 설정되어 있으면 임시 파일 없이 인쇄 대기열로 바로 전송
+            printer_queue = get_print_queue()
+            if printer_queue:
+                image = img.get_image() if hasattr(img, "get_image") else img
+                job_id = printer_queue.submit_image(image, self.text_var.get().strip())
+                self.update_status(f"인쇄 대기열 추가: 작업 {job_id} ({printer_queue.transport})")
+                return
+            
             img.save(temp_filename)
             
             # 시스템 기본 인쇄 프로그램으로 열기
@@ -451,68 +463,90 @@ class BarcodePrinter:
             pass  # 삭제 실패해도 무시
     
     def batch_generate_barcodes(self):
-        """30개의 바코드를 일괄 생성"""
+        """구역 설정(zone_config.json)의 보관위치 바코드 일괄 생성 (구역 선택, 백그라운드 병렬 처리)"""
         try:
-            # barcodejpg 폴더 생성
-            output_folder = "barcodejpg"
-            if not os.path.exists(output_folder):
-                os.makedirs(output_folder)
-                print(f"폴더 생성: {output_folder}")
-            
-            # 설정값 고정
-            self.font_size.set(8)
-            self.barcode_height.set(80)
-            self.margin.set(7)
-            self.show_text.set(True)
-            self.barcode_format.set("code128")
-            
-            # 바코드 생성 카운터
-            success_count = 0
-            failed_count = 0
-            
-            # A와 B 구역에 대해 바코드 생성
-            for zone in ['F']:
-                for xx in range(1, 6):  # 01~05
-                    for yy in range(1, 4):  # 01~03
-                        # 바코드 텍스트 생성
-                        barcode_text = f"{zone}-{xx:02d}-{yy:02d}"
-                        filename = f"{barcode_text}.jpeg"
-                        filepath = os.path.join(output_folder, filename)
-                        
-                        try:
-                            # 바코드 생성
-                            barcode_class = barcode.get_barcode_class("code128")
-                            barcode_instance = barcode_class(barcode_text, writer=ImageWriter())
-                            
-                            # 설정 적용
-                            options = {
-                                'font_size': 8,
-                                'text_distance': 3.0,
-                                'module_height': 8.0,  # 80/10
-                                'module_width': 0.2,
-                                'quiet_zone': 0.7,  # 7/10
-                                'write_text': True
-                            }
-                            
-                            img = barcode_instance.render(options)
-                            img.save(filepath)
-                            
-                            success_count += 1
-                            print(f"생성 완료: {filename}")
-                            
-                        except Exception as e:
-                            failed_count += 1
-                            print(f"생성 실패: {filename} - {e}")
-            
-            # 결과 메시지
-            result_message = f"일괄 생성 완료!\n\n성공: {success_count}개\n실패: {failed_count}개\n저장 위치: {output_folder} 폴더"
-            messagebox.showinfo("일괄 생성 완료", result_message)
-            self.update_status(f"일괄 생성 완료: {success_count}개 바코드")
-            
+            zones = location_barcodes.load_zones()
         except Exception as e:
-            messagebox.showerror("오류", f"일괄 생성 중 오류가 발생했습니다: {e}")
-            self.update_status("일괄 생성 실패")
-    
+            messagebox.showerror("오류", f"구역 설정을 읽을 수 없습니다: {e}")
+            return
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("보관위치 바코드 일괄 생성")
+        dialog.transient(self.root)
+
+        # 구역 선택
+        zone_frame = tk.LabelFrame(dialog, text="구역", font=("맑은 고딕", 10, "bold"))
+        zone_frame.pack(fill=tk.X, padx=10, pady=5)
+        zone_vars = {}
+        for i, (zone_code, zone_data) in enumerate(zones.items()):
+            zone_vars[zone_code] = tk.BooleanVar(value=True)
+            sections = zone_data.get('sections', {})
+            tk.Checkbutton(zone_frame, variable=zone_vars[zone_code], font=("맑은 고딕", 10),
+                           text=f"{zone_code} ({sections.get('rows', 5)}x{sections.get('columns', 3)})"
+                           ).grid(row=i // 4, column=i % 4, sticky=tk.W, padx=5)
+
+        # 출력 방식
+        output_frame = tk.LabelFrame(dialog, text="출력", font=("맑은 고딕", 10, "bold"))
+        output_frame.pack(fill=tk.X, padx=10, pady=5)
+        sheet_var = tk.StringVar(value="")
+        tk.Radiobutton(output_frame, text="폴더 (보관위치별 JPEG)", variable=sheet_var, value="",
+                       font=("맑은 고딕", 10)).pack(anchor=tk.W)
+        tk.Radiobutton(output_frame, text="A4 라벨지 PDF (40x30 칸)", variable=sheet_var, value="A4-40x30",
+                       font=("맑은 고딕", 10)).pack(anchor=tk.W)
+        tk.Radiobutton(output_frame, text="A4 라벨지 PDF (30x20 칸)", variable=sheet_var, value="A4-30x20",
+                       font=("맑은 고딕", 10)).pack(anchor=tk.W)
+
+        progress_bar = ttk.Progressbar(dialog, length=300)
+        progress_bar.pack(padx=10, pady=5)
+
+        def start():
+            selected = [zone_code for zone_code, var in zone_vars.items() if var.get()]
+            if not selected:
+                messagebox.showwarning("경고", "구역을 하나 이상 선택하세요.", parent=dialog)
+                return
+            start_btn.config(state=tk.DISABLED)
+            self.update_status(f"보관위치 바코드 생성 중: {', '.join(selected)} 구역")
+
+            # 작업 스레드 -> 메인 스레드 전달 (Tk 위젯은 메인 스레드에서만 변경)
+            events = queue.Queue()
+
+            def run():
+                try:
+                    result = location_barcodes.generate_location_barcodes(
+                        selected, sheet=sheet_var.get() or None, spawn_safe=True,
+                        progress=lambda done, total: events.put(("progress", (done, total))))
+                    events.put(("done", result))
+                except Exception as e:
+                    events.put(("error", e))
+
+            def poll():
+                while True:
+                    try:
+                        kind, value = events.get_nowait()
+                    except queue.Empty:
+                        break
+                    if kind == "progress":
+                        progress_bar.config(maximum=value[1], value=value[0])
+                        continue
+                    dialog.destroy()
+                    if kind == "done":
+                        messagebox.showinfo("일괄 생성 완료",
+                                            f"{value.report()}\n저장 위치: {location_barcodes.OUTPUT_DIR}")
+                        self.update_status(f"일괄 생성 완료: {len(value.files)}개 바코드")
+                    else:
+                        messagebox.showerror("오류", f"일괄 생성 중 오류가 발생했습니다: {value}")
+                        self.update_status("일괄 생성 실패")
+                    return
+                self.root.after(100, poll)
+
+            threading.Thread(target=run, daemon=True).start()
+            self.root.after(100, poll)
+
+        start_btn = tk.Button(dialog, text="생성", command=start,
+                              bg="#FF5722", fg="white", font=("맑은 고딕", 11),
+                              relief=tk.FLAT, bd=0, padx=20, pady=5)
+        start_btn.pack(pady=10)
+
     def update_status(self, message):
         """상태 메시지 업데이트"""
         self.status_label.config(text=message)
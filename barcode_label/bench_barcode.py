@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+Code128 바코드 래스터화 벤치마크 / 왕복 검증
+
+- 기존: python-barcode ImageWriter 렌더링 후 LANCZOS 리사이즈 (라벨 바코드 영역 크기)
+- 직접 래스터화: code128.render (정수 모듈 폭, 1비트, 리샘플링 없음)
+
+검증
+- 무작위 문자열을 code128.render로 그린 뒤 code128.decode로 다시 읽어 원래 값과 비교
+- python-barcode가 만든 모듈 패턴도 같은 디코더로 읽어 디코더 자체를 교차 확인
+
+사용법: python bench_barcode.py [--count 2000] [--width 600] [--height 150]
+"""
+
+import argparse
+import random
+import string
+import time
+
+import numpy as np
+from barcode import Code128
+from barcode.writer import ImageWriter
+from PIL import Image
+
+import code128
+
+
+def legacy_render(data, width, height):
+    """기존 create_label 방식"""
+    image = Code128(data, writer=ImageWriter()).render({'write_text': False})
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def modules_image(bits, module_width=3, height=20):
+    """모듈 패턴 문자열 -> 이미지 (여백 10모듈)"""
+    row = np.array([bit == "0" for bit in "0" * 10 + bits + "0" * 10])
+    return Image.fromarray(np.repeat(np.broadcast_to(row, (height, len(row))), module_width, axis=1))
+
+
+def sample_values(count, rng):
+    """일련번호, 제품코드-LOT 등 라벨에 쓰이는 형태의 무작위 문자열"""
+    alphabet = string.ascii_uppercase + string.digits + "-"
+    values = []
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            values.append(str(rng.randint(1, 10 ** rng.randint(1, 12))))
+        elif kind == 1:
+            values.append("".join(rng.choice(alphabet) for _ in range(rng.randint(1, 20))))
+        else:
+            values.append("".join(chr(rng.randint(32, 126)) for _ in range(rng.randint(1, 16))))
+    return values
+
+
+def measure(name, values, func):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed / len(values) * 1e6:10.1f}us/개")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Code128 래스터화 벤치마크")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--width", type=int, default=600, help="바코드 영역 폭 (40x30 라벨 600px)")
+    parser.add_argument("--height", type=int, default=150)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    values = sample_values(args.count, rng)
+
+    # 왕복 검증
+    failures, legacy_errors = [], []
+    for value in values:
+        try:
+            decoded = code128.decode(code128.render(value, max(args.width, 2000), 20))
+            if decoded != value:
+                failures.append((value, decoded))
+        except ValueError as e:
+            failures.append((value, str(e)))
+        try:
+            decoded = code128.decode(modules_image(Code128(value).build()[0]))
+        except ValueError as e:
+            decoded = str(e)
+        if decoded != value:
+            legacy_errors.append((value, decoded))
+    print(f"왕복 검증 (code128.render -> decode): {len(values)}개 중 실패 {len(failures)}개")
+    for value, decoded in failures[:10]:
+        print(f"  {value!r} -> {decoded!r}")
+    # python-barcode는 Code C에서 숫자쌍 "99"를 빠뜨리는 경우가 있음 (예: 99197 -> 197)
+    print(f"교차 확인 (python-barcode 패턴 -> decode): 값이 달라진 경우 {len(legacy_errors)}개")
+    for value, decoded in legacy_errors[:10]:
+        print(f"  {value!r} -> {decoded!r}")
+
+    # 라벨 바코드(일련번호) 속도 비교
+    serials = [str(serial) for serial in range(100000, 100000 + min(args.count, 500))]
+    legacy = measure("기존 (렌더링 + LANCZOS)", serials, lambda s: legacy_render(s, args.width, args.height))
+    direct = measure("직접 래스터화 (1비트)", serials, lambda s: code128.render(s, args.width, args.height))
+    print(f"속도 향상: {legacy / direct:.1f}x")
+
+    # 막대 경계 확인: 기존 방식은 리샘플링으로 회색 픽셀이 생김
+    gray = np.asarray(legacy_render(serials[0], args.width, args.height).convert("L"))
+    blurred = np.count_nonzero((gray > 0) & (gray < 255)) / gray.size
+    print(f"기존 방식 회색(흐린) 픽셀 비율: {blurred * 100:.1f}%, 직접 래스터화: 0% (mode '1')")
+    image = code128.render(serials[0], args.width, args.height)
+    module_width = args.width // (len(code128.modules(serials[0])) + 2 * code128.QUIET_ZONE)
+    print(f"일련번호 {serials[0]}: {len(code128.modules(serials[0]))}모듈, 모듈 폭 {module_width}px, 이미지 {image.size} {image.mode}")
+
+
+if __name__ == "__main__":
+    main()
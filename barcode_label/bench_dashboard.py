@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+대시보드 집계 벤치마크
+기존 update_dashboard 방식(그룹마다 전체 필터 + iterrows + 행별 to_datetime)과
+location_aggregate.dashboard_rows(벡터 연산)를 10k/100k/1M 행에서 비교
+
+사용법: python bench_dashboard.py [--sizes 10000 100000 1000000] [--legacy-max 10000]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from location_aggregate import dashboard_rows
+
+
+def make_history(rows, seed=0):
+    """가상 발행 이력 생성 (구역 8개 x 15칸, 제품 30종)"""
+    rng = np.random.default_rng(seed)
+    locations = [f"{zone}-{r:02d}-{c:02d}" for zone in "ABCDEFGH" for r in range(1, 6) for c in range(1, 4)]
+    codes = [f"P{i:04d}" for i in range(30)]
+    expiry = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 1500, rows), unit="D")
+    # 2/29 유통기한은 기존 방식에서 폐기일자가 N/A가 되므로 비교용 데이터에서 제외
+    expiry = expiry.where(~((expiry.month == 2) & (expiry.day == 29)), expiry + pd.Timedelta(days=1))
+    code_idx = rng.integers(0, len(codes), rows)
+    return pd.DataFrame({
+        "발행일시": "2024-01-01 09:00:00",
+        "구분": np.where(rng.random(rows) < 0.2, "관리품", "일반재고"),
+        "제품코드": np.array(codes)[code_idx],
+        "제품명": np.array([f"제품 {c}" for c in codes])[code_idx],
+        "LOT": rng.integers(100000, 999999, rows).astype(str),
+        "유통기한": expiry.strftime("%Y-%m-%d"),
+        "폐기일자": "N/A",
+        "보관위치": np.array(locations)[rng.integers(0, len(locations), rows)],
+    })
+
+
+def legacy_dashboard_rows(df):
+    """기존 update_dashboard 집계 로직 (Treeview 삽입 제외)"""
+    grouped = df.groupby(["보관위치", "구분", "제품코드", "제품명"]).size().reset_index()
+    grouped.columns = ["보관위치", "구분", "제품코드", "제품명", "수량"]
+    result = []
+    for _, row in grouped.iterrows():
+        location, product, product_code, category = row["보관위치"], row["제품명"], row["제품코드"], row["구분"]
+        filtered_df = df[(df["보관위치"] == location) & (df["구분"] == category) & (df["제품코드"] == product_code) & (df["제품명"] == product)]
+        current_date = pd.Timestamp.now()
+        expiry_dates = []
+        for _, filtered_row in filtered_df.iterrows():
+            try:
+                expiry_dates.append((pd.to_datetime(filtered_row["유통기한"]), filtered_row))
+            except:
+                continue
+        if expiry_dates:
+            closest_expiry, closest_row = min(expiry_dates, key=lambda x: abs((x[0] - current_date).days))
+            latest_lot = str(closest_row["LOT"])
+            latest_expiry = closest_expiry.strftime("%Y-%m-%d")
+            latest_disposal = closest_row.get("폐기일자", "N/A")
+            if latest_disposal == "N/A" or pd.isna(latest_disposal):
+                try:
+                    latest_disposal = closest_expiry.replace(year=closest_expiry.year + 1).strftime("%Y-%m-%d")
+                except:
+                    latest_disposal = "N/A"
+        else:
+            latest_lot = latest_expiry = latest_disposal = "N/A"
+        result.append((location, category, product_code, product, row["수량"], latest_lot, latest_expiry, latest_disposal))
+    return result
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 집계 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=10000,
+                        help="기존 방식을 측정할 최대 행 수 (그 이상은 시간이 너무 오래 걸려 생략)")
+    args = parser.parse_args()
+
+    # 결과 일치 확인 (작은 데이터)
+    sample = make_history(2000, seed=1)
+    legacy, _ = timed(legacy_dashboard_rows, sample)
+    fast = list(dashboard_rows(sample).itertuples(index=False, name=None))
+    assert [tuple(map(str, r)) for r in legacy] == [tuple(map(str, r)) for r in fast], "집계 결과가 다릅니다."
+    print("결과 일치 확인: OK (2,000행)")
+
+    print(f"{'행 수':>10} {'그룹 수':>8} {'기존(초)':>10} {'벡터(초)':>10} {'속도 향상':>10}")
+    for size in args.sizes:
+        df = make_history(size)
+        fast, fast_time = timed(dashboard_rows, df)
+        if size <= args.legacy_max:
+            _, legacy_time = timed(legacy_dashboard_rows, df)
+            legacy_text = f"{legacy_time:10.2f}"
+            speedup = f"{legacy_time / fast_time:9.0f}x"
+        else:
+            legacy_text, speedup = f"{'생략':>8}", f"{'-':>10}"
+        print(f"{size:>10,} {len(fast):>8,} {legacy_text} {fast_time:10.3f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
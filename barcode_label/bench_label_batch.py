@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+라벨 일괄 발행 벤치마크
+임시 폴더의 일련번호 DB/발행 이력 DB를 사용해 라벨 N장을 발행하며 처리량 비교
+
+- 기존: 라벨마다 일련번호 발급 -> 렌더링 -> 저장 -> 발행 내역 1행 추가
+- 일괄 발행: label_batch.create_labels_batch (작업 프로세스 수별)
+
+사용법: python bench_label_batch.py [--labels 500] [--workers 1 4] [--font 폰트경로]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라벨 일괄 발행 벤치마크")
+    parser.add_argument("--labels", type=int, default=500)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--font", help="사용할 TTF 경로 (한글 폰트가 없는 환경)")
+    args = parser.parse_args()
+
+    if args.font:
+        os.environ["LABEL_FONT_PATH"] = args.font
+
+    from issue_history_store import IssueHistoryStore, LAYOUT_40X30
+    from label_batch import create_labels_batch, issue_record
+    from label_registry import LabelRegistry
+    from label_template import label_templates
+
+    products = {"EQ-SERUM-050": "이퀄베리 프로바이오틱스 바쿠치올 탄력 앰플 세럼 50ml 기획세트",
+                "EQ-TONER-200": "이퀄베리 토너 200ml"}
+    items = [{'product_code': code, 'lot': f"24091{i % 3}A", 'expiry': "2026-09-14", 'version': "V2",
+              'location': f"A-0{i % 3 + 1}-02", 'category': "관리품"}
+             for i, code in enumerate(["EQ-SERUM-050"] * (args.labels // 2) +
+                                      ["EQ-TONER-200"] * (args.labels - args.labels // 2))]
+    print(f"라벨 {len(items)}장, CPU {os.cpu_count()}개")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        registry = LabelRegistry(os.path.join(temp_dir, "serial.db"))
+        store = IssueHistoryStore(os.path.join(temp_dir, "history.db"), legacy_files={})
+
+        # 기존 방식
+        output_dir = os.path.join(temp_dir, "legacy")
+        os.makedirs(output_dir)
+        start = time.perf_counter()
+        for item in items:
+            serial = registry.register(**item)
+            fields = (item['product_code'], products[item['product_code']], item['category'], item['lot'],
+                      item['expiry'], item['version'], item['location'])
+            filename = os.path.join(output_dir, f"{item['product_code']}-{item['location']}-{serial}.jpg")
+            label_templates.compose(LAYOUT_40X30, serial, *fields).save(filename)
+            store.append(issue_record(item, fields[1], filename, serial, "2024-09-15 00:00:00"))
+        legacy = time.perf_counter() - start
+        print(f"{'기존 (1장씩)':<24} {len(items) / legacy:8.1f} 라벨/초 ({legacy:.2f}초)")
+
+        for workers in args.workers:
+            output_dir = os.path.join(temp_dir, f"batch{workers}")
+            streamed = []
+            result = create_labels_batch(items, products=products, registry=registry, store=store,
+                                         output_dir=output_dir, max_workers=workers, spawn_safe=True,
+                                         on_label=lambda label: streamed.append(label.serial_number))
+            serials = [label.serial_number for label in result.labels]
+            in_order = streamed == serials == list(range(serials[0], serials[0] + len(items)))
+            print(f"{f'일괄 발행 (작업 {workers}개)':<24} {result.rate:8.1f} 라벨/초 ({result.elapsed:.2f}초, "
+                  f"{legacy / result.elapsed:.2f}x, 순서/연속 번호 확인: {in_order})")
+
+        print(f"발행 내역 {store.count()}행, 마지막 일련번호 {registry.current_serial()}")
+
+
+if __name__ == "__main__":
+    main()
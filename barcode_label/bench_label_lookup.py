@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+일련번호 조회 벤치마크
+라벨 N건이 등록된 label_serial DB에서 get_label_info_by_serial 조회 시간을 측정
+(인덱스 없는 기존 테이블 / 기본키 조회 / LRU 캐시 적중)
+
+사용법: python bench_label_lookup.py [--labels 1000000] [--lookups 20000] [--legacy-lookups 200]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from label_registry import LabelRegistry, LABEL_FIELDS
+
+
+def fill(registry, labels, chunk=50000):
+    """가상 라벨 정보 labels건 등록"""
+    for start in range(0, labels, chunk):
+        size = min(chunk, labels - start)
+        registry.register_many({
+            'product_code': f"P{(start + i) % 500:04d}", 'lot': f"L{(start + i) % 2000:05d}",
+            'expiry': "2026-12-31", 'version': "V1",
+            'location': f"A-{(start + i) % 20:02d}-{(start + i) % 5:02d}", 'category': "일반재고",
+        } for i in range(size))
+
+
+def per_lookup_us(func, serials):
+    start = time.perf_counter()
+    for serial in serials:
+        func(serial)
+    return (time.perf_counter() - start) / len(serials) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일련번호 조회 벤치마크")
+    parser.add_argument("--labels", type=int, default=1000000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--legacy-lookups", type=int, default=200,
+                        help="인덱스 없는 기존 테이블 조회 횟수 (전체 스캔이라 적게)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "label_serial.db")
+        registry = LabelRegistry(db_path)
+        begin = time.perf_counter()
+        fill(registry, args.labels)
+        print(f"라벨 {args.labels:,}건 등록: {time.perf_counter() - begin:.1f}초")
+
+        rng = random.Random(0)
+        serials = [rng.randint(1, args.labels) for _ in range(args.lookups)]
+
+        # 기존 방식: 인덱스 없는 label_info 전체 스캔
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE legacy_label_info AS SELECT * FROM label_info")
+        legacy_sql = f"SELECT {', '.join(LABEL_FIELDS)} FROM legacy_label_info WHERE serial_number = ?"
+        legacy = per_lookup_us(lambda s: conn.execute(legacy_sql, (s,)).fetchone(), serials[:args.legacy_lookups])
+
+        uncached = LabelRegistry(db_path, cache_size=0)
+        indexed = per_lookup_us(uncached.get, serials)
+        cold = per_lookup_us(registry.get, serials)
+        warm = per_lookup_us(registry.get, serials[-registry.cache_size:])
+        conn.close()
+
+        print(f"{'방식':<24} {'조회당(µs)':>12}")
+        print(f"{'인덱스 없음 (기존)':<24} {legacy:12.1f}")
+        print(f"{'기본키 조회':<24} {indexed:12.1f}")
+        print(f"{'LRU 첫 조회':<24} {cold:12.1f}")
+        print(f"{'LRU 캐시 적중':<24} {warm:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
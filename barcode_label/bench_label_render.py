@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+라벨 렌더링 벤치마크
+40x30 라벨(텍스트 + Code128 바코드)을 반복 생성하며 초당 라벨 수를 비교
+
+- 기존: 라벨마다 ImageFont.truetype 5회
+- 폰트 캐시: font_provider.get_font
+- 빠른 줄바꿈: text_layout.wrap_text (글자 폭 1회 측정 + 이분 탐색 + 결과 캐시)
+- 템플릿 캐시: label_template.label_templates (고정 영역은 한 번만, 라벨마다 바코드만)
+
+사용법: python bench_label_render.py [--labels 300] [--font 폰트경로]
+(한글 폰트가 없는 환경에서는 --font 또는 LABEL_FONT_PATH로 아무 TTF나 지정)
+"""
+
+import argparse
+import os
+import time
+
+import barcode
+from barcode.writer import ImageWriter
+from PIL import Image, ImageDraw, ImageFont
+
+LABEL_WIDTH = 640
+LABEL_HEIGHT = 480
+
+SAMPLE = {
+    "product_code": "EQ-SERUM-050",
+    "product_name": "이퀄베리 프로바이오틱스 바쿠치올 탄력 앰플 세럼 50ml 기획세트",
+    "category": "일반재고",
+    "lot": "240915A",
+    "expiry": "2026-09-14",
+    "version": "V2",
+    "location": "A-01-02",
+}
+
+
+def legacy_fonts(font_path):
+    """기존 방식: 라벨마다 폰트 파일을 다시 읽음"""
+    return {
+        "small": ImageFont.truetype(font_path, 20),
+        "large": ImageFont.truetype(font_path, 28),
+        "product": ImageFont.truetype(font_path, 24),
+        "info": ImageFont.truetype(font_path, 24),
+        "default": ImageFont.truetype(font_path, 28),
+    }
+
+
+def cached_fonts(font_path):
+    from font_provider import get_font
+    return {"small": get_font(20), "large": get_font(28), "product": get_font(24),
+            "info": get_font(24), "default": get_font(28)}
+
+
+def legacy_wrap(draw, text, font, max_width):
+    """기존 create_label의 글자 단위 줄바꿈 (접두어마다 textbbox)"""
+    lines, current_line = [], ""
+    for char in text:
+        test_line = current_line + char
+        bbox = draw.textbbox((0, 0), test_line, font=font)
+        if bbox[2] - bbox[0] <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = char
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+def fast_wrap(draw, text, font, max_width):
+    """text_layout.wrap_text (legacy_wrap과 같은 시그니처)"""
+    from text_layout import wrap_text
+    return wrap_text(text, font, max_width)
+
+
+def compare_wrap(font, names, widths):
+    """제품명 줄바꿈만 비교 (결과 차이 수, 캐시 없음/있음 시간)"""
+    from text_layout import wrap_text, _char_width
+    draw = ImageDraw.Draw(Image.new('RGB', (1, 1)))
+    cases = [(name, width) for name in names for width in widths]
+
+    start = time.perf_counter()
+    legacy = [legacy_wrap(draw, name, font, width) for name, width in cases]
+    legacy_time = time.perf_counter() - start
+
+    wrap_text.cache_clear()
+    _char_width.cache_clear()
+    start = time.perf_counter()
+    fast = [list(wrap_text(name, font, width)) for name, width in cases]
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name, width in cases:
+        wrap_text(name, font, width)
+    warm_time = time.perf_counter() - start
+
+    diff = sum(1 for a, b in zip(legacy, fast) if a != b)
+    n = len(cases)
+    print(f"[제품명 줄바꿈] {n}건, 결과가 다른 경우 {diff}건 (잉크 폭 vs 진행 폭 차이)")
+    print(f"{'기존 (접두어마다 textbbox)':<28} {legacy_time / n * 1e6:10.1f}us/건")
+    print(f"{'빠른 줄바꿈 (캐시 없음)':<28} {cold_time / n * 1e6:10.1f}us/건 ({legacy_time / cold_time:.1f}x)")
+    print(f"{'빠른 줄바꿈 (캐시 적중)':<28} {warm_time / n * 1e6:10.1f}us/건 ({legacy_time / warm_time:.1f}x)")
+
+
+def render(serial, fonts, wrap=legacy_wrap, item=SAMPLE, with_barcode=True):
+    """create_label과 같은 배치로 라벨 1장 생성"""
+    label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
+    draw = ImageDraw.Draw(label)
+    font_product, font_info, font_small = fonts["product"], fonts["info"], fonts["small"]
+
+    prefix_width = draw.textbbox((0, 0), "제품명: ", font=font_product)[2]
+    y_pos = 15
+    for i, line in enumerate(wrap(draw, item["product_name"], font_product, LABEL_WIDTH - 40 - prefix_width)):
+        draw.text((20 if i == 0 else 20 + prefix_width, y_pos), f"제품명: {line}" if i == 0 else line,
+                  fill="black", font=font_product)
+        y_pos += 32
+    draw.text((20, y_pos), f"구분: {item['category']}", fill="black", font=font_product)
+    y_pos += 32
+    draw.text((20, y_pos), f"LOT: {item['lot']}    유통기한: {item['expiry']}    버전: {item['version']}",
+              fill="black", font=font_info)
+    draw.text((20, y_pos + 30), f"보관위치: {item['location']}", fill="black", font=font_info)
+
+    if not with_barcode:
+        return label
+    barcode_img = barcode.get_barcode_class('code128')(str(serial), writer=ImageWriter()).render({'write_text': False})
+    barcode_img = barcode_img.resize((LABEL_WIDTH - 40, 150), Image.Resampling.LANCZOS)
+    label.paste(barcode_img, (5, LABEL_HEIGHT - 250))
+    text = f"{item['product_code']}-{item['lot']}-{item['expiry']}-{item['version']}"
+    bbox = draw.textbbox((0, 0), text, font=font_small)
+    draw.text(((LABEL_WIDTH - bbox[2] + bbox[0]) // 2, LABEL_HEIGHT - 50), text, fill="black", font=font_small)
+    return label
+
+
+def measure(name, count, make_label):
+    start = time.perf_counter()
+    for serial in range(1, count + 1):
+        make_label(serial)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {count / elapsed:10.1f} 라벨/초 ({elapsed / count * 1000:.2f}ms/라벨)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="라벨 렌더링 벤치마크")
+    parser.add_argument("--labels", type=int, default=300)
+    parser.add_argument("--font", help="사용할 TTF 경로 (기본: font_provider가 찾은 한글 폰트)")
+    args = parser.parse_args()
+
+    if args.font:
+        os.environ["LABEL_FONT_PATH"] = args.font
+    from font_provider import resolve_font_path
+    font_path = resolve_font_path()
+    if not font_path:
+        print("TTF 폰트를 찾지 못했습니다. --font로 폰트 파일을 지정하세요.")
+        return
+
+    print(f"폰트: {font_path} ({os.path.getsize(font_path) / 1024:.0f}KB), 라벨 {args.labels}장")
+    for with_barcode, title in ((False, "텍스트만"), (True, "텍스트 + 바코드")):
+        print(f"[{title}]")
+        legacy = measure("기존 (라벨마다 폰트 로드)", args.labels,
+                         lambda s: render(s, legacy_fonts(font_path), with_barcode=with_barcode))
+        cached = measure("폰트 캐시", args.labels,
+                         lambda s: render(s, cached_fonts(font_path), with_barcode=with_barcode))
+        fast = measure("폰트 캐시 + 빠른 줄바꿈", args.labels,
+                       lambda s: render(s, cached_fonts(font_path), wrap=fast_wrap, with_barcode=with_barcode))
+        print(f"속도 향상: 폰트 캐시 {legacy / cached:.2f}x, + 줄바꿈 {legacy / fast:.2f}x")
+
+    from label_template import label_templates, LAYOUT_40X30
+    fields = (SAMPLE["product_code"], SAMPLE["product_name"], SAMPLE["category"], SAMPLE["lot"],
+              SAMPLE["expiry"], SAMPLE["version"], SAMPLE["location"])
+    print("[텍스트 + 바코드, 같은 제품/LOT 연속 발행]")
+    fast = measure("폰트 캐시 + 빠른 줄바꿈", args.labels,
+                   lambda s: render(s, cached_fonts(font_path), wrap=fast_wrap))
+    template = measure("템플릿 캐시 (바코드만 그림)", args.labels,
+                       lambda s: label_templates.compose(LAYOUT_40X30, s, *fields))
+    # 텍스트 영역 비교 (바코드는 code128 직접 래스터화로 바뀌어 영역 밖만 비교)
+    expected = render(12345, cached_fonts(font_path), wrap=fast_wrap)
+    actual = label_templates.compose(LAYOUT_40X30, 12345, *fields)
+    barcode_box = (0, LABEL_HEIGHT - 250, LABEL_WIDTH, LABEL_HEIGHT - 100)
+    for image in (expected, actual):
+        image.paste("white", barcode_box)
+    same = expected.tobytes() == actual.tobytes()
+    print(f"속도 향상: {fast / template:.2f}x, 텍스트 영역 동일: {same}, {label_templates.stats()}")
+
+    names = [SAMPLE["product_name"], "Equalberry Bakuchiol Firming Ampoule Serum 50ml",
+             "닥터블릿 멜라 토닝 크림 50ml x 2개 세트 (리뉴얼)", "TEST 제품"]
+    compare_wrap(cached_fonts(font_path)["product"], names, range(200, 601, 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+라벨 시트(PDF/ZPL) 합치기 벤치마크 / 검증
+임시 폴더에 40x30 라벨 JPEG N장을 만든 뒤 인쇄용 파일 하나로 합치며 시간과 최대 메모리 비교
+
+- 기존 방식: 라벨 파일 N개 (인쇄 작업 N번)
+- PIL 한 번에 저장: 모든 라벨을 메모리에 올려 Image.save(save_all=True, append_images=[...])
+- label_sheet.write_sheets: 페이지 단위로 바로 기록 (롤 40x30, A4 40x30 격자, ZPL)
+
+각 방식은 별도 프로세스에서 실행해 최대 메모리(ru_maxrss)를 따로 측정
+검증: 작성한 PDF의 xref/페이지 수를 확인하고, 페이지 이미지 스트림을 풀어
+칸마다 일련번호 바코드를 code128.decode로 읽어 입력 순서와 비교
+
+사용법: python bench_label_sheet.py [--labels 1000] [--font 폰트경로]
+"""
+
+import argparse
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+FIRST_SERIAL = 100000
+
+
+def make_labels(label_dir, count):
+    from issue_history_store import LAYOUT_40X30
+    from label_template import label_templates
+
+    paths = []
+    for i in range(count):
+        path = os.path.join(label_dir, f"EQ-SERUM-050-A-01-02-{FIRST_SERIAL + i}.jpg")
+        label_templates.compose(LAYOUT_40X30, FIRST_SERIAL + i, "EQ-SERUM-050", "이퀄베리 바쿠치올 앰플 세럼 50ml",
+                                "관리품", "240910A", "2026-09-14", "V2", "A-01-02").save(path)
+        paths.append(path)
+    return paths
+
+
+def run_mode(mode, label_dir, output):
+    """자식 프로세스: 한 가지 방식으로 합치고 시간/최대 메모리를 JSON으로 출력"""
+    from PIL import Image
+    import label_sheet
+
+    paths = sorted(os.path.join(label_dir, name) for name in os.listdir(label_dir))
+    start = time.perf_counter()
+    if mode == "pil":
+        images = [Image.open(path).convert("RGB") for path in paths]
+        images[0].save(output, save_all=True, append_images=images[1:], resolution=406.4)
+        pages = len(images)
+    else:
+        pages = label_sheet.write_sheets(iter(paths), output, mode.split(":")[1])
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"elapsed": elapsed, "pages": pages, "size": os.path.getsize(output),
+                      "maxrss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+
+
+def measure(mode, label_dir, output):
+    result = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, label_dir, output],
+                            capture_output=True, text=True, env=os.environ)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def read_pdf_pages(path):
+    """PDF 구조 확인 (xref 오프셋이 각 객체 위치와 맞는지) 후 페이지 이미지 목록"""
+    from PIL import Image
+
+    with open(path, "rb") as f:
+        data = f.read()
+    xref_offset = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n ", data[xref_offset:])
+    for object_id, offset in enumerate(entries, 1):
+        if not data[int(offset):].startswith(f"{object_id} 0 obj".encode("ascii")):
+            raise ValueError(f"xref 오프셋 불일치: 객체 {object_id}")
+    count = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+
+    pages = []
+    for match in re.finditer(rb"/Width (\d+) /Height (\d+) .*?/Length (\d+) >>\nstream\n", data):
+        width, height, length = (int(value) for value in match.groups())
+        raw = zlib.decompress(data[match.end():match.end() + length])
+        pages.append(Image.frombytes("1", (width, height), raw))
+    if len(pages) != count:
+        raise ValueError(f"페이지 수 불일치: /Count {count}, 이미지 {len(pages)}")
+    return pages
+
+
+def read_serials(pages, stock):
+    """페이지 칸마다 바코드 영역(라벨 y 230~380)을 읽어 일련번호 목록"""
+    import code128
+
+    serials = []
+    for page in pages:
+        for slot in range(stock.per_page):
+            x, y = stock.slot_origin(slot)
+            cell = page.crop((x, y + 230, x + stock.label_px[0], y + 380))
+            if cell.getextrema() == (255, 255):  # 마지막 페이지의 빈 칸
+                continue
+            serials.append(int(code128.decode(cell)))
+    return serials
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        run_mode(*sys.argv[2:5])
+        return
+
+    parser = argparse.ArgumentParser(description="라벨 시트 합치기 벤치마크")
+    parser.add_argument("--labels", type=int, default=1000)
+    parser.add_argument("--font", help="사용할 TTF 경로 (한글 폰트가 없는 환경)")
+    args = parser.parse_args()
+
+    if args.font:
+        os.environ["LABEL_FONT_PATH"] = args.font
+
+    import label_sheet
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        label_dir = os.path.join(temp_dir, "labeljpg")
+        os.makedirs(label_dir)
+        start = time.perf_counter()
+        paths = make_labels(label_dir, args.labels)
+        print(f"라벨 JPEG {len(paths)}개 생성 ({time.perf_counter() - start:.1f}초) = 기존 방식 인쇄 작업 {len(paths)}번")
+
+        modes = [("PIL 한 번에 저장 (전체 메모리)", "pil", "pil.pdf"),
+                 ("롤 40x30 PDF (페이지 단위)", "sheet:40x30", "roll.pdf"),
+                 ("A4 40x30 격자 PDF", "sheet:A4-40x30", "a4.pdf"),
+                 ("롤 40x30 ZPL (Z64)", "sheet:40x30", "roll.zpl")]
+        for title, mode, filename in modes:
+            result = measure(mode, label_dir, os.path.join(temp_dir, filename))
+            print(f"{title:<28} {result['elapsed']:6.2f}초, {result['pages']:5d}페이지, "
+                  f"{result['size'] / 1024 / 1024:7.1f}MB, 최대 메모리 {result['maxrss_mb']:6.0f}MB")
+
+        expected = list(range(FIRST_SERIAL, FIRST_SERIAL + len(paths)))
+        for filename, stock in [("roll.pdf", "40x30"), ("a4.pdf", "A4-40x30")]:
+            serials = read_serials(read_pdf_pages(os.path.join(temp_dir, filename)), label_sheet.STOCKS[stock])
+            print(f"검증 {filename}: 바코드 {len(serials)}개 판독, 순서/값 일치: {serials == expected}")
+
+
+if __name__ == "__main__":
+    main()
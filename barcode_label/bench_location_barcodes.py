@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+보관위치 바코드 일괄 생성 벤치마크
+임시 폴더에 구역 설정(구역 수 x 행 x 열)을 만들고 보관위치 바코드를 생성하며 비교
+
+- 기존 방식: 보관위치마다 렌더링 후 파일 저장 (한 스레드에서 순서대로)
+- location_barcodes: 작업 프로세스 수별 첫 생성, 이어서 같은 설정으로 다시 실행 (해시가 같으면 건너뜀)
+- 구역 하나의 파일을 바꾼 뒤 다시 실행해 해당 파일만 다시 생성되는지 확인
+
+사용법: python bench_location_barcodes.py [--zones 20] [--rows 10] [--columns 10] [--workers 1 4]
+"""
+
+import argparse
+import json
+import os
+import string
+import tempfile
+import time
+
+import location_barcodes
+
+
+def legacy_generate(locations, output_dir):
+    """기존 batch_generate_barcodes 방식"""
+    import barcode
+    from barcode.writer import ImageWriter
+
+    for location in locations:
+        image = barcode.get_barcode_class("code128")(location, writer=ImageWriter()).render(
+            location_barcodes.RENDER_OPTIONS)
+        image.save(os.path.join(output_dir, f"{location}.jpeg"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보관위치 바코드 일괄 생성 벤치마크")
+    parser.add_argument("--zones", type=int, default=20)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--columns", type=int, default=10)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    zone_codes = [a + b for a in ["", *string.ascii_uppercase] for b in string.ascii_uppercase][:args.zones]
+    config = {"zones": {code: {"name": f"{code} 구역", "sections": {"rows": args.rows, "columns": args.columns}}
+                        for code in zone_codes}}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = os.path.join(temp_dir, "zone_config.json")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, ensure_ascii=False)
+        locations = location_barcodes.load_locations(config_file=config_file)
+        print(f"보관위치 {len(locations)}개 (구역 {args.zones}개 x {args.rows}행 x {args.columns}열), CPU {os.cpu_count()}개")
+
+        legacy_dir = os.path.join(temp_dir, "legacy")
+        os.makedirs(legacy_dir)
+        start = time.perf_counter()
+        legacy_generate(locations, legacy_dir)
+        legacy = time.perf_counter() - start
+        print(f"{'기존 (순서대로)':<28} {legacy:6.2f}초, {len(locations) / legacy:7.0f}개/초")
+
+        for workers in args.workers:
+            output_dir = os.path.join(temp_dir, f"workers{workers}")
+            result = location_barcodes.generate_location_barcodes(
+                output_dir=output_dir, max_workers=workers, config_file=config_file)
+            print(f"{f'첫 생성 (작업 프로세스 {result.workers}개)':<28} {result.elapsed:6.2f}초, "
+                  f"{len(locations) / result.elapsed:7.0f}개/초, 생성 {len(result.generated)}개")
+
+            # 기존 방식과 같은 이미지인지 (같은 옵션, 같은 JPEG 인코더)
+            same = sum(location_barcodes.file_hash(os.path.join(output_dir, f"{location}.jpeg")) ==
+                       location_barcodes.file_hash(os.path.join(legacy_dir, f"{location}.jpeg"))
+                       for location in locations)
+            print(f"  기존 방식과 파일 내용 동일: {same}/{len(locations)}")
+
+        # 다시 실행 (모두 건너뜀)
+        output_dir = os.path.join(temp_dir, f"workers{args.workers[-1]}")
+        result = location_barcodes.generate_location_barcodes(
+            output_dir=output_dir, max_workers=args.workers[-1], config_file=config_file)
+        print(f"{'다시 실행 (변경 없음)':<28} {result.elapsed:6.2f}초, 생성 {len(result.generated)}개, "
+              f"건너뜀 {len(result.skipped)}개 ({legacy / result.elapsed:.0f}x)")
+
+        # 파일 하나 손상 + 구역 하나만 선택해서 A4 시트로 출력
+        with open(os.path.join(output_dir, f"{locations[0]}.jpeg"), 'ab') as f:
+            f.write(b"broken")
+        result = location_barcodes.generate_location_barcodes(
+            [zone_codes[0]], output_dir=output_dir, sheet="A4-40x30", config_file=config_file)
+        print(f"{'손상 1개 + 구역 1개 시트':<28} {result.elapsed:6.2f}초, 다시 생성 {result.generated}, "
+              f"건너뜀 {len(result.skipped)}개, 시트 {os.path.basename(result.sheet_file)}")
+
+
+if __name__ == "__main__":
+    main()
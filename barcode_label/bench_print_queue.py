@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+인쇄 대기열 벤치마크 / 가짜 프린터 테스트
+로컬 소켓 서버(FakePrinter)가 9100 포트 프린터처럼 ZPL을 받아 기록
+
+1. 처리량: 라벨 N장(^XF 작업)을 대기열에 넣고 모두 전송될 때까지 라벨/초 (묶음 전송 vs 작업마다 연결)
+2. 순서: 받은 일련번호가 넣은 순서와 같은지 확인
+3. 재시도: 프린터가 꺼진 상태에서 작업을 넣고, 잠시 후 켰을 때 모두 전송되는지 확인
+4. 여러 프로그램: 같은 DB를 쓰는 대기열 2개(작업 스레드 2개)에서 한 번씩만, 순서대로 인쇄되는지 확인
+
+사용법: python bench_print_queue.py [--labels 2000] [--single-max 200]
+"""
+
+import argparse
+import os
+import re
+import socket
+import socketserver
+import tempfile
+import threading
+import time
+
+from print_queue import PrintQueue, TcpTransport
+import zpl_format
+
+
+class FakePrinter:
+    """받은 데이터를 기록하는 가짜 ZPL 프린터 (실제 프린터처럼 연결을 하나씩 순서대로 처리)"""
+
+    def __init__(self, port=0):
+        self.connections = 0
+        self.data = bytearray()
+        self.lock = threading.Lock()
+        printer = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                chunks = []
+                while True:
+                    chunk = self.request.recv(65536)
+                    if not chunk:
+                        break
+                    chunks.append(chunk)
+                with printer.lock:
+                    printer.connections += 1
+                    printer.data.extend(b"".join(chunks))
+
+        socketserver.TCPServer.allow_reuse_address = True
+        self.server = socketserver.TCPServer(("127.0.0.1", port), Handler)
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def labels(self):
+        """받은 라벨(^XZ로 끝나는 ^XF 작업)의 일련번호 목록"""
+        with self.lock:
+            text = self.data.decode("utf-8")
+        return [int(serial) for serial in re.findall(r"\^XF[^\^]*\^FS\^FN1\^FD(\d+)\^FS\^XZ", text)]
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_jobs(count):
+    """저장 포맷 1건 + 라벨별 ^XF 작업"""
+    base = {'product_code': "EQ-SERUM-050", 'product_name': "Equalberry Serum 50ml", 'category': "관리품",
+            'lot': "240915A", 'expiry': "2026-09-14", 'version': "V2", 'location': "A-01-02"}
+    lines = zpl_format.batch_job([dict(base, serial_number=100000 + i) for i in range(count)]).split("\n")
+    format_part = "\n".join(lines[:-count])
+    return format_part, lines[-count:]
+
+
+def run(title, labels, batch_bytes, temp_dir):
+    printer = FakePrinter()
+    queue = PrintQueue(TcpTransport("127.0.0.1", printer.port), os.path.join(temp_dir, f"{title}.db"),
+                       batch_bytes=batch_bytes)
+    format_part, jobs = make_jobs(labels)
+    start = time.perf_counter()
+    queue.submit(format_part, "저장 포맷")
+    for i, job in enumerate(jobs):
+        queue.submit(job, f"라벨 {i + 1}")
+    queue.wait_idle()
+    elapsed = time.perf_counter() - start
+    queue.stop()
+    received = printer.labels()
+    in_order = received == list(range(100000, 100000 + labels))
+    print(f"{title:<22} {labels / elapsed:9.0f} 라벨/초 ({elapsed:.2f}초, 연결 {printer.connections}회, "
+          f"수신 {len(printer.data):,} bytes, 순서 일치: {in_order})")
+    printer.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="인쇄 대기열 벤치마크")
+    parser.add_argument("--labels", type=int, default=2000)
+    parser.add_argument("--single-max", type=int, default=200,
+                        help="작업마다 연결하는 방식으로 보낼 최대 라벨 수 (연결 비용이 커서 적게)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        single_labels = min(args.labels, args.single_max)
+        single = run("작업마다 연결", single_labels, 0, temp_dir) / single_labels
+        batched = run("묶음 전송 (256KB)", args.labels, 256 * 1024, temp_dir) / args.labels
+        print(f"묶음 전송 속도 향상 (라벨당 시간 기준): {single / batched:.1f}x")
+
+        # 재시도: 꺼진 프린터 -> 1.5초 후 켜짐
+        port = free_port()
+        statuses = []
+        queue = PrintQueue(TcpTransport("127.0.0.1", port, timeout=1), os.path.join(temp_dir, "retry.db"),
+                           on_status=lambda kind, job_ids, message: statuses.append(kind),
+                           backoff_base=0.2, backoff_max=1.0)
+        format_part, jobs = make_jobs(20)
+        queue.submit(format_part)
+        for job in jobs:
+            queue.submit(job)
+        time.sleep(1.5)
+        printer = FakePrinter(port)
+        queue.wait_idle(timeout=10)
+        queue.stop()
+        ok = printer.labels() == list(range(100000, 100020))
+        print(f"재시도: 재시도 알림 {statuses.count('retrying')}회, 전송 알림 {statuses.count('printed')}회, "
+              f"프린터 켜진 뒤 20장 모두 순서대로 수신: {ok}")
+        printer.close()
+
+        # 같은 DB를 쓰는 대기열 2개 (label_gui와 streamlit_app이 함께 실행 중인 경우)
+        printer = FakePrinter()
+        db_path = os.path.join(temp_dir, "shared.db")
+        queues = [PrintQueue(TcpTransport("127.0.0.1", printer.port), db_path, batch_bytes=2048) for _ in range(2)]
+        for queue in queues:
+            queue.start()
+        format_part, jobs = make_jobs(200)
+        queues[0].submit(format_part)
+        for i, job in enumerate(jobs):
+            queues[i % 2].submit(job)
+        for queue in queues:
+            queue.wait_idle(timeout=30)
+            queue.stop()
+        received = printer.labels()
+        print(f"대기열 2개 (같은 DB): 넣은 라벨 200장 -> 받은 라벨 {len(received)}장, "
+              f"중복 없음 {len(set(received)) == len(received)}, 순서 일치 {received == list(range(100000, 100200))}")
+        printer.close()
+
+
+if __name__ == "__main__":
+    main()
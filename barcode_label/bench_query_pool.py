@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+쿼리 연결 풀 벤치마크 (오프라인)
+SQLite 파일 DB를 MySQL 대신 사용하고, 연결마다 접속 지연(TCP/TLS/인증)을 흉내 내어
+호출마다 엔진을 새로 만드는 기존 call_query와 공유 엔진 풀을 비교
+
+사용법: python bench_query_pool.py [--calls 20] [--connect-ms 80] [--rows 5000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+from sqlalchemy import create_engine, event
+
+import execute_query
+from boosters_query import boosters_query
+
+
+class LocalDbInfo:
+    """SQLite 파일을 가리키는 접속 정보 (boosters_db_info와 같은 속성)"""
+
+    def __init__(self, path):
+        self.connect_name = "local"
+        self.db = path
+        self.host = "localhost"
+        self.user = "bench"
+        self.passwd = ""
+        self.port = 0
+        self.charset = "utf8"
+
+    def get_connection_string(self):
+        return f"sqlite:///{self.db}"
+
+
+def slow_connect(delay):
+    """새 DB 연결마다 접속 지연 추가"""
+    def on_connect(dbapi_connection, connection_record):
+        time.sleep(delay)
+    return on_connect
+
+
+def make_db(path, rows):
+    engine = create_engine(f"sqlite:///{path}")
+    pd.DataFrame({
+        "제품코드": [f"P{i:05d}" for i in range(rows)],
+        "제품명": [f"제품 {i}" for i in range(rows)],
+        "바코드": [f"880{i:010d}" for i in range(rows)],
+        "유통기한_일수": 24,
+        "유통기한_구분": "월",
+    }).to_sql("boosters_items", engine, index=False)
+    engine.dispose()
+
+
+def legacy_call_query(query_string, db_info, delay):
+    """기존 방식: 호출마다 엔진 생성"""
+    engine = create_engine(db_info.get_connection_string())
+    event.listen(engine, "connect", slow_connect(delay))
+    df = pd.DataFrame(pd.read_sql(query_string, engine))
+    engine.dispose()
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="쿼리 연결 풀 벤치마크")
+    parser.add_argument("--calls", type=int, default=20, help="제품 로드 반복 횟수 (로드당 쿼리 2개)")
+    parser.add_argument("--connect-ms", type=float, default=80, help="연결 1회당 접속 지연(ms)")
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    delay = args.connect_ms / 1000
+
+    items = boosters_query("SELECT 제품코드, 제품명, 바코드 FROM boosters_items")
+    limit_date = boosters_query("SELECT 제품코드, 유통기한_일수, 유통기한_구분 FROM boosters_items")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_info = LocalDbInfo(os.path.join(temp_dir, "boosters.db"))
+        make_db(db_info.db, args.rows)
+
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            legacy_call_query(items.query, db_info, delay)
+            legacy_call_query(limit_date.query, db_info, delay)
+        legacy = time.perf_counter() - start
+
+        event.listen(execute_query.get_engine(db_info), "connect", slow_connect(delay))
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            execute_query.call_query(items, db_info)
+            execute_query.call_query(limit_date, db_info)
+        pooled = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.calls):
+            execute_query.call_queries([items, limit_date], db_info)
+        concurrent = time.perf_counter() - start
+
+        pool_status = execute_query.get_engine(db_info).pool.status()
+        execute_query.dispose_engines()
+
+    print(f"제품 로드 {args.calls}회 (쿼리 2개씩, 연결 지연 {args.connect_ms:.0f}ms, {args.rows:,}행)")
+    print(f"{'방식':<26} {'전체(초)':>10} {'로드당(ms)':>12}")
+    for name, elapsed in (("호출마다 엔진 생성 (기존)", legacy),
+                          ("공유 엔진 풀", pooled),
+                          ("공유 엔진 풀 + 동시 실행", concurrent)):
+        print(f"{name:<26} {elapsed:10.2f} {elapsed / args.calls * 1000:12.1f}")
+    print(f"풀 상태: {pool_status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+일련번호 발급 동시성 테스트
+여러 스레드와 프로세스가 같은 label_serial DB에서 동시에 일련번호를 발급해도
+중복/누락이 없는지 확인하고 초당 발급 수를 출력
+
+사용법: python bench_serial_allocator.py [--threads 8] [--processes 4] [--count 500] [--block 50]
+"""
+
+import argparse
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from label_registry import LabelRegistry
+
+
+def allocate_worker(db_path, mode, count, block):
+    """한 작업자가 발급받은 일련번호 목록 반환"""
+    registry = LabelRegistry(db_path)
+    serials = []
+    if mode == "single":
+        for _ in range(count):
+            serials.append(registry.allocate())
+    elif mode == "register":
+        for i in range(count):
+            serials.append(registry.register(f"P{i % 50:04d}", "LOT01", "2026-12-31", "V1", "A-01-01", "일반재고"))
+    else:
+        for _ in range(count // block):
+            serials.extend(registry.reserve_block(block))
+    return serials
+
+
+def run_threads(db_path, mode, threads, count, block):
+    results = [None] * threads
+
+    def target(i):
+        results[i] = allocate_worker(db_path, mode, count, block)
+
+    workers = [threading.Thread(target=target, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return [serial for serials in results for serial in serials]
+
+
+def run_processes(db_path, mode, processes, count, block):
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(allocate_worker, [(db_path, mode, count, block)] * processes)
+    return [serial for serials in results for serial in serials]
+
+
+def check(name, serials, start, elapsed):
+    """중복/누락 확인 후 결과 출력"""
+    unique = set(serials)
+    expected = set(range(start + 1, start + len(serials) + 1))
+    assert len(unique) == len(serials), f"{name}: 중복 일련번호 {len(serials) - len(unique)}건"
+    assert unique == expected, f"{name}: 누락된 일련번호가 있습니다."
+    print(f"{name:<28} {len(serials):>8,}건 {elapsed:8.2f}초 {len(serials) / elapsed:>12,.0f}건/초  중복 없음")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="일련번호 발급 동시성 테스트")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--count", type=int, default=500, help="작업자당 발급 수")
+    parser.add_argument("--block", type=int, default=50, help="블록 예약 크기")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "label_serial.db")
+        registry = LabelRegistry(db_path)
+        registry.initialize()
+
+        for mode in ("single", "register", "block"):
+            for kind, workers, runner in (("스레드", args.threads, run_threads),
+                                          ("프로세스", args.processes, run_processes)):
+                start = registry.current_serial()
+                begin = time.perf_counter()
+                serials = runner(db_path, mode, workers, args.count, args.block)
+                check(f"{mode} / {kind} {workers}개", serials, start, time.perf_counter() - begin)
+
+        # 라벨 정보 저장 건수와 발급 번호 일치 확인
+        conn = registry._connect()
+        registered = conn.execute("SELECT COUNT(*), COUNT(DISTINCT serial_number) FROM label_info").fetchone()
+        assert registered[0] == registered[1], "label_info에 중복 일련번호가 있습니다."
+        print(f"label_info 저장 {registered[0]:,}건, 마지막 일련번호 {registry.current_serial():,}")
+
+
+if __name__ == "__main__":
+    main()
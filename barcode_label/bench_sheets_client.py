@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트 클라이언트 캐시 벤치마크 (실제 API, sheets_config.json / client_secrets.json 필요)
+발행 내역 조회(load_dataframe)를 반복하면서 작업별 API 요청 수와 소요 시간을 비교
+
+- 기존 방식: 조회마다 인증 파일을 다시 읽고 클라이언트/스프레드시트/워크시트를 새로 가져옴
+  (invalidate(auth=True) 후 호출로 재현, 토큰 발급 요청은 요청 수에 포함되지 않고 시간에만 반영)
+- 캐시: 한 번 만든 클라이언트와 핸들을 재사용
+
+사용법: python bench_sheets_client.py [--repeat 5] [--sheet 발행이력]
+"""
+
+import argparse
+import time
+
+from google_sheets_manager import sheets_manager
+
+
+def run(title, repeat, cold):
+    sheets_manager.api_calls.clear()
+    start = time.perf_counter()
+    rows = 0
+    for _ in range(repeat):
+        if cold:
+            sheets_manager.invalidate(auth=True)
+        df = sheets_manager.load_dataframe()
+        rows = 0 if df is None else len(df)
+    elapsed = time.perf_counter() - start
+    calls = sum(sheets_manager.api_calls.values())
+    print(f"{title:<22} 조회 {repeat}회, 요청 {calls:4d}회 (조회당 {calls / repeat:4.1f}회), "
+          f"{elapsed:6.2f}초 (조회당 {elapsed / repeat * 1000:7.1f}ms), {rows}행")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 스프레드시트 클라이언트 캐시 벤치마크")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sheet", default=None, help="조회할 시트 이름 (기본: sheets_config.json 설정)")
+    args = parser.parse_args()
+
+    if args.sheet:
+        sheets_manager.sheet_name = args.sheet
+    if not sheets_manager.spreadsheet_id:
+        print("스프레드시트 ID가 설정되지 않았습니다. (sheets_config.json)")
+        return
+
+    run("기존 (매번 새 클라이언트)", args.repeat, cold=True)
+    run("캐시된 클라이언트/핸들", args.repeat, cold=False)
+    print(sheets_manager.api_call_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트 로컬 미러 벤치마크 / 검증 (가짜 워크시트)
+발행 내역 조회 시 내려받는 셀 수와 요청 수를 비교
+
+- 기존 방식: 조회마다 get_all_records() (시트 전체)
+- 미러: 처음 한 번 전체를 받고, 이후에는 마지막 블록부터 끝까지 + 확인할 블록만 batch_get
+  (조회 창 열기 시간 = 로컬 미러 읽기 실측 + 요청/셀 전송 환산)
+- 검증: 다른 PC가 행을 추가한 경우 / 중간 행, 최근 행을 수정한 경우 (내보내기는 모든 블록 확인) /
+  행을 지운 경우 / 전체 재업로드한 경우 미러 내용이 시트와 같은지
+
+사용법: python bench_sheets_mirror.py [--rows 20000] [--views 20] [--latency 0.3] [--cell-time 0.00002]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from issue_history_store import SHEETS_COLUMNS
+from sheets_mirror import SheetsMirror, BLOCK_ROWS, VERIFY_BLOCKS
+
+
+class FakeWorksheet:
+    """gspread Worksheet에서 미러가 사용하는 메서드만 구현, 받은 셀 수와 요청 수를 기록"""
+
+    def __init__(self, header):
+        self.rows = [list(header)]
+        self.requests = 0
+        self.cells = 0
+
+    @property
+    def col_count(self):
+        return max(len(row) for row in self.rows)
+
+    def _send(self, rows):
+        self.requests += 1
+        self.cells += sum(len(row) for row in rows)
+        return [[str(value) for value in row] for row in rows]
+
+    def get_all_values(self):
+        return self._send(self.rows)
+
+    def get_all_records(self):
+        values = self._send(self.rows)
+        return [dict(zip(values[0], row)) for row in values[1:]]
+
+    def batch_get(self, ranges):
+        self.requests += 1
+        result = []
+        for cell_range in ranges:
+            start, end = cell_range.split(":")
+            first = int(start[1:]) - 1
+            last = int(end[len(end.rstrip("0123456789")):]) if end[-1].isdigit() else len(self.rows)
+            rows = self.rows[first:last]
+            self.cells += sum(len(row) for row in rows)
+            result.append([[str(value) for value in row] for row in rows])
+        return result
+
+
+def issue_rows(count, start=0):
+    return [[100000 + i, "관리품", f"EQ-{i % 7:03d}", f"제품 {i % 7}", f"LOT{i % 5}", "2026-09-14",
+             "2027-09-14", f"A-0{i % 5 + 1}-01", "V2", f"2024-09-15 10:{i // 60 % 60:02d}:{i % 60:02d}"]
+            for i in range(start, start + count)]
+
+
+def sheet_frame(worksheet):
+    """시트 내용 (get_all_records처럼 빈 행 제외)"""
+    values = [[str(value) for value in row] for row in worksheet.rows]
+    return pd.DataFrame([row for row in values[1:] if row], columns=values[0])
+
+
+def matches(mirror, key, worksheet):
+    df = mirror.load_dataframe(key).astype(str)
+    return df.equals(sheet_frame(worksheet))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 스프레드시트 로컬 미러 벤치마크")
+    parser.add_argument("--rows", type=int, default=20000, help="시트에 이미 있는 발행 내역 행 수")
+    parser.add_argument("--views", type=int, default=20, help="조회 횟수 (조회 사이에 라벨 5장씩 발행)")
+    parser.add_argument("--latency", type=float, default=0.3, help="요청 1회 지연 (초, 시간 환산용)")
+    parser.add_argument("--cell-time", type=float, default=0.00002, help="셀 1개 전송 시간 (초, 시간 환산용)")
+    args = parser.parse_args()
+
+    def estimate(worksheet):
+        return worksheet.requests * args.latency + worksheet.cells * args.cell_time
+
+    print(f"시트 {args.rows}행, 조회 {args.views}회 (조회마다 5행 추가), "
+          f"블록 {BLOCK_ROWS}행, 조회마다 블록 {VERIFY_BLOCKS}개 확인")
+
+    # 기존 방식
+    sheet = FakeWorksheet(SHEETS_COLUMNS)
+    sheet.rows += issue_rows(args.rows)
+    start = time.perf_counter()
+    for view in range(args.views):
+        sheet.rows += issue_rows(5, args.rows + view * 5)
+        pd.DataFrame(sheet.get_all_records())
+    local = time.perf_counter() - start
+    print(f"{'기존 (get_all_records)':<24} 요청 {sheet.requests:4d}회, 받은 셀 {sheet.cells:10,d}개, "
+          f"조회당 {(estimate(sheet) + local) / args.views:6.2f}초")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        mirror = SheetsMirror(os.path.join(temp_dir, "mirror.db"))
+        key = "bench/발행이력"
+        sheet = FakeWorksheet(SHEETS_COLUMNS)
+        sheet.rows += issue_rows(args.rows)
+        mirror.refresh(sheet, key)
+        first = estimate(sheet)
+        sheet.requests = sheet.cells = 0
+        start = time.perf_counter()
+        for view in range(args.views):
+            sheet.rows += issue_rows(5, args.rows + view * 5)
+            mirror.refresh(sheet, key)
+            mirror.load_dataframe(key)
+        local = time.perf_counter() - start
+        print(f"{'미러 (처음 한 번 전체)':<24} 환산 {first:6.2f}초")
+        print(f"{'미러 (이후 조회)':<24} 요청 {sheet.requests:4d}회, 받은 셀 {sheet.cells:10,d}개, "
+              f"조회당 {(estimate(sheet) + local) / args.views:6.2f}초 (로컬 {local / args.views * 1000:.0f}ms), "
+              f"시트와 일치 {matches(mirror, key, sheet)}")
+
+        # 중간 행 수정: 블록이 차례로 확인되면서 반영
+        sheet.rows[100][3] = "수정된 제품명"
+        sheet.rows[len(sheet.rows) // 2][7] = "B-09-09"
+        blocks = (len(sheet.rows) - 2) // BLOCK_ROWS
+        refreshes = changed = 0
+        while not matches(mirror, key, sheet) and refreshes <= blocks:
+            changed += mirror.refresh(sheet, key).changed_blocks
+            refreshes += 1
+        print(f"중간 행 2개 수정: {refreshes}번 새로 고침 후 반영 (블록 {changed}개 교체, 전체 블록 {blocks}개), "
+              f"시트와 일치 {matches(mirror, key, sheet)}")
+
+        # 내보내기 (verify_blocks=None): 모든 블록을 확인하므로 중간 행 수정도 한 번에 반영
+        sheet.rows[200][3] = "내보내기 전 수정"
+        sheet.requests = 0
+        report = mirror.refresh(sheet, key, verify_blocks=None)
+        print(f"내보내기 전 중간 행 수정: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+        # 최근 행 수정 (마지막 블록): 다음 새로 고침에서 바로 반영
+        sheet.rows[-3][3] = "최근 행 수정"
+        report = mirror.refresh(sheet, key)
+        print(f"최근 행 수정: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+        # 다른 PC에서 행 추가 / 마지막 행 삭제 / 전체 재업로드
+        sheet.rows += issue_rows(3, 900000)
+        report = mirror.refresh(sheet, key)
+        print(f"다른 PC가 3행 추가: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+        del sheet.rows[-2:]
+        report = mirror.refresh(sheet, key)
+        print(f"마지막 2행 삭제: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+        sheet.rows = [list(SHEETS_COLUMNS)] + issue_rows(100, 500000)
+        report = mirror.refresh(sheet, key)
+        print(f"전체 재업로드: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+        sheet.rows.append([])
+        sheet.rows += issue_rows(2, 600000)
+        report = mirror.refresh(sheet, key)
+        print(f"빈 행 뒤에 2행 추가: {report.report()}, 시트와 일치 {matches(mirror, key, sheet)}")
+
+
+if __name__ == "__main__":
+    main()
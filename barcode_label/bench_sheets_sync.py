@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트 일괄 동기화 벤치마크 (가짜 워크시트, 가상 시계)
+실제 API 대신 요청마다 지연 시간을 가상 시계에 더하는 워크시트로 요청 수와 소요 시간을 비교
+(분당 요청 제한 대기도 가상 시계에서 진행하므로 실제로 기다리지 않음)
+
+- 기존 upload_to_sheets: clear + 헤더 append_row + 행마다 append_row
+- sheets_sync.sync_frame: 빈 시트 첫 업로드 / 20행 추가 후 / 중간 행 삭제 후 / 헤더 순서가 다른 시트 / 429 재시도 /
+  캐시된 핸들을 연 뒤 append_rows로 시트가 늘어난 경우 전체 다시 쓰기
+
+사용법: python bench_sheets_sync.py [--rows 3000] [--latency 0.3]
+"""
+
+import argparse
+
+import pandas as pd
+
+import sheets_sync
+from issue_history_store import HISTORY_COLUMNS, SHEETS_COLUMNS
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+class QuotaError(Exception):
+    """gspread APIError처럼 response.status_code가 있는 오류"""
+
+    class Response:
+        status_code = 429
+
+    response = Response()
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheet):
+        self.worksheet = worksheet
+
+    def fetch_sheet_metadata(self):
+        self.worksheet._request()
+        grid = {'rowCount': len(self.worksheet.grid), 'columnCount': len(self.worksheet.grid[0])}
+        return {'sheets': [{'properties': {'sheetId': self.worksheet.id, 'gridProperties': grid}}]}
+
+
+class FakeWorksheet:
+    """gspread Worksheet에서 사용하는 메서드만 구현, 요청마다 latency초"""
+
+    def __init__(self, clock, latency, rows=1000, cols=10):
+        self.clock = clock
+        self.latency = latency
+        self.grid = [[""] * cols for _ in range(rows)]
+        self.requests = 0
+        self.fail_next = 0
+        self.id = 0
+        self.spreadsheet = FakeSpreadsheet(self)
+
+    @property
+    def row_count(self):
+        return len(self.grid)
+
+    @property
+    def col_count(self):
+        return len(self.grid[0])
+
+    def _request(self):
+        self.requests += 1
+        self.clock.sleep(self.latency)
+        if self.fail_next:
+            self.fail_next -= 1
+            raise QuotaError("Quota exceeded")
+
+    @staticmethod
+    def _parse(cell_range):
+        start, end = cell_range.split(":")
+
+        def parse(cell):
+            letters = "".join(char for char in cell if char.isalpha())
+            column = 0
+            for char in letters:
+                column = column * 26 + ord(char) - ord("A") + 1
+            return int(cell[len(letters):]) - 1, column - 1
+
+        return parse(start), parse(end)
+
+    def get_all_values(self):
+        self._request()
+        rows = [[str(value) for value in row] for row in self.grid]
+        rows = [row[:max((i + 1 for i, value in enumerate(row) if value != ""), default=0)] for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def resize(self, rows=None, cols=None):
+        self._request()
+        cols = cols or len(self.grid[0])
+        self.grid = [(row + [""] * cols)[:cols] for row in self.grid[:rows]]
+        self.grid += [[""] * cols for _ in range((rows or 0) - len(self.grid))]
+
+    def batch_update(self, data, value_input_option=None):
+        self._request()
+        for item in data:
+            (row, col), _ = self._parse(item['range'])
+            for offset, values in enumerate(item['values']):
+                self.grid[row + offset][col:col + len(values)] = values
+
+    def batch_clear(self, ranges):
+        self._request()
+        for cell_range in ranges:
+            (top, left), (bottom, right) = self._parse(cell_range)
+            for row in range(top, min(bottom + 1, len(self.grid))):
+                self.grid[row][left:right + 1] = [""] * (right + 1 - left)
+
+    def clear(self):
+        self._request()
+        self.grid = [[""] * len(self.grid[0]) for _ in range(len(self.grid))]
+
+    def append_row(self, values):
+        self.append_rows([values])
+
+    def append_rows(self, rows, value_input_option=None):
+        self._request()
+        filled = max((i + 1 for i, row in enumerate(self.grid) if any(value != "" for value in row)), default=0)
+        for values in rows:
+            if filled == len(self.grid):
+                self.grid.append([""] * len(self.grid[0]))
+            self.grid[filled][:len(values)] = values
+            filled += 1
+
+
+class CachedWorksheet(FakeWorksheet):
+    """캐시된 gspread 핸들처럼 row_count/col_count가 처음 연 때 값으로 남는 워크시트"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.opened_size = (len(self.grid), len(self.grid[0]))
+
+    @property
+    def row_count(self):
+        return self.opened_size[0]
+
+    @property
+    def col_count(self):
+        return self.opened_size[1]
+
+
+def history_frame(rows, start_serial=100000):
+    """label_gui 발행 내역 형태 (HISTORY_COLUMNS)"""
+    return pd.DataFrame([{
+        '발행일시': f"2024-09-15 10:{i // 60 % 60:02d}:{i % 60:02d}", '구분': "관리품", '제품코드': f"EQ-{i % 7:03d}",
+        '제품명': f"제품 {i % 7}", 'LOT': f"LOT{i % 5}", '유통기한': "2026-09-14", '버전': "V2",
+        '폐기일자': "2027-09-14", '보관위치': f"A-0{i % 5 + 1}-01", '파일명': f"labeljpg/{start_serial + i}.jpg",
+        '바코드숫자': start_serial + i,
+    } for i in range(rows)], columns=HISTORY_COLUMNS)
+
+
+def sheet_matches(worksheet, df, header):
+    """시트 내용이 df를 header 순서로 배치한 것과 같은지"""
+    expected = [header] + [[str(value) for value in row] for row in sheets_sync.map_frame(df, header)]
+    return worksheet.get_all_values() == expected
+
+
+def legacy_upload(worksheet, df):
+    worksheet.clear()
+    worksheet.append_row(list(df.columns))
+    for _, row in df.iterrows():
+        worksheet.append_row(row.tolist())
+
+
+def run(title, clock, worksheet, func, rows):
+    start, requests = clock.now, worksheet.requests
+    result = func()
+    elapsed = clock.now - start
+    print(f"{title:<26} 요청 {worksheet.requests - requests:5d}회, 가상 {elapsed:8.1f}초, "
+          f"{rows / elapsed if elapsed else 0:8.0f}행/초")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 스프레드시트 일괄 동기화 벤치마크")
+    parser.add_argument("--rows", type=int, default=3000)
+    parser.add_argument("--latency", type=float, default=0.3, help="요청 1회 지연 (초)")
+    args = parser.parse_args()
+
+    clock = VirtualClock()
+    limiter = sheets_sync.RequestLimiter(clock=lambda: clock.now, sleep=clock.sleep)
+    df = history_frame(args.rows)
+    print(f"발행 내역 {len(df)}행, 요청 지연 {args.latency}초, 분당 쓰기 {sheets_sync.WRITE_REQUESTS_PER_MINUTE}회 제한")
+
+    # 기존 방식 (실제 API에서는 분당 제한에 걸리므로 같은 제한을 적용해 시간 계산)
+    legacy_sheet = FakeWorksheet(clock, args.latency)
+    original_request = legacy_sheet._request
+
+    def limited_request():
+        limiter.wait()
+        original_request()
+
+    legacy_sheet._request = limited_request
+    run("기존 (행마다 append_row)", clock, legacy_sheet, lambda: legacy_upload(legacy_sheet, df), len(df))
+
+    sheet = FakeWorksheet(clock, args.latency)
+    report = run("일괄 동기화 (빈 시트)", clock, sheet,
+                 lambda: sheets_sync.sync_frame(sheet, df, columns=HISTORY_COLUMNS, limiter=limiter), len(df))
+    print(f"  {report.report()}")
+    print(f"  시트 내용 일치: {sheet_matches(sheet, df, HISTORY_COLUMNS)}")
+
+    more = pd.concat([df, history_frame(20, 100000 + args.rows)], ignore_index=True)
+    report = run("20행 추가 후 동기화", clock, sheet,
+                 lambda: sheets_sync.sync_frame(sheet, more, limiter=limiter), 20)
+    print(f"  전송 {report.written_rows}행, 시트 내용 일치: {sheet_matches(sheet, more, HISTORY_COLUMNS)}")
+
+    removed = more.drop(index=len(more) - 10).reset_index(drop=True)
+    report = run("끝에서 10번째 행 삭제 후", clock, sheet,
+                 lambda: sheets_sync.sync_frame(sheet, removed, limiter=limiter), 10)
+    print(f"  전송 {report.written_rows}행, 삭제 {report.cleared_rows}행, "
+          f"시트 내용 일치: {sheet_matches(sheet, removed, HISTORY_COLUMNS)}")
+
+    # streamlit 시트(SHEETS_COLUMNS, '일련번호')에 label_gui 내역(HISTORY_COLUMNS, '바코드숫자') 올리기
+    streamlit_sheet = FakeWorksheet(clock, args.latency)
+    streamlit_sheet.batch_update([{'range': "A1:J1", 'values': [SHEETS_COLUMNS]}])
+    sheets_sync.sync_frame(streamlit_sheet, df, limiter=limiter)
+    values = streamlit_sheet.get_all_values()
+    serials_ok = [row[0] for row in values[1:]] == [str(serial) for serial in df['바코드숫자']]
+    print(f"헤더 순서가 다른 시트: 헤더 유지 {values[0] == SHEETS_COLUMNS}, 일련번호 열 일치 {serials_ok}")
+
+    # 할당량 초과(429) 2번 후 성공
+    retry_sheet = FakeWorksheet(clock, args.latency)
+    retry_sheet.fail_next = 2
+    report = sheets_sync.sync_frame(retry_sheet, df.head(100), columns=HISTORY_COLUMNS, limiter=limiter)
+    print(f"429 재시도: 요청 {report.requests}회, 시트 내용 일치 {sheet_matches(retry_sheet, df.head(100), HISTORY_COLUMNS)}")
+
+    # 캐시된 핸들(1000행 격자)을 연 뒤 동기화 대기열의 append_rows로 시트가 1500행이 된 경우
+    cached_sheet = CachedWorksheet(clock, args.latency)
+    cached_sheet.append_rows([HISTORY_COLUMNS] + sheets_sync.map_frame(history_frame(1500), HISTORY_COLUMNS))
+    report = sheets_sync.sync_frame(cached_sheet, df.head(100), columns=HISTORY_COLUMNS, full=True, limiter=limiter)
+    print(f"캐시된 핸들 + append_rows로 늘어난 시트 전체 다시 쓰기: 격자 {len(cached_sheet.grid)}행 "
+          f"(핸들 row_count {cached_sheet.row_count}), 삭제 {report.cleared_rows}행, "
+          f"시트 내용 일치 {sheet_matches(cached_sheet, df.head(100), HISTORY_COLUMNS)}")
+
+
+if __name__ == "__main__":
+    main()
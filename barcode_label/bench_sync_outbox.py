@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+구글 동기화 대기열(sync_outbox) 벤치마크 / 검증
+가짜 구글 API(요청마다 --latency초)로 발행 경로가 기다리는 시간과 전송 요청 수 비교
+
+- 기존 방식: 라벨마다 발행 경로에서 append_row 호출 (요청 지연만큼 발행이 멈춤)
+- 대기열: 발행 경로는 enqueue만, 작업 스레드가 대기 중인 행을 묶어서 append_rows
+- 검증: 429 오류 후 재시도 시 순서 유지, 오류 응답(bool False)의 상태 코드 인식, 프로그램 재시작 후 이어서 전송,
+  문제 행 하나가 뒤 행을 막지 않음, 같은 파일 업로드 합치기, 같은 DB를 쓰는 대기열 2개에서 중복 전송 없음
+
+사용법: python bench_sync_outbox.py [--labels 200] [--latency 0.3]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sync_outbox import SyncOutbox, SHEETS_ROWS, DRIVE_LABEL, _status_code
+
+
+class Response:
+    """requests.Response처럼 오류 응답이면 bool()이 False"""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def __bool__(self):
+        return self.status_code < 400
+
+
+class QuotaError(Exception):
+    response = Response(429)
+
+
+class FakeSheets:
+    """append_rows 요청마다 latency초, fail_next번은 429 오류"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.rows = []
+        self.requests = 0
+        self.fail_next = 0
+        self.lock = threading.Lock()
+
+    def append_row(self, row):
+        self.append_rows([row])
+
+    def append_rows(self, rows):
+        with self.lock:
+            self.requests += 1
+            time.sleep(self.latency)
+            if self.fail_next:
+                self.fail_next -= 1
+                raise QuotaError("Quota exceeded")
+            self.rows.extend(rows)
+
+
+class BadRequest(Exception):
+    response = Response(400)
+
+
+def issue_rows(count, start=0):
+    return [{'발행일시': "2024-09-15 10:00:00", '제품코드': "EQ-SERUM-050", '바코드숫자': 100000 + i}
+            for i in range(start, start + count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="구글 동기화 대기열 벤치마크")
+    parser.add_argument("--labels", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.3, help="구글 API 요청 1회 지연 (초)")
+    args = parser.parse_args()
+
+    rows = issue_rows(args.labels)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 기존 방식: 발행 경로에서 바로 전송 (시간이 오래 걸리므로 일부만 측정 후 환산)
+        sample = rows[:min(len(rows), 10)]
+        sheets = FakeSheets(args.latency)
+        start = time.perf_counter()
+        for row in sample:
+            sheets.append_row(row)
+        per_label = (time.perf_counter() - start) / len(sample)
+        print(f"{'기존 (발행마다 append_row)':<28} 라벨당 대기 {per_label * 1000:7.1f}ms, "
+              f"{args.labels}장이면 {per_label * args.labels:6.1f}초, 요청 {args.labels}회")
+
+        # 대기열
+        sheets = FakeSheets(args.latency)
+        outbox = SyncOutbox(os.path.join(temp_dir, "outbox.db"), backoff_base=0.1, quota_backoff=0.3)
+        outbox.register(SHEETS_ROWS, sheets.append_rows, batch=True)
+        start = time.perf_counter()
+        for row in rows:
+            outbox.enqueue(SHEETS_ROWS, row)
+        enqueue = time.perf_counter() - start
+        outbox.wait_idle(timeout=60)
+        drained = time.perf_counter() - start
+        in_order = [row['바코드숫자'] for row in sheets.rows] == [row['바코드숫자'] for row in rows]
+        print(f"{'대기열 (enqueue)':<28} 라벨당 대기 {enqueue / len(rows) * 1000:7.2f}ms, "
+              f"전송 완료까지 {drained:6.2f}초, 요청 {sheets.requests}회, 순서 일치 {in_order}")
+
+        # 429 두 번 후 성공 (그 사이 들어온 행도 순서대로)
+        sheets.rows.clear()
+        sheets.requests = 0
+        sheets.fail_next = 2
+        more = issue_rows(50, args.labels)
+        for row in more[:25]:
+            outbox.enqueue(SHEETS_ROWS, row)
+        time.sleep(args.latency + 0.05)
+        for row in more[25:]:
+            outbox.enqueue(SHEETS_ROWS, row)
+        outbox.wait_idle(timeout=60)
+        time.sleep(0.1)
+        in_order = [row['바코드숫자'] for row in sheets.rows] == [row['바코드숫자'] for row in more]
+        print(f"429 두 번 후 재시도: 요청 {sheets.requests}회, {len(sheets.rows)}행 전송, 순서 일치 {in_order}, "
+              f"대기 {outbox.pending_count()}건")
+        outbox.stop()
+
+        # 오류 응답 객체가 bool()로 False여도(requests.Response) 429로 인식해서 quota_backoff 이상 대기
+        attempts = []
+
+        def quota_once(payloads):
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise QuotaError("Quota exceeded")
+
+        quota = SyncOutbox(os.path.join(temp_dir, "quota.db"), backoff_base=0.01, quota_backoff=0.5)
+        quota.register(SHEETS_ROWS, quota_once, batch=True)
+        quota.enqueue(SHEETS_ROWS, issue_rows(1)[0])
+        quota.wait_idle(timeout=10)
+        quota.stop()
+        wait = attempts[1] - attempts[0] if len(attempts) > 1 else 0.0
+        print(f"429 응답 (bool False): 상태 코드 {_status_code(QuotaError())}, 재시도까지 {wait:.2f}초 "
+              f"(quota_backoff 0.5초 이상 {wait >= 0.5}), 400 응답 상태 코드 {_status_code(BadRequest())}")
+
+        # 문제 행 (시트에 넣을 수 없는 데이터): 묶음을 나눠 문제 행만 max_attempts번 후 실패 처리, 나머지는 순서대로 전송
+        sheets = FakeSheets(0.0)
+
+        def reject_bad(rows):
+            if any(row['바코드숫자'] == 100077 for row in rows):
+                raise ValueError("시트에 넣을 수 없는 값")
+            sheets.append_rows(rows)
+
+        poison = SyncOutbox(os.path.join(temp_dir, "poison.db"), backoff_base=0.05, max_attempts=3)
+        for row in issue_rows(200):
+            poison.enqueue(SHEETS_ROWS, row)
+        poison.register(SHEETS_ROWS, reject_bad, batch=True)
+        poison.wait_idle(timeout=30)
+        poison.stop()
+        sent = [row['바코드숫자'] for row in sheets.rows]
+        expected = [100000 + i for i in range(200) if i != 77]
+        print(f"문제 행 1개 (ValueError): 전송 {len(sent)}행, 순서 일치 {sent == expected}, 요청 {sheets.requests}회, "
+              f"실패 처리 {poison.stats().get((SHEETS_ROWS, 'failed'), 0)}건, 남은 대기 {poison.pending_count()}건")
+
+        # 재시작: 처리 함수 없이 넣어 두고, 새 인스턴스에서 등록하면 이어서 전송
+        db_path = os.path.join(temp_dir, "restart.db")
+        before = SyncOutbox(db_path)
+        for row in issue_rows(30):
+            before.enqueue(SHEETS_ROWS, row)
+        pending = before.pending_count()
+        sheets = FakeSheets(0.01)
+        after = SyncOutbox(db_path)
+        after.register(SHEETS_ROWS, sheets.append_rows, batch=True)
+        after.wait_idle(timeout=30)
+        time.sleep(0.1)
+        print(f"재시작 후 이어서 전송: 대기 {pending}건 -> 전송 {len(sheets.rows)}행, 남은 대기 {after.pending_count()}건")
+        after.stop()
+
+        # 같은 파일 업로드 합치기 (라벨 파일명은 제품코드-보관위치라 같은 파일을 여러 번 덮어씀)
+        uploads = []
+        drive = SyncOutbox(os.path.join(temp_dir, "drive.db"))
+        for i in range(50):
+            path = f"labeljpg/EQ-SERUM-050-A-0{i % 5 + 1}-01.jpg"
+            drive.enqueue(DRIVE_LABEL, {"path": path}, key=path)
+        drive.register(DRIVE_LABEL, lambda payload: uploads.append(payload["path"]))
+        drive.wait_idle(timeout=30)
+        time.sleep(0.1)
+        print(f"드라이브 업로드 합치기: 요청 50건 -> 업로드 {len(uploads)}회")
+        drive.stop()
+
+        # 같은 DB를 쓰는 대기열 2개 (label_gui와 streamlit_app이 함께 실행 중인 경우)
+        sheets = FakeSheets(0.01)
+        db_path = os.path.join(temp_dir, "shared.db")
+        outboxes = [SyncOutbox(db_path) for _ in range(2)]
+        for outbox in outboxes:
+            outbox.register(SHEETS_ROWS, sheets.append_rows, batch=True)
+        shared = issue_rows(200)
+        for i, row in enumerate(shared):
+            outboxes[i % 2].enqueue(SHEETS_ROWS, row)
+        for outbox in outboxes:
+            outbox.wait_idle(timeout=30)
+            outbox.stop()
+        sent = [row['바코드숫자'] for row in sheets.rows]
+        print(f"대기열 2개 (같은 DB): 넣은 행 {len(shared)}개 -> 전송 {len(sent)}행, "
+              f"중복 없음 {len(set(sent)) == len(sent)}, 순서 일치 {sent == [row['바코드숫자'] for row in shared]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+ZPL 저장 포맷(^DF/^XF) 벤치마크
+같은 제품/LOT 라벨 N장을 프린터로 보낼 때 전송 바이트 비교
+
+- 기존: 라벨마다 전체 포맷 (zpl_format.full_label, 라벨별 파일)
+- 저장 포맷: 레이아웃 한 번(^DF) + 라벨마다 바뀌는 필드만 ^XF (zpl_format.batch_job, 작업 스트림 1개)
+
+사용법: python bench_zpl_format.py [--labels 500]
+"""
+
+import argparse
+import time
+
+import zpl_format
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZPL 저장 포맷 벤치마크")
+    parser.add_argument("--labels", type=int, default=500)
+    args = parser.parse_args()
+
+    base = {'product_code': "EQ-SERUM-050", 'product_name': "Equalberry Bakuchiol Firming Ampoule Serum 50ml",
+            'category': "관리품", 'lot': "240915A", 'expiry': "2026-09-14", 'version': "V2", 'location': "A-01-02"}
+    scenarios = {
+        "같은 제품/LOT/위치": [dict(base, serial_number=100000 + i) for i in range(args.labels)],
+        "위치/LOT 섞임": [dict(base, serial_number=100000 + i, location=f"A-0{i % 5 + 1}-02", lot=f"24091{i % 3}A")
+                       for i in range(args.labels)],
+    }
+    for title, labels in scenarios.items():
+        start = time.perf_counter()
+        full = "\n".join(zpl_format.full_label(**label) for label in labels)
+        full_time = time.perf_counter() - start
+        start = time.perf_counter()
+        job = zpl_format.batch_job(labels)
+        job_time = time.perf_counter() - start
+
+        full_bytes, job_bytes = len(full.encode("utf-8")), len(job.encode("utf-8"))
+        per_label = job.splitlines()[-1]
+        print(f"[{title}] 라벨 {len(labels)}장")
+        print(f"  기존 (라벨마다 전체 포맷)  {full_bytes:>10,} bytes  {full_time * 1000:7.1f}ms")
+        print(f"  저장 포맷 (^DF + ^XF)      {job_bytes:>10,} bytes  {job_time * 1000:7.1f}ms  "
+              f"({full_bytes / job_bytes:.1f}x 작음)")
+        print(f"  라벨 1장 전송 내용: {per_label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+ZPL 그래픽(^GFA) 인코딩 벤치마크
+40x30 라벨 이미지를 ZPL로 바꿀 때 크기와 시간 비교
+
+- 기존: JPG 저장 -> 다시 열기 -> 리사이즈 -> PNG -> base64 (^GFA가 읽을 수 없는 형식)
+- ascii: zpl_graphic 16진수 + ZPL 압축
+- z64: zpl_graphic zlib + base64 + CRC
+
+ascii/z64 결과는 다시 풀어서 원래 비트맵과 같은지 확인
+
+사용법: python bench_zpl_graphic.py [--labels 200] [--font 폰트경로]
+"""
+
+import argparse
+import base64
+import binascii
+import io
+import os
+import re
+import tempfile
+import time
+import zlib
+
+import numpy as np
+from PIL import Image
+
+
+def legacy_image_to_zpl(image_path, label_width, label_height):
+    """기존 label_gui.image_to_zpl"""
+    img = Image.open(image_path).resize((label_width, label_height)).convert('1')
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    img_bytes = buffer.getvalue()
+    img_base64 = base64.b64encode(img_bytes).decode('utf-8')
+    return f"^XA\n^PW{label_width}\n^LL{label_height}\n^GFA,{len(img_bytes)},{len(img_bytes)},{label_width},{img_base64}\n^XZ"
+
+
+def decode_gfa(zpl):
+    """^GFA 데이터 -> uint8 배열[행, 바이트] (검증용)"""
+    total, bytes_per_row, data = re.search(r"\^GFA,(\d+),\d+,(\d+),(.*?)\^FS", zpl, re.S).groups()
+    total, bytes_per_row = int(total), int(bytes_per_row)
+    if data.startswith(":Z64:"):
+        payload, crc = data[5:].rsplit(":", 1)
+        assert f"{binascii.crc_hqx(payload.encode('ascii'), 0):04X}" == crc, "CRC 불일치"
+        raw = zlib.decompress(base64.b64decode(payload))
+        return np.frombuffer(raw, dtype=np.uint8).reshape(-1, bytes_per_row)
+
+    small = {chr(ord("G") + n - 1): n for n in range(1, 20)}
+    large = {chr(ord("g") + n - 1): n * 20 for n in range(1, 21)}
+    width = bytes_per_row * 2
+    rows, row, previous, count = [], "", None, 0
+    for char in data:
+        if char in small or char in large:
+            count += small.get(char, 0) + large.get(char, 0)
+            continue
+        if char in ",!":
+            row += ("0" if char == "," else "F") * (width - len(row))
+        elif char == ":":
+            row = previous
+        else:
+            row += char * (count or 1)
+        count = 0
+        if len(row) >= width:
+            rows.append(bytes.fromhex(row))
+            previous, row = row, ""
+    assert len(rows) * bytes_per_row == total, "행 수 불일치"
+    return np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(-1, bytes_per_row)
+
+
+def measure(name, count, func):
+    start = time.perf_counter()
+    for _ in range(count):
+        result = func()
+    elapsed = (time.perf_counter() - start) / count
+    print(f"{name:<24} {len(result):>9,} bytes {elapsed * 1000:8.2f}ms/라벨")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ZPL 그래픽 인코딩 벤치마크")
+    parser.add_argument("--labels", type=int, default=200)
+    parser.add_argument("--font", help="사용할 TTF 경로 (한글 폰트가 없는 환경)")
+    args = parser.parse_args()
+    if args.font:
+        os.environ["LABEL_FONT_PATH"] = args.font
+
+    import zpl_graphic
+    from label_template import label_templates, LAYOUT_40X30
+
+    label = label_templates.compose(LAYOUT_40X30, 123456, "EQ-SERUM-050", "이퀄베리 바쿠치올 탄력 앰플 세럼 50ml",
+                                    "관리품", "240915A", "2026-09-14", "V2", "A-01-02")
+    width, height = label.size
+    print(f"라벨 이미지 {width}x{height}, {args.labels}회 평균")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "label.jpg")
+
+        def legacy():
+            label.save(path)
+            return legacy_image_to_zpl(path, width, height)
+
+        legacy_zpl, legacy_time = measure("기존 (JPG -> PNG base64)", args.labels, legacy)
+
+    _, bitmap = zpl_graphic.pack_bitmap(label)
+    for compression in (zpl_graphic.ASCII, zpl_graphic.Z64):
+        zpl, elapsed = measure(f"zpl_graphic {compression}", args.labels,
+                               lambda: zpl_graphic.image_to_zpl(label, compression))
+        same = np.array_equal(decode_gfa(zpl), bitmap)
+        print(f"{'':<24} 기존 대비 크기 {len(zpl) / len(legacy_zpl) * 100:.0f}%, "
+              f"시간 {legacy_time / elapsed:.1f}x, 복원 비트맵 일치: {same}")
+    print(f"비압축 16진수 크기 참고: {bitmap.size * 2:,} bytes")
+
+
+if __name__ == "__main__":
+    main()
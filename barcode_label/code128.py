@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Code128 바코드 직접 래스터화
+python-barcode ImageWriter로 임의 크기 이미지를 만든 뒤 LANCZOS로 줄이면 느리고 막대 경계가 흐려짐
+여기서는 Code128 모듈 패턴을 직접 계산하고, 대상 영역에 들어가는 가장 큰 정수 모듈 폭으로
+막대를 그려 리샘플링 없는 1비트 이미지를 만듦
+
+- encode(data): 심볼 값 목록 (시작 코드, 체크섬, 정지 코드 포함, 숫자 구간은 Code C로 압축)
+- modules(data): 모듈 패턴 ('1' 막대, '0' 공백)
+- render(data, width, height): 1비트(mode '1') 바코드 이미지
+- decode(image): 이미지 가운데 줄을 읽어 원래 문자열 복원 (검증용)
+"""
+
+import numpy as np
+from PIL import Image
+
+# 심볼 값별 막대/공백 폭 (막대부터 시작, 0~105, 106은 정지 코드)
+PATTERNS = [
+    "212222", "222122", "222221", "121223", "121322", "131222", "122213", "122312", "132212", "221213",
+    "221312", "231212", "112232", "122132", "122231", "113222", "123122", "123221", "223211", "221132",
+    "221231", "213212", "223112", "312131", "311222", "321122", "321221", "312212", "322112", "322211",
+    "212123", "212321", "232121", "111323", "131123", "131321", "112313", "132113", "132311", "211313",
+    "231113", "231311", "112133", "112331", "132131", "113123", "113321", "133121", "313121", "211331",
+    "231131", "213113", "213311", "213131", "311123", "311321", "331121", "312113", "312311", "332111",
+    "314111", "221411", "431111", "111224", "111422", "121124", "121421", "141122", "141221", "112214",
+    "112412", "122114", "122411", "142112", "142211", "241211", "221114", "413111", "241112", "134111",
+    "111242", "121142", "121241", "114212", "124112", "124211", "411212", "421112", "421211", "212141",
+    "214121", "412121", "111143", "111341", "131141", "114113", "114311", "411113", "411311", "113141",
+    "114131", "311141", "411131", "211412", "211214", "211232", "2331112",
+]
+
+CODE_B, CODE_C = 100, 99
+START_B, START_C = 104, 105
+STOP = 106
+
+# 바코드 양쪽 여백 (모듈 수, 규격 최소 10)
+QUIET_ZONE = 10
+
+
+def _pattern_bits(pattern):
+    return "".join(("1" if i % 2 == 0 else "0") * int(width) for i, width in enumerate(pattern))
+
+
+PATTERN_BITS = [_pattern_bits(pattern) for pattern in PATTERNS]
+BITS_TO_VALUE = {bits: value for value, bits in enumerate(PATTERN_BITS)}
+
+
+def _digit_run(data, pos):
+    """pos부터 이어지는 숫자 개수"""
+    end = pos
+    while end < len(data) and data[end].isdigit():
+        end += 1
+    return end - pos
+
+
+def encode(data):
+    """문자열 -> 심볼 값 목록 (ASCII 32~126, 숫자 4자리 이상 구간은 Code C)"""
+    data = str(data)
+    if not data:
+        raise ValueError("빈 문자열은 바코드로 만들 수 없습니다.")
+    for char in data:
+        if not 32 <= ord(char) <= 126:
+            raise ValueError(f"Code128 B/C로 표현할 수 없는 문자: {char!r}")
+
+    run = _digit_run(data, 0)
+    code_set = CODE_C if run >= 4 or (run == len(data) and run % 2 == 0) else CODE_B
+    values = [START_C if code_set == CODE_C else START_B]
+    pos = 0
+    while pos < len(data):
+        run = _digit_run(data, pos)
+        if code_set == CODE_C:
+            if run >= 2:
+                values.append(int(data[pos:pos + 2]))
+                pos += 2
+                continue
+            code_set = CODE_B
+            values.append(CODE_B)
+        # Code B: 남은 숫자가 충분히 길면 (끝까지 짝수 개이거나 6자리 이상) Code C로 전환
+        if run >= 6 or (run >= 4 and pos + run == len(data)):
+            if run % 2:
+                values.append(ord(data[pos]) - 32)
+                pos += 1
+            code_set = CODE_C
+            values.append(CODE_C)
+            continue
+        values.append(ord(data[pos]) - 32)
+        pos += 1
+
+    checksum = values[0] + sum(i * value for i, value in enumerate(values[1:], 1))
+    values.append(checksum % 103)
+    values.append(STOP)
+    return values
+
+
+def modules(data):
+    """모듈 패턴 문자열 ('1' 막대, '0' 공백, 여백 제외)"""
+    return "".join(PATTERN_BITS[value] for value in encode(data))
+
+
+def render(data, width, height, quiet_zone=QUIET_ZONE):
+    """width x height 영역에 맞는 1비트 바코드 이미지
+
+    모듈 폭은 (여백 포함 전체 모듈 수)로 나눈 정수 폭, 남는 픽셀은 좌우 여백으로 균등 배분
+    """
+    bits = np.frombuffer(modules(data).encode("ascii"), dtype=np.uint8) == ord("1")
+    module_width = width // (len(bits) + 2 * quiet_zone)
+    if module_width < 1:
+        raise ValueError(f"바코드가 너무 깁니다: {len(bits)}모듈, 폭 {width}px")
+
+    row = np.ones(width, dtype=bool)  # True = 흰색
+    left = (width - len(bits) * module_width) // 2
+    row[left:left + len(bits) * module_width] = ~np.repeat(bits, module_width)
+    return Image.fromarray(np.broadcast_to(row, (height, width)).copy())
+
+
+def decode(image):
+    """바코드 이미지 가운데 줄을 읽어 문자열 복원 (체크섬 확인, 실패 시 ValueError)"""
+    gray = np.asarray(image.convert("L"))
+    row = gray[gray.shape[0] // 2] < 128  # True = 막대
+    dark = np.flatnonzero(row)
+    if not len(dark):
+        raise ValueError("막대를 찾지 못했습니다.")
+    row = row[dark[0]:dark[-1] + 1]
+
+    # 막대/공백 구간 길이 -> 모듈 폭 (시작 코드 첫 막대는 2모듈)
+    edges = np.flatnonzero(np.diff(row.astype(np.int8))) + 1
+    runs = np.diff(np.concatenate(([0], edges, [len(row)])))
+    module_width = runs[0] / 2
+    bits = "".join(("1" if i % 2 == 0 else "0") * int(round(run / module_width)) for i, run in enumerate(runs))
+
+    values = [BITS_TO_VALUE.get(bits[i:i + 11]) for i in range(0, len(bits) - 13, 11)]
+    if None in values or bits[-13:] != PATTERN_BITS[STOP]:
+        raise ValueError("Code128 패턴이 아닙니다.")
+    *values, checksum = values
+    if (values[0] + sum(i * value for i, value in enumerate(values[1:], 1))) % 103 != checksum:
+        raise ValueError("체크섬이 맞지 않습니다.")
+
+    code_set = {START_B: CODE_B, START_C: CODE_C}.get(values[0])
+    if code_set is None:
+        raise ValueError("지원하지 않는 시작 코드입니다 (Code A).")
+    chars = []
+    for value in values[1:]:
+        if code_set == CODE_C:
+            if value == CODE_B:
+                code_set = CODE_B
+            elif value < 100:
+                chars.append(f"{value:02d}")
+            else:
+                raise ValueError(f"지원하지 않는 Code C 심볼: {value}")
+        elif value == CODE_C:
+            code_set = CODE_C
+        elif value < 95:
+            chars.append(chr(value + 32))
+        else:
+            raise ValueError(f"지원하지 않는 Code B 심볼: {value}")
+    return "".join(chars)
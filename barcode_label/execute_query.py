@@ -6,36 +6,68 @@ from mysql_auth import boosters_db_info
 import pandas as pd
 from sqlalchemy import create_engine
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import pyodbc
 
-def call_query(query_string,boosters_db_info):
+try:
+    import pyodbc
+    # ODBC 드라이버 관리자 수준 연결 풀링 사용
+    pyodbc.pooling = True
+except ImportError:
+    pyodbc = None
 
-    # 데이터베이스 연결 설정
-        conn =  {
-                    "host": boosters_db_info.host,
-                    "port":boosters_db_info.port,
-                    "user":boosters_db_info.user,
-                    "passwd":boosters_db_info.passwd,
-                    "db":boosters_db_info.db,
-                    "charset":boosters_db_info.charset
-                }
+# 연결 풀 설정 (프로세스 전체에서 DB별 엔진 1개를 재사용)
+POOL_SIZE = 5
+MAX_OVERFLOW = 5
+POOL_RECYCLE = 1800  # 초 (서버 wait_timeout 전에 연결 교체)
 
-            
-        # SQLAlchemy 엔진 생성
-        engine = create_engine(f"mysql+pymysql://{conn['user']}:{conn['passwd']}@{conn['host']}:3306/{conn['db']}")
+_engines = {}
+_engines_lock = threading.Lock()
 
 
-        # SQL 쿼리 실행
-        query = query_string  # 'your_table_name'을 실제 테이블 이름으로 변경하세요.
-        df_result = pd.read_sql(query, engine)
-        df = pd.DataFrame(df_result)
+def _engine_key(kind, db_info):
+    """엔진 레지스트리 키 (접속 정보가 같으면 같은 엔진)"""
+    return (kind, db_info.host, str(db_info.port), db_info.user, db_info.db, db_info.charset)
 
-        # 데이터 확인
-        return df
 
+def _mysql_url(db_info):
+    """접속 정보 객체의 연결 문자열 (포트/문자셋 포함)"""
+    if hasattr(db_info, "get_connection_string"):
+        return db_info.get_connection_string()
+    return (f"mysql+pymysql://{db_info.user}:{db_info.passwd}@{db_info.host}:{db_info.port}"
+            f"/{db_info.db}?charset={db_info.charset}")
 
-def call_query_mssql(query_string,boosters_db_info):
+
+def _get_or_create_engine(key, factory):
+    engine = _engines.get(key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = factory()
+                _engines[key] = engine
+    return engine
+
+
+def get_engine(boosters_db_info):
+    """접속 정보별로 공유되는 SQLAlchemy 엔진 (연결 풀, pre-ping, recycle)"""
+    return _get_or_create_engine(
+        _engine_key("mysql", boosters_db_info),
+        lambda: create_engine(
+            _mysql_url(boosters_db_info),
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=POOL_RECYCLE,
+        )
+    )
+
+
+def get_mssql_engine(boosters_db_info):
+    """MSSQL(pyodbc) 연결을 풀링하는 공유 엔진"""
+    if pyodbc is None:
+        raise ImportError("pyodbc가 설치되어 있지 않습니다.")
 
     # MSSQL 연결 문자열 생성
     connection_string = (
@@ -46,9 +78,55 @@ def call_query_mssql(query_string,boosters_db_info):
         f"PWD={boosters_db_info.passwd};"
         f"charset={boosters_db_info.charset}"
     )
-    
 
-    conn = pyodbc.connect(connection_string)
-    df = pd.read_sql(query_string, conn)
-    conn.close()
-    return df
\ No newline at end of file
+    return _get_or_create_engine(
+        _engine_key("mssql", boosters_db_info),
+        lambda: create_engine(
+            "mssql+pyodbc://",
+            creator=lambda: pyodbc.connect(connection_string),
+            pool_size=POOL_SIZE,
+            max_overflow=MAX_OVERFLOW,
+            pool_pre_ping=True,
+            pool_recycle=POOL_RECYCLE,
+        )
+    )
+
+
+def dispose_engines():
+    """모든 공유 엔진의 연결 풀 닫기 (프로그램 종료/접속 정보 변경 시)"""
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
+
+
+def _read_sql(query_string, engine):
+    # boosters_query 객체도 그대로 받기
+    query = getattr(query_string, "query", query_string)
+    with engine.connect() as connection:
+        return pd.DataFrame(pd.read_sql(query, connection))
+
+
+def call_query(query_string,boosters_db_info):
+
+        # 공유 엔진의 풀에서 연결을 빌려 SQL 쿼리 실행
+        return _read_sql(query_string, get_engine(boosters_db_info))
+
+
+def call_query_mssql(query_string,boosters_db_info):
+
+    return _read_sql(query_string, get_mssql_engine(boosters_db_info))
+
+
+def call_queries(queries, boosters_db_info, max_workers=None, mssql=False):
+    """여러 쿼리(boosters_query 객체 또는 SQL 문자열)를 풀 연결로 동시에 실행
+
+    반환값: 입력 순서대로의 DataFrame 목록
+    """
+    queries = list(queries)
+    if not queries:
+        return []
+    engine = get_mssql_engine(boosters_db_info) if mssql else get_engine(boosters_db_info)
+    workers = min(len(queries), max_workers or POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda query: _read_sql(query, engine), queries))
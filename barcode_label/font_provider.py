@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 폰트 공용 캐시
+한글 폰트 경로는 프로세스당 한 번만 찾고, (폰트 종류, 크기)별 폰트 객체를 LRU 캐시로 재사용
+label_gui, label_gui_30x20, streamlit_app 라벨 생성에서 함께 사용
+"""
+
+import os
+import tempfile
+from functools import lru_cache
+
+from PIL import ImageFont
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+KOREAN = "korean"
+
+# 폰트 종류별 후보 (앞에서부터 사용 가능한 첫 번째 폰트 사용)
+FONT_CANDIDATES = {
+    KOREAN: [
+        os.path.join(SCRIPT_DIR, "fonts", "NotoSansKR-Regular.ttf"),  # 앱에 포함된 폰트
+        "malgun.ttf",  # Windows 맑은 고딕
+        "gulim.ttc",  # Windows 굴림
+        "AppleGothic.ttf",  # macOS
+        "/System/Library/Fonts/Supplemental/AppleGothic.ttf",
+        "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",  # Linux
+        "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    ],
+}
+
+# Streamlit Cloud 등 한글 폰트가 없는 환경에서 내려받을 폰트
+WEB_FONT_URL = "https://github.com/google/fonts/raw/main/ofl/notosanskr/NotoSansKR-Regular.ttf"
+
+
+def _download_web_font():
+    """웹 폰트를 임시 폴더에 한 번만 내려받기 (STREAMLIT_CLOUD 환경에서만)"""
+    if not os.environ.get('STREAMLIT_CLOUD', False):
+        return None
+    temp_font_path = os.path.join(tempfile.gettempdir(), os.path.basename(WEB_FONT_URL))
+    try:
+        if not os.path.exists(temp_font_path):
+            import urllib.request
+            print(f"웹 폰트를 다운로드합니다... ({WEB_FONT_URL})")
+            urllib.request.urlretrieve(WEB_FONT_URL, temp_font_path)
+        return temp_font_path
+    except Exception as e:
+        print(f"웹 폰트 다운로드 실패: {e}")
+        return None
+
+
+def resolve_font_path(family=KOREAN):
+    """폰트 파일 경로 찾기 (프로세스당 한 번, 없으면 None)
+
+    환경 변수 LABEL_FONT_PATH가 있으면 가장 먼저 사용
+    """
+    return _resolve_font_path(family)
+
+
+@lru_cache(maxsize=None)
+def _resolve_font_path(family):
+    candidates = [os.environ.get("LABEL_FONT_PATH")] + FONT_CANDIDATES.get(family, [])
+    for candidate in candidates:
+        if not candidate:
+            continue
+        try:
+            ImageFont.truetype(candidate, 10)
+            print(f"라벨 폰트: {candidate}")
+            return candidate
+        except Exception:
+            continue
+    if family == KOREAN:
+        web_font = _download_web_font()
+        if web_font:
+            return web_font
+    print("경고: 한글 지원 폰트를 찾지 못했습니다. 기본 폰트를 사용합니다.")
+    return None
+
+
+@lru_cache(maxsize=64)
+def get_font(size, family=KOREAN):
+    """(폰트 종류, 크기)별 폰트 객체 (캐시)"""
+    path = _resolve_font_path(family)
+    if path:
+        try:
+            return ImageFont.truetype(path, size)
+        except Exception as e:
+            print(f"폰트 로드 실패 ({path}, {size}): {e}")
+    return ImageFont.load_default()
@@ -7,13 +7,20 @@
 
 import os
 import json
+import threading
 import pandas as pd
+from collections import Counter
+from contextlib import contextmanager
 from datetime import datetime
 import gspread
 from google.oauth2.service_account import Credentials
+from google.auth.exceptions import RefreshError
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
 import pickle
+from sheets_sync import sync_frame, map_frame
+from sheets_mirror import sheets_mirror, VERIFY_BLOCKS
+from issue_history_store import SHEETS_COLUMNS
 
 class GoogleSheetsManager:
     def __init__(self):
@@ -32,6 +39,16 @@ class GoogleSheetsManager:
         self.spreadsheet_id = None
         self.sheet_name = "발행이력"
         
+        # 인증된 클라이언트/스프레드시트/워크시트 핸들은 프로세스 동안 재사용
+        self._credentials = None
+        self._spreadsheet = None   # (스프레드시트 ID, 핸들)
+        self._worksheet = None     # (스프레드시트 ID, 시트 이름, 핸들, 헤더)
+        self._handle_lock = threading.RLock()
+        
+        # 작업별 API 요청 수 (HTTP 요청 단위)
+        self.api_calls = Counter()
+        self._current = threading.local()
+        
         # 설정 로드
         self.load_config()
     
@@ -73,10 +90,23 @@ class GoogleSheetsManager:
         except Exception as e:
             print(f"설정 저장 오류: {e}")
     
-    # google_sheets_manager.py 파일에서 아래 함수를 통째로 바꿔주세요.
-
     def authenticate(self):
-        """구글 API 인증 (Streamlit Cloud 최적화)"""
+        """구글 API 인증 (한 번 만든 클라이언트를 재사용, 토큰이 만료되었으면 갱신)"""
+        with self._handle_lock:
+            if self.service is not None and self._credentials is not None:
+                if not getattr(self._credentials, 'expired', False):
+                    return True
+                try:
+                    self._credentials.refresh(Request())
+                    print("구글 API 토큰 갱신")
+                    return True
+                except Exception as e:
+                    print(f"구글 API 토큰 갱신 실패, 다시 인증합니다: {e}")
+                    self.invalidate(auth=True)
+            return self._build_client()
+    
+    def _build_client(self):
+        """인증 정보를 읽어 gspread 클라이언트 생성 (Streamlit Cloud 최적화)"""
         creds = None
         # Streamlit Cloud 환경인지 명확하게 확인
         is_streamlit_cloud = os.environ.get('STREAMLIT_CLOUD', False) or os.environ.get('STREAMLIT_SERVER_HEADLESS', False)
@@ -123,52 +153,155 @@ class GoogleSheetsManager:
         # 3. gspread 클라이언트 최종 인증
         try:
             self.service = gspread.authorize(creds)
+            self._credentials = creds
+            self._count_requests(self.service)
             print("gspread 클라이언트 인증 성공.")
             return True
         except Exception as e:
             print(f"gspread 클라이언트 인증 오류: {e}")
             return False
     
+    def _count_requests(self, client):
+        """클라이언트의 HTTP 세션을 감싸 요청마다 현재 작업 이름으로 집계"""
+        http_client = getattr(client, 'http_client', None)  # gspread 6
+        session = getattr(http_client, 'session', None) or getattr(client, 'session', None)
+        if session is None:
+            return
+        request = session.request
+
+        def counted_request(*args, **kwargs):
+            self.api_calls[getattr(self._current, 'operation', None) or '기타'] += 1
+            return request(*args, **kwargs)
+
+        session.request = counted_request
+
+    @contextmanager
+    def _operation(self, name):
+        """이 블록 안의 API 요청을 name 작업으로 집계"""
+        previous = getattr(self._current, 'operation', None)
+        self._current.operation = previous or name
+        try:
+            yield
+        finally:
+            self._current.operation = previous
+
+    def api_call_report(self):
+        """작업별 API 요청 수 문자열"""
+        if not self.api_calls:
+            return "구글 API 요청 없음"
+        return "구글 API 요청: " + ", ".join(f"{name} {count}회" for name, count in self.api_calls.most_common())
+
+    def invalidate(self, auth=False):
+        """캐시된 핸들 삭제 (auth=True면 클라이언트/인증 정보까지)"""
+        with self._handle_lock:
+            self._spreadsheet = None
+            self._worksheet = None
+            if auth:
+                self.service = None
+                self._credentials = None
+
+    def _open_spreadsheet(self):
+        """캐시된 스프레드시트 핸들 (스프레드시트 ID가 바뀌면 다시 열기)"""
+        with self._handle_lock:
+            if self._spreadsheet is None or self._spreadsheet[0] != self.spreadsheet_id:
+                self._spreadsheet = (self.spreadsheet_id, self.service.open_by_key(self.spreadsheet_id))
+            return self._spreadsheet[1]
+
+    def _cached_worksheet(self, create=True, header=None):
+        """캐시된 (워크시트, 헤더), 시트가 없으면 create=True일 때 생성 (header가 있으면 헤더 추가)"""
+        with self._handle_lock:
+            cached = self._worksheet
+            if cached and cached[:2] == (self.spreadsheet_id, self.sheet_name):
+                return cached[2], cached[3]
+            spreadsheet = self._open_spreadsheet()
+            try:
+                worksheet = spreadsheet.worksheet(self.sheet_name)
+                sheet_header = None
+            except gspread.WorksheetNotFound:
+                if not create:
+                    return None, None
+                worksheet = spreadsheet.add_worksheet(title=self.sheet_name, rows=1000, cols=10)
+                sheet_header = list(header) if header else []
+                if header:
+                    worksheet.append_row(list(header))
+            self._worksheet = (self.spreadsheet_id, self.sheet_name, worksheet, sheet_header)
+            return worksheet, sheet_header
+
+    def worksheet(self, create=True, header=None):
+        """발행이력 워크시트 핸들 (프로세스 동안 재사용, 없고 create=False면 None)"""
+        return self._cached_worksheet(create, header)[0]
+
+    def _sheet_header(self):
+        """워크시트 1행 헤더 (처음 한 번만 읽고 캐시)"""
+        with self._handle_lock:
+            worksheet, header = self._cached_worksheet()
+            if header is None:
+                header = worksheet.row_values(1)
+                self._worksheet = self._worksheet[:3] + (header,)
+            return header
+
+    def _with_retry(self, func):
+        """핸들/인증 오류면 캐시를 지우고 한 번 더 시도"""
+        try:
+            return func()
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            status = getattr(response, 'status_code', None)
+            if isinstance(e, RefreshError) or status in (401, 403):
+                print(f"구글 API 인증 오류 ({status or e}), 다시 인증 후 재시도")
+                self.invalidate(auth=True)
+                if not self.authenticate():
+                    raise
+            elif isinstance(e, gspread.WorksheetNotFound) or status in (400, 404):
+                print(f"구글 스프레드시트 핸들 오류 ({status or e}), 다시 열어서 재시도")
+                self.invalidate()
+            else:
+                raise
+            return func()
+
     def create_spreadsheet(self, title="바코드 라벨 발행이력"):
         """새 구글 스프레드시트 생성"""
         print(f"스프레드시트 생성 시작: {title}")
         
-        if not self.authenticate():
-            print("인증 실패로 스프레드시트 생성 불가")
-            return None
-        
-        try:
-            print("구글 스프레드시트 API 호출 중...")
-            spreadsheet = self.service.create(title)
-            self.spreadsheet_id = spreadsheet.id
-            print(f"스프레드시트 생성 성공: {self.spreadsheet_id}")
-            
-            # 기본 시트 이름 변경
-            print("시트 이름 변경 중...")
-            worksheet = spreadsheet.get_worksheet(0)
-            worksheet.update_title(self.sheet_name)
-            print(f"시트 이름 변경 완료: {self.sheet_name}")
+        with self._operation("create_spreadsheet"):
+            if not self.authenticate():
+                print("인증 실패로 스프레드시트 생성 불가")
+                return None
             
-            # 헤더 추가
-            print("헤더 추가 중...")
-            headers = [
-                '일련번호', '구분', '제품코드', '제품명', 'LOT', 
-                '유통기한', '폐기일자', '보관위치', '버전', '발행일시'
-            ]
-            worksheet.append_row(headers)
-            print("헤더 추가 완료")
-            
-            # 설정 저장
-            print("설정 저장 중...")
-            self.save_config()
-            print("설정 저장 완료")
-            
-            return spreadsheet.id
-        except Exception as e:
-            print(f"스프레드시트 생성 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+            try:
+                print("구글 스프레드시트 API 호출 중...")
+                spreadsheet = self._with_retry(lambda: self.service.create(title))
+                self.spreadsheet_id = spreadsheet.id
+                print(f"스프레드시트 생성 성공: {self.spreadsheet_id}")
+                
+                # 기본 시트 이름 변경
+                print("시트 이름 변경 중...")
+                worksheet = spreadsheet.get_worksheet(0)
+                worksheet.update_title(self.sheet_name)
+                print(f"시트 이름 변경 완료: {self.sheet_name}")
+                
+                # 헤더 추가
+                print("헤더 추가 중...")
+                headers = list(SHEETS_COLUMNS)
+                worksheet.append_row(headers)
+                print("헤더 추가 완료")
+                
+                # 새로 만든 핸들은 그대로 캐시
+                with self._handle_lock:
+                    self._spreadsheet = (self.spreadsheet_id, spreadsheet)
+                    self._worksheet = (self.spreadsheet_id, self.sheet_name, worksheet, headers)
+                
+                # 설정 저장
+                print("설정 저장 중...")
+                self.save_config()
+                print("설정 저장 완료")
+                
+                return spreadsheet.id
+            except Exception as e:
+                print(f"스프레드시트 생성 오류: {e}")
+                import traceback
+                traceback.print_exc()
+                return None
     
     def get_spreadsheet_url(self):
         """스프레드시트 URL 반환"""
@@ -178,69 +311,72 @@ class GoogleSheetsManager:
     
     def upload_to_sheets(self, excel_file_path):
         """Excel 파일을 구글 스프레드시트에 업로드"""
-        if not self.authenticate():
-            return False
-        
         try:
             # Excel 파일 읽기
             df = pd.read_excel(excel_file_path)
-            
-            # 스프레드시트가 없으면 생성
-            if not self.spreadsheet_id:
-                self.create_spreadsheet()
-            
-            if not self.spreadsheet_id:
+        except Exception as e:
+            print(f"업로드 오류: {e}")
+            return False
+        return self.upload_dataframe(df)
+    
+    def upload_dataframe(self, df, full=False):
+        """DataFrame을 구글 스프레드시트에 일괄 동기화 (바뀐 행만 batch_update, 시트 헤더 순서에 맞춤)"""
+        with self._operation("upload"):
+            if not self.authenticate():
                 return False
             
-            # 스프레드시트 열기
-            spreadsheet = self.service.open_by_key(self.spreadsheet_id)
-            
-            # 시트 가져오기 (없으면 생성)
             try:
-                worksheet = spreadsheet.worksheet(self.sheet_name)
-            except gspread.WorksheetNotFound:
-                worksheet = spreadsheet.add_worksheet(title=self.sheet_name, rows=1000, cols=10)
-            
-            # 기존 데이터 삭제 (헤더 제외)
-            worksheet.clear()
-            
-            # 헤더 추가
-            headers = list(df.columns)
-            worksheet.append_row(headers)
-            
-            # 데이터 추가
-            for _, row in df.iterrows():
-                worksheet.append_row(row.tolist())
+                # 스프레드시트가 없으면 생성
+                if not self.spreadsheet_id:
+                    self.create_spreadsheet()
+                
+                if not self.spreadsheet_id:
+                    return False
+                
+                # 캐시된 시트에 동기화 (없으면 생성)
+                result = self._with_retry(lambda: sync_frame(self.worksheet(), df, full=full))
+                print(result.report())
+                print(self.api_call_report())
+                return True
+                
+            except Exception as e:
+                print(f"업로드 오류: {e}")
+                return False
+    
+    def load_dataframe(self, full=False, verify_all=False):
+        """시트 전체를 DataFrame으로 읽기 (시트가 없으면 None)
+        
+        로컬 미러(sheets_mirror)에 저장된 행 뒤에 새로 추가된 행과 내용이 바뀐 블록만 받아서 합침
+        기본은 마지막 블록과 이전 블록 VERIFY_BLOCKS개만 다시 확인하므로, 이전 행이 수정된 경우
+        (블록 수 / VERIFY_BLOCKS)번 조회까지 이전 값이 보일 수 있음 (조회 화면용)
+        verify_all=True면 모든 블록을 확인해서 시트와 같은 내용을 반환 (요청 1번, 내보내기/백업용)
+        full=True면 미러를 무시하고 시트 전체를 다시 받음
+        """
+        with self._operation("download"):
+            if not self.authenticate() or not self.spreadsheet_id:
+                return None
+            key = f"{self.spreadsheet_id}/{self.sheet_name}"
             
-            print(f"구글 스프레드시트에 {len(df)}개 행이 업로드되었습니다.")
-            return True
+            def read():
+                worksheet = self.worksheet(create=False)
+                if worksheet is None:
+                    return None
+                if full:
+                    sheets_mirror.clear(key)
+                verify_blocks = None if verify_all else VERIFY_BLOCKS
+                print(sheets_mirror.refresh(worksheet, key, verify_blocks=verify_blocks).report())
+                return sheets_mirror.load_dataframe(key)
             
-        except Exception as e:
-            print(f"업로드 오류: {e}")
-            return False
+            return self._with_retry(read)
     
     def download_from_sheets(self, excel_file_path):
-        """구글 스프레드시트에서 Excel 파일로 다운로드"""
-        if not self.authenticate() or not self.spreadsheet_id:
-            return False
-        
+        """구글 스프레드시트에서 Excel 파일로 다운로드 (미러의 모든 블록을 확인해서 시트와 같은 내용으로)"""
         try:
-            # 스프레드시트 열기
-            spreadsheet = self.service.open_by_key(self.spreadsheet_id)
-            
-            # 시트 가져오기
-            try:
-                worksheet = spreadsheet.worksheet(self.sheet_name)
-            except gspread.WorksheetNotFound:
+            df = self.load_dataframe(verify_all=True)
+            if df is None:
                 print(f"시트 '{self.sheet_name}'을 찾을 수 없습니다.")
                 return False
             
-            # 모든 데이터 가져오기
-            data = worksheet.get_all_records()
-            
-            # DataFrame으로 변환
-            df = pd.DataFrame(data)
-            
             # Excel 파일로 저장
             df.to_excel(excel_file_path, index=False)
             
@@ -255,65 +391,73 @@ class GoogleSheetsManager:
         """개별 행을 구글 스프레드시트에 추가"""
         print(f"Google Sheets에 데이터 추가 시도: {row_data}")
         
-        if not self.authenticate():
-            print("Google Sheets 인증 실패")
-            return False
-        
-        try:
-            # 스프레드시트가 없으면 생성
-            if not self.spreadsheet_id:
-                print("스프레드시트 ID가 없어서 새로 생성합니다.")
-                self.create_spreadsheet()
-            
-            if not self.spreadsheet_id:
-                print("스프레드시트 생성 실패")
+        with self._operation("add_row"):
+            if not self.authenticate():
+                print("Google Sheets 인증 실패")
                 return False
             
-            print(f"스프레드시트 ID: {self.spreadsheet_id}")
-            
-            # 스프레드시트 열기
-            spreadsheet = self.service.open_by_key(self.spreadsheet_id)
-            print("스프레드시트 열기 성공")
-            
-            # 시트 가져오기 (없으면 생성)
             try:
-                worksheet = spreadsheet.worksheet(self.sheet_name)
-                print(f"기존 시트 '{self.sheet_name}' 사용")
-            except gspread.WorksheetNotFound:
-                print(f"시트 '{self.sheet_name}'가 없어서 새로 생성합니다.")
-                worksheet = spreadsheet.add_worksheet(title=self.sheet_name, rows=1000, cols=10)
-                # 헤더 추가 (지정된 컬럼 순서에 맞게)
-                headers = [
-                    '일련번호', '구분', '제품코드', '제품명', 'LOT', 
-                    '유통기한', '폐기일자', '보관위치', '버전', '발행일시'
+                # 스프레드시트가 없으면 생성
+                if not self.spreadsheet_id:
+                    print("스프레드시트 ID가 없어서 새로 생성합니다.")
+                    self.create_spreadsheet()
+                
+                if not self.spreadsheet_id:
+                    print("스프레드시트 생성 실패")
+                    return False
+                
+                # 데이터 행 추가 (지정된 컬럼 순서에 맞게)
+                row_values = [
+                    row_data.get('일련번호', ''),      # A열: 바코드 번호
+                    row_data.get('구분', ''),          # B열: 구분
+                    row_data.get('제품코드', ''),      # C열: 제품코드
+                    row_data.get('제품명', ''),        # D열: 제품명
+                    row_data.get('LOT', ''),          # E열: LOT
+                    row_data.get('유통기한', ''),      # F열: 유통기한
+                    row_data.get('폐기일자', ''),      # G열: 폐기일자 (유통기한 + 1년)
+                    row_data.get('보관위치', ''),      # H열: 보관위치
+                    row_data.get('버전', ''),          # I열: 버전
+                    row_data.get('발행일시', '')       # J열: 발행일시
                 ]
-                worksheet.append_row(headers)
-                print("헤더 추가 완료")
-            
-            # 데이터 행 추가 (지정된 컬럼 순서에 맞게)
-            row_values = [
-                row_data.get('일련번호', ''),      # A열: 바코드 번호
-                row_data.get('구분', ''),          # B열: 구분
-                row_data.get('제품코드', ''),      # C열: 제품코드
-                row_data.get('제품명', ''),        # D열: 제품명
-                row_data.get('LOT', ''),          # E열: LOT
-                row_data.get('유통기한', ''),      # F열: 유통기한
-                row_data.get('폐기일자', ''),      # G열: 폐기일자 (유통기한 + 1년)
-                row_data.get('보관위치', ''),      # H열: 보관위치
-                row_data.get('버전', ''),          # I열: 버전
-                row_data.get('발행일시', '')       # J열: 발행일시
-            ]
-            
-            print(f"추가할 데이터: {row_values}")
-            worksheet.append_row(row_values)
-            print(f"구글 스프레드시트에 새 행이 추가되었습니다.")
+                
+                print(f"추가할 데이터: {row_values}")
+                # 시트가 없으면 헤더와 함께 생성
+                self._with_retry(lambda: self.worksheet(header=SHEETS_COLUMNS).append_row(row_values))
+                print(f"구글 스프레드시트에 새 행이 추가되었습니다.")
+                return True
+                
+            except Exception as e:
+                print(f"행 추가 오류: {e}")
+                import traceback
+                traceback.print_exc()
+                return False
+
+    def append_rows_to_sheets(self, rows):
+        """발행 내역 여러 행을 시트 헤더 순서에 맞춰 한 번에 추가 (동기화 대기열용, 실패 시 예외 발생)"""
+        with self._operation("append_rows"):
+            if not self.authenticate():
+                raise RuntimeError("구글 스프레드시트 인증 실패")
+            if not self.spreadsheet_id:
+                self.create_spreadsheet()
+            if not self.spreadsheet_id:
+                raise RuntimeError("구글 스프레드시트를 만들 수 없습니다.")
+
+            def append():
+                # 시트에 헤더가 없으면 기본 헤더를 함께 추가
+                header = self._sheet_header()
+                values = []
+                if not any(header):
+                    header = list(SHEETS_COLUMNS)
+                    values.append(header)
+                values += map_frame(pd.DataFrame(rows), header)
+                self.worksheet().append_rows(values, value_input_option='RAW')
+                if len(values) > len(rows):
+                    with self._handle_lock:
+                        self._worksheet = self._worksheet[:3] + (header,)
+
+            self._with_retry(append)
+            print(f"구글 스프레드시트에 {len(rows)}개 행이 추가되었습니다.")
             return True
-            
-        except Exception as e:
-            print(f"행 추가 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
 
     def sync_with_sheets(self, excel_file_path, direction="upload"):
         """Excel 파일과 구글 스프레드시트 동기화"""
@@ -354,7 +498,8 @@ class GoogleSheetsManager:
             # 연결 테스트
             if self.authenticate():
                 try:
-                    spreadsheet = self.service.open_by_key(self.spreadsheet_id)
+                    with self._operation("setup"):
+                        self._with_retry(self._open_spreadsheet)
                     print(f"구글 스프레드시트에 연결되었습니다.")
                     print(f"스프레드시트 ID: {self.spreadsheet_id}")
                     print(f"URL: {self.get_spreadsheet_url()}")
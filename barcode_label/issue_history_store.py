@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+발행 이력 저장소
+라벨 발행 이력을 SQLite(WAL) 테이블에 한 행씩 추가 저장하는 모듈
+엑셀(issue_history.xlsx)은 내보내기 용도로만 사용
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 라벨 규격
+LAYOUT_40X30 = "40x30"
+LAYOUT_30X20 = "30x20"
+
+# 엑셀/화면에서 사용하는 컬럼명 -> 테이블 컬럼명
+FIELD_MAP = {
+    '발행일시': 'issued_at',
+    '구분': 'category',
+    '제품코드': 'product_code',
+    '제품명': 'product_name',
+    'LOT': 'lot',
+    '유통기한': 'expiry',
+    '버전': 'version',
+    '폐기일자': 'disposal_date',
+    '보관위치': 'location',
+    '파일명': 'filename',
+    '바코드숫자': 'serial',
+    '일련번호': 'serial',
+}
+
+# label_gui 발행 내역 컬럼 순서 (기본)
+HISTORY_COLUMNS = ['발행일시', '구분', '제품코드', '제품명', 'LOT', '유통기한', '버전', '폐기일자', '보관위치', '파일명', '바코드숫자']
+
+# streamlit_app / 구글 스프레드시트 컬럼 순서
+SHEETS_COLUMNS = ['일련번호', '구분', '제품코드', '제품명', 'LOT', '유통기한', '폐기일자', '보관위치', '버전', '발행일시']
+
+# 출고 내역 컬럼명 -> 테이블 컬럼명
+OUTBOUND_FIELD_MAP = {
+    '출고일시': 'outbound_at',
+    '보관위치': 'location',
+    '제품코드': 'product_code',
+    '제품명': 'product_name',
+    'LOT': 'lot',
+    '구분': 'category',
+    '출고수량': 'quantity',
+    '반출자': 'outbounder',
+}
+
+OUTBOUND_COLUMNS = ['출고일시', '보관위치', '제품코드', '제품명', 'LOT', '구분', '출고수량', '반출자']
+
+# 출고 내역을 기록하는 가상 규격 (기존 엑셀 가져오기 구분용)
+LAYOUT_OUTBOUND = "outbound"
+
+# 기존 엑셀 발행/출고 내역 (최초 1회 가져오기)
+LEGACY_EXCEL_FILES = {
+    LAYOUT_40X30: os.path.join(SCRIPT_DIR, "issue_history.xlsx"),
+    LAYOUT_30X20: os.path.join(SCRIPT_DIR, "issue_history_30x20.xlsx"),
+    LAYOUT_OUTBOUND: os.path.join(SCRIPT_DIR, "outbound_history.xlsx"),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS issue_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    layout TEXT NOT NULL DEFAULT '40x30',
+    issued_at TEXT NOT NULL,
+    category TEXT,
+    product_code TEXT,
+    product_name TEXT,
+    lot TEXT,
+    expiry TEXT,
+    version TEXT,
+    disposal_date TEXT,
+    location TEXT,
+    filename TEXT,
+    serial TEXT,
+    removed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_issue_history_serial ON issue_history(serial);
+CREATE INDEX IF NOT EXISTS idx_issue_history_product_code ON issue_history(product_code);
+CREATE INDEX IF NOT EXISTS idx_issue_history_location ON issue_history(location);
+CREATE INDEX IF NOT EXISTS idx_issue_history_issued_at ON issue_history(issued_at);
+CREATE INDEX IF NOT EXISTS idx_issue_history_removed_at ON issue_history(removed_at);
+CREATE TABLE IF NOT EXISTS outbound_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    outbound_at TEXT NOT NULL,
+    location TEXT,
+    product_code TEXT,
+    product_name TEXT,
+    lot TEXT,
+    category TEXT,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    outbounder TEXT,
+    issue_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_outbound_history_outbound_at ON outbound_history(outbound_at);
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    path TEXT PRIMARY KEY,
+    layout TEXT NOT NULL,
+    imported_at TEXT NOT NULL,
+    row_count INTEGER NOT NULL
+);
+"""
+
+
+def _to_text(value):
+    """저장용 문자열 변환 (빈 값은 None)"""
+    import pandas as pd
+    if value is None:
+        return None
+    # NaN, pd.NaT(엑셀 날짜 컬럼의 빈칸) 등 (NaT는 datetime이지만 strftime이 ValueError)
+    if pd.api.types.is_scalar(value) and pd.isna(value):
+        return None
+    if isinstance(value, datetime):
+        if value.hour == 0 and value.minute == 0 and value.second == 0:
+            return value.strftime("%Y-%m-%d")
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if hasattr(value, 'strftime'):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+class IssueHistoryStore:
+    def __init__(self, db_path=None, legacy_files=None):
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, "issue_history.db")
+        self.legacy_files = LEGACY_EXCEL_FILES if legacy_files is None else legacy_files
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        """스레드별 연결 반환 (최초 호출 시 스키마 생성 및 기존 엑셀 가져오기)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._import_legacy_excel(conn)
+                    self._initialized = True
+        return conn
+
+    def _import_legacy_excel(self, conn):
+        """기존 issue_history.xlsx 내용을 최초 1회 가져오기"""
+        for layout, path in self.legacy_files.items():
+            if not os.path.exists(path):
+                continue
+            key = os.path.abspath(path)
+            if conn.execute("SELECT 1 FROM legacy_imports WHERE path = ?", (key,)).fetchone():
+                continue
+            try:
+                import pandas as pd
+                df = pd.read_excel(path)
+                records = df.to_dict('records')
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if layout == LAYOUT_OUTBOUND:
+                        self._insert_outbound_rows(conn, records)
+                    else:
+                        self._insert_rows(conn, records, layout)
+                    conn.execute(
+                        "INSERT INTO legacy_imports (path, layout, imported_at, row_count) VALUES (?, ?, ?, ?)",
+                        (key, layout, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), len(records))
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                print(f"기존 내역 {len(records)}건을 가져왔습니다: {path}")
+            except Exception as e:
+                print(f"기존 내역 가져오기 실패 ({path}): {e}")
+
+    def _insert_rows(self, conn, records, layout):
+        """발행 내역 여러 행 추가 (트랜잭션은 호출 측에서 관리)"""
+        columns = ['layout'] + sorted(set(FIELD_MAP.values()))
+        placeholders = ", ".join("?" for _ in columns)
+        sql = f"INSERT INTO issue_history ({', '.join(columns)}) VALUES ({placeholders})"
+        rows = []
+        for record in records:
+            values = {'layout': layout}
+            for key, value in record.items():
+                field = FIELD_MAP.get(key, key if key in FIELD_MAP.values() else None)
+                if field:
+                    values[field] = _to_text(value)
+            if not values.get('issued_at'):
+                values['issued_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            rows.append(tuple(values.get(column) for column in columns))
+        cursor = conn.executemany(sql, rows)
+        return cursor.rowcount
+
+    def _insert_outbound_rows(self, conn, records):
+        """기존 출고 내역 여러 행 추가 (트랜잭션은 호출 측에서 관리)"""
+        columns = list(OUTBOUND_FIELD_MAP.values())
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        for record in records:
+            values = dict(zip(columns, (_to_text(record.get(key)) for key in OUTBOUND_FIELD_MAP)))
+            values['outbound_at'] = values['outbound_at'] or now
+            try:
+                values['quantity'] = int(float(values['quantity']))
+            except (TypeError, ValueError):
+                values['quantity'] = 1
+            rows.append(tuple(values[column] for column in columns))
+        conn.executemany(
+            f"INSERT INTO outbound_history ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            rows
+        )
+
+    def append(self, record, layout=LAYOUT_40X30):
+        """발행 내역 1건 추가 후 행 번호 반환"""
+        return self.append_many([record], layout)[0]
+
+    def append_many(self, records, layout=LAYOUT_40X30):
+        """발행 내역 여러 건을 한 트랜잭션으로 추가 후 행 번호 목록 반환"""
+        records = list(records)
+        if not records:
+            return []
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._insert_rows(conn, records, layout)
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return list(range(last_id - len(records) + 1, last_id + 1))
+
+    def load_dataframe(self, layout=LAYOUT_40X30, columns=None, include_removed=False, after_id=None):
+        """발행 내역을 DataFrame으로 반환 (인덱스는 저장소 행 번호)
+
+        after_id를 지정하면 해당 행 번호 이후에 추가된 행만 반환한다.
+        """
+        import pandas as pd
+        columns = list(columns or HISTORY_COLUMNS)
+        select = ", ".join(f'{FIELD_MAP[c]} AS "{c}"' for c in columns)
+        sql = f"SELECT id, {select} FROM issue_history WHERE layout = ?"
+        params = [layout]
+        if not include_removed:
+            sql += " AND removed_at IS NULL"
+        if after_id is not None:
+            sql += " AND id > ?"
+            params.append(int(after_id))
+        sql += " ORDER BY id"
+        conn = self._connect()
+        cursor = conn.execute(sql, params)
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=['id'] + columns)
+        return df.set_index('id')
+
+    def removed_ids_since(self, since, layout=LAYOUT_40X30):
+        """since(발행일시 형식 문자열) 이후 출고/삭제된 행 번호 목록"""
+        conn = self._connect()
+        return [row[0] for row in conn.execute(
+            "SELECT id FROM issue_history WHERE layout = ? AND removed_at >= ?", (layout, since)
+        )]
+
+    def changes_since(self, last_id, since, layout=LAYOUT_40X30):
+        """증분 동기화: (last_id 이후 추가된 행, since 이후 제거된 행 번호, 다음 since)"""
+        next_since = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        new_rows = self.load_dataframe(layout, after_id=last_id)
+        removed_ids = self.removed_ids_since(since, layout)
+        return new_rows, removed_ids, next_since
+
+    def count(self, layout=LAYOUT_40X30):
+        """현재 재고(제거되지 않은) 발행 건수"""
+        conn = self._connect()
+        return conn.execute(
+            "SELECT COUNT(*) FROM issue_history WHERE layout = ? AND removed_at IS NULL", (layout,)
+        ).fetchone()[0]
+
+    def mark_removed(self, row_ids):
+        """출고/삭제된 행 표시 (행은 지우지 않고 제거 시각만 기록)"""
+        row_ids = [int(i) for i in row_ids]
+        if not row_ids:
+            return 0
+        conn = self._connect()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.executemany(
+                "UPDATE issue_history SET removed_at = ? WHERE id = ? AND removed_at IS NULL",
+                [(now, i) for i in row_ids]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def ship(self, shipments):
+        """출고 처리: [(행 번호 목록, 반출자), ...]를 한 트랜잭션으로 기록
+
+        모든 행이 아직 재고 상태일 때만 커밋하고, 하나라도 이미 출고/삭제된
+        행이 있으면 전체를 롤백한다 (전부 반영 또는 전부 취소).
+        """
+        shipments = [([int(i) for i in ids], outbounder) for ids, outbounder in shipments]
+        total = sum(len(ids) for ids, _ in shipments)
+        if not total:
+            return 0
+        conn = self._connect()
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for ids, outbounder in shipments:
+                conn.executemany(
+                    "INSERT INTO outbound_history (outbound_at, location, product_code, product_name, lot, category, quantity, outbounder, issue_id) "
+                    "SELECT ?, location, product_code, product_name, lot, category, 1, ?, id "
+                    "FROM issue_history WHERE id = ? AND removed_at IS NULL",
+                    [(now, outbounder, i) for i in ids]
+                )
+                cursor = conn.executemany(
+                    "UPDATE issue_history SET removed_at = ? WHERE id = ? AND removed_at IS NULL",
+                    [(now, i) for i in ids]
+                )
+                if cursor.rowcount != len(ids):
+                    raise RuntimeError("이미 출고되었거나 삭제된 재고가 포함되어 있습니다.")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return total
+
+    def load_outbound_dataframe(self):
+        """출고 내역을 DataFrame으로 반환"""
+        import pandas as pd
+        select = ", ".join(f'{OUTBOUND_FIELD_MAP[c]} AS "{c}"' for c in OUTBOUND_COLUMNS)
+        conn = self._connect()
+        cursor = conn.execute(f"SELECT id, {select} FROM outbound_history ORDER BY id")
+        df = pd.DataFrame.from_records(cursor.fetchall(), columns=['id'] + OUTBOUND_COLUMNS)
+        return df.set_index('id')
+
+    def remove_matching(self, criteria, layout=LAYOUT_40X30):
+        """조건(컬럼명: 값)과 일치하는 행 모두 제거 표시 후 건수 반환"""
+        conditions = " AND ".join(f"{FIELD_MAP[key]} = ?" for key in criteria)
+        params = [_to_text(value) for value in criteria.values()]
+        conn = self._connect()
+        ids = [row[0] for row in conn.execute(
+            f"SELECT id FROM issue_history WHERE layout = ? AND removed_at IS NULL AND {conditions}",
+            [layout] + params
+        )]
+        return self.mark_removed(ids)
+
+    def export_to_excel(self, excel_file_path, layout=LAYOUT_40X30, columns=None):
+        """현재 발행 내역을 엑셀 파일로 내보내기"""
+        df = self.load_dataframe(layout, columns)
+        os.makedirs(os.path.dirname(os.path.abspath(excel_file_path)), exist_ok=True)
+        df.to_excel(excel_file_path, index=False)
+        return excel_file_path
+
+
+# 전역 인스턴스
+history_store = IssueHistoryStore()
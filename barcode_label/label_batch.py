@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 일괄 발행
+여러 장의 라벨을 한 번에 발행하는 엔진
+
+1. 일련번호를 한 트랜잭션으로 예약 (label_registry.register_many)
+2. 라벨 이미지 렌더링/JPG 저장을 프로세스 풀에서 병렬 처리 (라벨 템플릿 캐시 사용)
+3. 완성된 라벨을 발행 순서대로 on_label 콜백에 전달 (인쇄 등)
+4. 발행 내역을 한 번에 저장 (history_store.append_many)
+
+진행 상황은 progress(완료 수, 전체 수) 콜백으로 알림 (호출한 스레드에서 호출됨)
+GUI에서는 별도 스레드에서 실행하고 root.after로 화면에 반영
+"""
+
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+
+from issue_history_store import history_store, LAYOUT_40X30, LAYOUT_30X20
+from label_registry import label_registry, LABEL_FIELDS
+from label_template import label_templates
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 레이아웃별 라벨 이미지 저장 폴더
+OUTPUT_DIRS = {
+    LAYOUT_40X30: os.path.join(SCRIPT_DIR, "labeljpg"),
+    LAYOUT_30X20: os.path.join(SCRIPT_DIR, "labeljpg_30x20"),
+}
+
+# 이 수량 미만이면 프로세스 풀 없이 현재 프로세스에서 렌더링
+MIN_PARALLEL_LABELS = 8
+
+
+class BatchLabel:
+    """일괄 발행된 라벨 1장"""
+
+    def __init__(self, index, serial_number, filename, item):
+        self.index = index
+        self.serial_number = serial_number
+        self.filename = filename
+        self.item = item
+
+
+class BatchResult:
+    """일괄 발행 결과 (라벨 목록, 단계별 소요 시간, 저장한 발행 내역 행)"""
+
+    def __init__(self, labels, timings, workers, records=None):
+        self.labels = labels
+        self.timings = timings
+        self.workers = workers
+        self.records = records or []
+
+    @property
+    def elapsed(self):
+        return sum(self.timings.values())
+
+    @property
+    def rate(self):
+        """초당 라벨 수"""
+        return len(self.labels) / self.elapsed if self.elapsed else 0.0
+
+    def report(self):
+        parts = ", ".join(f"{phase} {seconds * 1000:.0f}ms" for phase, seconds in self.timings.items())
+        return (f"라벨 {len(self.labels)}장 발행: {self.elapsed:.2f}초, {self.rate:.1f} 라벨/초 "
+                f"(작업 프로세스 {self.workers}개; {parts})")
+
+
+def disposal_date(expiry):
+    """폐기일자 (유통기한 + 1년, 계산할 수 없으면 N/A)"""
+    try:
+        expiry_date = expiry if isinstance(expiry, datetime) else datetime.strptime(str(expiry), "%Y-%m-%d")
+        return expiry_date.replace(year=expiry_date.year + 1).strftime("%Y-%m-%d")
+    except Exception:
+        return "N/A"
+
+
+def issue_record(item, product_name, filename, serial_number, issued_at):
+    """발행 내역 1행 (label_gui.save_issue_history와 같은 컬럼)"""
+    return {
+        '발행일시': issued_at,
+        '구분': item['category'],
+        '제품코드': item['product_code'],
+        '제품명': product_name,
+        'LOT': item['lot'],
+        '유통기한': item['expiry'],
+        '버전': item['version'],
+        '폐기일자': disposal_date(item['expiry']),
+        '보관위치': item['location'],
+        '파일명': filename,
+        '바코드숫자': serial_number,
+    }
+
+
+def _render_chunk(layout, output_dir, jobs):
+    """작업 프로세스: 라벨 여러 장 렌더링 후 JPG 저장, [(순번, 파일 경로)] 반환"""
+    results = []
+    for index, serial_number, fields in jobs:
+        product_code, product_name, category, lot, expiry, version, location = fields
+        label = label_templates.compose(layout, serial_number, *fields)
+        filename = os.path.join(output_dir, f"{product_code}-{location}-{serial_number}.jpg")
+        label.save(filename)
+        results.append((index, filename))
+    return results
+
+
+def make_executor(workers, spawn_safe):
+    """렌더링 작업 풀
+
+    작업 프로세스는 메인 스크립트를 다시 import하므로(spawn/forkserver) spawn_safe일 때만 프로세스 풀,
+    아니면 스레드 풀 사용. 다른 스레드(인쇄/동기화 대기열 등)가 돌고 있는 GUI 프로세스를 fork하면
+    잠긴 lock을 물려받은 작업 프로세스가 멈출 수 있으므로 fork는 쓰지 않고 POSIX에서는 forkserver 사용
+    """
+    if not spawn_safe:
+        return ThreadPoolExecutor(max_workers=workers)
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("forkserver"))
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def create_labels_batch(items, layout=LAYOUT_40X30, products=None, registry=None, store=None,
+                        output_dir=None, max_workers=None, progress=None, on_label=None, spawn_safe=False):
+    """라벨 여러 장 일괄 발행
+
+    items: [{'product_code', 'lot', 'expiry', 'version', 'location', 'category'}, ...]
+    products: 제품코드 -> 제품명 (없으면 제품 카탈로그 사용)
+    on_label(BatchLabel): 라벨이 저장될 때마다 발행 순서대로 호출 (인쇄 등)
+    progress(done, total): 진행 상황 알림
+    spawn_safe: 메인 스크립트가 if __name__ == "__main__"으로 보호되어 있으면 True
+    """
+    items = [dict(item) for item in items]
+    if not items:
+        return BatchResult([], {}, 0)
+    for item in items:
+        missing = [field for field in LABEL_FIELDS if not str(item.get(field, "")).strip()]
+        if missing:
+            raise ValueError(f"라벨 정보 누락: {', '.join(missing)} ({item})")
+
+    registry = registry or label_registry
+    store = store or history_store
+    output_dir = output_dir or OUTPUT_DIRS.get(layout, OUTPUT_DIRS[LAYOUT_40X30])
+    os.makedirs(output_dir, exist_ok=True)
+    if products is None:
+        from product_catalog import product_catalog
+        products = product_catalog.load(block=False).products
+    timings = {}
+
+    # 1. 일련번호 예약 (한 트랜잭션)
+    start = time.perf_counter()
+    serials = registry.register_many(items)
+    timings["일련번호"] = time.perf_counter() - start
+
+    # 2. 렌더링 (같은 제품이 이어지도록 순서대로 묶어서 작업 프로세스에 전달)
+    start = time.perf_counter()
+    jobs = []
+    for index, (item, serial_number) in enumerate(zip(items, serials)):
+        product_name = products.get(item['product_code'], "알 수 없는 제품")
+        fields = (item['product_code'], product_name, item['category'], item['lot'],
+                  item['expiry'], item['version'], item['location'])
+        jobs.append((index, serial_number, fields))
+
+    workers = max_workers or os.cpu_count() or 1
+    if len(jobs) < MIN_PARALLEL_LABELS:
+        workers = 1
+    chunk_size = max(1, min(50, math.ceil(len(jobs) / (workers * 4))))
+    chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    labels = []
+
+    def save_history():
+        """3. 발행 내역 일괄 저장 후 저장한 행 반환"""
+        issued_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        records = [issue_record(label.item, jobs[label.index][2][1], label.filename, label.serial_number, issued_at)
+                   for label in labels]
+        store.append_many(records, layout)
+        return records
+
+    executor = make_executor(workers, spawn_safe) if workers > 1 else None
+    try:
+        results = (executor.map(_render_chunk, [layout] * len(chunks), [output_dir] * len(chunks), chunks)
+                   if executor else (_render_chunk(layout, output_dir, chunk) for chunk in chunks))
+        # map은 제출 순서대로 결과를 돌려주므로 발행 순서가 유지됨
+        for chunk_results in results:
+            for index, filename in chunk_results:
+                label = BatchLabel(index, serials[index], filename, items[index])
+                labels.append(label)
+                if on_label:
+                    on_label(label)
+            if progress:
+                progress(len(labels), len(jobs))
+    except Exception:
+        # 중간에 실패해도 저장까지 끝난 라벨은 기록 (기록 실패는 원래 오류를 가리지 않게 출력만)
+        try:
+            save_history()
+        except Exception as e:
+            print(f"일괄 발행 중단 후 발행 내역 저장 실패: {e}")
+        raise
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        timings["렌더링"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    records = save_history()
+    timings["발행 내역"] = time.perf_counter() - start
+
+    result = BatchResult(labels, timings, workers, records)
+    print(result.report())
+    return result
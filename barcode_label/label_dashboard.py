@@ -5,99 +5,34 @@ import os
 import subprocess
 import sys
 
-# ✅ 발행 이력 파일명 변경
-history_file = "barcode_label/issue_history.xlsx"
+# ✅ 발행 이력 저장소 (issue_history.db)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from issue_history_store import history_store
+from location_aggregate import dashboard_rows
 
 def load_inventory():
-    if not os.path.exists(history_file):
-        messagebox.showerror("오류", "발행 이력이 없습니다.")
+    try:
+        return history_store.load_dataframe()
+    except Exception as e:
+        messagebox.showerror("오류", f"발행 이력을 불러올 수 없습니다: {e}")
         return pd.DataFrame()
-    df = pd.read_excel(history_file)
-    return df
 
 def update_dashboard():
     df = load_inventory()
     if df.empty:
         # 빈 데이터일 때 트리뷰 초기화
-        for i in tree.get_children():
-            tree.delete(i)
+        tree.delete(*tree.get_children())
         return
 
-    # ✅ 위치별 재고 집계 (구분 포함)
-    grouped = df.groupby(["보관위치", "구분", "제품코드", "제품명"]).size().reset_index()
-    grouped.columns = ["보관위치", "구분", "제품코드", "제품명", "수량"]
+    # ✅ 위치별 재고 집계 (구분 포함, 가장 가까운 유통기한 기준 최신 정보)
+    grouped = dashboard_rows(df)
 
-    # Treeview 초기화
-    for i in tree.get_children():
-        tree.delete(i)
-
-    for _, row in grouped.iterrows():
-        # 해당 위치와 제품의 최신 정보 가져오기
-        location = row["보관위치"]
-        product = row["제품명"]
-        product_code = row["제품코드"]
-        category = row["구분"]
-        
-        # 해당 위치와 제품의 데이터 필터링
-        filtered_df = df[(df["보관위치"] == location) & (df["구분"] == category) & (df["제품코드"] == product_code) & (df["제품명"] == product)]
-        
-        # 최신 정보 (현재 시점에서 가장 가까운 유통기한 기준)
-        try:
-            current_date = pd.Timestamp.now()
-            
-            # 유통기한을 날짜로 변환하여 가장 가까운 날짜 찾기
-            expiry_dates = []
-            for _, filtered_row in filtered_df.iterrows():
-                try:
-                    expiry_date = pd.to_datetime(filtered_row["유통기한"])
-                    expiry_dates.append((expiry_date, filtered_row))
-                except:
-                    continue
-            
-            if expiry_dates:
-                # 현재 날짜와의 차이를 계산하여 가장 가까운 날짜 찾기
-                closest_expiry, closest_row = min(expiry_dates, key=lambda x: abs((x[0] - current_date).days))
-                
-                latest_lot = str(closest_row["LOT"])
-                latest_expiry = closest_expiry.strftime("%Y-%m-%d")
-                
-                # 폐기일자 계산
-                latest_disposal = closest_row.get("폐기일자", "N/A")
-                if latest_disposal == "N/A" or pd.isna(latest_disposal):
-                    try:
-                        disposal_date = closest_expiry.replace(year=closest_expiry.year + 1)
-                        latest_disposal = disposal_date.strftime("%Y-%m-%d")
-                    except:
-                        latest_disposal = "N/A"
-                else:
-                    latest_disposal = str(latest_disposal)
-            else:
-                latest_lot = "N/A"
-                latest_expiry = "N/A"
-                latest_disposal = "N/A"
-                
-        except Exception as e:
-            print(f"데이터 처리 오류: {e}")
-            latest_lot = "N/A"
-            latest_expiry = "N/A"
-            latest_disposal = "N/A"
-        
-        # 수량 안전한 접근
-        quantity = row.get("수량", 0)
-        
+    # Treeview 초기화 후 일괄 삽입
+    tree.delete(*tree.get_children())
+    for values in grouped.itertuples(index=False, name=None):
+        location, category, product_code, product = values[:4]
         # 고유 ID 생성 (위치+구분+제품명 조합)
-        item_id = f"{location}_{category}_{product_code}_{product}"
-        
-        tree.insert("", "end", iid=item_id, values=(
-            location, 
-            category,
-            product_code,
-            product, 
-            quantity,
-            latest_lot,
-            latest_expiry,
-            latest_disposal
-        ))
+        tree.insert("", "end", iid=f"{location}_{category}_{product_code}_{product}", values=values)
 
 def edit_quantity(event):
     """수량 편집 기능"""
@@ -176,7 +111,7 @@ def edit_quantity(event):
 def update_quantity_in_history(location, category, product_code, new_quantity):
     """발행 이력에서 수량 정보 업데이트"""
     try:
-        df = pd.read_excel(history_file)
+        df = load_inventory()
         
         # 해당 위치, 구분, 제품명의 모든 항목 찾기
         mask = (df["보관위치"] == location) & (df["구분"] == category) & (df["제품코드"] == product_code)
@@ -295,18 +230,15 @@ def delete_selected():
     if not selected_items:
         messagebox.showwarning("경고", "삭제할 항목을 선택하세요.")
         return
-    if not messagebox.askyesno("삭제 확인", "선택한 항목을 삭제하시겠습니까? (엑셀에서도 삭제됩니다)"):
+    if not messagebox.askyesno("삭제 확인", "선택한 항목을 삭제하시겠습니까? (발행 이력에서도 삭제됩니다)"):
         return
     try:
-        df = load_inventory()
         for item in selected_items:
             values = tree.item(item)['values']
             location, category, product_code, product = values[0], values[1], values[2], values[3]
             # 해당 행 삭제
-            mask = (df["보관위치"] == location) & (df["구분"] == category) & (df["제품코드"] == product_code) & (df["제품명"] == product)
-            df = df[~mask]
+            history_store.remove_matching({"보관위치": location, "구분": category, "제품코드": product_code, "제품명": product})
             tree.delete(item)
-        df.to_excel(history_file, index=False)
         update_dashboard()
         messagebox.showinfo("삭제 완료", "선택한 항목이 삭제되었습니다.")
     except Exception as e:
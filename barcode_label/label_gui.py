@@ -1,12 +1,10 @@
 # -*- coding: utf-8 -*-
 import tkinter as tk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, ttk, simpledialog
 from tkcalendar import DateEntry
 import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image
 # 바코드 라이브러리 추가
-import barcode
-from barcode.writer import ImageWriter
 import qrcode
 import os
 import time
@@ -15,21 +13,32 @@ import subprocess
 import sys
 import argparse
 from datetime import datetime
-import base64
-import io
 import json
-import sqlite3
 import csv
+import queue
+import threading
 
 # 구글 스프레드시트 연동 모듈 import
 try:
     from google_sheets_manager import sheets_manager
-    import gspread
     GOOGLE_SHEETS_AVAILABLE = True
 except ImportError:
     GOOGLE_SHEETS_AVAILABLE = False
     print("구글 스프레드시트 연동 모듈을 불러올 수 없습니다.")
 
+# 발행 이력 저장소
+from issue_history_store import history_store, LAYOUT_40X30
+from label_registry import label_registry
+from product_catalog import product_catalog
+from startup_loader import StartupLoader
+from label_template import label_templates
+from label_batch import create_labels_batch
+import zpl_graphic
+import zpl_format
+import label_sheet
+from print_queue import get_print_queue
+from sync_outbox import sync_outbox, SHEETS_ROWS, DRIVE_LABEL, DRIVE_ZPL
+
 # 구글 드라이브 연동 모듈 import
 try:
     from google_drive_manager import drive_manager
@@ -38,70 +47,49 @@ except ImportError:
     GOOGLE_DRIVE_AVAILABLE = False
     print("구글 드라이브 연동 모듈을 불러올 수 없습니다.")
 
+# 구글 스프레드시트/드라이브 전송은 동기화 대기열의 작업 스레드에서 처리
+def upload_to_drive(upload, payload):
+    """드라이브 업로드 (실패하면 예외를 발생시켜 대기열에서 재시도)"""
+    if not os.path.exists(payload["path"]):
+        print(f"업로드할 파일이 없어 건너뜁니다: {payload['path']}")
+        return
+    drive_result = upload(payload["path"])
+    if not drive_result:
+        raise RuntimeError(f"구글 드라이브 업로드 실패: {payload['path']}")
+    print(f"구글 드라이브 업로드 성공: {drive_result['name']}")
+
+if GOOGLE_SHEETS_AVAILABLE:
+    sync_outbox.register(SHEETS_ROWS, sheets_manager.append_rows_to_sheets, batch=True)
+if GOOGLE_DRIVE_AVAILABLE:
+    sync_outbox.register(DRIVE_LABEL, lambda payload: upload_to_drive(drive_manager.upload_label_image, payload))
+    sync_outbox.register(DRIVE_ZPL, lambda payload: upload_to_drive(drive_manager.upload_zpl_file, payload))
+
 # 스크립트 디렉토리 설정
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 
-# 상위 디렉토리의 execute_query.py 임포트
+# 상위 디렉토리 모듈(execute_query.py 등) 경로 추가 - 제품 카탈로그 DB 조회에 사용
 sys.path.append(PROJECT_ROOT)
-try:
-    from execute_query import call_query
-    from mysql_auth import boosta_boosters
-    from boosters_query import q_boosters_items_for_barcode_reader, q_boosters_items_limit_date
-except ImportError as e:
-    print(f"모듈 임포트 오류: {e}")
-    print(f"스크립트 디렉토리: {SCRIPT_DIR}")
-    print(f"프로젝트 루트: {PROJECT_ROOT}")
-    print(f"Python 경로: {sys.path}")
-    # 기본값 설정
-    call_query = None
-    boosta_boosters = None
-    q_boosters_items_for_barcode_reader = None
-    q_boosters_items_limit_date = None
-
-
-# ✅ CSV/엑셀에서 제품 리스트 불러오기
+
+
+# ✅ 제품 카탈로그 캐시에서 제품 리스트 불러오기 (DB 조회는 창을 띄운 뒤 시작 로더에서)
 def load_products():
-    try:
-        # 모듈이 제대로 임포트되었는지 확인
-        if call_query is None or boosta_boosters is None:
-            print("데이터베이스 모듈을 임포트할 수 없습니다. 기본 데이터를 사용합니다.")
-            return {"TEST001": "테스트 제품"}, {}, {}
-        
-        df = call_query(q_boosters_items_for_barcode_reader.query, boosta_boosters)
-        df_limit_date = call_query(q_boosters_items_limit_date.query, boosta_boosters)
-        df = pd.merge(df, df_limit_date, on='제품코드', how='left')
-        products_dict = dict(zip(df['제품코드'].astype(str), df['제품명']))
-        
-        # 바코드 정보도 함께 로드 (바코드 컬럼이 있는 경우)
-        barcode_dict = {}
-        if '바코드' in df.columns:
-            for _, row in df.iterrows():
-                barcode = str(row['바코드']).strip()
-                if barcode and barcode != 'nan':
-                    barcode_dict[barcode] = str(row['제품코드'])
-        
-        # 유통기한 정보도 함께 로드
-        expiry_info_dict = {}
-        for _, row in df.iterrows():
-            product_code = str(row['제품코드'])
-            expiry_days = row.get('유통기한_일수')
-            expiry_unit = row.get('유통기한_구분')
-            
-            if expiry_days is not None and expiry_unit is not None and str(expiry_days) != 'nan' and str(expiry_unit) != 'nan':
-                expiry_info_dict[product_code] = {
-                    'days': expiry_days,
-                    'unit': expiry_unit
-                }
-        
-        print(f"제품 데이터 로드 성공: {len(products_dict)}개 제품")
-        return products_dict, barcode_dict, expiry_info_dict
-    except Exception as e:
-        print(f"데이터베이스 연결 실패: {e}")
-        print(f"현재 작업 디렉토리: {os.getcwd()}")
-        print(f"스크립트 디렉토리: {SCRIPT_DIR}")
-        # 기본 데이터 반환
-        return {"TEST001": "테스트 제품"}, {}, {}
+    catalog = product_catalog.load(block=False)
+    print(f"제품 데이터 로드 성공: {len(catalog.products)}개 제품 ({catalog.source})")
+    return catalog.products, catalog.barcodes, catalog.expiry
+
+def apply_product_catalog(catalog):
+    """백그라운드 갱신된 카탈로그 반영"""
+    global products, barcode_to_product, expiry_info
+    products, barcode_to_product, expiry_info = catalog.products, catalog.barcodes, catalog.expiry
+
+product_catalog.subscribe(apply_product_catalog)
+
+# 일련번호 DB 준비 (시작 로더에서 백그라운드로 호출)
+def init_serial_database():
+    """일련번호 데이터베이스 초기화 (기존 라벨 정보 유지, 필요한 마이그레이션만 적용)"""
+    label_registry.initialize()
+    print(f"라벨 정보 DB 준비 완료 (마지막 일련번호: {label_registry.current_serial()}).")
 
 # products, barcode_to_product = load_products("barcode_label/products.xlsx")  # 올바른 경로
 products, barcode_to_product, expiry_info = load_products()
@@ -452,92 +440,11 @@ def update_barcode_status(status_text, color="#2196F3"):
     except:
         pass  # 창이 닫혀있거나 오류가 발생해도 무시
 
-# 발행 내역 저장 함수 (구글 스프레드시트 우선)
+# 발행 내역 저장 함수 (로컬 저장소 + 구글 스프레드시트)
 def save_issue_history(product_code, lot, expiry, version, location, filename, category, barcode_number=None):
     try:
-        # 발행 내역 파일 경로 (백업용)
-        history_file = os.path.join(os.path.dirname(__file__), "issue_history.xlsx")
-        
-        # 구글 스프레드시트가 설정되어 있으면 우선 사용
-        if GOOGLE_SHEETS_AVAILABLE and sheets_manager.spreadsheet_id:
-            try:
-                # 기존 데이터 로드 (구글 스프레드시트에서)
-                existing_data = []
-                if sheets_manager.authenticate():
-                    spreadsheet = sheets_manager.service.open_by_key(sheets_manager.spreadsheet_id)
-                    try:
-                        worksheet = spreadsheet.worksheet(sheets_manager.sheet_name)
-                        existing_data = worksheet.get_all_records()
-                    except gspread.WorksheetNotFound:
-                        # 시트가 없으면 새로 생성
-                        worksheet = spreadsheet.add_worksheet(title=sheets_manager.sheet_name, rows=1000, cols=10)
-                        # 헤더 추가
-                        headers = ['발행일시', '구분', '제품코드', '제품명', 'LOT', '유통기한', '버전', '폐기일자', '보관위치', '파일명', '바코드숫자']
-                        worksheet.append_row(headers)
-                
-                # 새 데이터 추가
-                product_name = products.get(product_code, "알 수 없는 제품")
-                
-                # 폐기일자 계산 (유통기한 + 1년)
-                try:
-                    if isinstance(expiry, datetime):
-                        expiry_date = expiry
-                    else:
-                        expiry_date = datetime.strptime(str(expiry), "%Y-%m-%d")
-                    
-                    disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                    disposal_date_str = disposal_date.strftime("%Y-%m-%d")
-                except Exception as e:
-                    print(f"폐기일자 계산 오류: {e}, 유통기한: {expiry}")
-                    disposal_date_str = "N/A"
-                
-                new_row = [
-                    datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    category,
-                    product_code,
-                    product_name,
-                    lot,
-                    expiry,
-                    version,
-                    disposal_date_str,
-                    location,
-                    filename,
-                    barcode_number if barcode_number else "N/A"
-                ]
-                
-                # 구글 스프레드시트에 추가
-                worksheet.append_row(new_row)
-                
-                # Excel 파일도 백업용으로 저장
-                all_data = existing_data + [dict(zip(['발행일시', '구분', '제품코드', '제품명', 'LOT', '유통기한', '버전', '폐기일자', '보관위치', '파일명', '바코드숫자'], new_row))]
-                df_history = pd.DataFrame(all_data)
-                df_history.to_excel(history_file, index=False)
-                
-                print(f"발행 내역이 구글 스프레드시트에 저장되었습니다.")
-                return
-                
-            except Exception as e:
-                print(f"구글 스프레드시트 저장 실패: {e}, Excel 파일로 저장합니다.")
-        
-        # 구글 스프레드시트가 없거나 실패한 경우 Excel 파일 사용
-        # 파일이 없으면 디렉토리 생성 및 빈 파일 생성
-        if not os.path.exists(history_file):
-            os.makedirs(os.path.dirname(history_file), exist_ok=True)
-            # 빈 DataFrame으로 엑셀 파일 생성
-            empty_df = pd.DataFrame({
-                '발행일시': [],
-                '구분': [],
-                '제품코드': [],
-                '제품명': [],
-                'LOT': [],
-                '유통기한': [],
-                '버전': [],
-                '폐기일자': [],
-                '보관위치': [],
-                '파일명': [],
-                '바코드숫자': []
-            })
-            empty_df.to_excel(history_file, index=False)
+        # 새 데이터 추가
+        product_name = products.get(product_code, "알 수 없는 제품")
         
         # 폐기일자 계산 (유통기한 + 1년)
         try:
@@ -555,26 +462,6 @@ def save_issue_history(product_code, lot, expiry, version, location, filename, c
             print(f"폐기일자 계산 오류: {e}, 유통기한: {expiry}")
             disposal_date_str = "N/A"
         
-        # 기존 파일이 있으면 읽고, 없으면 새로 생성
-        try:
-            df_history = pd.read_excel(history_file)
-        except FileNotFoundError:
-            df_history = pd.DataFrame({
-                '발행일시': [],
-                '구분': [],
-                '제품코드': [],
-                '제품명': [],
-                'LOT': [],
-                '유통기한': [],
-                '버전': [],
-                '폐기일자': [],
-                '보관위치': [],
-                '파일명': [],
-                '바코드숫자': []
-            })
-        
-        # 새 발행 내역 추가
-        product_name = products.get(product_code, "알 수 없는 제품")
         new_row = {
             '발행일시': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             '구분': category,
@@ -589,18 +476,13 @@ def save_issue_history(product_code, lot, expiry, version, location, filename, c
             '바코드숫자': barcode_number if barcode_number else "N/A"
         }
         
-        df_history = pd.concat([df_history, pd.DataFrame([new_row])], ignore_index=True)
-        df_history.to_excel(history_file, index=False)
+        # 로컬 발행 이력 저장소에 1행 추가 (엑셀 전체 재작성 없음)
+        history_store.append(new_row)
+        print(f"발행 내역이 {history_store.db_path}에 저장되었습니다.")
         
-        # 구글 스프레드시트에도 자동 저장 (설정된 경우)
+        # 구글 스프레드시트가 설정되어 있으면 동기화 대기열에 추가 (전송은 백그라운드에서 묶어서)
         if GOOGLE_SHEETS_AVAILABLE and sheets_manager.spreadsheet_id:
-            try:
-                sheets_manager.upload_to_sheets(history_file)
-                print(f"발행 내역이 구글 스프레드시트에도 자동 저장되었습니다.")
-            except Exception as e:
-                print(f"구글 스프레드시트 자동 저장 실패: {e}")
-        
-        print(f"발행 내역이 {history_file}에 저장되었습니다.")
+            sync_outbox.enqueue(SHEETS_ROWS, new_row)
         
     except Exception as e:
         print(f"발행 내역 저장 중 오류: {e}")
@@ -673,6 +555,13 @@ def show_preview(label_image, filename, product_code, lot, expiry, version, loca
         # 인쇄 버튼
         def print_label():
             try:
+                # 라벨 프린터가 설정되어 있으면 인쇄 대기열로 바로 전송 (결과는 메인 화면 상태 표시줄)
+                printer_queue = get_print_queue()
+                if printer_queue:
+                    with Image.open(filename) as label_image:
+                        printer_queue.submit_image(label_image, os.path.basename(filename))
+                    preview_window.destroy()
+                    return
                 os.startfile(filename, "print")
                 time.sleep(2)
                 preview_window.destroy()
@@ -718,147 +607,9 @@ def create_label(product_code, lot, expiry, version, location, category):
     # 바코드 데이터는 일련번호만 사용
     barcode_data = str(serial_number)
 
-    # 라벨 캔버스 생성 (40mm x 30mm 용지, 4배 확대된 해상도)
-    LABEL_WIDTH = 640  # 가로 (40mm * 4 * 4 = 640px)
-    LABEL_HEIGHT = 480  # 세로 (30mm * 4 * 4 = 480px)
-    label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
-    draw = ImageDraw.Draw(label)
-    
-    # 한글 폰트 설정 (4배 확대된 해상도에 맞춰 폰트 크기 조정)
-    try:
-        font = ImageFont.truetype("malgun.ttf", 28)  # 기본 폰트 (7 * 4)
-        font_small = ImageFont.truetype("malgun.ttf", 20)  # 작은 폰트 (5 * 4)
-        font_large = ImageFont.truetype("malgun.ttf", 28)  # 제품코드용 (7 * 4)
-        font_product = ImageFont.truetype("malgun.ttf", 24)  # 제품명용 (6 * 4)
-        font_info = ImageFont.truetype("malgun.ttf", 24)  # LOT/유통기한용 (6 * 4)
-    except:
-        try:
-            font = ImageFont.truetype("gulim.ttc", 28)
-            font_small = ImageFont.truetype("gulim.ttc", 20)
-            font_large = ImageFont.truetype("gulim.ttc", 28)  # 제품코드용 (7 * 4)
-            font_product = ImageFont.truetype("gulim.ttc", 24)  # 제품명용 (6 * 4)
-            font_info = ImageFont.truetype("gulim.ttc", 24)  # LOT/유통기한용 (6 * 4)
-        except:
-            font = ImageFont.load_default()
-            font_small = ImageFont.load_default()
-            font_large = ImageFont.load_default()
-            font_product = ImageFont.load_default()
-            font_info = ImageFont.load_default()
-
-    # 텍스트 줄바꿈 함수 (라벨 크기에 맞게 개선) - draw 객체 정의 후에 이동
-    def wrap_text(text, max_width):
-        if not text:
-            return []
-        
-        # 한글과 영문이 섞인 경우를 고려하여 하이브리드 처리
-        lines = []
-        current_line = ""
-        
-        # 한글과 영문을 구분하여 처리
-        for char in text:
-            test_line = current_line + char
-            
-            # 현재 폰트로 텍스트 너비 측정 (제품명 폰트 사용)
-            try:
-                bbox = draw.textbbox((0, 0), test_line, font=font_product)
-                text_width = bbox[2] - bbox[0]
-            except:
-                # 폰트 측정이 실패하면 대략적인 계산
-                if ord(char) > 127:  # 한글인 경우
-                    text_width = len(test_line) * 13
-                else:  # 영문인 경우
-                    text_width = len(test_line) * 9
-            
-            if text_width <= max_width:
-                current_line = test_line
-            else:
-                if current_line:
-                    lines.append(current_line)
-                current_line = char
-        
-        if current_line:
-            lines.append(current_line)
-        
-        return lines
-
-    # 제품명 줄바꿈 (4배 확대된 해상도에 맞춰 조정)
-    # "제품명: " 부분을 고려하여 실제 제품명만 줄바꿈 처리
-    label_prefix = "제품명: "
-    prefix_width = draw.textbbox((0, 0), label_prefix, font=font_product)[2] - draw.textbbox((0, 0), "", font=font_product)[0]
-    available_width = LABEL_WIDTH - 40 - prefix_width  # 좌우 여백 조정 (10 * 4)
-    
-    product_name_lines = wrap_text(product_name, available_width)
-    
-    y_pos = 15  # 상단 여백 조정 (약 4 * 4)
-    for i, line in enumerate(product_name_lines):
-        if i == 0:
-            draw.text((20, y_pos), f"제품명: {line}", fill="black", font=font_product)
-        else:
-            # 들여쓰기로 정렬 (제품명: 과 같은 위치에서 시작)
-            draw.text((20 + prefix_width, y_pos), line, fill="black", font=font_product)
-        y_pos += 32  # 줄 간격 조정 (8 * 4)
-    
-    # 구분 정보 추가 (제품명과 동일한 폰트 크기)
-    draw.text((20, y_pos), f"구분: {category}", fill="black", font=font_product)
-    y_pos += 32  # 줄 간격 조정 (8 * 4)
-    
-    # LOT, 유통기한, 버전을 같은 줄에 배치
-    lot_expiry_version_text = f"LOT: {lot}    유통기한: {expiry}    버전: {version}"
-    draw.text((20, y_pos), lot_expiry_version_text, fill="black", font=font_info)
-    
-    # 보관위치는 LOT 행 아래에 배치 (간격 조정)
-    draw.text((20, y_pos + 30), f"보관위치: {location}", fill="black", font=font_info)
-
-    # 바코드 생성 및 추가
-    try:
-        # Code128 바코드 생성 (더 인식하기 쉬운 형식)
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_image = barcode_class(barcode_data, writer=ImageWriter())
-        
-        # 바코드 이미지 생성 (텍스트 없이)
-        barcode_img = barcode_image.render({'write_text': False})
-        
-        # 바코드 크기 조정 (4배 확대된 해상도에 맞춰 조정, 높이 감소로 텍스트 공간 확보)
-        barcode_width = LABEL_WIDTH - 40  # 좌우 여백 조정 (약 10 * 4)
-        barcode_height = 150  # 바코드 높이 조정 (텍스트 공간 확보를 위해 높이 감소)
-        
-        # 바코드 이미지 리사이즈
-        barcode_img = barcode_img.resize((barcode_width, barcode_height), Image.Resampling.LANCZOS)
-        
-        # 바코드를 더 위쪽에 배치 (보관위치 텍스트와의 간격 줄임)
-        barcode_x = 5  # 좌측 여백 조정 (약 1.25 * 4)
-        barcode_y = LABEL_HEIGHT - barcode_height - 100  # 하단 여백 조정 (간격 줄임)
-        
-        # 바코드 이미지를 라벨에 붙이기
-        label.paste(barcode_img, (barcode_x, barcode_y))
-        
-        # 바코드 아래 텍스트 (제품코드-LOT-유통기한-버전 형식) - 가운데 정렬
-        barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
-        # 텍스트 너비 계산하여 가운데 정렬
-        text_bbox = draw.textbbox((0, 0), barcode_text, font=font_small)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = (LABEL_WIDTH - text_width) // 2  # 가운데 정렬
-        draw.text((text_x, LABEL_HEIGHT - 50), barcode_text, fill="black", font=font_small)
-        
-    except Exception as e:
-        print(f"바코드 생성 실패: {e}")
-        # Code128 실패 시 Code39로 재시도
-        try:
-            barcode_class = barcode.get_barcode_class('code39')
-            barcode_image = barcode_class(barcode_data, writer=ImageWriter())
-            barcode_img = barcode_image.render({'write_text': False})
-            barcode_img = barcode_img.resize((LABEL_WIDTH - 40, 120), Image.Resampling.LANCZOS)
-            label.paste(barcode_img, (5, LABEL_HEIGHT - 120 - 10))
-        except Exception as e2:
-            print(f"Code39 바코드 생성도 실패: {e2}")
-            # 바코드 생성 실패 시 텍스트만 표시
-            draw.text((20, LABEL_HEIGHT - 80), f"바코드: {barcode_data}", fill="black", font=font_small)
-            # 제품 정보 텍스트도 표시 (가운데 정렬)
-            barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
-            text_bbox = draw.textbbox((0, 0), barcode_text, font=font_small)
-            text_width = text_bbox[2] - text_bbox[0]
-            text_x = (LABEL_WIDTH - text_width) // 2  # 가운데 정렬
-            draw.text((text_x, LABEL_HEIGHT - 50), barcode_text, fill="black", font=font_small)
+    # 고정 영역(제품명, 구분, LOT 등)은 템플릿 캐시에서 가져오고 바코드만 새로 그림
+    label = label_templates.compose(LAYOUT_40X30, barcode_data, product_code, product_name,
+                                    category, lot, expiry, version, location)
 
     # labeljpg 폴더 생성 및 확인
     labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg")
@@ -871,46 +622,20 @@ def create_label(product_code, lot, expiry, version, location, category):
     # 파일 저장
     label.save(filename)
     
-    # 구글 드라이브에 업로드
+    # 구글 드라이브 업로드는 동기화 대기열로 (같은 파일이 다시 저장되면 마지막 것만 업로드)
     if GOOGLE_DRIVE_AVAILABLE:
-        try:
-            drive_result = drive_manager.upload_label_image(filename)
-            if drive_result:
-                print(f"구글 드라이브 업로드 성공: {drive_result['name']}")
-            else:
-                print("구글 드라이브 업로드 실패")
-        except Exception as e:
-            print(f"구글 드라이브 업로드 오류: {e}")
+        sync_outbox.enqueue(DRIVE_LABEL, {"path": filename}, key=filename)
     
     # 발행 내역 저장 (바코드 숫자 포함)
     save_issue_history(product_code, lot, expiry, version, location, filename, category, serial_number)
     
     return label, filename
 
-def image_to_zpl(image_path, label_width=240, label_height=160):
+def image_to_zpl(image_path, label_width=240, label_height=160, compression=zpl_graphic.ASCII):
+    """라벨 이미지(PIL 이미지 또는 파일 경로) -> ^GFA 그래픽 ZPL (1비트 행 단위, ZPL 압축 또는 Z64)"""
     try:
-        # 이미지 로드 및 리사이즈
-        img = Image.open(image_path)
-        img = img.resize((label_width, label_height))
-        
-        # 이미지를 1비트 흑백으로 변환
-        img = img.convert('1')
-        
-        # 이미지를 바이트로 변환
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        img_bytes = buffer.getvalue()
-        
-        # Base64 인코딩
-        img_base64 = base64.b64encode(img_bytes).decode('utf-8')
-        
-        # ZPL 코드 생성 (이미지 포함)
-        zpl_code = f"""^XA
-^PW{label_width}
-^LL{label_height}
-^GFA,{len(img_bytes)},{len(img_bytes)},{label_width},{img_base64}
-^XZ"""
-        return zpl_code
+        img = Image.open(image_path) if isinstance(image_path, str) else image_path
+        return zpl_graphic.image_to_zpl(img, compression, label_width, label_height)
     except Exception as e:
         print(f"이미지 ZPL 변환 오류: {e}")
         return None
@@ -931,18 +656,8 @@ def create_zpl_label(product_code, lot, expiry, version, location, category):
     # 발행 내역 저장 (ZPL 파일용)
     save_issue_history(product_code, lot, expiry, version, location, zpl_filename, category, serial_number)
     
-    # 영문 ZPL 코드 생성 (40mm x 30mm 용지, 4배 확대된 해상도, Code128 바코드 사용)
-    zpl_code = f"""^XA
-^PW640
-^LL480
-^FO25,25^A0N,24,24^FDProduct: {product_name}^FS
-^FO25,60^A0N,24,24^FDCategory: {category}^FS
-^FO25,95^A0N,24,24^FDLOT: {lot}    Expiry: {expiry}    Version: {version}^FS
-^FO25,130^A0N,24,24^FDLocation: {location}^FS
-^FO5,200^BY40^B2N,1200,Y,N,N^FD{barcode_data}^FS
-^FO25,440^A0N,20,20^FD{product_code}-{lot}-{expiry}-{version}^FS
-^XZ"""
-    return zpl_code
+    # 영문 ZPL 코드 생성 (40mm x 30mm 용지, 4배 확대된 해상도, Code128 바코드 사용, 레이아웃은 zpl_format과 공용)
+    return zpl_format.full_label(product_code, product_name, category, lot, expiry, version, location, barcode_data)
 
 def save_zpl_file(zpl_code, product_code, lot, expiry, version, location):
     """ZPL 코드를 파일로 저장"""
@@ -956,16 +671,9 @@ def save_zpl_file(zpl_code, product_code, lot, expiry, version, location):
     with open(filename, "w", encoding='utf-8') as f:
         f.write(zpl_code)
     
-    # 구글 드라이브에 업로드
+    # 구글 드라이브 업로드는 동기화 대기열로
     if GOOGLE_DRIVE_AVAILABLE:
-        try:
-            drive_result = drive_manager.upload_zpl_file(filename)
-            if drive_result:
-                print(f"ZPL 파일 구글 드라이브 업로드 성공: {drive_result['name']}")
-            else:
-                print("ZPL 파일 구글 드라이브 업로드 실패")
-        except Exception as e:
-            print(f"ZPL 파일 구글 드라이브 업로드 오류: {e}")
+        sync_outbox.enqueue(DRIVE_ZPL, {"path": filename}, key=filename)
     
     return filename
 
@@ -1120,42 +828,50 @@ def update_product_name(event=None):
             except Exception as e:
                 print(f"유통기한 계산 오류: {e}")
 
+def get_label_inputs():
+    """입력 화면 값 검증 후 (제품코드, LOT, 유통기한, 버전, 보관위치, 구분) 반환 (잘못되면 None)"""
+    product_code = combo_code.get().upper()  # 소문자를 대문자로 변환
+    category = category_var.get()
+    location = location_var.get()
+    
+    print(f"입력된 데이터: 제품코드={product_code}, 구분={category}, 보관위치={location}")
+
+    # 기본 입력 검증
+    if not product_code or not location:
+        messagebox.showwarning("경고", "제품코드와 보관위치를 입력하세요.")
+        return None
+    
+    # 관리품, 표준품, 벌크표준일 때 LOT, 유통기한, 버전 검증
+    if category in ["관리품", "표준품", "벌크표준"]:
+        lot = entry_lot.get()
+        expiry = entry_expiry.get()
+        version = entry_version.get()
+        if not lot or not expiry or not version:
+            messagebox.showwarning("경고", f"{category}은 LOT, 유통기한, 버전을 모두 입력하세요.")
+            return None
+    else:
+        # 샘플재고일 때는 기본값 설정
+        lot = "SAMPLE"
+        expiry = "N/A"
+        version = "N/A"
+    
+    print(f"검증된 데이터: LOT={lot}, 유통기한={expiry}, 버전={version}")
+        
+    # 보관위치 형식 검증
+    is_valid, error_message = validate_location(location)
+    if not is_valid:
+        messagebox.showerror("보관위치 오류", error_message)
+        location_combo.focus()
+        return None
+    return product_code, lot, expiry, version, location, category
+
 def on_submit():
     try:
         print("라벨 생성 시작...")
-        product_code = combo_code.get().upper()  # 소문자를 대문자로 변환
-        category = category_var.get()
-        location = location_var.get()
-        
-        print(f"입력된 데이터: 제품코드={product_code}, 구분={category}, 보관위치={location}")
-    
-        # 기본 입력 검증
-        if not product_code or not location:
-            messagebox.showwarning("경고", "제품코드와 보관위치를 입력하세요.")
-            return
-        
-        # 관리품, 표준품, 벌크표준일 때 LOT, 유통기한, 버전 검증
-        if category in ["관리품", "표준품", "벌크표준"]:
-            lot = entry_lot.get()
-            expiry = entry_expiry.get()
-            version = entry_version.get()
-            if not lot or not expiry or not version:
-                messagebox.showwarning("경고", f"{category}은 LOT, 유통기한, 버전을 모두 입력하세요.")
-                return
-        else:
-            # 샘플재고일 때는 기본값 설정
-            lot = "SAMPLE"
-            expiry = "N/A"
-            version = "N/A"
-        
-        print(f"검증된 데이터: LOT={lot}, 유통기한={expiry}, 버전={version}")
-            
-        # 보관위치 형식 검증
-        is_valid, error_message = validate_location(location)
-        if not is_valid:
-            messagebox.showerror("보관위치 오류", error_message)
-            location_combo.focus()
+        inputs = get_label_inputs()
+        if inputs is None:
             return
+        product_code, lot, expiry, version, location, category = inputs
         
         print("라벨 생성 함수 호출...")
         # 라벨 생성
@@ -1182,6 +898,84 @@ def on_submit():
         traceback.print_exc()
         messagebox.showerror("오류", f"라벨 생성 중 오류가 발생했습니다:\n{e}")
 
+def on_submit_batch():
+    """같은 입력값으로 라벨 여러 장 일괄 발행 (백그라운드 스레드, 진행률 표시)"""
+    inputs = get_label_inputs()
+    if inputs is None:
+        return
+    product_code, lot, expiry, version, location, category = inputs
+    count = simpledialog.askinteger("일괄 발행", f"{product_code} / {location}\n발행할 라벨 수량:",
+                                    parent=root, minvalue=1, maxvalue=1000)
+    if not count:
+        return
+    item = {'product_code': product_code, 'lot': lot, 'expiry': expiry,
+            'version': version, 'location': location, 'category': category}
+
+    progress_window = tk.Toplevel(root)
+    progress_window.title("라벨 일괄 발행")
+    progress_window.geometry("360x120")
+    progress_window.transient(root)
+    status_label = tk.Label(progress_window, text=f"라벨 0 / {count}장 발행 중...", font=("맑은 고딕", 10))
+    status_label.pack(pady=10)
+    progress_bar = ttk.Progressbar(progress_window, maximum=count, length=300)
+    progress_bar.pack(pady=5)
+
+    # 작업 스레드 -> 메인 스레드 전달 (Tk 위젯은 메인 스레드에서만 변경)
+    events = queue.Queue()
+
+    def run_batch():
+        try:
+            result = create_labels_batch([item] * count, products=products,
+                                         progress=lambda done, total: events.put(("progress", done)))
+            # 구글 스프레드시트 동기화 대기열에 추가 (작업 스레드가 append_rows 한 번으로 묶어서 전송)
+            if GOOGLE_SHEETS_AVAILABLE and sheets_manager.spreadsheet_id:
+                for row in result.records:
+                    sync_outbox.enqueue(SHEETS_ROWS, row)
+            # 프린터용 ZPL: 레이아웃은 한 번(^DF), 라벨마다 바뀌는 필드만(^XF) 하나의 작업 파일로 저장
+            job = zpl_format.batch_job([
+                dict(label.item, product_name=products.get(label.item['product_code'], "Unknown Product"),
+                     serial_number=label.serial_number)
+                for label in result.labels
+            ])
+            zpl_path = zpl_format.save_job(job)
+            # 라벨 이미지를 여러 페이지 PDF 하나로 (인쇄 작업 한 번), 페이지마다 바로 기록
+            sheet_pdf = label_sheet.sheet_path(os.path.dirname(result.labels[0].filename),
+                                               f"batch-{product_code}-{location}")
+            label_sheet.write_sheets((label.filename for label in result.labels), sheet_pdf,
+                                     label_sheet.LAYOUT_STOCKS[LAYOUT_40X30])
+            printer_queue = get_print_queue()
+            if printer_queue:
+                printer_queue.submit(job, f"일괄 발행 {len(result.labels)}장 ({os.path.basename(zpl_path)})")
+            events.put(("done", (result, zpl_path, sheet_pdf)))
+        except Exception as e:
+            events.put(("error", e))
+
+    def poll_batch():
+        while True:
+            try:
+                kind, value = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                progress_bar['value'] = value
+                status_label.config(text=f"라벨 {value} / {count}장 발행 중...")
+                continue
+            progress_window.destroy()
+            if kind == "done":
+                result, zpl_path, sheet_pdf = value
+                messagebox.showinfo("일괄 발행 완료",
+                                    f"{result.report()}\n\n라벨 이미지: {os.path.dirname(result.labels[0].filename)}\n"
+                                    f"인쇄용 PDF: {sheet_pdf}\n"
+                                    f"ZPL 작업 파일: {zpl_path}{' (프린터 인쇄 대기열로 전송)' if get_print_queue() else ''}\n"
+                                    f"일련번호: {result.labels[0].serial_number} ~ {result.labels[-1].serial_number}")
+            else:
+                messagebox.showerror("일괄 발행 오류", f"라벨 일괄 발행 중 오류가 발생했습니다:\n{value}")
+            return
+        root.after(100, poll_batch)
+
+    threading.Thread(target=run_batch, daemon=True).start()
+    root.after(100, poll_batch)
+
 # ✅ Tkinter GUI 생성
 root = tk.Tk()
 root.title("바코드 라벨 관리 시스템 - 라벨 발행")
@@ -1613,6 +1407,21 @@ def filter_products():
     filtered_codes = [code for code in product_codes if search_term in code.upper()]
     combo_code['values'] = filtered_codes
 
+# 시작 데이터 로드 (창을 먼저 띄우고 백그라운드에서 DB 조회/DB 준비)
+def apply_loaded_catalog(catalog):
+    """시작 로더가 갱신한 카탈로그를 제품코드 목록에 반영"""
+    global product_codes
+    apply_product_catalog(catalog)
+    product_codes = list(products.keys())
+    combo_code['values'] = product_codes
+    print(f"제품 데이터 로드 성공: {len(products)}개 제품 ({catalog.source})")
+
+startup = StartupLoader(root, "label_gui")
+startup.add("제품 카탈로그", product_catalog.refresh_if_stale, apply_loaded_catalog)
+startup.add("일련번호 DB", init_serial_database)
+startup.mark("창 표시")
+startup.start()
+
 # 초기 UI 설정
 update_category_ui()
 
@@ -1677,541 +1486,508 @@ def open_zone_manager():
 
 def view_history():
     """발행 내역 조회 및 관리 (구글 스프레드시트 우선)"""
+    # 엑셀 내보내기/구글시트 업로드용 파일
+    history_file = os.path.join(SCRIPT_DIR, "issue_history.xlsx")
     try:
         # 구글 스프레드시트가 설정되어 있으면 우선 사용
         if GOOGLE_SHEETS_AVAILABLE and sheets_manager.spreadsheet_id:
             try:
-                if sheets_manager.authenticate():
-                    spreadsheet = sheets_manager.service.open_by_key(sheets_manager.spreadsheet_id)
-                    try:
-                        worksheet = spreadsheet.worksheet(sheets_manager.sheet_name)
-                        data = worksheet.get_all_records()
-                        df_history = pd.DataFrame(data)
-                        print(f"구글 스프레드시트에서 {len(df_history)}개 행을 로드했습니다.")
-                    except gspread.WorksheetNotFound:
-                        print("구글 스프레드시트에 시트가 없습니다. Excel 파일을 사용합니다.")
-                        # Excel 파일로 폴백
-                        history_file = os.path.join(SCRIPT_DIR, "issue_history.xlsx")
-                        if os.path.exists(history_file):
-                            df_history = pd.read_excel(history_file)
-                        else:
-                            messagebox.showinfo("알림", "발행 내역이 없습니다.")
-                            return
+                # 인증/스프레드시트/워크시트 핸들은 sheets_manager가 캐시 (조회마다 다시 만들지 않음)
+                df_history = sheets_manager.load_dataframe()
+                if df_history is not None:
+                    print(f"구글 스프레드시트에서 {len(df_history)}개 행을 로드했습니다. ({sheets_manager.api_call_report()})")
                 else:
-                    print("구글 스프레드시트 인증 실패. Excel 파일을 사용합니다.")
-                    # Excel 파일로 폴백
-                    history_file = os.path.join(SCRIPT_DIR, "issue_history.xlsx")
-                    if os.path.exists(history_file):
-                        df_history = pd.read_excel(history_file)
-                    else:
-                        messagebox.showinfo("알림", "발행 내역이 없습니다.")
-                        return
+                    print("구글 스프레드시트 인증 실패 또는 시트 없음. 로컬 발행 내역을 사용합니다.")
+                    df_history = history_store.load_dataframe()
             except Exception as e:
-                print(f"구글 스프레드시트 로드 실패: {e}, Excel 파일을 사용합니다.")
-                # Excel 파일로 폴백
-                history_file = os.path.join(SCRIPT_DIR, "issue_history.xlsx")
-                if os.path.exists(history_file):
-                    df_history = pd.read_excel(history_file)
-                else:
-                    # 빈 DataFrame 생성하여 GUI는 표시
-                    df_history = pd.DataFrame(columns=['일련번호', '구분', '제품코드', '제품명', 'LOT', '유통기한', '폐기일자', '보관위치', '버전', '발행일시'])
-                    print("발행 내역이 없습니다. 빈 테이블을 표시합니다.")
+                print(f"구글 스프레드시트 로드 실패: {e}, 로컬 발행 내역을 사용합니다.")
+                df_history = history_store.load_dataframe()
         else:
-            # 구글 스프레드시트가 설정되지 않은 경우 Excel 파일 사용
-            history_file = os.path.join(SCRIPT_DIR, "issue_history.xlsx")
-            if os.path.exists(history_file):
-                df_history = pd.read_excel(history_file)
-            else:
-                # 빈 DataFrame 생성하여 GUI는 표시
-                df_history = pd.DataFrame(columns=['일련번호', '구분', '제품코드', '제품명', 'LOT', '유통기한', '폐기일자', '보관위치', '버전', '발행일시'])
+            # 구글 스프레드시트가 설정되지 않은 경우 로컬 발행 내역 사용
+            df_history = history_store.load_dataframe()
+            if df_history.empty:
                 print("발행 내역이 없습니다. 빈 테이블을 표시합니다.")
         
         # 새 창에 발행 내역 표시
-            history_window = tk.Toplevel(root)
-            history_window.title("발행 내역 조회 및 관리")
-            history_window.geometry("1400x800")
-            
-            # 검색 및 필터링 프레임
-            search_frame = tk.Frame(history_window)
-            search_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            # 검색 옵션
-            tk.Label(search_frame, text="검색:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
-            
-            # 검색 필드 선택 (새로운 컬럼 순서에 맞춰 수정)
-            search_field_var = tk.StringVar(value="제품코드")
-            search_field_combo = ttk.Combobox(search_frame, textvariable=search_field_var, 
-                                            values=["일련번호", "구분", "제품코드", "제품명", "LOT", "유통기한", "폐기일자", "보관위치", "버전", "발행일시"], 
-                                            width=10, state="readonly")
-            search_field_combo.pack(side=tk.LEFT, padx=5)
-            
-            # 검색어 입력
-            search_var = tk.StringVar()
-            search_entry = tk.Entry(search_frame, textvariable=search_var, width=20)
-            search_entry.pack(side=tk.LEFT, padx=5)
-            search_entry.bind('<Return>', lambda e: apply_filters())  # Enter 키로 검색
-            
-            # 날짜 필터 프레임
-            date_filter_frame = tk.Frame(history_window)
-            date_filter_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            tk.Label(date_filter_frame, text="날짜 범위:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
-            
-            # 시작일
-            start_date_var = tk.StringVar()
-            start_date_entry = tk.Entry(date_filter_frame, textvariable=start_date_var, width=12)
-            start_date_entry.pack(side=tk.LEFT, padx=5)
-            start_date_entry.insert(0, "YYYY-MM-DD")
-            start_date_entry.bind('<FocusIn>', lambda e: start_date_entry.delete(0, tk.END) if start_date_entry.get() == "YYYY-MM-DD" else None)
-            start_date_entry.bind('<FocusOut>', lambda e: start_date_entry.insert(0, "YYYY-MM-DD") if not start_date_entry.get() else None)
-            tk.Label(date_filter_frame, text="~").pack(side=tk.LEFT, padx=2)
-            
-            # 종료일
-            end_date_var = tk.StringVar()
-            end_date_entry = tk.Entry(date_filter_frame, textvariable=end_date_var, width=12)
-            end_date_entry.pack(side=tk.LEFT, padx=5)
-            end_date_entry.insert(0, "YYYY-MM-DD")
-            end_date_entry.bind('<FocusIn>', lambda e: end_date_entry.delete(0, tk.END) if end_date_entry.get() == "YYYY-MM-DD" else None)
-            end_date_entry.bind('<FocusOut>', lambda e: end_date_entry.insert(0, "YYYY-MM-DD") if not end_date_entry.get() else None)
-            
-            # 정렬 옵션
-            sort_frame = tk.Frame(history_window)
-            sort_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            tk.Label(sort_frame, text="정렬:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
-            
-            sort_field_var = tk.StringVar(value="발행일시")
-            sort_field_combo = ttk.Combobox(sort_frame, textvariable=sort_field_var, 
-                                          values=["발행일시", "구분", "제품코드", "제품명", "LOT", "유통기한", "보관위치", "바코드숫자"], 
-                                          width=10, state="readonly")
-            sort_field_combo.pack(side=tk.LEFT, padx=5)
-            
-            sort_order_var = tk.StringVar(value="내림차순")
-            sort_order_combo = ttk.Combobox(sort_frame, textvariable=sort_order_var, 
-                                          values=["오름차순", "내림차순"], 
-                                          width=8, state="readonly")
-            sort_order_combo.pack(side=tk.LEFT, padx=5)
-            
-            # 버튼 프레임
-            button_frame = tk.Frame(history_window)
-            button_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            # 검색 및 필터링 함수
-            def apply_filters():
-                try:
-                    # 검색어 필터링
-                    filtered_df = df_history.copy()
-                    
-                    search_term = search_var.get().strip()
-                    if search_term:
-                        search_field = search_field_var.get()
-                        filtered_df = filtered_df[filtered_df[search_field].astype(str).str.contains(search_term, case=False, na=False)]
-                    
-                    # 날짜 필터링
-                    start_date = start_date_var.get().strip()
-                    end_date = end_date_var.get().strip()
-                    
-                    if start_date or end_date:
-                        try:
-                            filtered_df['발행일시'] = pd.to_datetime(filtered_df['발행일시'])
-                            
-                            if start_date:
-                                start_dt = pd.to_datetime(start_date)
-                                filtered_df = filtered_df[filtered_df['발행일시'] >= start_dt]
-                            
-                            if end_date:
-                                end_dt = pd.to_datetime(end_date)
-                                filtered_df = filtered_df[filtered_df['발행일시'] <= end_dt]
-                        except:
-                            pass
-                    
-                    # 정렬
-                    sort_field = sort_field_var.get()
-                    ascending = sort_order_var.get() == "오름차순"
-                    
-                    if sort_field == "발행일시":
+        history_window = tk.Toplevel(root)
+        history_window.title("발행 내역 조회 및 관리")
+        history_window.geometry("1400x800")
+        
+        # 검색 및 필터링 프레임
+        search_frame = tk.Frame(history_window)
+        search_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 검색 옵션
+        tk.Label(search_frame, text="검색:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
+        
+        # 검색 필드 선택 (새로운 컬럼 순서에 맞춰 수정)
+        search_field_var = tk.StringVar(value="제품코드")
+        search_field_combo = ttk.Combobox(search_frame, textvariable=search_field_var, 
+                                        values=["일련번호", "구분", "제품코드", "제품명", "LOT", "유통기한", "폐기일자", "보관위치", "버전", "발행일시"], 
+                                        width=10, state="readonly")
+        search_field_combo.pack(side=tk.LEFT, padx=5)
+        
+        # 검색어 입력
+        search_var = tk.StringVar()
+        search_entry = tk.Entry(search_frame, textvariable=search_var, width=20)
+        search_entry.pack(side=tk.LEFT, padx=5)
+        search_entry.bind('<Return>', lambda e: apply_filters())  # Enter 키로 검색
+        
+        # 날짜 필터 프레임
+        date_filter_frame = tk.Frame(history_window)
+        date_filter_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(date_filter_frame, text="날짜 범위:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
+        
+        # 시작일
+        start_date_var = tk.StringVar()
+        start_date_entry = tk.Entry(date_filter_frame, textvariable=start_date_var, width=12)
+        start_date_entry.pack(side=tk.LEFT, padx=5)
+        start_date_entry.insert(0, "YYYY-MM-DD")
+        start_date_entry.bind('<FocusIn>', lambda e: start_date_entry.delete(0, tk.END) if start_date_entry.get() == "YYYY-MM-DD" else None)
+        start_date_entry.bind('<FocusOut>', lambda e: start_date_entry.insert(0, "YYYY-MM-DD") if not start_date_entry.get() else None)
+        tk.Label(date_filter_frame, text="~").pack(side=tk.LEFT, padx=2)
+        
+        # 종료일
+        end_date_var = tk.StringVar()
+        end_date_entry = tk.Entry(date_filter_frame, textvariable=end_date_var, width=12)
+        end_date_entry.pack(side=tk.LEFT, padx=5)
+        end_date_entry.insert(0, "YYYY-MM-DD")
+        end_date_entry.bind('<FocusIn>', lambda e: end_date_entry.delete(0, tk.END) if end_date_entry.get() == "YYYY-MM-DD" else None)
+        end_date_entry.bind('<FocusOut>', lambda e: end_date_entry.insert(0, "YYYY-MM-DD") if not end_date_entry.get() else None)
+        
+        # 정렬 옵션
+        sort_frame = tk.Frame(history_window)
+        sort_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        tk.Label(sort_frame, text="정렬:", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=(0, 5))
+        
+        sort_field_var = tk.StringVar(value="발행일시")
+        sort_field_combo = ttk.Combobox(sort_frame, textvariable=sort_field_var, 
+                                      values=["발행일시", "구분", "제품코드", "제품명", "LOT", "유통기한", "보관위치", "바코드숫자"], 
+                                      width=10, state="readonly")
+        sort_field_combo.pack(side=tk.LEFT, padx=5)
+        
+        sort_order_var = tk.StringVar(value="내림차순")
+        sort_order_combo = ttk.Combobox(sort_frame, textvariable=sort_order_var, 
+                                      values=["오름차순", "내림차순"], 
+                                      width=8, state="readonly")
+        sort_order_combo.pack(side=tk.LEFT, padx=5)
+        
+        # 버튼 프레임
+        button_frame = tk.Frame(history_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 검색 및 필터링 함수
+        def apply_filters():
+            try:
+                # 검색어 필터링
+                filtered_df = df_history.copy()
+                
+                search_term = search_var.get().strip()
+                if search_term:
+                    search_field = search_field_var.get()
+                    filtered_df = filtered_df[filtered_df[search_field].astype(str).str.contains(search_term, case=False, na=False)]
+                
+                # 날짜 필터링
+                start_date = start_date_var.get().strip()
+                end_date = end_date_var.get().strip()
+                
+                if start_date or end_date:
+                    try:
                         filtered_df['발행일시'] = pd.to_datetime(filtered_df['발행일시'])
+                        
+                        if start_date:
+                            start_dt = pd.to_datetime(start_date)
+                            filtered_df = filtered_df[filtered_df['발행일시'] >= start_dt]
+                        
+                        if end_date:
+                            end_dt = pd.to_datetime(end_date)
+                            filtered_df = filtered_df[filtered_df['발행일시'] <= end_dt]
+                    except:
+                        pass
+                
+                # 정렬
+                sort_field = sort_field_var.get()
+                ascending = sort_order_var.get() == "오름차순"
+                
+                if sort_field == "발행일시":
+                    filtered_df['발행일시'] = pd.to_datetime(filtered_df['발행일시'])
+                
+                if hasattr(filtered_df, 'sort_values'):
+                    filtered_df = filtered_df.sort_values(by=sort_field, ascending=ascending)
+                
+                # 트리뷰 업데이트
+                for item in tree.get_children():
+                    tree.delete(item)
+                
+                # 데이터 추가 (일련번호를 정수로 표시)
+                if hasattr(filtered_df, 'iterrows'):
+                    for idx, row in filtered_df.iterrows():
+                        # 일련번호를 정수로 변환
+                        values = list(row)
+                        if '일련번호' in available_columns:
+                            serial_index = available_columns.index('일련번호')
+                            if values[serial_index] is not None and str(values[serial_index]) != 'nan':
+                                try:
+                                    values[serial_index] = int(float(values[serial_index]))
+                                except (ValueError, TypeError):
+                                    values[serial_index] = values[serial_index]
+                        
+                        tree.insert('', 'end', values=values, tags=(str(idx),))
+                
+                # 결과 개수 표시
+                result_count = len(filtered_df)
+                total_count = len(df_history)
+                status_label.config(text=f"검색 결과: {result_count}개 / 전체: {total_count}개")
+                
+            except Exception as e:
+                messagebox.showerror("필터링 오류", f"필터링 중 오류가 발생했습니다: {e}")
+        
+        # 초기화 함수
+        def reset_filters():
+            search_var.set("")
+            start_date_var.set("")
+            end_date_var.set("")
+            sort_field_var.set("발행일시")
+            sort_order_var.set("내림차순")
+            apply_filters()
+        
+        # 검색 버튼
+        search_btn = tk.Button(button_frame, text="🔍 검색", command=apply_filters,
+                              bg="#2196F3", fg="white", font=("맑은 고딕", 10),
+                              relief=tk.FLAT, bd=0, padx=15, pady=3)
+        search_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 초기화 버튼
+        reset_btn = tk.Button(button_frame, text="🔄 초기화", command=reset_filters,
+                             bg="#FF9800", fg="white", font=("맑은 고딕", 10),
+                             relief=tk.FLAT, bd=0, padx=15, pady=3)
+        reset_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 엑셀 내보내기 버튼
+        def export_to_excel():
+            try:
+                export_filename = f"발행내역_내보내기_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+                
+                # 현재 트리뷰에 표시된 데이터 수집
+                export_data = []
+                for item in tree.get_children():
+                    values = tree.item(item)['values']
+                    export_data.append(values)
+                
+                if export_data:
+                    export_df = pd.DataFrame(export_data, columns=available_columns)
                     
-                    if hasattr(filtered_df, 'sort_values'):
-                        filtered_df = filtered_df.sort_values(by=sort_field, ascending=ascending)
-                    
-                    # 트리뷰 업데이트
-                    for item in tree.get_children():
-                        tree.delete(item)
-                    
-                    # 데이터 추가 (일련번호를 정수로 표시)
-                    if hasattr(filtered_df, 'iterrows'):
-                        for idx, row in filtered_df.iterrows():
-                            # 일련번호를 정수로 변환
-                            values = list(row)
-                            if '일련번호' in available_columns:
-                                serial_index = available_columns.index('일련번호')
-                                if values[serial_index] is not None and str(values[serial_index]) != 'nan':
-                                    try:
-                                        values[serial_index] = int(float(values[serial_index]))
-                                    except (ValueError, TypeError):
-                                        values[serial_index] = values[serial_index]
-                            
-                            tree.insert('', 'end', values=values, tags=(str(idx),))
+                    # 일련번호 컬럼을 정수로 변환
+                    if '일련번호' in export_df.columns:
+                        export_df['일련번호'] = pd.to_numeric(export_df['일련번호'], errors='coerce').fillna(0).astype(int)
                     
-                    # 결과 개수 표시
-                    result_count = len(filtered_df)
-                    total_count = len(df_history)
-                    status_label.config(text=f"검색 결과: {result_count}개 / 전체: {total_count}개")
+                    export_df.to_excel(export_filename, index=False)
+                    messagebox.showinfo("내보내기 완료", f"데이터가 {export_filename}로 내보내기되었습니다.")
+                else:
+                    messagebox.showwarning("내보내기 실패", "내보낼 데이터가 없습니다.")
                     
-                except Exception as e:
-                    messagebox.showerror("필터링 오류", f"필터링 중 오류가 발생했습니다: {e}")
-            
-            # 초기화 함수
-            def reset_filters():
-                search_var.set("")
-                start_date_var.set("")
-                end_date_var.set("")
-                sort_field_var.set("발행일시")
-                sort_order_var.set("내림차순")
-                apply_filters()
-            
-            # 검색 버튼
-            search_btn = tk.Button(button_frame, text="🔍 검색", command=apply_filters,
-                                  bg="#2196F3", fg="white", font=("맑은 고딕", 10),
-                                  relief=tk.FLAT, bd=0, padx=15, pady=3)
-            search_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 초기화 버튼
-            reset_btn = tk.Button(button_frame, text="🔄 초기화", command=reset_filters,
-                                 bg="#FF9800", fg="white", font=("맑은 고딕", 10),
-                                 relief=tk.FLAT, bd=0, padx=15, pady=3)
-            reset_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 엑셀 내보내기 버튼
-            def export_to_excel():
+            except Exception as e:
+                messagebox.showerror("내보내기 오류", f"내보내기 실패: {e}")
+        
+        export_btn = tk.Button(button_frame, text="📊 엑셀 내보내기", command=export_to_excel,
+                              bg="#4CAF50", fg="white", font=("맑은 고딕", 10),
+                              relief=tk.FLAT, bd=0, padx=15, pady=3)
+        export_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 구글 스프레드시트 연동 버튼들 (항상 표시)
+        print(f"GOOGLE_SHEETS_AVAILABLE: {GOOGLE_SHEETS_AVAILABLE}")
+        
+        # 구글 스프레드시트 설정 버튼 (항상 표시)
+        def setup_google_sheets():
+            try:
+                if sheets_manager.setup_initial_config():
+                    messagebox.showinfo("설정 완료", "구글 스프레드시트 설정이 완료되었습니다.")
+                else:
+                    messagebox.showwarning("설정 취소", "구글 스프레드시트 설정이 취소되었습니다.")
+            except Exception as e:
+                messagebox.showerror("설정 오류", f"설정 중 오류가 발생했습니다: {e}")
+        
+        setup_btn = tk.Button(button_frame, text="⚙️ 구글시트 설정", command=setup_google_sheets,
+                             bg="#EA4335", fg="white", font=("맑은 고딕", 10),
+                             relief=tk.FLAT, bd=0, padx=15, pady=3)
+        setup_btn.pack(side=tk.LEFT, padx=5)
+        
+        if GOOGLE_SHEETS_AVAILABLE:
+            # 구글 스프레드시트 업로드 버튼
+            def upload_to_google_sheets():
                 try:
-                    export_filename = f"발행내역_내보내기_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-                    
-                    # 현재 트리뷰에 표시된 데이터 수집
-                    export_data = []
-                    for item in tree.get_children():
-                        values = tree.item(item)['values']
-                        export_data.append(values)
-                    
-                    if export_data:
-                        export_df = pd.DataFrame(export_data, columns=available_columns)
-                        
-                        # 일련번호 컬럼을 정수로 변환
-                        if '일련번호' in export_df.columns:
-                            export_df['일련번호'] = pd.to_numeric(export_df['일련번호'], errors='coerce').fillna(0).astype(int)
-                        
-                        export_df.to_excel(export_filename, index=False)
-                        messagebox.showinfo("내보내기 완료", f"데이터가 {export_filename}로 내보내기되었습니다.")
+                    if sheets_manager.upload_dataframe(history_store.load_dataframe()):
+                        messagebox.showinfo("업로드 완료", 
+                                          f"발행 내역이 구글 스프레드시트에 업로드되었습니다.\n\n"
+                                          f"스프레드시트 URL: {sheets_manager.get_spreadsheet_url()}")
                     else:
-                        messagebox.showwarning("내보내기 실패", "내보낼 데이터가 없습니다.")
-                        
+                        messagebox.showerror("업로드 실패", "구글 스프레드시트 업로드에 실패했습니다.")
                 except Exception as e:
-                    messagebox.showerror("내보내기 오류", f"내보내기 실패: {e}")
+                    messagebox.showerror("업로드 오류", f"업로드 중 오류가 발생했습니다: {e}")
             
-            export_btn = tk.Button(button_frame, text="📊 엑셀 내보내기", command=export_to_excel,
-                                  bg="#4CAF50", fg="white", font=("맑은 고딕", 10),
+            upload_btn = tk.Button(button_frame, text="☁️ 구글시트 업로드", command=upload_to_google_sheets,
+                                  bg="#4285F4", fg="white", font=("맑은 고딕", 10),
                                   relief=tk.FLAT, bd=0, padx=15, pady=3)
-            export_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 구글 스프레드시트 연동 버튼들 (항상 표시)
-            print(f"GOOGLE_SHEETS_AVAILABLE: {GOOGLE_SHEETS_AVAILABLE}")
+            upload_btn.pack(side=tk.LEFT, padx=5)
             
-            # 구글 스프레드시트 설정 버튼 (항상 표시)
-            def setup_google_sheets():
+            # 구글 스프레드시트 다운로드 버튼
+            def download_from_google_sheets():
                 try:
-                    if sheets_manager.setup_initial_config():
-                        messagebox.showinfo("설정 완료", "구글 스프레드시트 설정이 완료되었습니다.")
+                    if sheets_manager.download_from_sheets(history_file):
+                        messagebox.showinfo("다운로드 완료", 
+                                          f"구글 스프레드시트에서 발행 내역을 다운로드했습니다.\n\n"
+                                          f"파일: {history_file}")
+                        # 창 새로고침
+                        view_history()
                     else:
-                        messagebox.showwarning("설정 취소", "구글 스프레드시트 설정이 취소되었습니다.")
+                        messagebox.showerror("다운로드 실패", "구글 스프레드시트 다운로드에 실패했습니다.")
                 except Exception as e:
-                    messagebox.showerror("설정 오류", f"설정 중 오류가 발생했습니다: {e}")
+                    messagebox.showerror("다운로드 오류", f"다운로드 중 오류가 발생했습니다: {e}")
             
-            setup_btn = tk.Button(button_frame, text="⚙️ 구글시트 설정", command=setup_google_sheets,
-                                 bg="#EA4335", fg="white", font=("맑은 고딕", 10),
-                                 relief=tk.FLAT, bd=0, padx=15, pady=3)
-            setup_btn.pack(side=tk.LEFT, padx=5)
-            
-            if GOOGLE_SHEETS_AVAILABLE:
-                # 구글 스프레드시트 업로드 버튼
-                def upload_to_google_sheets():
-                    try:
-                        if sheets_manager.upload_to_sheets(history_file):
-                            messagebox.showinfo("업로드 완료", 
-                                              f"발행 내역이 구글 스프레드시트에 업로드되었습니다.\n\n"
-                                              f"스프레드시트 URL: {sheets_manager.get_spreadsheet_url()}")
-                        else:
-                            messagebox.showerror("업로드 실패", "구글 스프레드시트 업로드에 실패했습니다.")
-                    except Exception as e:
-                        messagebox.showerror("업로드 오류", f"업로드 중 오류가 발생했습니다: {e}")
-                
-                upload_btn = tk.Button(button_frame, text="☁️ 구글시트 업로드", command=upload_to_google_sheets,
-                                      bg="#4285F4", fg="white", font=("맑은 고딕", 10),
-                                      relief=tk.FLAT, bd=0, padx=15, pady=3)
-                upload_btn.pack(side=tk.LEFT, padx=5)
-                
-                # 구글 스프레드시트 다운로드 버튼
-                def download_from_google_sheets():
-                    try:
-                        if sheets_manager.download_from_sheets(history_file):
-                            messagebox.showinfo("다운로드 완료", 
-                                              f"구글 스프레드시트에서 발행 내역을 다운로드했습니다.\n\n"
-                                              f"파일: {history_file}")
-                            # 창 새로고침
-                            view_history()
-                        else:
-                            messagebox.showerror("다운로드 실패", "구글 스프레드시트 다운로드에 실패했습니다.")
-                    except Exception as e:
-                        messagebox.showerror("다운로드 오류", f"다운로드 중 오류가 발생했습니다: {e}")
-                
-                download_btn = tk.Button(button_frame, text="⬇️ 구글시트 다운로드", command=download_from_google_sheets,
-                                        bg="#34A853", fg="white", font=("맑은 고딕", 10),
-                                        relief=tk.FLAT, bd=0, padx=15, pady=3)
-                download_btn.pack(side=tk.LEFT, padx=5)
-            else:
-                # 구글 스프레드시트 모듈이 없는 경우 안내
-                info_btn = tk.Button(button_frame, text="ℹ️ 구글시트 미지원", 
-                                    command=lambda: messagebox.showinfo("구글 스프레드시트", 
-                                                                       "구글 스프레드시트 연동 모듈이 설치되지 않았습니다.\n\n"
-                                                                       "설치 방법:\n"
-                                                                       "pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client gspread"),
-                                    bg="#9E9E9E", fg="white", font=("맑은 고딕", 10),
+            download_btn = tk.Button(button_frame, text="⬇️ 구글시트 다운로드", command=download_from_google_sheets,
+                                    bg="#34A853", fg="white", font=("맑은 고딕", 10),
                                     relief=tk.FLAT, bd=0, padx=15, pady=3)
-                info_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 프레임 생성
-            tree_frame = tk.Frame(history_window)
-            tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-            
-            # Treeview로 표시 (다중 선택 가능) - 새로운 컬럼 순서로 재구성
-            # 요청된 순서: 일련번호, 구분, 제품코드, 제품명, LOT, 유통기한, 폐기일자, 보관위치, 버전, 발행일시
-            new_columns = ['일련번호', '구분', '제품코드', '제품명', 'LOT', '유통기한', '폐기일자', '보관위치', '버전', '발행일시']
-            
-            # 기존 데이터에서 필요한 컬럼만 선택하고 순서 재배열
-            if '바코드숫자' in df_history.columns:
-                df_history = df_history.rename(columns={'바코드숫자': '일련번호'})
-            
-            # 버전 컬럼이 없으면 추가
-            if '버전' not in df_history.columns:
-                df_history['버전'] = 'N/A'
-            
-            # 컬럼 순서 재배열
-            available_columns = [col for col in new_columns if col in df_history.columns]
-            df_history = df_history[available_columns]
-            
-            tree = ttk.Treeview(tree_frame, columns=available_columns, show='headings', height=15, selectmode='extended')
-            
-            # 스크롤바 추가
-            scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
-            tree.configure(yscrollcommand=scrollbar.set)
-            
-            # 컬럼 설정
-            column_widths = {
-                '일련번호': 80,
-                '구분': 80,
-                '제품코드': 100,
-                '제품명': 200,
-                'LOT': 100,
-                '유통기한': 120,
-                '폐기일자': 120,
-                '보관위치': 100,
-                '버전': 80,
-                '발행일시': 150
-            }
-            
-            for col in available_columns:
-                tree.heading(col, text=col)
-                tree.column(col, width=column_widths.get(col, 120))
+            download_btn.pack(side=tk.LEFT, padx=5)
+        else:
+            # 구글 스프레드시트 모듈이 없는 경우 안내
+            info_btn = tk.Button(button_frame, text="ℹ️ 구글시트 미지원", 
+                                command=lambda: messagebox.showinfo("구글 스프레드시트", 
+                                                                   "구글 스프레드시트 연동 모듈이 설치되지 않았습니다.\n\n"
+                                                                   "설치 방법:\n"
+                                                                   "pip install google-auth google-auth-oauthlib google-auth-httplib2 google-api-python-client gspread"),
+                                bg="#9E9E9E", fg="white", font=("맑은 고딕", 10),
+                                relief=tk.FLAT, bd=0, padx=15, pady=3)
+            info_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 프레임 생성
+        tree_frame = tk.Frame(history_window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Treeview로 표시 (다중 선택 가능) - 새로운 컬럼 순서로 재구성
+        # 요청된 순서: 일련번호, 구분, 제품코드, 제품명, LOT, 유통기한, 폐기일자, 보관위치, 버전, 발행일시
+        new_columns = ['일련번호', '구분', '제품코드', '제품명', 'LOT', '유통기한', '폐기일자', '보관위치', '버전', '발행일시']
+        
+        # 기존 데이터에서 필요한 컬럼만 선택하고 순서 재배열
+        if '바코드숫자' in df_history.columns:
+            df_history = df_history.rename(columns={'바코드숫자': '일련번호'})
+        
+        # 버전 컬럼이 없으면 추가
+        if '버전' not in df_history.columns:
+            df_history['버전'] = 'N/A'
+        
+        # 컬럼 순서 재배열
+        available_columns = [col for col in new_columns if col in df_history.columns]
+        df_history = df_history[available_columns]
+        
+        tree = ttk.Treeview(tree_frame, columns=available_columns, show='headings', height=15, selectmode='extended')
+        
+        # 스크롤바 추가
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        
+        # 컬럼 설정
+        column_widths = {
+            '일련번호': 80,
+            '구분': 80,
+            '제품코드': 100,
+            '제품명': 200,
+            'LOT': 100,
+            '유통기한': 120,
+            '폐기일자': 120,
+            '보관위치': 100,
+            '버전': 80,
+            '발행일시': 150
+        }
+        
+        for col in available_columns:
+            tree.heading(col, text=col)
+            tree.column(col, width=column_widths.get(col, 120))
+        
+        # 데이터 추가 (일련번호를 정수로 표시)
+        for idx, row in df_history.iterrows():
+            # 일련번호를 정수로 변환
+            values = list(row)
+            if '일련번호' in available_columns:
+                serial_index = available_columns.index('일련번호')
+                if values[serial_index] is not None and str(values[serial_index]) != 'nan':
+                    try:
+                        values[serial_index] = int(float(values[serial_index]))
+                    except (ValueError, TypeError):
+                        values[serial_index] = values[serial_index]
             
-            # 데이터 추가 (일련번호를 정수로 표시)
-            for idx, row in df_history.iterrows():
-                # 일련번호를 정수로 변환
-                values = list(row)
-                if '일련번호' in available_columns:
-                    serial_index = available_columns.index('일련번호')
-                    if values[serial_index] is not None and str(values[serial_index]) != 'nan':
-                        try:
-                            values[serial_index] = int(float(values[serial_index]))
-                        except (ValueError, TypeError):
-                            values[serial_index] = values[serial_index]
-                
-                tree.insert('', 'end', values=values, tags=(str(idx),))
+            tree.insert('', 'end', values=values, tags=(str(idx),))
+        
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        # 상태 라벨 (검색 결과 개수 표시)
+        status_label = tk.Label(history_window, text=f"전체: {len(df_history)}개", 
+                               relief=tk.SUNKEN, bd=1, padx=10, pady=5)
+        status_label.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 재발행 함수
+        def reprint_selected():
+            selected_item = tree.selection()
+            if not selected_item:
+                messagebox.showwarning("경고", "재발행할 항목을 선택하세요.")
+                return
             
-            tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-            scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+            # 선택된 항목의 데이터 가져오기
+            item_values = tree.item(selected_item[0])['values']
+            category = item_values[0]  # 구분
+            product_code = item_values[1]  # 제품코드
+            lot = item_values[3]           # LOT
+            expiry = item_values[4]        # 유통기한
+            location = item_values[6]      # 보관위치 (폐기일자 컬럼 추가로 인덱스 변경)
+            filename = item_values[7]      # 파일명
+            barcode_number = item_values[8] if len(item_values) > 8 else "N/A"  # 바코드 숫자
+            
+            # 파일 존재 확인 (labeljpg 폴더 내에서 확인)
+            labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg")
+            file_path = os.path.join(labeljpg_dir, filename)
+            
+            if os.path.exists(file_path):
+                try:
+                    # 파일을 다시 생성하여 새로운 UI 적용
+                    create_label(product_code, lot, expiry, location, category)
+                    messagebox.showinfo("재발행 완료", f"라벨을 새로 생성했습니다.\n\n구분: {category}\n제품: {product_code}\nLOT: {lot}\n유통기한: {expiry}\n보관위치: {location}\n바코드: {barcode_number}\n\n미리보기 창에서 확인 후 인쇄하세요.")
+                except Exception as e:
+                    messagebox.showerror("재발행 오류", f"라벨 생성 실패: {e}")
+            else:
+                # 파일이 없으면 새로 생성
+                try:
+                    create_label(product_code, lot, expiry, location, category)
+                    messagebox.showinfo("재발행 완료", f"라벨을 새로 생성했습니다.\n\n구분: {category}\n제품: {product_code}\nLOT: {lot}\n유통기한: {expiry}\n보관위치: {location}\n바코드: {barcode_number}\n\n미리보기 창에서 확인 후 인쇄하세요.")
+                except Exception as e:
+                    messagebox.showerror("재발행 오류", f"라벨 생성 실패: {e}")
+        
+        # 삭제 함수 (다중 선택 지원)
+        def delete_selected():
+            selected_items = tree.selection()
+            if not selected_items:
+                messagebox.showwarning("경고", "삭제할 항목을 선택하세요.")
+                return
             
-            # 상태 라벨 (검색 결과 개수 표시)
-            status_label = tk.Label(history_window, text=f"전체: {len(df_history)}개", 
-                                   relief=tk.SUNKEN, bd=1, padx=10, pady=5)
-            status_label.pack(fill=tk.X, padx=10, pady=5)
+            # 다중 선택된 항목들의 정보 수집
+            selected_data = []
+            for item in selected_items:
+                item_values = tree.item(item)['values']
+                selected_data.append({
+                    'item_id': item,
+                    'category': item_values[0],
+                    'product_code': item_values[1],
+                    'product_name': item_values[2],
+                    'lot': item_values[3],
+                    'expiry': item_values[4],
+                    'location': item_values[6],  # 폐기일자 컬럼 추가로 인덱스 변경
+                    'filename': item_values[7],
+                    'barcode_number': item_values[8] if len(item_values) > 8 else "N/A"
+                })
+            
+            # 삭제 확인 메시지 (다중 선택 시)
+            if len(selected_items) == 1:
+                data = selected_data[0]
+                confirm_msg = f"다음 항목을 삭제하시겠습니까?\n\n구분: {data['category']}\n제품코드: {data['product_code']}\n제품명: {data['product_name']}\nLOT: {data['lot']}\n유통기한: {data['expiry']}\n보관위치: {data['location']}"
+            else:
+                confirm_msg = f"선택된 {len(selected_items)}개 항목을 모두 삭제하시겠습니다?\n\n"
+                for i, data in enumerate(selected_data[:3], 1):  # 처음 3개만 표시
+                    confirm_msg += f"{i}. {data['category']} - {data['product_code']} - {data['product_name']} (LOT: {data['lot']})\n"
+                if len(selected_data) > 3:
+                    confirm_msg += f"... 외 {len(selected_data) - 3}개 항목"
             
-            # 재발행 함수
-            def reprint_selected():
-                selected_item = tree.selection()
-                if not selected_item:
-                    messagebox.showwarning("경고", "재발행할 항목을 선택하세요.")
-                    return
-                
-                # 선택된 항목의 데이터 가져오기
-                item_values = tree.item(selected_item[0])['values']
-                category = item_values[0]  # 구분
-                product_code = item_values[1]  # 제품코드
-                lot = item_values[3]           # LOT
-                expiry = item_values[4]        # 유통기한
-                location = item_values[6]      # 보관위치 (폐기일자 컬럼 추가로 인덱스 변경)
-                filename = item_values[7]      # 파일명
-                barcode_number = item_values[8] if len(item_values) > 8 else "N/A"  # 바코드 숫자
-                
-                # 파일 존재 확인 (labeljpg 폴더 내에서 확인)
-                labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg")
-                file_path = os.path.join(labeljpg_dir, filename)
-                
-                if os.path.exists(file_path):
-                    try:
-                        # 파일을 다시 생성하여 새로운 UI 적용
-                        create_label(product_code, lot, expiry, location, category)
-                        messagebox.showinfo("재발행 완료", f"라벨을 새로 생성했습니다.\n\n구분: {category}\n제품: {product_code}\nLOT: {lot}\n유통기한: {expiry}\n보관위치: {location}\n바코드: {barcode_number}\n\n미리보기 창에서 확인 후 인쇄하세요.")
-                    except Exception as e:
-                        messagebox.showerror("재발행 오류", f"라벨 생성 실패: {e}")
-                else:
-                    # 파일이 없으면 새로 생성
-                    try:
-                        create_label(product_code, lot, expiry, location, category)
-                        messagebox.showinfo("재발행 완료", f"라벨을 새로 생성했습니다.\n\n구분: {category}\n제품: {product_code}\nLOT: {lot}\n유통기한: {expiry}\n보관위치: {location}\n바코드: {barcode_number}\n\n미리보기 창에서 확인 후 인쇄하세요.")
-                    except Exception as e:
-                        messagebox.showerror("재발행 오류", f"라벨 생성 실패: {e}")
+            if not messagebox.askyesno("삭제 확인", confirm_msg):
+                return
             
-            # 삭제 함수 (다중 선택 지원)
-            def delete_selected():
-                selected_items = tree.selection()
-                if not selected_items:
-                    messagebox.showwarning("경고", "삭제할 항목을 선택하세요.")
-                    return
+            try:
+                # 발행 이력 저장소에서 해당 행들 제거
+                deleted_count = 0
+                file_deleted_count = 0
                 
-                # 다중 선택된 항목들의 정보 수집
-                selected_data = []
-                for item in selected_items:
-                    item_values = tree.item(item)['values']
-                    selected_data.append({
-                        'item_id': item,
-                        'category': item_values[0],
-                        'product_code': item_values[1],
-                        'product_name': item_values[2],
-                        'lot': item_values[3],
-                        'expiry': item_values[4],
-                        'location': item_values[6],  # 폐기일자 컬럼 추가로 인덱스 변경
-                        'filename': item_values[7],
-                        'barcode_number': item_values[8] if len(item_values) > 8 else "N/A"
+                # 선택된 항목들을 역순으로 삭제 (인덱스 변경 방지)
+                for data in selected_data:
+                    # 선택된 항목과 일치하는 행 제거
+                    history_store.remove_matching({
+                        '구분': data['category'],
+                        '제품코드': data['product_code'],
+                        'LOT': data['lot'],
+                        '유통기한': data['expiry'],
+                        '보관위치': data['location']
                     })
+                    deleted_count += 1
+                    
+                    # 트리뷰에서도 삭제
+                    tree.delete(data['item_id'])
+                    
+                    # 파일도 삭제 (선택사항) - labeljpg 폴더 내에서 확인
+                    labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg")
+                    file_path = os.path.join(labeljpg_dir, data['filename'])
+                    if os.path.exists(file_path):
+                        try:
+                            os.remove(file_path)
+                            file_deleted_count += 1
+                        except:
+                            pass
                 
-                # 삭제 확인 메시지 (다중 선택 시)
+                # 완료 메시지
                 if len(selected_items) == 1:
-                    data = selected_data[0]
-                    confirm_msg = f"다음 항목을 삭제하시겠습니까?\n\n구분: {data['category']}\n제품코드: {data['product_code']}\n제품명: {data['product_name']}\nLOT: {data['lot']}\n유통기한: {data['expiry']}\n보관위치: {data['location']}"
+                    messagebox.showinfo("삭제 완료", f"선택한 항목이 삭제되었습니다.\n파일도 함께 삭제되었습니다." if file_deleted_count > 0 else "선택한 항목이 삭제되었습니다.")
                 else:
-                    confirm_msg = f"선택된 {len(selected_items)}개 항목을 모두 삭제하시겠습니다?\n\n"
-                    for i, data in enumerate(selected_data[:3], 1):  # 처음 3개만 표시
-                        confirm_msg += f"{i}. {data['category']} - {data['product_code']} - {data['product_name']} (LOT: {data['lot']})\n"
-                    if len(selected_data) > 3:
-                        confirm_msg += f"... 외 {len(selected_data) - 3}개 항목"
-                
-                if not messagebox.askyesno("삭제 확인", confirm_msg):
-                    return
+                    messagebox.showinfo("삭제 완료", f"선택된 {deleted_count}개 항목이 삭제되었습니다.\n파일 {file_deleted_count}개도 함께 삭제되었습니다.")
                 
-                try:
-                    # 엑셀 파일에서 해당 행들 삭제
-                    df_history = pd.read_excel(history_file)
-                    deleted_count = 0
-                    file_deleted_count = 0
-                    
-                    # 선택된 항목들을 역순으로 삭제 (인덱스 변경 방지)
-                    for data in selected_data:
-                        # 선택된 항목과 일치하는 행 찾기
-                        mask = (df_history['구분'] == data['category']) & \
-                               (df_history['제품코드'] == data['product_code']) & \
-                               (df_history['LOT'] == data['lot']) & \
-                               (df_history['유통기한'] == data['expiry']) & \
-                               (df_history['보관위치'] == data['location'])
-                        
-                        # 해당 행 삭제
-                        df_history = df_history[~mask]
-                        deleted_count += 1
-                        
-                        # 트리뷰에서도 삭제
-                        tree.delete(data['item_id'])
-                        
-                        # 파일도 삭제 (선택사항) - labeljpg 폴더 내에서 확인
-                        labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg")
-                        file_path = os.path.join(labeljpg_dir, data['filename'])
-                        if os.path.exists(file_path):
-                            try:
-                                os.remove(file_path)
-                                file_deleted_count += 1
-                            except:
-                                pass
-                    
-                    # 파일 저장
-                    if hasattr(df_history, 'to_excel'):
-                        df_history.to_excel(history_file, index=False)
-                    
-                    # 완료 메시지
-                    if len(selected_items) == 1:
-                        messagebox.showinfo("삭제 완료", f"선택한 항목이 삭제되었습니다.\n파일도 함께 삭제되었습니다." if file_deleted_count > 0 else "선택한 항목이 삭제되었습니다.")
-                    else:
-                        messagebox.showinfo("삭제 완료", f"선택된 {deleted_count}개 항목이 삭제되었습니다.\n파일 {file_deleted_count}개도 함께 삭제되었습니다.")
-                    
-                except Exception as e:
-                    messagebox.showerror("삭제 오류", f"삭제 실패: {e}")
-            
-            # 버튼 프레임
-            button_frame = tk.Frame(history_window)
-            button_frame.pack(fill=tk.X, padx=10, pady=5)
-            
-            # 재발행 버튼
-            reprint_btn = tk.Button(button_frame, text="선택 항목 재발행", command=reprint_selected, 
-                                   bg="#4CAF50", fg="white", font=("맑은 고딕", 11), 
-                                   relief=tk.FLAT, bd=0, padx=15, pady=5)
-            reprint_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 삭제 버튼
-            delete_btn = tk.Button(button_frame, text="선택 항목 삭제 (다중선택)", command=delete_selected, 
-                                  bg="#f44336", fg="white", font=("맑은 고딕", 11), 
-                                  relief=tk.FLAT, bd=0, padx=15, pady=5)
-            delete_btn.pack(side=tk.LEFT, padx=5)
-            
-            # 닫기 버튼
-            close_btn = tk.Button(button_frame, text="닫기", command=history_window.destroy)
-            close_btn.pack(side=tk.RIGHT, padx=5)
-            
-            # 선택된 항목 정보 표시 (다중 선택 지원)
-            def show_selection_info(event):
-                selected_items = tree.selection()
-                if selected_items:
-                    if len(selected_items) == 1:
-                        # 단일 선택
-                        item_values = tree.item(selected_items[0])['values']
-                        info_text = f"선택된 항목:\n구분: {item_values[0]}\n제품코드: {item_values[1]}\n제품명: {item_values[2]}\nLOT: {item_values[3]}\n유통기한: {item_values[4]}\n보관위치: {item_values[5]}"
-                    else:
-                        # 다중 선택
-                        info_text = f"선택된 항목: {len(selected_items)}개\n"
-                        for i, item in enumerate(selected_items[:3], 1):  # 처음 3개만 표시
-                            item_values = tree.item(item)['values']
-                            info_text += f"{i}. {item_values[0]} - {item_values[1]} - {item_values[2]} (LOT: {item_values[3]})\n"
-                        if len(selected_items) > 3:
-                            info_text += f"... 외 {len(selected_items) - 3}개 항목"
-                    info_label.config(text=info_text)
+            except Exception as e:
+                messagebox.showerror("삭제 오류", f"삭제 실패: {e}")
+        
+        # 버튼 프레임
+        button_frame = tk.Frame(history_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 재발행 버튼
+        reprint_btn = tk.Button(button_frame, text="선택 항목 재발행", command=reprint_selected, 
+                               bg="#4CAF50", fg="white", font=("맑은 고딕", 11), 
+                               relief=tk.FLAT, bd=0, padx=15, pady=5)
+        reprint_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 삭제 버튼
+        delete_btn = tk.Button(button_frame, text="선택 항목 삭제 (다중선택)", command=delete_selected, 
+                              bg="#f44336", fg="white", font=("맑은 고딕", 11), 
+                              relief=tk.FLAT, bd=0, padx=15, pady=5)
+        delete_btn.pack(side=tk.LEFT, padx=5)
+        
+        # 닫기 버튼
+        close_btn = tk.Button(button_frame, text="닫기", command=history_window.destroy)
+        close_btn.pack(side=tk.RIGHT, padx=5)
+        
+        # 선택된 항목 정보 표시 (다중 선택 지원)
+        def show_selection_info(event):
+            selected_items = tree.selection()
+            if selected_items:
+                if len(selected_items) == 1:
+                    # 단일 선택
+                    item_values = tree.item(selected_items[0])['values']
+                    info_text = f"선택된 항목:\n구분: {item_values[0]}\n제품코드: {item_values[1]}\n제품명: {item_values[2]}\nLOT: {item_values[3]}\n유통기한: {item_values[4]}\n보관위치: {item_values[5]}"
                 else:
-                    info_label.config(text="항목을 선택하세요 (Ctrl+클릭으로 다중 선택 가능)")
-            
-            tree.bind('<<TreeviewSelect>>', show_selection_info)
-            
-            # 선택 정보 표시 라벨
-            info_label = tk.Label(history_window, text="항목을 선택하세요 (Ctrl+클릭으로 다중 선택 가능)", 
-                                 relief=tk.SUNKEN, bd=1, padx=10, pady=5)
-            info_label.pack(fill=tk.X, padx=10, pady=5)
-            
-            # 초기 필터 적용 (최신순으로 정렬)
-            apply_filters()
+                    # 다중 선택
+                    info_text = f"선택된 항목: {len(selected_items)}개\n"
+                    for i, item in enumerate(selected_items[:3], 1):  # 처음 3개만 표시
+                        item_values = tree.item(item)['values']
+                        info_text += f"{i}. {item_values[0]} - {item_values[1]} - {item_values[2]} (LOT: {item_values[3]})\n"
+                    if len(selected_items) > 3:
+                        info_text += f"... 외 {len(selected_items) - 3}개 항목"
+                info_label.config(text=info_text)
+            else:
+                info_label.config(text="항목을 선택하세요 (Ctrl+클릭으로 다중 선택 가능)")
+        
+        tree.bind('<<TreeviewSelect>>', show_selection_info)
+        
+        # 선택 정보 표시 라벨
+        info_label = tk.Label(history_window, text="항목을 선택하세요 (Ctrl+클릭으로 다중 선택 가능)", 
+                             relief=tk.SUNKEN, bd=1, padx=10, pady=5)
+        info_label.pack(fill=tk.X, padx=10, pady=5)
+        
+        # 초기 필터 적용 (최신순으로 정렬)
+        apply_filters()
             
     except Exception as e:
         messagebox.showerror("오류", f"발행 내역 조회 중 오류: {e}")
@@ -2235,6 +2011,7 @@ button_frame = tk.Frame(root)
 button_frame.pack(pady=20)
 
 tk.Button(button_frame, text="라벨 생성 및 인쇄", command=on_submit).pack(side=tk.LEFT, padx=5)
+tk.Button(button_frame, text="일괄 발행", command=on_submit_batch).pack(side=tk.LEFT, padx=5)
 tk.Button(button_frame, text="📷 바코드 리딩", command=lambda: combo_code.focus(), 
           bg="#FF9800", fg="white", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=5)
 
@@ -2284,115 +2061,26 @@ tk.Button(button_frame2, text="📁 구글드라이브 설정", command=setup_go
           bg="#4285F4", fg="white", font=("맑은 고딕", 10, "bold")).pack(side=tk.LEFT, padx=5)
 
 # 일련번호 관리 시스템
-def init_serial_database():
-    """일련번호 데이터베이스 초기화"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    # 기존 테이블 삭제 (일련번호 문제 해결을 위해)
-    cursor.execute("DROP TABLE IF EXISTS label_info")
-    
-    # 새 테이블 생성 (AUTOINCREMENT 완전 제거, 명시적 일련번호 관리)
-    cursor.execute('''
-        CREATE TABLE label_info (
-            serial_number INTEGER,
-            product_code TEXT NOT NULL,
-            lot TEXT NOT NULL,
-            expiry TEXT NOT NULL,
-            version TEXT NOT NULL,
-            location TEXT NOT NULL,
-            category TEXT NOT NULL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    print("라벨 정보 테이블을 새로 생성했습니다 (AUTOINCREMENT 제거).")
-    
-    conn.commit()
-    conn.close()
-
-def get_next_serial_number():
-    """다음 일련번호 가져오기"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT MAX(serial_number) FROM label_info')
-    result = cursor.fetchone()
-    
-    conn.close()
-    
-    if result[0] is None:
-        return 1
-    else:
-        return result[0] + 1
-
 def save_label_info(product_code, lot, expiry, version, location, category):
     """라벨 정보 저장 및 일련번호 반환"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
     try:
-        # 다음 일련번호를 명시적으로 계산
-        cursor.execute('SELECT MAX(serial_number) FROM label_info')
-        result = cursor.fetchone()
-        current_max = result[0] if result[0] is not None else 0
-        next_serial = current_max + 1
-        
-        print(f"현재 최대 일련번호: {current_max}, 다음 일련번호: {next_serial}")
-        
-        # 명시적 일련번호로 데이터 삽입
-        cursor.execute('''
-            INSERT INTO label_info (serial_number, product_code, lot, expiry, version, location, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (next_serial, product_code, lot, expiry, version, location, category))
-        
-        # 트랜잭션 커밋
-        conn.commit()
-        
+        # 카운터 증가와 라벨 정보 저장을 한 트랜잭션으로 처리 (동시 발행 시에도 중복 없음)
+        next_serial = label_registry.register(product_code, lot, expiry, version, location, category)
         print(f"일련번호 생성 성공: {next_serial}")
         return next_serial
         
     except Exception as e:
         print(f"라벨 정보 저장 오류: {e}")
-        conn.rollback()
         raise
-    finally:
-        conn.close()
 
 def get_label_info_by_serial(serial_number):
     """일련번호로 라벨 정보 조회"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
     try:
-        # 버전 컬럼이 있는 새로운 테이블 구조 사용
-        cursor.execute('''
-            SELECT product_code, lot, expiry, version, location, category
-            FROM label_info WHERE serial_number = ?
-        ''', (serial_number,))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            return {
-                'product_code': result[0],
-                'lot': result[1],
-                'expiry': result[2],
-                'version': result[3],
-                'location': result[4],
-                'category': result[5]
-            }
-        
-        return None
+        return label_registry.get(serial_number)
         
     except Exception as e:
         print(f"라벨 정보 조회 오류: {e}")
         return None
-    finally:
-        conn.close()
 
 def process_serial_barcode(serial_number):
     """일련번호 바코드 처리"""
@@ -2435,17 +2123,50 @@ LOT: {lot}
         messagebox.showerror("오류", f"바코드 처리 중 오류가 발생했습니다: {e}")
         return False
 
-# 데이터베이스 초기화
-init_serial_database()
-
-# 제품 정보 로드
-products, barcode_to_product, expiry_info = load_products()
-
 # 구글 스프레드시트 초기 설정 확인
 if GOOGLE_SHEETS_AVAILABLE and not sheets_manager.spreadsheet_id:
     print("구글 스프레드시트가 설정되지 않았습니다. 설정을 권장합니다.")
     print("메인 화면의 '☁️ 구글시트 설정' 버튼을 클릭하여 설정하세요.")
 
+# 라벨 프린터 인쇄 대기열 상태 표시 (프린터가 설정된 경우에만)
+print_status_var = tk.StringVar(value="")
+tk.Label(root, textvariable=print_status_var, fg="gray", font=("맑은 고딕", 9)).pack(pady=5)
+print_events = queue.Queue()
+
+def poll_print_status():
+    """작업 스레드가 보낸 인쇄 상태를 메인 스레드에서 표시"""
+    while True:
+        try:
+            kind, job_ids, message = print_events.get_nowait()
+        except queue.Empty:
+            break
+        print_status_var.set(f"인쇄 대기 {printer_queue.pending_count()}건 - {message}")
+        if kind == "failed":
+            messagebox.showerror("인쇄 실패", f"라벨 프린터로 전송하지 못했습니다 (작업 {job_ids}).\n{message}")
+    root.after(300, poll_print_status)
+
+printer_queue = get_print_queue()
+if printer_queue:
+    printer_queue.subscribe(lambda kind, job_ids, message: print_events.put((kind, job_ids, message)))
+    print_status_var.set(f"라벨 프린터: {printer_queue.transport} (대기 {printer_queue.pending_count()}건)")
+    root.after(300, poll_print_status)
+
+# 구글 스프레드시트/드라이브 동기화 대기 건수 표시
+sync_status_var = tk.StringVar(value="")
+tk.Label(root, textvariable=sync_status_var, fg="gray", font=("맑은 고딕", 9)).pack()
+
+def poll_sync_status():
+    """동기화 대기열 건수 갱신 (1초마다)"""
+    try:
+        pending = sync_outbox.pending_count()
+        sync_status_var.set(f"구글 동기화 대기 {pending}건" if pending else "구글 동기화: 모두 전송됨")
+    except Exception as e:
+        sync_status_var.set(f"구글 동기화 상태 확인 실패: {e}")
+    root.after(1000, poll_sync_status)
+
+if GOOGLE_SHEETS_AVAILABLE or GOOGLE_DRIVE_AVAILABLE:
+    root.after(1000, poll_sync_status)
+
 # root.mainloop() 호출 후에 구역 설정 변경 감지 시작
 root.after(100, check_zone_config_changes)
 
@@ -7,10 +7,6 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from tkcalendar import DateEntry
-import pandas as pd
-from PIL import Image, ImageDraw, ImageFont
-import barcode
-from barcode.writer import ImageWriter
 import os
 import time
 import re
@@ -18,11 +14,17 @@ import sys
 import argparse
 from datetime import datetime
 import json
-import sqlite3
+
+from issue_history_store import history_store, LAYOUT_30X20
+from label_registry import LabelRegistry
+from label_template import label_templates
 
 # 스크립트 디렉토리 설정
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# 30x20 라벨 일련번호 (40x30과 별도 DB)
+label_registry = LabelRegistry(os.path.join(SCRIPT_DIR, 'label_serial_30x20.db'))
+
 # 제품 데이터 (간단한 예시)
 products = {"TEST001": "테스트 제품 1", "TEST002": "테스트 제품 2"}
 
@@ -31,75 +33,15 @@ def create_label_30x20(product_code, lot, expiry, version, location, category):
     # 제품명 조회
     product_name = products.get(product_code, "알 수 없는 제품")
 
-    # 일련번호 생성
-    serial_number = get_next_serial_number()
+    # 일련번호 발급 및 라벨 정보 저장
+    serial_number = label_registry.register(product_code, lot, expiry, version, location, category)
     
     # 바코드 데이터는 일련번호만 사용
     barcode_data = str(serial_number)
 
-    # 라벨 캔버스 생성 (30mm x 20mm 용지, 4배 확대된 해상도)
-    LABEL_WIDTH = 480  # 가로 (30mm * 4 * 4 = 480px)
-    LABEL_HEIGHT = 320  # 세로 (20mm * 4 * 4 = 320px)
-    label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
-    draw = ImageDraw.Draw(label)
-    
-    # 한글 폰트 설정
-    try:
-        font = ImageFont.truetype("malgun.ttf", 20)
-        font_small = ImageFont.truetype("malgun.ttf", 16)
-        font_product = ImageFont.truetype("malgun.ttf", 18)
-        font_info = ImageFont.truetype("malgun.ttf", 18)
-    except:
-        font = ImageFont.load_default()
-        font_small = ImageFont.load_default()
-        font_product = ImageFont.load_default()
-        font_info = ImageFont.load_default()
-
-    # 텍스트 배치
-    y_pos = 10
-    
-    # 제품명
-    draw.text((15, y_pos), f"제품명: {product_name}", fill="black", font=font_product)
-    y_pos += 24
-    
-    # 구분
-    draw.text((15, y_pos), f"구분: {category}", fill="black", font=font_product)
-    y_pos += 24
-    
-    # LOT, 유통기한, 버전
-    lot_expiry_version_text = f"LOT: {lot}    유통기한: {expiry}    버전: {version}"
-    draw.text((15, y_pos), lot_expiry_version_text, fill="black", font=font_info)
-    y_pos += 24
-    
-    # 보관위치
-    draw.text((15, y_pos), f"보관위치: {location}", fill="black", font=font_info)
-
-    # 바코드 생성 및 추가
-    try:
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_image = barcode_class(barcode_data, writer=ImageWriter())
-        barcode_img = barcode_image.render({'write_text': False})
-        
-        # 바코드 크기 조정
-        barcode_width = LABEL_WIDTH - 30
-        barcode_height = 100
-        barcode_img = barcode_img.resize((barcode_width, barcode_height), Image.Resampling.LANCZOS)
-        
-        # 바코드 배치
-        barcode_x = 4
-        barcode_y = LABEL_HEIGHT - barcode_height - 60
-        label.paste(barcode_img, (barcode_x, barcode_y))
-        
-        # 바코드 아래 텍스트
-        barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
-        text_bbox = draw.textbbox((0, 0), barcode_text, font=font_small)
-        text_width = text_bbox[2] - text_bbox[0]
-        text_x = (LABEL_WIDTH - text_width) // 2
-        draw.text((text_x, LABEL_HEIGHT - 35), barcode_text, fill="black", font=font_small)
-        
-    except Exception as e:
-        print(f"바코드 생성 실패: {e}")
-        draw.text((15, LABEL_HEIGHT - 60), f"바코드: {barcode_data}", fill="black", font=font_small)
+    # 고정 영역은 템플릿 캐시에서 가져오고 바코드만 새로 그림
+    label = label_templates.compose(LAYOUT_30X20, barcode_data, product_code, product_name,
+                                    category, lot, expiry, version, location)
 
     # labeljpg_30x20 폴더 생성
     labeljpg_dir = os.path.join(SCRIPT_DIR, "labeljpg_30x20")
@@ -118,25 +60,6 @@ def create_label_30x20(product_code, lot, expiry, version, location, category):
 def save_issue_history(product_code, lot, expiry, version, location, filename, category, barcode_number):
     """발행 내역 저장"""
     try:
-        history_file = os.path.join(SCRIPT_DIR, "issue_history_30x20.xlsx")
-        
-        # 기존 파일이 있으면 읽고, 없으면 새로 생성
-        try:
-            df_history = pd.read_excel(history_file)
-        except FileNotFoundError:
-            df_history = pd.DataFrame({
-                '발행일시': [],
-                '구분': [],
-                '제품코드': [],
-                '제품명': [],
-                'LOT': [],
-                '유통기한': [],
-                '버전': [],
-                '보관위치': [],
-                '파일명': [],
-                '바코드숫자': []
-            })
-        
         # 새 발행 내역 추가
         product_name = products.get(product_code, "알 수 없는 제품")
         new_row = {
@@ -152,52 +75,17 @@ def save_issue_history(product_code, lot, expiry, version, location, filename, c
             '바코드숫자': barcode_number
         }
         
-        df_history = pd.concat([df_history, pd.DataFrame([new_row])], ignore_index=True)
-        df_history.to_excel(history_file, index=False)
+        # 발행 이력 저장소에 1행 추가 (30x20 규격으로 구분)
+        history_store.append(new_row, LAYOUT_30X20)
         
-        print(f"발행 내역이 {history_file}에 저장되었습니다.")
+        print(f"발행 내역이 {history_store.db_path}에 저장되었습니다.")
         
     except Exception as e:
         print(f"발행 내역 저장 중 오류: {e}")
 
-def get_next_serial_number():
-    """다음 일련번호 가져오기"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial_30x20.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT MAX(serial_number) FROM label_info')
-    result = cursor.fetchone()
-    
-    conn.close()
-    
-    if result[0] is None:
-        return 1
-    else:
-        return result[0] + 1
-
 def init_serial_database():
-    """일련번호 데이터베이스 초기화"""
-    db_path = os.path.join(SCRIPT_DIR, 'label_serial_30x20.db')
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    
-    cursor.execute("DROP TABLE IF EXISTS label_info")
-    cursor.execute('''
-        CREATE TABLE label_info (
-            serial_number INTEGER,
-            product_code TEXT NOT NULL,
-            lot TEXT NOT NULL,
-            expiry TEXT NOT NULL,
-            version TEXT NOT NULL,
-            location TEXT NOT NULL,
-            category TEXT NOT NULL,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    
-    conn.commit()
-    conn.close()
+    """일련번호 데이터베이스 초기화 (기존 라벨 정보 유지, 필요한 마이그레이션만 적용)"""
+    label_registry.initialize()
 
 def show_preview(label_image, filename, product_code, lot, expiry, version, location, category):
     """미리보기 창"""
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 일련번호 관리
+label_serial.db의 카운터 행으로 일련번호를 발급하고 일련번호별 라벨 정보를 저장하는 모듈
+여러 스레드/프로세스(Tkinter GUI, Streamlit 세션)가 동시에 발급해도 번호가 겹치지 않음
+"""
+
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 카운터 이름 (serial_counter 테이블의 키)
+LABEL_COUNTER = "label"
+
+LABEL_FIELDS = ['product_code', 'lot', 'expiry', 'version', 'location', 'category']
+
+LABEL_INFO_TABLE = """
+CREATE TABLE IF NOT EXISTS label_info (
+    serial_number INTEGER PRIMARY KEY,
+    product_code TEXT NOT NULL,
+    lot TEXT NOT NULL,
+    expiry TEXT NOT NULL,
+    version TEXT NOT NULL,
+    location TEXT NOT NULL,
+    category TEXT NOT NULL,
+    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+)
+"""
+
+COUNTER_TABLE = """
+CREATE TABLE IF NOT EXISTS serial_counter (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+)
+"""
+
+# 일련번호 조회 캐시 크기 (스캔한 라벨 정보)
+LOOKUP_CACHE_SIZE = 4096
+
+
+class LabelRegistry:
+    def __init__(self, db_path=None, counter=LABEL_COUNTER, cache_size=LOOKUP_CACHE_SIZE):
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, "label_serial.db")
+        self.counter = counter
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        """스레드별 연결 반환 (최초 호출 시 스키마 생성)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    self._init_schema(conn)
+                    self._initialized = True
+        return conn
+
+    def _init_schema(self, conn):
+        """PRAGMA user_version 기준으로 아직 적용되지 않은 마이그레이션 실행"""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, migrate in MIGRATIONS:
+                if target > version:
+                    migrate(self, conn)
+                    conn.execute(f"PRAGMA user_version = {target}")
+                    print(f"label_serial DB 마이그레이션 적용: v{target}")
+            # 카운터가 없으면 기존 최대 일련번호에서 이어서 발급 (기본키라 인덱스 조회)
+            conn.execute(
+                "INSERT OR IGNORE INTO serial_counter (name, value) "
+                "SELECT ?, COALESCE(MAX(serial_number), 0) FROM label_info",
+                (self.counter,)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _migrate_v1(self, conn):
+        """v1: 일련번호 기본키 label_info + serial_counter"""
+        conn.execute(LABEL_INFO_TABLE)
+        conn.execute(COUNTER_TABLE)
+        self._ensure_serial_primary_key(conn)
+
+    def _migrate_v2(self, conn):
+        """v2: 제품코드+LOT, 보관위치 조회용 보조 인덱스"""
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_label_info_product_lot ON label_info(product_code, lot)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_label_info_location ON label_info(location)")
+
+    def _ensure_serial_primary_key(self, conn):
+        """예전 label_info(일련번호 인덱스 없음)를 일련번호 기본키 테이블로 변환"""
+        columns = {row[1]: row[5] for row in conn.execute("PRAGMA table_info(label_info)")}
+        if columns.get('serial_number') == 1:
+            return
+        keep = [c for c in LABEL_FIELDS if c in columns]
+        created = 'created_date' if 'created_date' in columns else ('created_at' if 'created_at' in columns else None)
+        conn.execute("ALTER TABLE label_info RENAME TO label_info_old")
+        conn.execute(LABEL_INFO_TABLE)
+        target = ", ".join(['serial_number'] + keep + (['created_date'] if created else []))
+        source = ", ".join(['serial_number'] + keep + ([created] if created else []))
+        # 중복 발급된 일련번호는 먼저 저장된 행만 유지
+        conn.execute(f"""
+            INSERT OR IGNORE INTO label_info ({target})
+            SELECT {source} FROM label_info_old
+            WHERE serial_number IS NOT NULL ORDER BY rowid
+        """)
+        conn.execute("DROP TABLE label_info_old")
+        print("label_info 테이블에 일련번호 기본키를 적용했습니다.")
+
+    def initialize(self):
+        """스키마 생성 및 카운터 준비 (프로그램 시작 시 호출)"""
+        self._connect()
+
+    def _reserve(self, conn, count):
+        """카운터를 count만큼 증가시키고 발급된 첫 번호 반환 (트랜잭션은 호출 측에서 관리)"""
+        conn.execute("UPDATE serial_counter SET value = value + ? WHERE name = ?", (count, self.counter))
+        last = conn.execute("SELECT value FROM serial_counter WHERE name = ?", (self.counter,)).fetchone()[0]
+        return last - count + 1
+
+    def reserve_block(self, count):
+        """연속된 일련번호 count개를 한 트랜잭션으로 예약 (range 반환)"""
+        if count < 1:
+            raise ValueError("예약할 일련번호 개수는 1 이상이어야 합니다.")
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first = self._reserve(conn, count)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return range(first, first + count)
+
+    def allocate(self):
+        """일련번호 1개 발급"""
+        return self.reserve_block(1)[0]
+
+    def register_many(self, records):
+        """라벨 정보 여러 건을 연속 일련번호로 저장 (한 트랜잭션, 일련번호 목록 반환)"""
+        records = list(records)
+        if not records:
+            return []
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            first = self._reserve(conn, len(records))
+            serials = list(range(first, first + len(records)))
+            conn.executemany(
+                f"INSERT INTO label_info (serial_number, {', '.join(LABEL_FIELDS)}) "
+                f"VALUES (?, {', '.join('?' for _ in LABEL_FIELDS)})",
+                [(serial, *(str(record[f]) for f in LABEL_FIELDS)) for serial, record in zip(serials, records)]
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return serials
+
+    def register(self, product_code, lot, expiry, version, location, category):
+        """라벨 정보 저장 및 발급된 일련번호 반환"""
+        return self.register_many([{
+            'product_code': product_code, 'lot': lot, 'expiry': expiry,
+            'version': version, 'location': location, 'category': category,
+        }])[0]
+
+    def current_serial(self):
+        """마지막으로 발급된 일련번호 (발급 이력이 없으면 0)"""
+        row = self._connect().execute(
+            "SELECT value FROM serial_counter WHERE name = ?", (self.counter,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def get(self, serial_number):
+        """일련번호로 라벨 정보 조회 (없으면 None)
+
+        등록된 라벨 정보는 바뀌지 않으므로 조회 결과를 LRU 캐시에 보관
+        (없는 번호는 이후 발급될 수 있어 캐시하지 않음)
+        """
+        serial_number = int(serial_number)
+        with self._cache_lock:
+            info = self._cache.get(serial_number)
+            if info is not None:
+                self._cache.move_to_end(serial_number)
+                return dict(info)
+        row = self._connect().execute(
+            f"SELECT {', '.join(LABEL_FIELDS)} FROM label_info WHERE serial_number = ?",
+            (serial_number,)
+        ).fetchone()
+        if row is None:
+            return None
+        info = dict(zip(LABEL_FIELDS, row))
+        with self._cache_lock:
+            self._cache[serial_number] = info
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(info)
+
+
+# (user_version, 적용 함수) - 새 스키마 변경은 목록 끝에 추가
+MIGRATIONS = [
+    (1, LabelRegistry._migrate_v1),
+    (2, LabelRegistry._migrate_v2),
+]
+
+
+# 40x30 라벨(label_gui, streamlit_app) 공용
+label_registry = LabelRegistry()
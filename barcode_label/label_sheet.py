@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 시트 합치기 (여러 장 -> PDF 하나 / ZPL 스트림 하나)
+라벨마다 JPEG 파일을 하나씩 인쇄하면 200장이면 인쇄 작업도 200번이므로
+렌더링된 라벨을 용지(롤 라벨 또는 A4 라벨지) 칸에 배치해 페이지를 만들고
+여러 페이지 PDF 또는 ZPL 스트림 파일 하나로 저장
+
+- 용지는 STOCKS에 정의 (40x30, 30x20 롤 / A4 라벨지 격자)
+- 라벨은 이미지 또는 파일 경로의 iterable, 한 페이지를 채우면 바로 파일에 쓰고 버리므로
+  수천 장이어도 메모리에는 페이지 한 장만 유지 (PDF 페이지 목록/xref는 마지막에 기록)
+- 페이지는 1비트(흑백)로 변환 (라벨 프린터와 같은 임계값 방식, 회색 디더링 없음)
+"""
+
+import os
+import zlib
+from datetime import datetime
+
+from PIL import Image, ImageOps
+
+import zpl_graphic
+from issue_history_store import LAYOUT_40X30, LAYOUT_30X20
+
+# 라벨 이미지 해상도 (40mm -> 640px, 약 406dpi)
+PX_PER_MM = 16
+POINTS_PER_MM = 72 / 25.4
+
+PDF = "pdf"
+ZPL = "zpl"
+
+
+class SheetStock:
+    """용지 한 장: 페이지 크기, 라벨 크기, 칸 수 (mm 단위, 남는 공간은 상하좌우 균등 여백)"""
+
+    def __init__(self, name, page_mm, label_mm, cols=1, rows=1, gap_mm=(0, 0)):
+        self.name = name
+        self.page_mm = page_mm
+        self.label_mm = label_mm
+        self.cols = cols
+        self.rows = rows
+        self.gap_mm = gap_mm
+        if cols * label_mm[0] + (cols - 1) * gap_mm[0] > page_mm[0] or \
+                rows * label_mm[1] + (rows - 1) * gap_mm[1] > page_mm[1]:
+            raise ValueError(f"라벨 {cols}x{rows}칸이 용지 {page_mm}mm에 들어가지 않습니다.")
+
+    @property
+    def per_page(self):
+        return self.cols * self.rows
+
+    @property
+    def page_px(self):
+        return tuple(round(mm * PX_PER_MM) for mm in self.page_mm)
+
+    @property
+    def label_px(self):
+        return tuple(round(mm * PX_PER_MM) for mm in self.label_mm)
+
+    def slot_origin(self, slot):
+        """칸 번호(왼쪽 위부터 가로 순서) -> 페이지 안 왼쪽 위 좌표(px)"""
+        row, col = divmod(slot, self.cols)
+        left = (self.page_mm[0] - self.cols * self.label_mm[0] - (self.cols - 1) * self.gap_mm[0]) / 2
+        top = (self.page_mm[1] - self.rows * self.label_mm[1] - (self.rows - 1) * self.gap_mm[1]) / 2
+        return (round((left + col * (self.label_mm[0] + self.gap_mm[0])) * PX_PER_MM),
+                round((top + row * (self.label_mm[1] + self.gap_mm[1])) * PX_PER_MM))
+
+
+A4_MM = (210, 297)
+
+STOCKS = {
+    "40x30": SheetStock("40x30", (40, 30), (40, 30)),
+    "30x20": SheetStock("30x20", (30, 20), (30, 20)),
+    "A4-40x30": SheetStock("A4-40x30", A4_MM, (40, 30), cols=5, rows=9),   # 45칸
+    "A4-30x20": SheetStock("A4-30x20", A4_MM, (30, 20), cols=6, rows=13),  # 78칸
+}
+
+# 라벨 레이아웃별 기본 용지 (롤 라벨, 라벨 한 장 = 한 페이지)
+LAYOUT_STOCKS = {
+    LAYOUT_40X30: "40x30",
+    LAYOUT_30X20: "30x20",
+}
+
+
+def _bilevel(label, size, threshold=128):
+    """라벨(이미지 또는 경로) -> 칸 크기의 1비트 이미지 (비율 유지, 가운데 정렬)"""
+    if isinstance(label, (str, os.PathLike)):
+        with Image.open(label) as image:
+            return _bilevel(image, size, threshold)
+    gray = label.convert("L")
+    if gray.size != size:
+        gray = ImageOps.pad(ImageOps.contain(gray, size, Image.Resampling.LANCZOS), size, color=255)
+    return gray.point(lambda value: 255 if value >= threshold else 0, "1")
+
+
+def compose_pages(labels, stock):
+    """라벨 iterable -> 페이지 이미지(mode '1') generator (마지막 페이지는 남는 칸 비움)"""
+    stock = STOCKS[stock] if isinstance(stock, str) else stock
+    page, slot = None, 0
+    for label in labels:
+        if page is None:
+            page = Image.new("1", stock.page_px, 1)
+        page.paste(_bilevel(label, stock.label_px), stock.slot_origin(slot))
+        slot += 1
+        if slot == stock.per_page:
+            yield page
+            page, slot = None, 0
+    if page is not None:
+        yield page
+
+
+class PdfStreamWriter:
+    """페이지를 하나씩 바로 쓰는 PDF 작성기 (1비트 이미지 + FlateDecode)
+
+    객체 1 = Catalog, 2 = Pages (페이지 목록을 알아야 하므로 close()에서 기록)
+    """
+
+    def __init__(self, path, page_mm):
+        self.path = path
+        self.page_pt = tuple(round(mm * POINTS_PER_MM, 2) for mm in page_mm)
+        self._file = open(path, "wb")
+        self._offsets = {}
+        self._pages = []
+        self._next_id = 3
+        self._file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        self._write_object(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+
+    def _write_object(self, object_id, body, stream=None):
+        self._offsets[object_id] = self._file.tell()
+        self._file.write(f"{object_id} 0 obj\n".encode("ascii") + body)
+        if stream is not None:
+            self._file.write(b"\nstream\n" + stream + b"\nendstream")
+        self._file.write(b"\nendobj\n")
+
+    def _allocate(self, count):
+        ids = list(range(self._next_id, self._next_id + count))
+        self._next_id += count
+        return ids
+
+    def add_page(self, page):
+        """페이지 이미지(mode '1') 한 장 추가"""
+        image_id, content_id, page_id = self._allocate(3)
+        width, height = page.size
+        data = zlib.compress(page.tobytes(), 6)
+        self._write_object(image_id, (
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /FlateDecode /Length {len(data)} >>"
+        ).encode("ascii"), data)
+
+        page_width, page_height = self.page_pt
+        content = f"q {page_width} 0 0 {page_height} 0 0 cm /Im0 Do Q".encode("ascii")
+        self._write_object(content_id, f"<< /Length {len(content)} >>".encode("ascii"), content)
+        self._write_object(page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("ascii"))
+        self._pages.append(page_id)
+
+    def close(self):
+        kids = " ".join(f"{page_id} 0 R" for page_id in self._pages)
+        self._write_object(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._pages)} >>".encode("ascii"))
+
+        xref_offset = self._file.tell()
+        lines = [f"xref\n0 {self._next_id}\n", "0000000000 65535 f \n"]
+        lines += [f"{self._offsets[object_id]:010d} 00000 n \n" for object_id in range(1, self._next_id)]
+        lines.append(f"trailer\n<< /Size {self._next_id} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n")
+        self._file.write("".join(lines).encode("ascii"))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+
+def write_sheets(labels, path, stock="40x30", output_format=None):
+    """라벨들을 용지에 배치해 PDF(.pdf) 또는 ZPL(.zpl) 파일 하나로 저장, 페이지 수 반환"""
+    stock = STOCKS[stock] if isinstance(stock, str) else stock
+    output_format = output_format or (ZPL if path.lower().endswith(".zpl") else PDF)
+    pages = compose_pages(labels, stock)
+    count = 0
+    if output_format == ZPL:
+        with open(path, "w", encoding="ascii") as f:
+            for page in pages:
+                f.write(zpl_graphic.image_to_zpl(page, zpl_graphic.Z64) + "\n")
+                count += 1
+    else:
+        with PdfStreamWriter(path, stock.page_mm) as writer:
+            for page in pages:
+                writer.add_page(page)
+                count += 1
+    return count
+
+
+def sheet_path(output_dir, prefix="sheet", output_format=PDF):
+    """output_dir/<prefix>-<시각>.<pdf|zpl>"""
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{output_format}")
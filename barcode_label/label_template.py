@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 고정 영역 템플릿 캐시
+같은 제품/LOT/유통기한으로 여러 장을 찍을 때 바뀌는 것은 일련번호 바코드뿐이므로
+제품명, 구분, LOT/유통기한/버전, 보관위치, 하단 제품 정보 텍스트는
+(레이아웃, 제품, 구분, LOT, 유통기한, 버전, 보관위치)별로 한 번만 그리고
+라벨마다 템플릿 복사본에 바코드만 붙임
+
+- 템플릿은 LRU로 최대 TEMPLATE_CACHE_SIZE개만 보관 (40x30 RGB 한 장 약 0.9MB)
+- 키에 제품명이 포함되고, 제품 카탈로그에서 제품명이 바뀌면 해당 제품 템플릿을 바로 삭제
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw
+
+import code128
+from font_provider import get_font
+from issue_history_store import LAYOUT_40X30, LAYOUT_30X20
+from product_catalog import product_catalog
+from text_layout import wrap_text
+
+# 보관할 템플릿 최대 개수
+TEMPLATE_CACHE_SIZE = 32
+
+# 레이아웃별 라벨 크기 (4배 확대된 해상도)
+LABEL_SIZES = {
+    LAYOUT_40X30: (640, 480),  # 40mm * 4 * 4, 30mm * 4 * 4
+    LAYOUT_30X20: (480, 320),  # 30mm * 4 * 4, 20mm * 4 * 4
+}
+
+
+def draw_static_40x30(product_code, product_name, category, lot, expiry, version, location):
+    """40x30 라벨 고정 영역 (텍스트만, 바코드 자리는 비워 둠)"""
+    LABEL_WIDTH, LABEL_HEIGHT = LABEL_SIZES[LAYOUT_40X30]
+    label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
+    draw = ImageDraw.Draw(label)
+
+    font_small = get_font(20)  # 작은 폰트 (5 * 4)
+    font_product = get_font(24)  # 제품명용 (6 * 4)
+    font_info = get_font(24)  # LOT/유통기한용 (6 * 4)
+
+    # 제품명 줄바꿈 ("제품명: " 부분을 고려하여 실제 제품명만 줄바꿈 처리)
+    label_prefix = "제품명: "
+    prefix_width = draw.textbbox((0, 0), label_prefix, font=font_product)[2] - draw.textbbox((0, 0), "", font=font_product)[0]
+    available_width = LABEL_WIDTH - 40 - prefix_width  # 좌우 여백 조정 (10 * 4)
+    product_name_lines = wrap_text(product_name, font_product, available_width)
+
+    y_pos = 15  # 상단 여백 조정 (약 4 * 4)
+    for i, line in enumerate(product_name_lines):
+        if i == 0:
+            draw.text((20, y_pos), f"제품명: {line}", fill="black", font=font_product)
+        else:
+            # 들여쓰기로 정렬 (제품명: 과 같은 위치에서 시작)
+            draw.text((20 + prefix_width, y_pos), line, fill="black", font=font_product)
+        y_pos += 32  # 줄 간격 조정 (8 * 4)
+
+    # 구분 정보 추가 (제품명과 동일한 폰트 크기)
+    draw.text((20, y_pos), f"구분: {category}", fill="black", font=font_product)
+    y_pos += 32
+
+    # LOT, 유통기한, 버전을 같은 줄에 배치
+    lot_expiry_version_text = f"LOT: {lot}    유통기한: {expiry}    버전: {version}"
+    draw.text((20, y_pos), lot_expiry_version_text, fill="black", font=font_info)
+
+    # 보관위치는 LOT 행 아래에 배치
+    draw.text((20, y_pos + 30), f"보관위치: {location}", fill="black", font=font_info)
+
+    # 바코드 아래 텍스트 (제품코드-LOT-유통기한-버전 형식) - 가운데 정렬
+    barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
+    text_bbox = draw.textbbox((0, 0), barcode_text, font=font_small)
+    text_x = (LABEL_WIDTH - (text_bbox[2] - text_bbox[0])) // 2
+    draw.text((text_x, LABEL_HEIGHT - 50), barcode_text, fill="black", font=font_small)
+    return label
+
+
+def draw_barcode_40x30(label, barcode_data):
+    """40x30 템플릿 복사본에 일련번호 바코드 붙이기 (정수 모듈 폭 1비트, 리샘플링 없음)"""
+    LABEL_WIDTH, LABEL_HEIGHT = label.size
+    barcode_width = LABEL_WIDTH - 40
+    barcode_height = 150  # 바코드 높이 (텍스트 공간 확보)
+    try:
+        label.paste(code128.render(barcode_data, barcode_width, barcode_height),
+                    (5, LABEL_HEIGHT - barcode_height - 100))
+    except ValueError as e:
+        print(f"바코드 생성 실패: {e}")
+        # 바코드 생성 실패 시 텍스트만 표시
+        ImageDraw.Draw(label).text((20, LABEL_HEIGHT - 80), f"바코드: {barcode_data}", fill="black", font=get_font(20))
+
+
+def draw_static_30x20(product_code, product_name, category, lot, expiry, version, location):
+    """30x20 라벨 고정 영역 (텍스트만, 바코드 자리는 비워 둠)"""
+    LABEL_WIDTH, LABEL_HEIGHT = LABEL_SIZES[LAYOUT_30X20]
+    label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
+    draw = ImageDraw.Draw(label)
+
+    font_small = get_font(16)
+    font_product = get_font(18)
+    font_info = get_font(18)
+
+    y_pos = 10
+
+    # 제품명 (40x30 라벨과 같은 줄바꿈, 바코드와 겹치지 않도록 최대 2줄)
+    label_prefix = "제품명: "
+    prefix_width = draw.textbbox((0, 0), label_prefix, font=font_product)[2]
+    product_name_lines = list(wrap_text(product_name, font_product, LABEL_WIDTH - 30 - prefix_width))
+    if len(product_name_lines) > 2:
+        product_name_lines = [product_name_lines[0], product_name_lines[1][:-2] + "..."]
+    for i, line in enumerate(product_name_lines):
+        if i == 0:
+            draw.text((15, y_pos), f"{label_prefix}{line}", fill="black", font=font_product)
+        else:
+            draw.text((15 + prefix_width, y_pos), line, fill="black", font=font_product)
+        y_pos += 24
+
+    # 구분
+    draw.text((15, y_pos), f"구분: {category}", fill="black", font=font_product)
+    y_pos += 24
+
+    # LOT, 유통기한, 버전
+    lot_expiry_version_text = f"LOT: {lot}    유통기한: {expiry}    버전: {version}"
+    draw.text((15, y_pos), lot_expiry_version_text, fill="black", font=font_info)
+    y_pos += 24
+
+    # 보관위치
+    draw.text((15, y_pos), f"보관위치: {location}", fill="black", font=font_info)
+
+    # 바코드 아래 텍스트
+    barcode_text = f"{product_code}-{lot}-{expiry}-{version}"
+    text_bbox = draw.textbbox((0, 0), barcode_text, font=font_small)
+    text_x = (LABEL_WIDTH - (text_bbox[2] - text_bbox[0])) // 2
+    draw.text((text_x, LABEL_HEIGHT - 35), barcode_text, fill="black", font=font_small)
+    return label
+
+
+def draw_barcode_30x20(label, barcode_data):
+    """30x20 템플릿 복사본에 일련번호 바코드 붙이기 (정수 모듈 폭 1비트, 리샘플링 없음)"""
+    LABEL_WIDTH, LABEL_HEIGHT = label.size
+    barcode_width = LABEL_WIDTH - 30
+    barcode_height = 100
+    try:
+        label.paste(code128.render(barcode_data, barcode_width, barcode_height),
+                    (4, LABEL_HEIGHT - barcode_height - 60))
+    except ValueError as e:
+        print(f"바코드 생성 실패: {e}")
+        ImageDraw.Draw(label).text((15, LABEL_HEIGHT - 60), f"바코드: {barcode_data}", fill="black", font=get_font(16))
+
+
+# 레이아웃별 (고정 영역, 바코드) 그리기 함수
+LAYOUTS = {
+    LAYOUT_40X30: (draw_static_40x30, draw_barcode_40x30),
+    LAYOUT_30X20: (draw_static_30x20, draw_barcode_30x20),
+}
+
+
+class LabelTemplateCache:
+    def __init__(self, max_entries=TEMPLATE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def template(self, layout, product_code, product_name, category, lot, expiry, version, location):
+        """고정 영역 템플릿 (캐시, 반환된 이미지를 직접 수정하면 안 됨)"""
+        key = (layout, product_code, product_name, category, lot, expiry, version, location)
+        with self._lock:
+            image = self._templates.get(key)
+            if image is not None:
+                self._templates.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        draw_static = LAYOUTS[layout][0]
+        image = draw_static(product_code, product_name, category, lot, expiry, version, location)
+        with self._lock:
+            self._templates[key] = image
+            self._templates.move_to_end(key)
+            while len(self._templates) > self.max_entries:
+                self._templates.popitem(last=False)
+        return image
+
+    def compose(self, layout, serial_number, product_code, product_name, category, lot, expiry, version, location):
+        """템플릿 복사본에 일련번호 바코드를 붙인 라벨 이미지"""
+        label = self.template(layout, product_code, product_name, category, lot, expiry, version, location).copy()
+        LAYOUTS[layout][1](label, str(serial_number))
+        return label
+
+    def invalidate(self, product_codes=None):
+        """템플릿 삭제 (product_codes가 없으면 전체)"""
+        with self._lock:
+            if product_codes is None:
+                self._templates.clear()
+                return
+            product_codes = set(product_codes)
+            for key in [key for key in self._templates if key[1] in product_codes]:
+                del self._templates[key]
+
+    def on_catalog_update(self, snapshot):
+        """제품 카탈로그 갱신 시 제품명이 바뀐 제품의 템플릿 삭제"""
+        with self._lock:
+            stale = [key for key in self._templates
+                     if key[1] in snapshot.products and snapshot.products[key[1]] != key[2]]
+            for key in stale:
+                del self._templates[key]
+        if stale:
+            print(f"라벨 템플릿 {len(stale)}개 삭제 (제품명 변경)")
+
+    def stats(self):
+        return {"templates": len(self._templates), "hits": self.hits, "misses": self.misses}
+
+
+label_templates = LabelTemplateCache()
+product_catalog.subscribe(label_templates.on_catalog_update)
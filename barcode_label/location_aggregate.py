@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보관위치별 재고 집계
+그리드 셀 표시(라벨 수, 제품 수, 가장 가까운 폐기일자)와 위치 상세 창에서 함께 사용
+발행/출고 시 변경된 위치만 다시 계산
+"""
+
+import pandas as pd
+
+DETAIL_COLUMNS = ["구분", "제품코드", "제품명", "LOT", "유통기한", "폐기일자", "발행일시"]
+
+
+def disposal_dates(df):
+    """폐기일자 계산 (저장된 값이 없으면 유통기한 + 1년)"""
+    expiry = pd.to_datetime(df["유통기한"], errors="coerce")
+    computed = expiry + pd.DateOffset(years=1)
+    if "폐기일자" in df.columns:
+        stored = pd.to_datetime(df["폐기일자"].where(df["폐기일자"] != "N/A"), errors="coerce")
+        return stored.fillna(computed)
+    return computed
+
+
+def summarize(df, now=None):
+    """위치별 집계 계산 (벡터 연산)
+
+    반환값: {보관위치: {"라벨수", "제품수", "폐기일자", "제품별"}}
+    """
+    if df is None or df.empty:
+        return {}
+    now = now or pd.Timestamp.now()
+    frame = pd.DataFrame({
+        "보관위치": df["보관위치"].values,
+        "제품코드": df["제품코드"].values,
+        "제품명": df["제품명"].values,
+        "폐기일": disposal_dates(df).values,
+    })
+    frame["차이"] = (frame["폐기일"] - now).abs()
+
+    counts = frame.groupby("보관위치", sort=False).size()
+    products = frame.groupby("보관위치", sort=False)["제품명"].nunique()
+
+    # 현재 시점에서 가장 가까운 폐기일자
+    dated = frame.dropna(subset=["차이"])
+    nearest = dated.loc[dated.groupby("보관위치", sort=False)["차이"].idxmin(), ["보관위치", "폐기일"]]
+    nearest = dict(zip(nearest["보관위치"], nearest["폐기일"].dt.strftime("%Y-%m-%d")))
+
+    # 제품별 수량
+    breakdown = {}
+    per_product = frame.groupby(["보관위치", "제품코드", "제품명"], sort=False, dropna=False).size()
+    for (location, code, name), quantity in per_product.items():
+        breakdown.setdefault(location, {})[code] = {"제품명": name, "수량": int(quantity)}
+
+    return {
+        location: {
+            "라벨수": int(count),
+            "제품수": int(products.get(location, 0)),
+            "폐기일자": nearest.get(location, "N/A"),
+            "제품별": breakdown.get(location, {}),
+        }
+        for location, count in counts.items()
+    }
+
+
+DASHBOARD_COLUMNS = ["보관위치", "구분", "제품코드", "제품명", "수량", "최신LOT", "최신유통기한", "최신폐기일자"]
+
+
+def dashboard_rows(df, now=None):
+    """대시보드 집계: (보관위치, 구분, 제품코드, 제품명)별 수량과
+    현재 시점에서 유통기한이 가장 가까운 라벨의 LOT/유통기한/폐기일자 (한 번의 벡터 연산)
+    """
+    keys = ["보관위치", "구분", "제품코드", "제품명"]
+    if df is None or df.empty:
+        return pd.DataFrame(columns=DASHBOARD_COLUMNS)
+    now = now or pd.Timestamp.now()
+    frame = df[keys].reset_index(drop=True)
+    frame["LOT"] = df["LOT"].values if "LOT" in df.columns else None
+    frame["유통기한"] = pd.to_datetime(df["유통기한"], errors="coerce").values
+    frame["폐기일자"] = disposal_dates(df).values
+    frame["차이"] = (frame["유통기한"] - now).dt.days.abs()
+
+    grouped = frame.groupby(keys, sort=True).size().rename("수량").reset_index()
+
+    # 그룹별 유통기한이 가장 가까운 행 (동률이면 먼저 발행된 행)
+    dated = frame.dropna(subset=["차이"])
+    closest = dated.loc[dated.groupby(keys, sort=False)["차이"].idxmin(), keys + ["LOT", "유통기한", "폐기일자"]]
+    closest = closest.rename(columns={"LOT": "최신LOT", "유통기한": "최신유통기한", "폐기일자": "최신폐기일자"})
+    closest["최신LOT"] = closest["최신LOT"].astype(str)
+    closest["최신유통기한"] = closest["최신유통기한"].dt.strftime("%Y-%m-%d")
+    closest["최신폐기일자"] = closest["최신폐기일자"].dt.strftime("%Y-%m-%d").fillna("N/A")
+
+    result = grouped.merge(closest, on=keys, how="left")
+    result[["최신LOT", "최신유통기한", "최신폐기일자"]] = result[["최신LOT", "최신유통기한", "최신폐기일자"]].fillna("N/A")
+    return result[DASHBOARD_COLUMNS]
+
+
+class LocationAggregate:
+    """보관위치별 집계 (행 단위 추가/제거 시 해당 위치만 갱신)"""
+
+    def __init__(self, df=None):
+        self.rebuild(df)
+
+    def rebuild(self, df):
+        """전체 재계산 후 모든 위치를 변경 목록에 추가"""
+        self.frames = {}
+        self.row_locations = {}
+        self.summaries = {}
+        self.dirty = set()
+        if df is None or df.empty:
+            return
+        self.frames = {location: frame for location, frame in df.groupby("보관위치", sort=False)}
+        self.row_locations = dict(zip(df.index.tolist(), df["보관위치"].tolist()))
+        self.summaries = summarize(df)
+        self.dirty = set(self.frames)
+
+    def add_rows(self, df):
+        """새로 발행된 행 반영 후 변경된 위치 목록 반환"""
+        if df is None or df.empty:
+            return set()
+        changed = set()
+        for location, frame in df.groupby("보관위치", sort=False):
+            current = self.frames.get(location)
+            self.frames[location] = frame if current is None else pd.concat([current, frame])
+            changed.add(location)
+        self.row_locations.update(zip(df.index.tolist(), df["보관위치"].tolist()))
+        self._refresh(changed)
+        return changed
+
+    def remove_rows(self, row_ids):
+        """출고/삭제된 행 제거 후 변경된 위치 목록 반환"""
+        by_location = {}
+        for row_id in row_ids:
+            location = self.row_locations.pop(row_id, None)
+            if location is not None:
+                by_location.setdefault(location, []).append(row_id)
+        for location, ids in by_location.items():
+            frame = self.frames[location].drop(ids)
+            if frame.empty:
+                del self.frames[location]
+            else:
+                self.frames[location] = frame
+        changed = set(by_location)
+        self._refresh(changed)
+        return changed
+
+    def _refresh(self, locations):
+        """지정한 위치의 집계만 다시 계산"""
+        for location in locations:
+            frame = self.frames.get(location)
+            if frame is None:
+                self.summaries.pop(location, None)
+            else:
+                self.summaries.update(summarize(frame))
+        self.dirty |= set(locations)
+
+    def pop_dirty(self):
+        """마지막 호출 이후 집계가 바뀐 위치 목록"""
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def summary(self, location):
+        """위치 집계 (라벨이 없으면 None)"""
+        return self.summaries.get(location)
+
+    def rows(self, location):
+        """위치에 있는 라벨 행 (DataFrame)"""
+        frame = self.frames.get(location)
+        return frame if frame is not None else pd.DataFrame(columns=DETAIL_COLUMNS)
+
+    def detail_rows(self, location, columns=DETAIL_COLUMNS):
+        """상세 창 Treeview에 넣을 값 목록 (폐기일자 계산 포함)"""
+        frame = self.frames.get(location)
+        if frame is None:
+            return []
+        values = frame.reindex(columns=[c for c in columns if c != "폐기일자"]).fillna("")
+        if "폐기일자" in columns:
+            disposal = disposal_dates(frame).dt.strftime("%Y-%m-%d").fillna("N/A")
+            values.insert(columns.index("폐기일자"), "폐기일자", disposal.values)
+        return list(values.itertuples(index=False, name=None))
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보관위치 바코드 일괄 생성 (zone_config.json 기준)
+구역 설정의 모든 구역(또는 선택한 구역)의 보관위치(구역-행-열) 바코드를 프로세스 풀에서 병렬로 생성
+
+- 바코드 모양은 기존 일괄 생성과 같음 (python-barcode Code128, 글자 포함, RENDER_OPTIONS)
+- 이미 같은 내용의 이미지가 있으면 건너뜀: 출력 폴더의 .barcode_hashes.json에
+  보관위치별 (입력 키, 파일 SHA-256)을 기록하고, 입력 키(위치 + 옵션 + 라이브러리 버전)가 같고
+  파일 해시도 기록과 같으면 렌더링하지 않음
+  다시 렌더링한 결과가 기존 파일과 같으면 파일을 덮어쓰지 않음
+- 결과는 폴더(보관위치별 JPEG) 또는 라벨 시트 파일 하나 (label_sheet, A4 격자 PDF 등)
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import time
+
+from label_batch import make_executor
+import label_sheet
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ZONE_CONFIG_FILE = os.path.join(SCRIPT_DIR, "zone_config.json")
+OUTPUT_DIR = os.path.join(SCRIPT_DIR, "barcodejpg")
+HASH_FILE = ".barcode_hashes.json"
+
+# 기존 일괄 생성과 같은 바코드 설정
+RENDER_OPTIONS = {
+    'font_size': 8,
+    'text_distance': 3.0,
+    'module_height': 8.0,
+    'module_width': 0.2,
+    'quiet_zone': 0.7,
+    'write_text': True
+}
+
+
+class LocationBarcodeResult:
+    def __init__(self, files, generated, skipped, failed, sheet_file, elapsed, workers):
+        self.files = files            # 보관위치 순서대로 이미지 경로
+        self.generated = generated    # 새로 만들었거나 내용이 바뀐 보관위치
+        self.skipped = skipped        # 같은 내용이 이미 있어서 건너뛴 보관위치
+        self.failed = failed          # [(보관위치, 오류 메시지)]
+        self.sheet_file = sheet_file
+        self.elapsed = elapsed
+        self.workers = workers
+
+    def report(self):
+        message = (f"보관위치 바코드 {len(self.files)}개: 생성 {len(self.generated)}개, "
+                   f"건너뜀(동일) {len(self.skipped)}개, 실패 {len(self.failed)}개 "
+                   f"({self.elapsed:.2f}초, 작업 프로세스 {self.workers}개)")
+        if self.sheet_file:
+            message += f"\n인쇄용 시트: {self.sheet_file}"
+        return message
+
+
+def load_zones(config_file=ZONE_CONFIG_FILE):
+    """구역 설정 -> {구역 코드: 구역 정보}"""
+    with open(config_file, 'r', encoding='utf-8') as f:
+        return json.load(f).get('zones', {})
+
+
+def load_locations(zones=None, config_file=ZONE_CONFIG_FILE):
+    """구역 설정 -> 보관위치 목록 (구역-행-열, 설정 순서), zones를 주면 해당 구역만"""
+    all_zones = load_zones(config_file)
+    if zones:
+        unknown = [zone for zone in zones if zone not in all_zones]
+        if unknown:
+            raise ValueError(f"존재하지 않는 구역입니다: {', '.join(unknown)}")
+
+    locations = []
+    for zone_code, zone_data in all_zones.items():
+        if zones and zone_code not in zones:
+            continue
+        rows = zone_data.get('sections', {}).get('rows', 5)
+        columns = zone_data.get('sections', {}).get('columns', 3)
+        for row in range(1, rows + 1):
+            for col in range(1, columns + 1):
+                locations.append(f"{zone_code}-{row:02d}-{col:02d}")
+    return locations
+
+
+def render_key(location):
+    """렌더링 입력 키 (보관위치, 바코드 옵션, 라이브러리 버전이 같으면 결과 이미지도 같음)"""
+    import barcode
+    import PIL
+    source = json.dumps([location, RENDER_OPTIONS, barcode.version, PIL.__version__], sort_keys=True)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def render_location(location):
+    """보관위치 바코드 JPEG bytes"""
+    import barcode
+    from barcode.writer import ImageWriter
+
+    image = barcode.get_barcode_class("code128")(location, writer=ImageWriter()).render(RENDER_OPTIONS)
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _render_chunk(output_dir, locations):
+    """작업 프로세스: 보관위치 여러 개 렌더링, 내용이 바뀐 파일만 저장
+
+    [(보관위치, 입력 키, 파일 해시, 저장 여부, 오류)] 반환
+    """
+    results = []
+    for location in locations:
+        try:
+            data = render_location(location)
+            digest = hashlib.sha256(data).hexdigest()
+            path = os.path.join(output_dir, f"{location}.jpeg")
+            written = not (os.path.exists(path) and file_hash(path) == digest)
+            if written:
+                with open(path, 'wb') as f:
+                    f.write(data)
+            results.append((location, render_key(location), digest, written, None))
+        except Exception as e:
+            results.append((location, None, None, False, str(e)))
+    return results
+
+
+def _load_hashes(output_dir):
+    path = os.path.join(output_dir, HASH_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"바코드 해시 기록 읽기 실패 (전체 다시 생성): {e}")
+        return {}
+
+
+def _save_hashes(output_dir, hashes):
+    path = os.path.join(output_dir, HASH_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def generate_location_barcodes(zones=None, output_dir=OUTPUT_DIR, sheet=None, max_workers=None,
+                               progress=None, spawn_safe=False, config_file=ZONE_CONFIG_FILE):
+    """보관위치 바코드 일괄 생성
+
+    zones: 생성할 구역 코드 목록 (None이면 전체)
+    sheet: 라벨 시트 용지 이름 (예: "A4-40x30"), 주면 시트 PDF 파일 하나도 저장
+    progress(done, total): 진행 상황 알림 (호출한 스레드에서 호출됨)
+    spawn_safe: 메인 스크립트가 if __name__ == "__main__"으로 보호되어 있으면 True
+    """
+    start = time.perf_counter()
+    locations = load_locations(zones, config_file)
+    os.makedirs(output_dir, exist_ok=True)
+    hashes = _load_hashes(output_dir)
+
+    # 입력 키와 파일 해시가 모두 기록과 같으면 렌더링하지 않음
+    skipped, pending = [], []
+    for location in locations:
+        recorded = hashes.get(location, {})
+        path = os.path.join(output_dir, f"{location}.jpeg")
+        if (recorded.get("key") == render_key(location) and os.path.exists(path)
+                and file_hash(path) == recorded.get("sha256")):
+            skipped.append(location)
+        else:
+            pending.append(location)
+    if progress:
+        progress(len(skipped), len(locations))
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(pending)))
+    chunk_size = max(1, math.ceil(len(pending) / (workers * 4)))
+    chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+
+    generated, failed = [], []
+    done = len(skipped)
+    executor = make_executor(workers, spawn_safe) if workers > 1 else None
+    try:
+        results = (executor.map(_render_chunk, [output_dir] * len(chunks), chunks)
+                   if executor else (_render_chunk(output_dir, chunk) for chunk in chunks))
+        for chunk_results in results:
+            for location, key, digest, written, error in chunk_results:
+                if error:
+                    failed.append((location, error))
+                    print(f"생성 실패: {location} - {error}")
+                    continue
+                hashes[location] = {"key": key, "sha256": digest}
+                (generated if written else skipped).append(location)
+            done += len(chunk_results)
+            if progress:
+                progress(done, len(locations))
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        _save_hashes(output_dir, hashes)
+
+    failed_locations = {location for location, _ in failed}
+    files = [os.path.join(output_dir, f"{location}.jpeg") for location in locations
+             if location not in failed_locations]
+    sheet_file = None
+    if sheet and files:
+        sheet_file = label_sheet.sheet_path(output_dir, "locations")
+        label_sheet.write_sheets(files, sheet_file, sheet)
+
+    result = LocationBarcodeResult(files, generated, skipped, failed, sheet_file,
+                                   time.perf_counter() - start, workers)
+    print(result.report())
+    return result
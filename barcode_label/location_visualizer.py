@@ -17,41 +17,26 @@ import time
 import threading
 from datetime import datetime
 
-# 발행 이력 파일
-history_file = "barcode_label/issue_history.xlsx"
-products_file = "barcode_label/products.xlsx"
+# 발행 이력 저장소
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from issue_history_store import history_store
+from location_aggregate import LocationAggregate, summarize
+from product_catalog import product_catalog
+
 zone_config_file = "barcode_label/zone_config.json"
 
 def load_inventory():
     """발행 이력 로드"""
-    if not os.path.exists(history_file):
-        messagebox.showerror("오류", "발행 이력이 없습니다.")
+    try:
+        return history_store.load_dataframe()
+    except Exception as e:
+        messagebox.showerror("오류", f"발행 이력을 불러올 수 없습니다: {e}")
         return pd.DataFrame()
-    df = pd.read_excel(history_file)
-    return df
 
 def load_products():
-    """제품 정보 로드"""
-    if not os.path.exists(products_file):
-        messagebox.showerror("오류", "제품 정보 파일이 없습니다.")
-        return {}, {}
-    
-    try:
-        df = pd.read_excel(products_file)
-        products_dict = dict(zip(df['제품코드'].astype(str), df['제품명']))
-        
-        # 바코드 정보도 함께 로드 (바코드 컬럼이 있는 경우)
-        barcode_dict = {}
-        if '바코드' in df.columns:
-            for _, row in df.iterrows():
-                barcode = str(row['바코드']).strip()
-                if barcode and barcode != 'nan':
-                    barcode_dict[barcode] = str(row['제품코드'])
-        
-        return products_dict, barcode_dict
-    except Exception as e:
-        messagebox.showerror("오류", f"제품 정보 로드 중 오류: {e}")
-        return {}, {}
+    """제품 정보 로드 (공용 제품 카탈로그 캐시)"""
+    catalog = product_catalog.load()
+    return catalog.products, catalog.barcodes
 
 def load_zone_config():
     """구역 설정 로드"""
@@ -97,9 +82,12 @@ class LocationVisualizer:
         self.root.geometry("1400x900")
         
         # 데이터 로드
+        self.synced_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.df = load_inventory()
+        self.locations = LocationAggregate(self.df)
         self.products, self.barcode_to_product = load_products()
         self.zone_config = load_zone_config()
+        self.showing_search = False  # 그리드에 검색 결과가 표시 중인지
         
         # 파일 감시 관련 변수
         self.last_config_mtime = os.path.getmtime(zone_config_file) if os.path.exists(zone_config_file) else 0
@@ -451,11 +439,30 @@ class LocationVisualizer:
         self.create_dynamic_grid()
     
     def refresh_data(self):
-        """데이터 새로고침 및 그리드 업데이트"""
-        self.df = load_inventory()
+        """데이터 새로고침 및 그리드 업데이트 (발행 이력은 바뀐 행만 반영)
+
+        검색 결과가 표시 중이거나 구역 설정이 바뀌었으면 전체 그리드를 다시 그림
+        """
+        self.sync_inventory()
         self.products, self.barcode_to_product = load_products()
-        self.zone_config = load_zone_config()
-        self.update_dynamic_grid()
+        zone_config = load_zone_config()
+        config_changed = zone_config != self.zone_config
+        self.zone_config = zone_config
+        if config_changed:
+            self.create_dynamic_grid()
+        self.update_dynamic_grid(changed_only=not (config_changed or self.showing_search))
+    
+    def sync_inventory(self):
+        """마지막 동기화 이후 발행/출고된 행만 self.df와 위치별 집계에 반영"""
+        last_id = int(self.df.index.max()) if not self.df.empty else 0
+        new_rows, removed_ids, self.synced_at = history_store.changes_since(last_id, self.synced_at)
+        removed_ids = [row_id for row_id in removed_ids if row_id in self.locations.row_locations]
+        if removed_ids:
+            self.df = self.df.drop(removed_ids)
+            self.locations.remove_rows(removed_ids)
+        if not new_rows.empty:
+            self.df = pd.concat([self.df, new_rows]) if not self.df.empty else new_rows
+            self.locations.add_rows(new_rows)
     
     def update_grid(self):
         """그리드 업데이트 (동적 그리드 사용)"""
@@ -592,14 +599,10 @@ class LocationVisualizer:
 
     def show_location_detail_in_window(self, location, window, restore_callback):
         """지정된 창에 위치 상세 정보 표시"""
-        if self.df.empty:
-            restore_callback()
-            return
+        # 위치별 집계에서 해당 위치 데이터 조회
+        summary = self.locations.summary(location)
         
-        # 해당 위치의 데이터 필터링
-        location_df = self.df[self.df["보관위치"] == location]
-        
-        if location_df.empty:
+        if summary is None:
             # 라벨이 없는 경우 라벨 생성 옵션 제공
             # 창을 먼저 닫고 메시지 박스 표시
             window.destroy()
@@ -620,22 +623,8 @@ class LocationVisualizer:
         stats_frame = tk.Frame(window)
         stats_frame.pack(pady=10)
         
-        # Fix: Ensure location_df["제품명"] is a Series, not ndarray
-        if isinstance(location_df, pd.DataFrame):
-            try:
-                unique_products = location_df["제품명"].dropna().nunique()
-            except Exception:
-                unique_products = len(set(location_df["제품명"]))
-        else:
-            # fallback for non-DataFrame
-            try:
-                unique_products = len(set([row["제품명"] for _, row in location_df.iterrows() if row["제품명"]]))
-            except Exception:
-                unique_products = 0
-        total_items = len(location_df)
-        
-        tk.Label(stats_frame, text=f"총 제품 수: {unique_products}개", font=("맑은 고딕", 10)).pack()
-        tk.Label(stats_frame, text=f"총 라벨 수: {total_items}개", font=("맑은 고딕", 10)).pack()
+        tk.Label(stats_frame, text=f"총 제품 수: {summary['제품수']}개", font=("맑은 고딕", 10)).pack()
+        tk.Label(stats_frame, text=f"총 라벨 수: {summary['라벨수']}개", font=("맑은 고딕", 10)).pack()
         
         # 상세 테이블
         tree_frame = tk.Frame(window)
@@ -667,37 +656,9 @@ class LocationVisualizer:
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # 데이터 추가
-        for _, row in location_df.iterrows():
-            # 폐기일자 계산 (기존 데이터에 폐기일자가 없는 경우)
-            disposal_date = row.get("폐기일자", "N/A")
-            is_na = False
-            try:
-                is_na = bool(pd.isna(disposal_date))
-            except Exception:
-                is_na = disposal_date is None
-            if disposal_date == "N/A" or (isinstance(disposal_date, str) and disposal_date == "N/A") or is_na:
-                try:
-                    expiry_date = pd.to_datetime(row["유통기한"])
-                    if isinstance(expiry_date, pd.Timestamp):
-                        disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                        disposal_date = disposal_date.strftime("%Y-%m-%d")
-                    else:
-                        disposal_date = "N/A"
-                except:
-                    disposal_date = "N/A"
-            else:
-                disposal_date = str(disposal_date)
-                
-            tree.insert("", "end", values=(
-                row["구분"],
-                row["제품코드"],
-                row["제품명"],
-                row["LOT"],
-                row["유통기한"],
-                disposal_date,
-                row["발행일시"]
-            ))
+        # 데이터 추가 (폐기일자가 없으면 유통기한 + 1년)
+        for values in self.locations.detail_rows(location):
+            tree.insert("", "end", values=values)
         
         # 라벨 생성 버튼 추가
         button_frame = tk.Frame(window)
@@ -716,7 +677,7 @@ class LocationVisualizer:
                              relief=tk.FLAT, bd=0, padx=15, pady=5)
         close_btn.pack(side=tk.LEFT, padx=5)
 
-    def update_cell(self, cell, location, items, is_search_result=False):
+    def update_cell(self, cell, location, summary, is_search_result=False):
         # 구역 수에 따른 동적 폰트 크기 계산
         total_zones = len(self.zone_config["zones"])
         if total_zones <= 2:
@@ -731,37 +692,18 @@ class LocationVisualizer:
         # 원래 relief 상태 보존
         original_relief = cell.cget("relief")
         
-        if not items:
+        if not summary:
             # 빈 위치
             cell.config(text=f"{location}\n\n(빈 위치)", 
                        bg="#f5f5f5", fg="gray", font=("맑은 고딕", font_size),
                        relief=original_relief)  # 원래 relief 상태 유지
         else:
-            # 아이템이 있는 위치
-            unique_products = len(set(item["제품명"] for item in items))
-            total_items = len(items)
+            # 아이템이 있는 위치 (위치별 집계 사용)
+            unique_products = summary["제품수"]
+            total_items = summary["라벨수"]
             
-            # 최신 폐기일자 확인 (현재 시점에서 가장 가까운 날짜)
-            try:
-                current_date = pd.Timestamp.now()
-                disposal_dates = []
-                for item in items:
-                    try:
-                        # 폐기일자 계산
-                        expiry_date = pd.to_datetime(item["유통기한"])
-                        disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                        disposal_dates.append(disposal_date)
-                    except:
-                        continue
-                if disposal_dates:
-                    # 현재 날짜와의 차이를 계산하여 가장 가까운 날짜 찾기
-                    closest_disposal = min(disposal_dates, key=lambda x: abs((x - current_date).days))
-                    latest_disposal_str = closest_disposal.strftime("%Y-%m-%d")
-                else:
-                    latest_disposal_str = "N/A"
-            except Exception as e:
-                print(f"날짜 계산 오류: {e}")
-                latest_disposal_str = "N/A"
+            # 현재 시점에서 가장 가까운 폐기일자
+            latest_disposal_str = summary["폐기일자"]
             
             # 검색 결과인지 여부에 따라 배경색 결정
             if is_search_result:
@@ -778,13 +720,10 @@ class LocationVisualizer:
     
     def show_location_detail(self, location):
         """위치 상세 정보 표시 (기존 방식 - 호환성 유지)"""
-        if self.df.empty:
-            return
-        
-        # 해당 위치의 데이터 필터링
-        location_df = self.df[self.df["보관위치"] == location]
+        # 위치별 집계에서 해당 위치 데이터 조회
+        summary = self.locations.summary(location)
         
-        if location_df.empty:
+        if summary is None:
             # 라벨이 없는 경우 라벨 생성 옵션 제공
             result = messagebox.askyesno("위치 정보", 
                                        f"{location}\n\n이 위치에는 아직 라벨이 발행되지 않았습니다.\n\n이 위치에 새 라벨을 생성하시겠습니까?")
@@ -806,20 +745,8 @@ class LocationVisualizer:
         stats_frame = tk.Frame(detail_window)
         stats_frame.pack(pady=10)
         
-        if isinstance(location_df, pd.DataFrame):
-            try:
-                unique_products = location_df["제품명"].dropna().nunique()
-            except Exception:
-                unique_products = len(set(location_df["제품명"]))
-        else:
-            try:
-                unique_products = len(set([row["제품명"] for _, row in location_df.iterrows() if row["제품명"]]))
-            except Exception:
-                unique_products = 0
-        total_items = len(location_df)
-        
-        tk.Label(stats_frame, text=f"총 제품 수: {unique_products}개", font=("맑은 고딕", 10)).pack()
-        tk.Label(stats_frame, text=f"총 라벨 수: {total_items}개", font=("맑은 고딕", 10)).pack()
+        tk.Label(stats_frame, text=f"총 제품 수: {summary['제품수']}개", font=("맑은 고딕", 10)).pack()
+        tk.Label(stats_frame, text=f"총 라벨 수: {summary['라벨수']}개", font=("맑은 고딕", 10)).pack()
         
         # 상세 테이블
         tree_frame = tk.Frame(detail_window)
@@ -851,37 +778,9 @@ class LocationVisualizer:
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # 데이터 추가
-        for _, row in location_df.iterrows():
-            # 폐기일자 계산 (기존 데이터에 폐기일자가 없는 경우)
-            disposal_date = row.get("폐기일자", "N/A")
-            is_na = False
-            try:
-                is_na = bool(pd.isna(disposal_date))
-            except Exception:
-                is_na = disposal_date is None
-            if disposal_date == "N/A" or (isinstance(disposal_date, str) and disposal_date == "N/A") or is_na:
-                try:
-                    expiry_date = pd.to_datetime(row["유통기한"])
-                    if isinstance(expiry_date, pd.Timestamp):
-                        disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                        disposal_date = disposal_date.strftime("%Y-%m-%d")
-                    else:
-                        disposal_date = "N/A"
-                except:
-                    disposal_date = "N/A"
-            else:
-                disposal_date = str(disposal_date)
-                
-            tree.insert("", "end", values=(
-                row["구분"],
-                row["제품코드"],
-                row["제품명"],
-                row["LOT"],
-                row["유통기한"],
-                disposal_date,
-                row["발행일시"]
-            ))
+        # 데이터 추가 (폐기일자가 없으면 유통기한 + 1년)
+        for values in self.locations.detail_rows(location):
+            tree.insert("", "end", values=values)
         
         # 라벨 생성 버튼 추가
         button_frame = tk.Frame(detail_window)
@@ -1197,23 +1096,10 @@ class LocationVisualizer:
         except:
             pass
     
-    def update_dynamic_grid(self):
-        """동적 그리드 업데이트"""
-        if self.df.empty:
-            return
-        
-        # 각 위치별 데이터 집계
-        location_data = {}
-        for _, row in self.df.iterrows():
-            location = row["보관위치"]
-            if location not in location_data:
-                location_data[location] = []
-            location_data[location].append({
-                "제품명": row["제품명"],
-                "LOT": row["LOT"],
-                "유통기한": row["유통기한"],
-                "발행일시": row["발행일시"]
-            })
+    def update_dynamic_grid(self, changed_only=False):
+        """동적 그리드 업데이트 (changed_only면 집계가 바뀐 위치만)"""
+        changed = self.locations.pop_dirty()
+        self.showing_search = False
         
         # 각 구역별로 그리드 업데이트
         for zone_code, zone_data in self.zone_config["zones"].items():
@@ -1226,11 +1112,14 @@ class LocationVisualizer:
             for row in range(sections["rows"]):
                 for col in range(sections["columns"]):
                     location = f"{zone_code}-{row+1:02d}-{col+1:02d}"
+                    if changed_only and location not in changed:
+                        continue
                     cell = zone_grid[row][col]
-                    self.update_cell(cell, location, location_data.get(location, []), is_search_result=False)
+                    self.update_cell(cell, location, self.locations.summary(location), is_search_result=False)
     
     def update_dynamic_grid_with_data(self, filtered_df):
         """필터링된 데이터로 동적 그리드 업데이트"""
+        self.showing_search = True
         if filtered_df.empty:
             # 모든 셀을 빈 상태로 설정
             for zone_code, zone_data in self.zone_config["zones"].items():
@@ -1251,18 +1140,8 @@ class LocationVisualizer:
                                    relief=original_relief)
             return
         
-        # 각 위치별 데이터 집계
-        location_data = {}
-        for _, row in filtered_df.iterrows():
-            location = row["보관위치"]
-            if location not in location_data:
-                location_data[location] = []
-            location_data[location].append({
-                "제품명": row["제품명"],
-                "LOT": row["LOT"],
-                "유통기한": row["유통기한"],
-                "발행일시": row["발행일시"]
-            })
+        # 검색 결과의 위치별 집계 (벡터 연산)
+        location_data = summarize(filtered_df)
         
         # 각 구역별로 그리드 업데이트
         for zone_code, zone_data in self.zone_config["zones"].items():
@@ -1276,7 +1155,7 @@ class LocationVisualizer:
                 for col in range(sections["columns"]):
                     location = f"{zone_code}-{row+1:02d}-{col+1:02d}"
                     cell = zone_grid[row][col]
-                    self.update_cell(cell, location, location_data.get(location, []), is_search_result=True)
+                    self.update_cell(cell, location, location_data.get(location), is_search_result=True)
 
 def main():
     root = tk.Tk()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 프린터 인쇄 대기열
+ZPL(또는 ZPL 그래픽으로 바꾼 라벨 이미지)을 SQLite 대기열에 넣고
+작업 스레드가 프린터로 직접 전송 (임시 파일/인쇄 대화상자 없음)
+
+- 전송 방식: raw TCP 9100 (tcp://호스트:포트) 또는 CUPS raw (lp://프린터이름, lp -o raw)
+- 대기 중인 작업은 최대 BATCH_BYTES까지 묶어서 한 번에 전송
+- 여러 프로그램(label_gui, barcode_printing, streamlit_app)이 같은 print_queue.db를 쓰므로
+  보낼 작업은 트랜잭션 안에서 sending으로 바꿔 가져가고(claim), 전송 중인 묶음이 있으면 기다림
+  (같은 작업을 두 번 인쇄하지 않고 순서 유지), 전송 중 종료되어 CLAIM_TIMEOUT이 지난 작업은 다시 대기 상태로
+- 실패하면 지수 백오프로 재시도, MAX_ATTEMPTS번 실패하면 failed 처리
+- 프로그램이 종료되어도 대기 중인 작업은 print_queue.db에 남아 다음 실행 때 이어서 전송
+- 상태 변경은 on_status(kind, job_ids, message) 콜백으로 알림 (작업 스레드에서 호출되므로
+  Tk에서는 root.after 등으로 메인 스레드에 넘겨서 화면에 반영)
+
+프린터 설정: 환경 변수 LABEL_PRINTER 또는 printer_config.json {"uri": "tcp://192.168.0.50:9100"}
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import subprocess
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PRINTER_CONFIG_FILE = os.path.join(SCRIPT_DIR, "printer_config.json")
+
+# 한 번에 묶어서 보낼 최대 크기
+BATCH_BYTES = 256 * 1024
+
+# 재시도 (1초, 2초, 4초 ... 최대 30초 간격)
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# 전송 중(sending) 상태로 이 시간이 지나면 가져간 프로그램이 종료된 것으로 보고 다시 대기 상태로
+CLAIM_TIMEOUT = 300.0
+
+PENDING, SENDING, DONE, FAILED = "pending", "sending", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS print_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    description TEXT,
+    payload BLOB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    printed_at TEXT,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_print_jobs_status ON print_jobs(status, id);
+"""
+
+
+class TcpTransport:
+    """raw TCP (Zebra 기본 9100 포트)"""
+
+    def __init__(self, host, port=9100, timeout=10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def send(self, payload):
+        with socket.create_connection((self.host, self.port), timeout=self.timeout) as sock:
+            sock.sendall(payload)
+
+    def __str__(self):
+        return f"tcp://{self.host}:{self.port}"
+
+
+class LpTransport:
+    """CUPS raw 대기열 (lp -o raw, 표준 입력으로 전달하므로 임시 파일 없음)"""
+
+    def __init__(self, printer=None, timeout=30):
+        self.printer = printer
+        self.timeout = timeout
+
+    def send(self, payload):
+        command = ["lp", "-o", "raw"] + (["-d", self.printer] if self.printer else [])
+        result = subprocess.run(command, input=payload, capture_output=True, timeout=self.timeout)
+        if result.returncode != 0:
+            raise OSError(f"lp 실패: {result.stderr.decode(errors='replace').strip()}")
+
+    def __str__(self):
+        return f"lp://{self.printer or ''}"
+
+
+def transport_from_uri(uri):
+    """tcp://호스트[:포트] 또는 lp://[프린터이름] -> 전송 객체"""
+    parsed = urlparse(uri)
+    if parsed.scheme == "tcp":
+        return TcpTransport(parsed.hostname, parsed.port or 9100)
+    if parsed.scheme == "lp":
+        return LpTransport(parsed.netloc or None)
+    raise ValueError(f"지원하지 않는 프린터 주소입니다: {uri}")
+
+
+def printer_uri():
+    """설정된 프린터 주소 (없으면 None)"""
+    uri = os.environ.get("LABEL_PRINTER")
+    if uri:
+        return uri
+    if os.path.exists(PRINTER_CONFIG_FILE):
+        try:
+            with open(PRINTER_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f).get("uri")
+        except Exception as e:
+            print(f"프린터 설정 읽기 실패: {e}")
+    return None
+
+
+class PrintQueue:
+    def __init__(self, transport, db_path=None, on_status=None, batch_bytes=BATCH_BYTES,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX):
+        self.transport = transport
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, "print_queue.db")
+        self.batch_bytes = batch_bytes
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._listeners = [on_status] if on_status else []
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    self._initialized = True
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        """이전 버전 print_queue.db에 claim 컬럼 추가"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(print_jobs)")}
+        for name, kind in (("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+            if name not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE print_jobs ADD COLUMN {name} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # 다른 프로그램이 먼저 추가함
+
+    def subscribe(self, callback):
+        """상태 알림 함수 등록 (callback(kind, job_ids, message), 작업 스레드에서 호출됨)"""
+        self._listeners.append(callback)
+
+    def _notify(self, kind, job_ids, message):
+        for callback in list(self._listeners):
+            try:
+                callback(kind, job_ids, message)
+            except Exception as e:
+                print(f"인쇄 상태 알림 오류: {e}")
+
+    def submit(self, payload, description=""):
+        """인쇄 작업 추가 (ZPL 문자열 또는 bytes) 후 작업 번호 반환"""
+        if isinstance(payload, str):
+            payload = payload.encode("utf-8")
+        cursor = self._connect().execute(
+            "INSERT INTO print_jobs (created_at, description, payload) VALUES (?, ?, ?)",
+            (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), description, payload)
+        )
+        job_id = cursor.lastrowid
+        self._notify("queued", [job_id], description)
+        self.start()
+        self._wakeup.set()
+        return job_id
+
+    def submit_image(self, image, description=""):
+        """라벨 이미지를 ZPL 그래픽(Z64)으로 바꿔 인쇄 작업 추가"""
+        import zpl_graphic
+        return self.submit(zpl_graphic.image_to_zpl(image, zpl_graphic.Z64), description)
+
+    def pending_count(self):
+        """대기 중이거나 전송 중인 작업 수"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM print_jobs WHERE status IN (?, ?)", (PENDING, SENDING)
+        ).fetchone()[0]
+
+    def retry_failed(self):
+        """failed 작업을 다시 대기 상태로"""
+        self._connect().execute(
+            "UPDATE print_jobs SET status = ?, attempts = 0 WHERE status = ?", (PENDING, FAILED)
+        )
+        self._wakeup.set()
+
+    def start(self):
+        """작업 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="print-queue", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def wait_idle(self, timeout=None):
+        """대기 중인 작업이 모두 끝날 때까지 대기 (전송 성공/실패 무관), 끝나면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending_count():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def _next_batch(self):
+        """대기 작업을 순서대로 BATCH_BYTES까지 가져감 (첫 작업은 크기와 관계없이 포함)
+
+        트랜잭션 안에서 sending으로 바꾸므로 다른 프로그램의 작업 스레드는 같은 작업을 가져가지 못함
+        다른 곳에서 전송 중인 묶음이 있으면 순서를 지키기 위해 빈 목록 반환
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 가져간 프로그램이 전송 중에 종료된 작업은 다시 대기 상태로
+            conn.execute(
+                "UPDATE print_jobs SET status = ?, claimed_by = NULL, claimed_at = NULL "
+                "WHERE status = ? AND claimed_at < ?", (PENDING, SENDING, now - CLAIM_TIMEOUT)
+            )
+            batch = []
+            if not conn.execute("SELECT 1 FROM print_jobs WHERE status = ? LIMIT 1", (SENDING,)).fetchone():
+                rows = conn.execute(
+                    "SELECT id, payload, attempts FROM print_jobs WHERE status = ? ORDER BY id LIMIT 1000", (PENDING,)
+                ).fetchall()
+                size = 0
+                for row in rows:
+                    if batch and size + len(row[1]) > self.batch_bytes:
+                        break
+                    batch.append(row)
+                    size += len(row[1])
+                if batch:
+                    job_ids = [row[0] for row in batch]
+                    conn.execute(
+                        f"UPDATE print_jobs SET status = ?, claimed_by = ?, claimed_at = ? "
+                        f"WHERE id IN ({', '.join('?' for _ in job_ids)})",
+                        [SENDING, self.owner, now] + job_ids
+                    )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return batch
+
+    def _run(self):
+        failures = 0
+        while not self._stopping.is_set():
+            try:
+                batch = self._next_batch()
+            except sqlite3.Error as e:
+                print(f"인쇄 대기열 읽기 오류: {e}")
+                batch = []
+            if not batch:
+                self._wakeup.wait(1.0)
+                self._wakeup.clear()
+                continue
+
+            job_ids = [row[0] for row in batch]
+            placeholders = ", ".join("?" for _ in job_ids)
+            conn = self._connect()
+            try:
+                start = time.perf_counter()
+                self.transport.send(b"".join(row[1] for row in batch))
+                conn.execute(
+                    f"UPDATE print_jobs SET status = ?, attempts = attempts + 1, printed_at = ?, last_error = NULL, "
+                    f"claimed_by = NULL, claimed_at = NULL WHERE id IN ({placeholders})",
+                    [DONE, datetime.now().strftime("%Y-%m-%d %H:%M:%S")] + job_ids
+                )
+                failures = 0
+                self._notify("printed", job_ids,
+                             f"{len(job_ids)}건 전송 ({(time.perf_counter() - start) * 1000:.0f}ms, {self.transport})")
+            except Exception as e:
+                failures += 1
+                conn.execute(
+                    f"UPDATE print_jobs SET attempts = attempts + 1, last_error = ?, claimed_by = NULL, "
+                    f"claimed_at = NULL, status = CASE WHEN attempts + 1 >= ? THEN '{FAILED}' ELSE '{PENDING}' END "
+                    f"WHERE id IN ({placeholders})",
+                    [str(e), self.max_attempts] + job_ids
+                )
+                failed = [row[0] for row in conn.execute(
+                    f"SELECT id FROM print_jobs WHERE status = ? AND id IN ({placeholders})", [FAILED] + job_ids)]
+                if failed:
+                    self._notify("failed", failed, f"인쇄 실패 ({self.max_attempts}회): {e}")
+                delay = min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
+                retrying = [job_id for job_id in job_ids if job_id not in failed]
+                if retrying:
+                    self._notify("retrying", retrying, f"프린터 전송 실패: {e} ({delay:.0f}초 후 재시도)")
+                self._stopping.wait(delay)
+
+
+_print_queue = None
+_print_queue_lock = threading.Lock()
+
+
+def get_print_queue():
+    """프린터가 설정되어 있으면 공용 인쇄 대기열 반환 (없으면 None)"""
+    global _print_queue
+    if _print_queue is None:
+        uri = printer_uri()
+        if not uri:
+            return None
+        with _print_queue_lock:
+            if _print_queue is None:
+                _print_queue = PrintQueue(transport_from_uri(uri))
+                _print_queue.start()
+    return _print_queue
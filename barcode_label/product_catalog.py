@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+제품 카탈로그 캐시
+MySQL 제품 정보(제품명, 바코드 -> 제품코드, 유통기한 기준)를 로컬 JSON 파일에 저장해 두고
+모든 프로그램(label_gui, stock_manager, location_visualizer, streamlit_app)이 함께 사용
+
+- 캐시가 TTL 이내면 파일만 읽음
+- TTL이 지났으면 기존 캐시를 바로 반환하고 백그라운드에서 새로 조회 (stale-while-revalidate)
+- DB에 연결할 수 없으면 오래된 캐시 -> products.xlsx -> 기본값 순서로 사용
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 캐시 유효 시간 (초)
+CATALOG_TTL = 60 * 60
+
+# DB 조회 실패 후 다시 시도하기까지 대기 시간 (초)
+RETRY_INTERVAL = 60
+
+DEFAULT_PRODUCTS = {"TEST001": "테스트 제품"}
+
+
+def _plain(value):
+    """JSON 저장용 값 변환 (numpy 숫자, NaN 처리)"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+class CatalogSnapshot:
+    """한 시점의 제품 카탈로그"""
+
+    def __init__(self, products=None, barcodes=None, expiry=None, fetched_at=None, source="default"):
+        self.products = products if products is not None else dict(DEFAULT_PRODUCTS)
+        self.barcodes = barcodes or {}
+        self.expiry = expiry or {}
+        self.fetched_at = fetched_at or 0.0
+        self.source = source
+
+    def age(self):
+        return time.time() - self.fetched_at
+
+    def to_dict(self):
+        return {
+            "fetched_at": self.fetched_at,
+            "products": self.products,
+            "barcodes": self.barcodes,
+            "expiry": self.expiry,
+        }
+
+
+class ProductCatalog:
+    def __init__(self, cache_path=None, ttl=CATALOG_TTL, products_file=None):
+        self.cache_path = cache_path or os.path.join(SCRIPT_DIR, "product_catalog.json")
+        self.products_file = products_file or os.path.join(SCRIPT_DIR, "products.xlsx")
+        self.ttl = ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._last_attempt = 0.0
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """카탈로그가 갱신될 때 호출할 함수 등록 (callback(snapshot), 백그라운드 스레드에서 호출됨)"""
+        self._listeners.append(callback)
+
+    def load(self, block=True):
+        """현재 카탈로그 반환 (필요하면 캐시 파일 읽기/DB 조회)
+
+        block=False면 DB 조회를 기다리지 않음 (캐시가 없으면 products.xlsx/기본값,
+        갱신은 호출 측에서 refresh_if_stale로 처리)
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._read_cache()
+                    if self._snapshot is None and not block:
+                        self._snapshot = self._offline_snapshot()
+                snapshot = self._snapshot
+        if not block:
+            return snapshot
+        if snapshot is None:
+            # 캐시가 없으면 최초 1회는 기다려서 조회
+            snapshot = self.refresh()
+        elif snapshot.age() > self.ttl:
+            # 다른 프로그램이 이미 갱신한 캐시가 있으면 그것을 사용
+            cached = self._read_cache()
+            if cached is not None and cached.fetched_at > snapshot.fetched_at:
+                self._snapshot = snapshot = cached
+            if snapshot.age() > self.ttl:
+                self.refresh_in_background()
+        return snapshot
+
+    def refresh_if_stale(self):
+        """캐시가 TTL을 지났으면 지금 스레드에서 DB 조회 (시작 로더 작업용)"""
+        snapshot = self.load(block=False)
+        if snapshot.age() > self.ttl:
+            cached = self._read_cache()
+            if cached is not None and cached.fetched_at > snapshot.fetched_at:
+                self._snapshot = snapshot = cached
+        if snapshot.age() > self.ttl:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh_in_background(self):
+        """백그라운드 조회 시작 (이미 진행 중이면 무시)"""
+        with self._lock:
+            if self._refreshing or time.time() - self._last_attempt < RETRY_INTERVAL:
+                return
+            self._refreshing = True
+        threading.Thread(target=self.refresh, daemon=True).start()
+
+    def refresh(self):
+        """DB에서 새로 조회해 캐시 갱신 (실패 시 기존/오프라인 카탈로그 반환)"""
+        self._last_attempt = time.time()
+        try:
+            start = time.perf_counter()
+            snapshot = self._fetch()
+            changes = self._diff(self._snapshot, snapshot)
+            self._write_cache(snapshot)
+            self._snapshot = snapshot
+            print(f"제품 카탈로그 갱신: {len(snapshot.products)}개 제품, "
+                  f"변경 {changes} ({(time.perf_counter() - start) * 1000:.0f}ms)")
+            if changes and self._listeners:
+                for callback in list(self._listeners):
+                    try:
+                        callback(snapshot)
+                    except Exception as e:
+                        print(f"제품 카탈로그 갱신 알림 오류: {e}")
+            return snapshot
+        except Exception as e:
+            print(f"제품 카탈로그 조회 실패: {e}")
+            if self._snapshot is None:
+                self._snapshot = self._offline_snapshot()
+            return self._snapshot
+        finally:
+            self._refreshing = False
+
+    def _fetch(self):
+        """MySQL에서 제품/유통기한 정보 조회"""
+        import pandas as pd
+        from execute_query import call_queries
+        from mysql_auth import boosta_boosters
+        from boosters_query import q_boosters_items_for_barcode_reader, q_boosters_items_limit_date
+
+        df, df_limit_date = call_queries([q_boosters_items_for_barcode_reader, q_boosters_items_limit_date], boosta_boosters)
+        df = pd.merge(df, df_limit_date, on='제품코드', how='left')
+        return self._build(df, time.time(), "mysql")
+
+    def _build(self, df, fetched_at, source):
+        """제품 DataFrame -> 카탈로그"""
+        products = {str(code): _plain(name) for code, name in zip(df['제품코드'], df['제품명'])}
+
+        barcodes = {}
+        if '바코드' in df.columns:
+            for barcode, code in zip(df['바코드'], df['제품코드']):
+                barcode = str(barcode).strip()
+                if barcode and barcode != 'nan':
+                    barcodes[barcode] = str(code)
+
+        expiry = {}
+        if '유통기한_일수' in df.columns and '유통기한_구분' in df.columns:
+            for code, days, unit in zip(df['제품코드'], df['유통기한_일수'], df['유통기한_구분']):
+                days, unit = _plain(days), _plain(unit)
+                if days is not None and unit is not None:
+                    expiry[str(code)] = {'days': days, 'unit': unit}
+
+        return CatalogSnapshot(products, barcodes, expiry, fetched_at, source)
+
+    @staticmethod
+    def _diff(old, new):
+        """이전 카탈로그 대비 변경 요약 (변경 없으면 빈 문자열)"""
+        if old is None:
+            return "전체"
+        parts = []
+        for name, before, after in (("제품", old.products, new.products),
+                                    ("바코드", old.barcodes, new.barcodes),
+                                    ("유통기한", old.expiry, new.expiry)):
+            added = len(after.keys() - before.keys())
+            removed = len(before.keys() - after.keys())
+            changed = sum(1 for key in after.keys() & before.keys() if after[key] != before[key])
+            if added or removed or changed:
+                parts.append(f"{name} +{added}/-{removed}/~{changed}")
+        return ", ".join(parts)
+
+    def _read_cache(self):
+        """캐시 파일 읽기 (없거나 손상되었으면 None)"""
+        if not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return CatalogSnapshot(data['products'], data.get('barcodes'), data.get('expiry'),
+                                   data.get('fetched_at', 0.0), "cache")
+        except Exception as e:
+            print(f"제품 카탈로그 캐시 읽기 실패: {e}")
+            return None
+
+    def _write_cache(self, snapshot):
+        """임시 파일에 쓴 뒤 교체 (다른 프로세스가 반쯤 쓴 파일을 읽지 않도록)"""
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot.to_dict(), f, ensure_ascii=False)
+        os.replace(temp_path, self.cache_path)
+
+    def _offline_snapshot(self):
+        """DB/캐시 모두 없을 때 products.xlsx 또는 기본값 사용"""
+        if os.path.exists(self.products_file):
+            try:
+                import pandas as pd
+                snapshot = self._build(pd.read_excel(self.products_file), 0.0, "xlsx")
+                print(f"제품 카탈로그: {self.products_file} 사용 ({len(snapshot.products)}개 제품)")
+                return snapshot
+            except Exception as e:
+                print(f"제품 정보 파일 읽기 실패: {e}")
+        return CatalogSnapshot()
+
+    def describe(self):
+        """현재 카탈로그 상태 문자열 (화면 표시용)"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            return "로드 안됨"
+        fetched = datetime.fromtimestamp(snapshot.fetched_at).strftime("%Y-%m-%d %H:%M") if snapshot.fetched_at else "-"
+        return f"{len(snapshot.products)}개 제품 ({snapshot.source}, {fetched})"
+
+
+product_catalog = ProductCatalog()
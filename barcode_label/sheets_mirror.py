@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트 로컬 미러
+발행 내역 시트를 조회할 때마다 get_all_records()로 전체를 내려받지 않고
+로컬 SQLite(sheets_mirror.db)에 저장해 둔 행 뒤에 새로 추가된 행만 범위로 읽어옴
+
+- 시트별(스프레드시트 ID/시트 이름)로 헤더, 동기화한 마지막 행 번호, 마지막 행 값을 보관
+- 데이터 행을 BLOCK_ROWS행씩 묶은 블록마다 내용 해시와 마지막 확인 시각을 보관
+- 새로 고침: 헤더 행, "마지막 행이 든 블록의 첫 행부터 끝까지"(최대 BLOCK_ROWS행 더),
+  그 이전 블록 중 가장 오래전에 확인한 VERIFY_BLOCKS개를 batch_get 요청 1번으로 읽음
+  - 마지막 행 값이 그대로면 그 뒤의 행은 추가하고, 마지막 블록과 확인한 블록 중 해시가 다른 블록은
+    받은 내용으로 교체 (최근 행 수정은 바로, 그 이전 행 수정은 블록이 차례로 확인될 때 반영되므로
+    블록 수 / VERIFY_BLOCKS 번 새로 고침까지 늦을 수 있음)
+  - verify_blocks=None이면 이전 블록을 모두 확인 (내보내기처럼 시트와 정확히 같아야 할 때, 요청은 그대로 1번)
+  - 헤더나 마지막 행 값이 다르면(행 삭제/삽입, 전체 재업로드 등 행 위치가 바뀐 경우) 전체를 다시 받음
+- 조회: 한 번 읽은 DataFrame은 메모리에 두고 이후에는 추가된 행만 변환해서 붙임
+- 시트에 쓰는 것은 동기화 대기열(sync_outbox)의 append_rows가 담당하고 미러는 읽기만 함
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from sheets_sync import column_letter
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 블록 크기 (행), 새로 고침마다 다시 확인할 블록 수
+BLOCK_ROWS = 500
+VERIFY_BLOCKS = 2
+
+# 숫자로 변환할 문자열 형태
+NUMBER_PATTERN = r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_state (
+    sheet_key TEXT PRIMARY KEY,
+    header TEXT NOT NULL,
+    synced_rows INTEGER NOT NULL,
+    last_row TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mirror_rows (
+    sheet_key TEXT NOT NULL,
+    row_number INTEGER NOT NULL,
+    row_values TEXT NOT NULL,
+    PRIMARY KEY (sheet_key, row_number)
+);
+CREATE TABLE IF NOT EXISTS mirror_blocks (
+    sheet_key TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    hash TEXT NOT NULL,
+    verified_at REAL NOT NULL,
+    PRIMARY KEY (sheet_key, block)
+);
+"""
+
+
+def _row_json(row):
+    return json.dumps(row, ensure_ascii=False)
+
+
+def _block_hash(row_jsons):
+    """블록 내용 해시 (행마다 JSON 직렬화한 문자열 기준)"""
+    return hashlib.sha1("\n".join(row_jsons).encode("utf-8")).hexdigest()
+
+
+def block_rows(block):
+    """블록 번호 -> (첫 행 번호, 마지막 행 번호), 데이터는 시트 2행부터"""
+    first = 2 + block * BLOCK_ROWS
+    return first, first + BLOCK_ROWS - 1
+
+
+def _numericise(value):
+    """get_all_records()와 같이 숫자 문자열은 숫자로 변환"""
+    if value == "":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+
+def _trim(row):
+    """시트는 행 끝의 빈칸을 생략해서 돌려주므로 비교 전에 같은 형태로 맞춤"""
+    row = [str(value) for value in row]
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+class MirrorReport:
+    def __init__(self, rows, new_rows, full, requests, verified_blocks=0, changed_blocks=0):
+        self.rows = rows                          # 미러의 데이터 행 수
+        self.new_rows = new_rows                  # 이번에 받은 행 수
+        self.full = full                          # 전체를 다시 받았는지
+        self.requests = requests
+        self.verified_blocks = verified_blocks    # 해시를 다시 확인한 블록 수
+        self.changed_blocks = changed_blocks      # 내용이 달라 교체한 블록 수
+
+    def report(self):
+        if self.full:
+            mode = "전체 다시 받음"
+        else:
+            mode = f"추가된 행만 받음, 블록 {self.verified_blocks}개 확인/{self.changed_blocks}개 교체"
+        return f"구글 스프레드시트 미러: {self.rows}행 ({mode}, {self.new_rows}행 수신, 요청 {self.requests}회)"
+
+
+class SheetsMirror:
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, "sheets_mirror.db")
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self.last_report = None
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._initialized = True
+        return conn
+
+    def _frames(self):
+        """스레드별 {시트 키: (data_version, 마지막 행 번호, DataFrame, 헤더)}"""
+        frames = getattr(self._local, "frames", None)
+        if frames is None:
+            frames = self._local.frames = {}
+        return frames
+
+    def _state(self, key):
+        row = self._connect().execute(
+            "SELECT header, synced_rows, last_row FROM mirror_state WHERE sheet_key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1], json.loads(row[2])
+
+    def _save(self, key, header, rows, replace=False, verified=()):
+        """rows [(행 번호, 값)] 저장 후 바뀐 블록과 verified 블록의 해시/확인 시각 갱신
+
+        replace=True면 기존 행을 모두 지우고 저장
+        """
+        # 메모리에 읽어 둔 DataFrame은 뒤에 행이 추가되는 경우에만 이어서 사용
+        frame = self._frames().get(key)
+        if frame and (replace or any(row_number <= frame[1] for row_number, _ in rows)):
+            self._frames().pop(key)
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if replace:
+                conn.execute("DELETE FROM mirror_rows WHERE sheet_key = ?", (key,))
+                conn.execute("DELETE FROM mirror_blocks WHERE sheet_key = ?", (key,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO mirror_rows (sheet_key, row_number, row_values) VALUES (?, ?, ?)",
+                ((key, row_number, _row_json(row)) for row_number, row in rows)
+            )
+            blocks = {(row_number - 2) // BLOCK_ROWS for row_number, _ in rows} | set(verified)
+            for block in sorted(blocks):
+                first, last = block_rows(block)
+                row_jsons = [data for (data,) in conn.execute(
+                    "SELECT row_values FROM mirror_rows WHERE sheet_key = ? AND row_number BETWEEN ? AND ? "
+                    "ORDER BY row_number", (key, first, last)
+                )]
+                conn.execute(
+                    "INSERT OR REPLACE INTO mirror_blocks (sheet_key, block, hash, verified_at) VALUES (?, ?, ?, ?)",
+                    (key, block, _block_hash(row_jsons), now)
+                )
+            synced_rows, last_row = conn.execute(
+                "SELECT row_number, row_values FROM mirror_rows WHERE sheet_key = ? ORDER BY row_number DESC LIMIT 1",
+                (key,)
+            ).fetchone() or (1, _row_json(header))
+            conn.execute(
+                "INSERT OR REPLACE INTO mirror_state (sheet_key, header, synced_rows, last_row) VALUES (?, ?, ?, ?)",
+                (key, _row_json(header), synced_rows, last_row)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _block_hash_of(self, key, block):
+        row = self._connect().execute(
+            "SELECT hash FROM mirror_blocks WHERE sheet_key = ? AND block = ?", (key, block)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _blocks_to_verify(self, key, tail_block, limit):
+        """다시 확인할 블록 [(블록 번호, 해시)] (마지막 블록 이전 블록 중 가장 오래전에 확인한 순, limit=None이면 모두)"""
+        if (limit is not None and limit <= 0) or tail_block <= 0:
+            return []
+        return self._connect().execute(
+            "SELECT block, hash FROM mirror_blocks WHERE sheet_key = ? AND block < ? "
+            "ORDER BY verified_at, block LIMIT ?", (key, tail_block, -1 if limit is None else limit)
+        ).fetchall()
+
+    def refresh(self, worksheet, key, verify_blocks=VERIFY_BLOCKS):
+        """시트의 새 행/바뀐 블록을 미러에 반영하고 MirrorReport 반환
+
+        verify_blocks: 마지막 블록 외에 다시 확인할 이전 블록 수 (None이면 모든 블록을 확인해서 시트와 같게 맞춤)
+        """
+        state = self._state(key)
+        last_column = column_letter(max(worksheet.col_count, len(state[0]) if state else 1))
+
+        if state is not None:
+            header, synced_rows, last_row = state
+            # 마지막 행이 들어 있는 블록(최근 발행분이라 수정될 가능성이 가장 큼)은 매번 처음부터 다시 읽음
+            tail_block = (synced_rows - 2) // BLOCK_ROWS if synced_rows >= 2 else None
+            tail_start = block_rows(tail_block)[0] if tail_block is not None else 1
+            verify = self._blocks_to_verify(key, tail_block or 0, verify_blocks)
+            # 헤더, 마지막 블록부터 끝까지, 확인할 블록들을 요청 1번으로
+            ranges = [f"A1:{last_column}1", f"A{tail_start}:{last_column}"]
+            ranges += ["A{}:{}{}".format(block_rows(block)[0], last_column, block_rows(block)[1])
+                       for block, _ in verify]
+            results = worksheet.batch_get(ranges)
+            current_header = _trim(results[0][0]) if results[0] else []
+            tail = [_trim(row) for row in results[1]]
+            anchor = synced_rows - tail_start
+            if current_header == header and len(tail) > anchor and tail[anchor] == last_row:
+                new_rows = tail[anchor + 1:]
+                rows = [(synced_rows + 1 + offset, row) for offset, row in enumerate(new_rows)]
+                changed = 0
+                verified = [block for block, _ in verify]
+                if tail_block is not None:
+                    verified.append(tail_block)
+                    known = tail[:anchor + 1]
+                    if _block_hash([_row_json(row) for row in known]) != self._block_hash_of(key, tail_block):
+                        changed += 1
+                        rows += [(tail_start + offset, row) for offset, row in enumerate(known)]
+                for (block, stored_hash), fetched in zip(verify, results[2:]):
+                    # 범위 끝의 빈 행은 응답에서 생략되므로 블록 크기만큼 채움
+                    fetched = [_trim(row) for row in fetched] + [[]] * (BLOCK_ROWS - len(fetched))
+                    if _block_hash([_row_json(row) for row in fetched]) != stored_hash:
+                        changed += 1
+                        first = block_rows(block)[0]
+                        rows += [(first + offset, row) for offset, row in enumerate(fetched)]
+                self._save(key, header, rows, verified=verified)
+                report = MirrorReport(self._count(key), sum(1 for row in new_rows if row),
+                                      False, 1, len(verified), changed)
+                self.last_report = report
+                return report
+            print("구글 스프레드시트 행 위치가 바뀌어 미러를 다시 받습니다.")
+
+        values = [_trim(row) for row in worksheet.get_all_values()]
+        header = values[0] if values else []
+        # 시트 중간의 빈 행도 행 번호를 맞추기 위해 그대로 저장 (조회 시 제외)
+        self._save(key, header, [(row_number, row) for row_number, row in enumerate(values[1:], start=2)],
+                   replace=True)
+        report = MirrorReport(self._count(key), len(values) - 1 if values else 0, True,
+                              2 if state is not None else 1)
+        self.last_report = report
+        return report
+
+    def _count(self, key):
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM mirror_rows WHERE sheet_key = ? AND row_values != '[]'", (key,)
+        ).fetchone()[0]
+
+    @staticmethod
+    def _decode(rows, header):
+        """저장된 행(JSON) 목록 -> get_all_records()와 같은 형태의 DataFrame"""
+        # 행마다 json.loads 하지 않고 한 번에 파싱
+        records = json.loads("[" + ",".join(rows) + "]")
+        width = len(header)
+        records = [row[:width] if len(row) >= width else row + [""] * (width - len(row)) for row in records]
+        df = pd.DataFrame(records, columns=header)
+        # 숫자 문자열은 숫자로 (숫자 형태인 값만 골라서 변환)
+        for position in range(width):
+            column = df.iloc[:, position].astype(object)
+            mask = column.str.fullmatch(NUMBER_PATTERN).fillna(False).astype(bool)
+            if len(column) and mask.all():
+                df.isetitem(position, pd.to_numeric(column))
+            elif mask.any():
+                column[mask] = [_numericise(value) for value in column[mask]]
+                df.isetitem(position, column)
+        return df
+
+    def load_dataframe(self, key):
+        """미러 내용을 get_all_records()와 같은 형태의 DataFrame으로 반환 (미러가 없으면 None)
+
+        한 번 읽은 DataFrame은 메모리에 두고 다음부터는 뒤에 추가된 행만 변환해서 붙임
+        (다른 연결이 DB를 바꾸면 data_version이 달라지므로 전체를 다시 읽음)
+        """
+        state = self._state(key)
+        if state is None:
+            return None
+        header = state[0]
+        conn = self._connect()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        frame = self._frames().get(key)
+        if frame and frame[0] == version and frame[3] == header:
+            after, df = frame[1], frame[2]
+        else:
+            after, df = 0, None
+        rows = conn.execute(
+            "SELECT row_number, row_values FROM mirror_rows "
+            "WHERE sheet_key = ? AND row_number > ? AND row_values != '[]' ORDER BY row_number",
+            (key, after)
+        ).fetchall()
+        if rows or df is None:
+            new = self._decode([data for _, data in rows], header)
+            df = new if df is None else pd.concat([df, new], ignore_index=True)
+            after = rows[-1][0] if rows else after
+        self._frames()[key] = (version, after, df, header)
+        return df.copy()
+
+    def clear(self, key=None):
+        """미러 삭제 (key가 없으면 전체)"""
+        conn = self._connect()
+        where, params = ("WHERE sheet_key = ?", (key,)) if key else ("", ())
+        if key:
+            self._frames().pop(key, None)
+        else:
+            self._frames().clear()
+        for table in ("mirror_rows", "mirror_blocks", "mirror_state"):
+            conn.execute(f"DELETE FROM {table} {where}", params)
+
+
+# 공용 미러
+sheets_mirror = SheetsMirror()
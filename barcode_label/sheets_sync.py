@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트 일괄 동기화
+발행 이력 DataFrame을 행마다 append_row(요청 1번)로 올리지 않고
+시트의 현재 값과 비교해 바뀐 행 구간만 batch_update로 묶어서 전송
+
+- 시트 헤더 순서가 label_gui(HISTORY_COLUMNS)와 streamlit_app(SHEETS_COLUMNS)에서 다르므로
+  시트에 이미 있는 헤더 순서에 맞춰 컬럼을 배치 ('바코드숫자' <-> '일련번호'는 같은 컬럼)
+- 요청 하나에 최대 MAX_CELLS_PER_REQUEST 셀, 분당 WRITE_REQUESTS_PER_MINUTE 요청을 넘지 않게 대기
+- 할당량 초과(429)나 일시 오류(5xx)는 지수 백오프로 재시도
+- 시트가 새 데이터보다 길면 남는 행은 지움
+- 격자 크기(행/열 수)는 동기화마다 서버에서 다시 읽음 (캐시된 워크시트 핸들의 row_count는
+  처음 열 때 값이라 동기화 대기열의 append_rows로 늘어난 행이 반영되지 않음)
+"""
+
+import math
+import time
+from datetime import datetime, time as dt_time
+
+import pandas as pd
+
+from issue_history_store import SHEETS_COLUMNS
+
+# 같은 값을 나타내는 컬럼 이름 (label_gui는 '바코드숫자', streamlit/시트는 '일련번호')
+COLUMN_ALIASES = {
+    '바코드숫자': '일련번호',
+    '일련번호': '바코드숫자',
+}
+
+# Sheets API 쓰기 제한 (사용자당 분당 60회), 요청 크기는 여유 있게 제한
+WRITE_REQUESTS_PER_MINUTE = 60
+MAX_CELLS_PER_REQUEST = 50000
+
+# 429/5xx 재시도
+MAX_RETRIES = 5
+RETRY_BASE = 2.0
+RETRY_MAX = 64.0
+
+
+class RequestLimiter:
+    """분당 요청 수 제한 (마지막 1분 동안 보낸 요청 시각을 보관)"""
+
+    def __init__(self, per_minute=WRITE_REQUESTS_PER_MINUTE, clock=time.monotonic, sleep=time.sleep):
+        self.per_minute = per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self._sent = []
+
+    def wait(self):
+        now = self.clock()
+        self._sent = [sent for sent in self._sent if now - sent < 60]
+        if len(self._sent) >= self.per_minute:
+            self.sleep(60 - (now - self._sent[0]))
+            now = self.clock()
+            self._sent = [sent for sent in self._sent if now - sent < 60]
+        self._sent.append(now)
+
+
+class SyncReport:
+    def __init__(self, rows, written_rows, cleared_rows, requests, elapsed):
+        self.rows = rows                  # 동기화 후 시트 데이터 행 수
+        self.written_rows = written_rows  # 실제로 전송한 행 수
+        self.cleared_rows = cleared_rows
+        self.requests = requests          # 읽기 포함 API 요청 수
+        self.elapsed = elapsed
+
+    @property
+    def rate(self):
+        """초당 동기화한 행 수"""
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def report(self):
+        return (f"구글 스프레드시트 동기화: {self.rows}행 ({self.written_rows}행 전송, {self.cleared_rows}행 삭제), "
+                f"요청 {self.requests}회, {self.elapsed:.2f}초, {self.rate:.0f}행/초")
+
+
+def column_letter(number):
+    """1 -> A, 27 -> AA"""
+    letters = ""
+    while number:
+        number, remainder = divmod(number - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def _cell(value):
+    """DataFrame 값 -> 시트에 쓸 값 (NaN은 빈칸, numpy 숫자는 파이썬 숫자, 날짜는 문자열)"""
+    if value is None or (isinstance(value, float) and math.isnan(value)) or value is pd.NaT:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d" if value.time() == dt_time() else "%Y-%m-%d %H:%M:%S")
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def map_frame(df, header):
+    """DataFrame 컬럼을 시트 헤더 순서로 배치 -> 값 목록 (헤더에만 있는 컬럼은 빈칸)"""
+    columns = []
+    for name in header:
+        if name in df.columns:
+            columns.append(df[name])
+        elif COLUMN_ALIASES.get(name) in df.columns:
+            columns.append(df[COLUMN_ALIASES[name]])
+        else:
+            columns.append(pd.Series([""] * len(df), index=df.index))
+    return [[_cell(value) for value in row] for row in zip(*columns)] if columns else []
+
+
+def _same_row(sheet_row, row):
+    """시트에서 읽은 행(문자열)과 보낼 행 비교 (시트는 끝의 빈칸을 생략해서 돌려줌)"""
+    sheet_row = list(sheet_row) + [""] * (len(row) - len(sheet_row))
+    return all(str(a) == str(b) for a, b in zip(sheet_row, row)) and not any(sheet_row[len(row):])
+
+
+def plan_sync(existing, values):
+    """현재 시트 값(헤더 포함)과 보낼 값(헤더 포함) -> (바뀐 행 구간 [(시작, 끝)], 지울 행 수)
+
+    행 번호는 0부터, 끝은 포함하지 않음
+    """
+    runs = []
+    for index, row in enumerate(values):
+        if index < len(existing) and _same_row(existing[index], row):
+            continue
+        if runs and runs[-1][1] == index:
+            runs[-1][1] = index + 1
+        else:
+            runs.append([index, index + 1])
+    return [tuple(run) for run in runs], max(0, len(existing) - len(values))
+
+
+def pack_requests(runs, values, columns, max_cells=MAX_CELLS_PER_REQUEST):
+    """바뀐 행 구간 -> batch_update 요청 목록 (요청마다 범위 여러 개, 최대 max_cells 셀)"""
+    last_column = column_letter(columns)
+    rows_per_request = max(1, max_cells // columns)
+    requests, current, current_rows = [], [], 0
+    for start, end in runs:
+        while start < end:
+            rows = min(end - start, rows_per_request - current_rows)
+            current.append({'range': f"A{start + 1}:{last_column}{start + rows}", 'values': values[start:start + rows]})
+            current_rows += rows
+            start += rows
+            if current_rows == rows_per_request:
+                requests.append(current)
+                current, current_rows = [], 0
+    if current:
+        requests.append(current)
+    return requests
+
+
+def _call(func, limiter, counter, *args, **kwargs):
+    """API 요청 1회 (요청 수 제한, 429/5xx 재시도)"""
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.wait()
+        counter[0] += 1
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            if attempt == MAX_RETRIES or not (status == 429 or (status or 0) >= 500):
+                raise
+            delay = min(RETRY_BASE * 2 ** attempt, RETRY_MAX)
+            print(f"구글 스프레드시트 요청 제한/오류 ({status}), {delay:.0f}초 후 재시도")
+            limiter.sleep(delay)
+
+
+def grid_size(worksheet, limiter, counter):
+    """서버에 저장된 워크시트 격자 크기 (행 수, 열 수)"""
+    metadata = _call(worksheet.spreadsheet.fetch_sheet_metadata, limiter, counter)
+    for sheet in metadata.get("sheets", []):
+        properties = sheet.get("properties", {})
+        if properties.get("sheetId") == worksheet.id:
+            grid = properties.get("gridProperties", {})
+            return grid.get("rowCount", worksheet.row_count), grid.get("columnCount", worksheet.col_count)
+    return worksheet.row_count, worksheet.col_count
+
+
+def sync_frame(worksheet, df, columns=None, full=False, limiter=None):
+    """DataFrame을 워크시트에 동기화
+
+    columns: 시트에 헤더가 없을 때 사용할 헤더 (기본 SHEETS_COLUMNS)
+    full: True면 기존 값과 비교하지 않고 전체를 다시 씀
+    """
+    start = time.perf_counter()
+    limiter = limiter or RequestLimiter()
+    counter = [0]
+
+    existing = [] if full else _call(worksheet.get_all_values, limiter, counter)
+    header = existing[0] if existing and any(existing[0]) else list(columns or SHEETS_COLUMNS)
+    values = [header] + map_frame(df, header)
+    row_count, col_count = grid_size(worksheet, limiter, counter)
+    if full:
+        runs, cleared = [(0, len(values))], max(0, row_count - len(values))
+    else:
+        runs, cleared = plan_sync(existing, values)
+
+    # 시트 격자가 작으면 먼저 늘림 (범위 밖 batch_update는 오류)
+    if row_count < len(values) or col_count < len(header):
+        _call(worksheet.resize, limiter, counter,
+              rows=max(row_count, len(values)), cols=max(col_count, len(header)))
+
+    for ranges in pack_requests(runs, values, len(header)):
+        _call(worksheet.batch_update, limiter, counter, ranges, value_input_option='RAW')
+
+    if cleared:
+        _call(worksheet.batch_clear, limiter, counter,
+              [f"A{len(values) + 1}:{column_letter(max(col_count, len(header)))}{len(values) + cleared}"])
+
+    written = sum(end - max(start, 1) for start, end in runs if end > 1)
+    return SyncReport(len(values) - 1, written, cleared, counter[0], time.perf_counter() - start)
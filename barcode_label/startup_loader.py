@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tkinter 프로그램 시작 시 데이터 병렬 로드
+창을 먼저 띄운 뒤 발행 내역, 제품 카탈로그, 구역 설정 등을 스레드 풀에서 동시에 불러오고
+각 항목이 도착하는 대로 메인 스레드에서 화면에 반영
+단계별 소요 시간은 모두 끝난 뒤 콘솔에 출력
+"""
+
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class StartupLoader:
+    def __init__(self, root, name, max_workers=4, poll_ms=30):
+        self.root = root
+        self.name = name
+        self.max_workers = max_workers
+        self.poll_ms = poll_ms
+        self.started = time.perf_counter()
+        self.tasks = []
+        self.timings = []
+        self._results = queue.Queue()
+        self._pending = 0
+        self._executor = None
+
+    def mark(self, phase):
+        """동기 단계 완료 시점 기록 (예: 창 표시)"""
+        self.timings.append((phase, time.perf_counter() - self.started, None))
+
+    def add(self, phase, func, on_done=None, on_error=None):
+        """백그라운드에서 실행할 로드 작업 등록
+
+        func는 작업 스레드에서 실행되므로 Tk 위젯을 건드리면 안 됨
+        on_done(result)/on_error(exception)는 메인 스레드에서 호출
+        """
+        self.tasks.append((phase, func, on_done, on_error))
+
+    def start(self):
+        """등록된 작업을 동시에 시작"""
+        if not self.tasks:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        self._pending = len(self.tasks)
+        for task in self.tasks:
+            self._executor.submit(self._run, *task)
+        self._executor.shutdown(wait=False)
+        self.root.after(self.poll_ms, self._poll)
+
+    def _run(self, phase, func, on_done, on_error):
+        begin = time.perf_counter()
+        try:
+            result, error = func(), None
+        except Exception as e:
+            result, error = None, e
+        self._results.put((phase, on_done, on_error, result, error, time.perf_counter() - begin))
+
+    def _poll(self):
+        """완료된 작업 결과를 메인 스레드에서 반영"""
+        while True:
+            try:
+                phase, on_done, on_error, result, error, elapsed = self._results.get_nowait()
+            except queue.Empty:
+                break
+            begin = time.perf_counter()
+            try:
+                if error is None:
+                    if on_done:
+                        on_done(result)
+                else:
+                    print(f"[{self.name}] {phase} 로드 실패: {error}")
+                    if on_error:
+                        on_error(error)
+            except Exception as e:
+                print(f"[{self.name}] {phase} 화면 반영 오류: {e}")
+            self.timings.append((phase, elapsed, time.perf_counter() - begin))
+            self._pending -= 1
+
+        if self._pending > 0:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self.report()
+
+    def report(self):
+        """단계별 소요 시간 출력"""
+        total = time.perf_counter() - self.started
+        lines = [f"[{self.name}] 시작 단계별 소요 시간 (전체 {total * 1000:.0f}ms)"]
+        for phase, elapsed, applied in self.timings:
+            if applied is None:
+                lines.append(f"  - {phase}: {elapsed * 1000:.0f}ms 시점")
+            else:
+                lines.append(f"  - {phase}: 로드 {elapsed * 1000:.0f}ms, 화면 반영 {applied * 1000:.0f}ms")
+        print("\n".join(lines))
@@ -19,14 +19,105 @@ import json
 import os.path
 from functools import partial
 
-# 상위 디렉토리의 execute_query.py 임포트
+# 상위 디렉토리 모듈 경로 (제품 카탈로그의 execute_query.py 임포트용)
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from execute_query import call_query
-from mysql_auth import boosta_boosters
-from boosters_query import q_boosters_items_for_barcode_reader, q_boosters_items_limit_date
+from product_catalog import product_catalog
+from startup_loader import StartupLoader
+from issue_history_store import history_store
+from location_aggregate import LocationAggregate, summarize
+
+class InventoryIndex:
+    """재고 인덱스 (self.df와 함께 유지)
+
+    - (보관위치, 제품코드) -> 행 번호 목록 (오래된 것부터)
+    - 제품코드 -> 재고 수량
+    - (보관위치, 제품코드) -> 구분별 수량 (관리품 확인용)
+    출고/발행 시 전체 재계산 없이 변경된 행만 반영한다.
+    """
+
+    def __init__(self, df=None):
+        self.rebuild(df if df is not None else pd.DataFrame())
+
+    def rebuild(self, df):
+        """DataFrame 전체로 인덱스 재구성"""
+        self.rows = {}
+        self.product_counts = {}
+        self.categories = {}
+        self.product_names = {}
+        self.row_keys = {}
+        self.last_id = 0
+        self.add_rows(df)
+
+    def add_rows(self, df):
+        """새로 발행된 행 반영 (df 인덱스는 저장소 행 번호)"""
+        if df is None or df.empty:
+            return
+        locations = df['보관위치'].tolist()
+        codes = df['제품코드'].tolist()
+        categories = df['구분'].tolist() if '구분' in df.columns else [None] * len(df)
+        names = df['제품명'].tolist() if '제품명' in df.columns else [None] * len(df)
+        for row_id, location, code, category, name in zip(df.index.tolist(), locations, codes, categories, names):
+            key = (location, code)
+            self.rows.setdefault(key, []).append(row_id)
+            self.product_counts[code] = self.product_counts.get(code, 0) + 1
+            category_counts = self.categories.setdefault(key, {})
+            category_counts[category] = category_counts.get(category, 0) + 1
+            if name is not None and code not in self.product_names:
+                self.product_names[code] = name
+            self.row_keys[row_id] = (location, code, category)
+            if row_id > self.last_id:
+                self.last_id = row_id
+
+    def remove_rows(self, row_ids):
+        """출고/삭제된 행 제거 후 실제 제거된 행 번호 목록 반환"""
+        removed = []
+        removed_by_key = {}
+        for row_id in row_ids:
+            entry = self.row_keys.pop(row_id, None)
+            if entry is None:
+                continue
+            location, code, category = entry
+            key = (location, code)
+            removed.append(row_id)
+            removed_by_key.setdefault(key, set()).add(row_id)
+            self.product_counts[code] -= 1
+            if self.product_counts[code] <= 0:
+                del self.product_counts[code]
+            category_counts = self.categories[key]
+            category_counts[category] -= 1
+            if category_counts[category] <= 0:
+                del category_counts[category]
+        for key, ids in removed_by_key.items():
+            remaining = [row_id for row_id in self.rows[key] if row_id not in ids]
+            if remaining:
+                self.rows[key] = remaining
+            else:
+                del self.rows[key]
+                del self.categories[key]
+        return removed
+
+    def stock(self, location, product_code):
+        """(보관위치, 제품코드) 재고 수량"""
+        return len(self.rows.get((location, product_code), ()))
+
+    def row_ids(self, location, product_code, quantity=None):
+        """(보관위치, 제품코드) 행 번호 목록 (오래된 것부터)"""
+        ids = self.rows.get((location, product_code), [])
+        return list(ids if quantity is None else ids[:quantity])
+
+    def product_total(self, product_code):
+        """제품 전체 재고 수량"""
+        return self.product_counts.get(product_code, 0)
+
+    def product_name(self, product_code, default="알 수 없음"):
+        """재고에 기록된 제품명"""
+        name = self.product_names.get(product_code)
+        return default if name is None else str(name)
+
+    def is_management_item(self, location, product_code):
+        """해당 위치의 제품에 관리품이 포함되어 있는지 확인"""
+        return self.categories.get((location, product_code), {}).get('관리품', 0) > 0
 
-# 발행 이력 파일
-history_file = "barcode_label/issue_history.xlsx"
 
 class StockManager:
     def __init__(self, root):
@@ -34,11 +125,13 @@ class StockManager:
         self.root.title("입고/출고 관리 시스템")
         self.root.geometry("1200x800")
         
-        # 데이터 로드
-        self.load_data()
-        
-        # 바코드-제품코드 매핑 로드
-        self.load_barcode_mapping()
+        # 데이터는 창을 먼저 띄운 뒤 백그라운드에서 동시에 로드 (빈 상태로 시작)
+        self.startup = StartupLoader(root, "stock_manager")
+        self.set_history(pd.DataFrame(), synced_at=None)
+        self.products = {}
+        self.barcode_to_product = {}
+        self.apply_zone_config = None
+        self.refresh_location_grid = None
         
         # 자동 바코드 감지 변수들
         self.barcode_buffer = ""
@@ -73,8 +166,9 @@ class StockManager:
                                     font=("맑은 고딕", 10), fg="#2196F3")
         self.status_label.pack(pady=5)
         
-        # 초기 데이터 로드
-        self.update_status("시스템이 준비되었습니다. 바코드를 스캔하면 자동으로 인식됩니다.")
+        # 초기 데이터 로드 (발행 내역, 제품 카탈로그, 바코드 매핑, 구역 설정)
+        self.update_status("데이터를 불러오는 중입니다...")
+        self.start_loading()
         
         # 전역 키보드 이벤트 바인딩 (자동 바코드 감지)
         self.root.bind('<Key>', self.on_key_press)
@@ -298,40 +392,80 @@ class StockManager:
         else:
             self.update_status(f"제품 바코드 감지: {barcode_data} (출고 탭에서 사용하세요)")
     
+    def start_loading(self):
+        """시작 데이터 병렬 로드 (창 표시 후)"""
+        def read_history():
+            synced_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            return synced_at, history_store.load_dataframe()
+        
+        def on_history_loaded(result):
+            # 로드 중에 출고 등으로 이미 동기화되었으면 더 최신 상태 유지
+            if self.synced_at is None:
+                synced_at, df = result
+                self.set_history(df, synced_at)
+                print(f"데이터 로드 성공: {len(self.df)} 행")
+                if self.refresh_location_grid:
+                    self.refresh_location_grid()
+            self.update_status("시스템이 준비되었습니다. 바코드를 스캔하면 자동으로 인식됩니다.")
+        
+        def on_products_loaded(products):
+            self.products = products
+            print(f"제품 데이터 로드 성공: {len(self.products)} 개")
+        
+        def on_zone_config_loaded(config):
+            if self.apply_zone_config:
+                self.apply_zone_config(config)
+        
+        self.startup.add("발행 내역", read_history, on_history_loaded,
+                         lambda e: messagebox.showerror("오류", f"데이터 로드 중 오류: {e}"))
+        self.startup.add("제품 카탈로그", lambda: product_catalog.load().products, on_products_loaded)
+        self.startup.add("바코드 매핑", lambda: product_catalog.load().barcodes, self.set_barcode_mapping,
+                         lambda e: messagebox.showerror("오류", f"바코드 매핑을 로드하는 중 오류가 발생했습니다: {e}"))
+        self.startup.add("구역 설정", self.read_zone_config, on_zone_config_loaded,
+                         lambda e: messagebox.showerror("구역 설정 오류", f"구역 설정을 로드할 수 없습니다: {e}"))
+        self.startup.mark("창 표시")
+        self.startup.start()
+
+    def set_history(self, df, synced_at):
+        """발행 내역과 재고 인덱스/위치 집계 교체"""
+        self.synced_at = synced_at
+        self.df = df
+        self.inventory = InventoryIndex(df)
+        self.locations = LocationAggregate(df)
+
     def load_data(self):
         """데이터 로드"""
         try:
-            # 발행 내역 데이터 로드
-            history_file = "issue_history.xlsx"
-            print(f"발행 내역 파일 경로: {os.path.abspath(history_file)}")
-            print(f"파일 존재 여부: {os.path.exists(history_file)}")
-            
-            if os.path.exists(history_file):
-                self.df = pd.read_excel(history_file)
-                print(f"데이터 로드 성공: {len(self.df)} 행")
-                print(f"컬럼: {list(self.df.columns)}")
-            else:
-                print("발행 내역 파일이 없습니다.")
-                self.df = pd.DataFrame()
-            
-            # 제품 데이터 로드 (label_gui.py에서 사용하는 방식과 동일)
-            try:
-                from execute_query import call_query
-                from mysql_auth import boosta_boosters
-                from boosters_query import q_boosters_items_for_barcode_reader
-                
-                df_products = call_query(q_boosters_items_for_barcode_reader.query, boosta_boosters)
-                self.products = dict(zip(df_products['제품코드'].astype(str), df_products['제품명']))
-                print(f"제품 데이터 로드 성공: {len(self.products)} 개")
-            except Exception as e:
-                print(f"제품 데이터 로드 실패: {e}")
-                self.products = {"TEST001": "테스트 제품"}
+            # 발행 내역 데이터 로드 (인덱스는 저장소 행 번호)
+            print(f"발행 내역 저장소 경로: {history_store.db_path}")
+            synced_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.set_history(history_store.load_dataframe(), synced_at)
+            print(f"데이터 로드 성공: {len(self.df)} 행")
+            
+            # 제품 데이터 로드 (label_gui.py와 같은 제품 카탈로그 캐시)
+            self.products = product_catalog.load().products
+            print(f"제품 데이터 로드 성공: {len(self.products)} 개")
                 
         except Exception as e:
             print(f"데이터 로드 중 오류: {e}")
             messagebox.showerror("오류", f"데이터 로드 중 오류: {e}")
-            self.df = pd.DataFrame()
+            self.set_history(pd.DataFrame(), synced_at=None)
             self.products = {"TEST001": "테스트 제품"}
+
+    def sync_inventory(self):
+        """다른 프로그램에서 발행/출고된 내역만 가져와 self.df와 재고 인덱스에 반영"""
+        if self.synced_at is None:
+            self.load_data()
+            return
+        new_rows, removed_ids, self.synced_at = history_store.changes_since(self.inventory.last_id, self.synced_at)
+        removed_ids = self.inventory.remove_rows(removed_ids)
+        if removed_ids:
+            self.df = self.df.drop(removed_ids)
+            self.locations.remove_rows(removed_ids)
+        if not new_rows.empty:
+            self.inventory.add_rows(new_rows)
+            self.locations.add_rows(new_rows)
+            self.df = pd.concat([self.df, new_rows]) if not self.df.empty else new_rows
     
     def create_inbound_tab(self):
         """입고 탭 생성"""
@@ -490,8 +624,8 @@ class StockManager:
             viz_frame = tk.Frame(visualizer_frame)
             viz_frame.pack(pady=10, fill=tk.BOTH, expand=True)
             
-            # 구역 설정 로드
-            zone_config = self.load_zone_config()
+            # 구역 설정은 시작 로더가 불러온 뒤 apply_zone_config로 반영
+            zone_config = {"zones": {}}
             
             # 파일 감시 관련 변수
             config_file_path = "barcode_label/zone_config.json"
@@ -600,9 +734,7 @@ class StockManager:
                 button.config(bg="#FFD700", relief=tk.SUNKEN)  # 노란색 배경, 눌린 효과
                 
                 # 해당 위치의 데이터 확인
-                location_df = self.df[self.df["보관위치"] == location] if not self.df.empty else pd.DataFrame()
-                
-                if location_df.empty:
+                if self.locations.summary(location) is None:
                     # 빈 위치인 경우 바로 라벨 생성 옵션 제공
                     def restore_button_state():
                         button.config(bg=original_bg, relief=original_relief, 
@@ -658,12 +790,8 @@ class StockManager:
             
             # 지정된 창에 위치 상세 정보 표시 (두 번째 정의)
             def show_location_detail_in_window(location, window, restore_callback):
-                if self.df.empty:
-                    restore_callback()
-                    return
-                
-                # 해당 위치의 데이터 필터링
-                location_df = self.df[self.df["보관위치"] == location]
+                # 위치별 집계에서 해당 위치 데이터 조회
+                location_df = self.locations.rows(location)
                 
                 # 데이터가 있는 경우만 상세 정보 표시 (빈 위치는 이미 on_cell_click에서 처리됨)
                 if location_df.empty:
@@ -681,8 +809,9 @@ class StockManager:
                 
                 if isinstance(location_df, pd.DataFrame):
                     try:
-                        total_items = len(location_df)
-                        unique_products = len(location_df["제품명"].unique())
+                        summary = self.locations.summary(location)
+                        total_items = summary["라벨수"]
+                        unique_products = summary["제품수"]
                         
                         stats_label = tk.Label(stats_frame, 
                                              text=f"총 {total_items}개 라벨, {unique_products}개 제품",
@@ -715,22 +844,8 @@ class StockManager:
                         tree.column("폐기일자", width=100)
                         
                         # 데이터 삽입
-                        for _, row in location_df.iterrows():
-                            try:
-                                # 폐기일자 계산
-                                expiry_date = pd.to_datetime(row["유통기한"])
-                                disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                                disposal_str = disposal_date.strftime("%Y-%m-%d")
-                            except:
-                                disposal_str = "N/A"
-                            
-                            tree.insert("", "end", values=(
-                                row["제품명"],
-                                row["제품코드"],
-                                row["LOT"],
-                                row["유통기한"],
-                                disposal_str
-                            ))
+                        for values in self.locations.detail_rows(location, ["제품명", "제품코드", "LOT", "유통기한", "폐기일자"]):
+                            tree.insert("", "end", values=values)
                         
                         tree.pack(fill=tk.BOTH, expand=True)
                         
@@ -887,8 +1002,9 @@ class StockManager:
                 zones_container.update_idletasks()
                 canvas.configure(scrollregion=canvas.bbox("all"))
             
-            # 초기 그리드 생성
-            create_dynamic_grid()
+            # 구역 설정을 불러오기 전 안내 메시지
+            tk.Label(zones_container, text="구역 설정과 재고 데이터를 불러오는 중입니다...",
+                     font=("맑은 고딕", 12), fg="gray").pack(pady=50)
             
             # 데이터 새로고침 함수
             def refresh_data():
@@ -983,14 +1099,10 @@ class StockManager:
             
             # 지정된 창에 위치 상세 정보 표시
             def show_location_detail_in_window(location, window, restore_callback):
-                if self.df.empty:
-                    restore_callback()
-                    return
-                
-                # 해당 위치의 데이터 필터링
-                location_df = self.df[self.df["보관위치"] == location]
+                # 위치별 집계에서 해당 위치 데이터 조회
+                summary = self.locations.summary(location)
                 
-                if location_df.empty:
+                if summary is None:
                     # 라벨이 없는 경우 라벨 생성 옵션 제공
                     window.destroy()
                     result = messagebox.askyesno("위치 정보", 
@@ -1009,20 +1121,8 @@ class StockManager:
                 stats_frame = tk.Frame(window)
                 stats_frame.pack(pady=10)
                 
-                if isinstance(location_df, pd.DataFrame):
-                    try:
-                        unique_products = location_df["제품명"].dropna().nunique()
-                    except Exception:
-                        unique_products = len(set(location_df["제품명"]))
-                else:
-                    try:
-                        unique_products = len(set([row["제품명"] for _, row in location_df.iterrows() if row["제품명"]]))
-                    except Exception:
-                        unique_products = 0
-                total_items = len(location_df)
-                
-                tk.Label(stats_frame, text=f"총 제품 수: {unique_products}개", font=("맑은 고딕", 10)).pack()
-                tk.Label(stats_frame, text=f"총 라벨 수: {total_items}개", font=("맑은 고딕", 10)).pack()
+                tk.Label(stats_frame, text=f"총 제품 수: {summary['제품수']}개", font=("맑은 고딕", 10)).pack()
+                tk.Label(stats_frame, text=f"총 라벨 수: {summary['라벨수']}개", font=("맑은 고딕", 10)).pack()
                 
                 # 상세 테이블
                 tree_frame = tk.Frame(window)
@@ -1054,37 +1154,9 @@ class StockManager:
                 tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
                 scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
                 
-                # 데이터 추가
-                for _, row in location_df.iterrows():
-                    # 폐기일자 계산 (기존 데이터에 폐기일자가 없는 경우)
-                    disposal_date = row.get("폐기일자", "N/A")
-                    is_na = False
-                    try:
-                        is_na = bool(pd.isna(disposal_date))
-                    except Exception:
-                        is_na = disposal_date is None
-                    if disposal_date == "N/A" or (isinstance(disposal_date, str) and disposal_date == "N/A") or is_na:
-                        try:
-                            expiry_date = pd.to_datetime(row["유통기한"])
-                            if isinstance(expiry_date, pd.Timestamp):
-                                disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                                disposal_date = disposal_date.strftime("%Y-%m-%d")
-                            else:
-                                disposal_date = "N/A"
-                        except:
-                            disposal_date = "N/A"
-                    else:
-                        disposal_date = str(disposal_date)
-                        
-                    tree.insert("", "end", values=(
-                        row["구분"],
-                        row["제품코드"],
-                        row["제품명"],
-                        row["LOT"],
-                        row["유통기한"],
-                        disposal_date,
-                        row["발행일시"]
-                    ))
+                # 데이터 추가 (폐기일자가 없으면 유통기한 + 1년)
+                for values in self.locations.detail_rows(location):
+                    tree.insert("", "end", values=values)
                 
                 # 라벨 생성 버튼 추가
                 button_frame = tk.Frame(window)
@@ -1140,7 +1212,7 @@ class StockManager:
                     messagebox.showerror("오류", f"라벨 생성 창을 열 수 없습니다: {str(e)}")
             
             # 셀 업데이트 함수
-            def update_cell(cell, location, items, is_search_result=False):
+            def update_cell(cell, location, summary, is_search_result=False):
                 # 구역 수에 따른 동적 폰트 크기 계산
                 total_zones = len(zone_config["zones"])
                 if total_zones <= 2:
@@ -1157,37 +1229,18 @@ class StockManager:
                 # 원래 relief 상태 보존
                 original_relief = cell.cget("relief")
                 
-                if not items:
+                if not summary:
                     # 빈 위치
                     cell.config(text=f"{location}\n\n(빈 위치)", 
                                bg="#f5f5f5", fg="gray", font=("맑은 고딕", font_size),
                                relief=original_relief)  # 원래 relief 상태 유지
                 else:
-                    # 아이템이 있는 위치
-                    unique_products = len(set(item["제품명"] for item in items))
-                    total_items = len(items)
+                    # 아이템이 있는 위치 (위치별 집계 사용)
+                    unique_products = summary["제품수"]
+                    total_items = summary["라벨수"]
                     
-                    # 최신 폐기일자 확인 (현재 시점에서 가장 가까운 날짜)
-                    try:
-                        current_date = pd.Timestamp.now()
-                        disposal_dates = []
-                        for item in items:
-                            try:
-                                # 폐기일자 계산
-                                expiry_date = pd.to_datetime(item["유통기한"])
-                                disposal_date = expiry_date.replace(year=expiry_date.year + 1)
-                                disposal_dates.append(disposal_date)
-                            except:
-                                continue
-                        if disposal_dates:
-                            # 현재 날짜와의 차이를 계산하여 가장 가까운 날짜 찾기
-                            closest_disposal = min(disposal_dates, key=lambda x: abs((x - current_date).days))
-                            latest_disposal_str = closest_disposal.strftime("%Y-%m-%d")
-                        else:
-                            latest_disposal_str = "N/A"
-                    except Exception as e:
-                        print(f"날짜 계산 오류: {e}")
-                        latest_disposal_str = "N/A"
+                    # 현재 시점에서 가장 가까운 폐기일자
+                    latest_disposal_str = summary["폐기일자"]
                     
                     # 검색 결과인지 여부에 따라 배경색 결정
                     if is_search_result:
@@ -1203,24 +1256,11 @@ class StockManager:
                                relief=original_relief)  # 원래 relief 상태 유지
             
             # 동적 그리드 업데이트 함수
-            def update_dynamic_grid():
-                if self.df.empty:
-                    return
-                
-                # 각 위치별 데이터 집계
-                location_data = {}
-                for _, row in self.df.iterrows():
-                    location = row["보관위치"]
-                    if location not in location_data:
-                        location_data[location] = []
-                    location_data[location].append({
-                        "제품명": row["제품명"],
-                        "LOT": row["LOT"],
-                        "유통기한": row["유통기한"],
-                        "발행일시": row["발행일시"]
-                    })
+            def update_dynamic_grid(changed_only=False):
+                # 마지막 갱신 이후 집계가 바뀐 위치
+                changed = self.locations.pop_dirty()
                 
-                # 각 구역별로 그리드 업데이트
+                # 각 구역별로 그리드 업데이트 (changed_only면 바뀐 위치만)
                 for zone_code, zone_data in zone_config["zones"].items():
                     if zone_code not in zone_grids:
                         continue
@@ -1231,8 +1271,10 @@ class StockManager:
                     for row in range(sections["rows"]):
                         for col in range(sections["columns"]):
                             location = f"{zone_code}-{row+1:02d}-{col+1:02d}"
+                            if changed_only and location not in changed:
+                                continue
                             cell = zone_grid[row][col]
-                            update_cell(cell, location, location_data.get(location, []), is_search_result=False)
+                            update_cell(cell, location, self.locations.summary(location), is_search_result=False)
             
             # 필터링된 데이터로 동적 그리드 업데이트 함수
             def update_dynamic_grid_with_data(filtered_df):
@@ -1256,18 +1298,8 @@ class StockManager:
                                            relief=original_relief)
                     return
                 
-                # 각 위치별 데이터 집계
-                location_data = {}
-                for _, row in filtered_df.iterrows():
-                    location = row["보관위치"]
-                    if location not in location_data:
-                        location_data[location] = []
-                    location_data[location].append({
-                        "제품명": row["제품명"],
-                        "LOT": row["LOT"],
-                        "유통기한": row["유통기한"],
-                        "발행일시": row["발행일시"]
-                    })
+                # 검색 결과의 위치별 집계 (벡터 연산)
+                location_data = summarize(filtered_df)
                 
                 # 각 구역별로 그리드 업데이트
                 for zone_code, zone_data in zone_config["zones"].items():
@@ -1281,7 +1313,7 @@ class StockManager:
                         for col in range(sections["columns"]):
                             location = f"{zone_code}-{row+1:02d}-{col+1:02d}"
                             cell = zone_grid[row][col]
-                            update_cell(cell, location, location_data.get(location, []), is_search_result=True)
+                            update_cell(cell, location, location_data.get(location), is_search_result=True)
             
             # 구역 설정 로드 함수
             def load_zone_config():
@@ -1321,8 +1353,21 @@ class StockManager:
                     messagebox.showerror("구역 설정 오류", f"구역 설정을 로드할 수 없습니다: {e}")
                     return {"zones": {}}
             
-            # 초기 데이터 표시
-            update_dynamic_grid()
+            # 시작 로더에서 구역 설정/발행 내역이 도착하면 그리드 생성 및 표시
+            def apply_zone_config(config):
+                nonlocal zone_config
+                zone_config = config
+                create_dynamic_grid()
+                update_dynamic_grid()
+            
+            def refresh_location_grid():
+                if search_var.get().strip():
+                    apply_search()
+                else:
+                    update_dynamic_grid()
+            
+            self.apply_zone_config = apply_zone_config
+            self.refresh_location_grid = refresh_location_grid
             
             # 창 닫기 시 파일 감시 중단
             def on_tab_closing():
@@ -1337,6 +1382,10 @@ class StockManager:
                     watching = False
                 else:  # 위치 확인 탭으로 돌아올 때
                     watching = True
+                    # 출고/발행으로 바뀐 위치만 다시 표시
+                    if not search_var.get().strip():
+                        self.sync_inventory()
+                        update_dynamic_grid(changed_only=True)
                     # 파일 감시 스레드 재시작
                     watch_thread = threading.Thread(target=watch_config_file, daemon=True)
                     watch_thread.start()
@@ -1919,8 +1968,7 @@ class StockManager:
         try:
             if not self.df.empty:
                 # 해당 제품의 전체 재고 확인
-                stock_mask = (self.df['제품코드'] == product_code)
-                total_stock = len(self.df[stock_mask])
+                total_stock = self.inventory.product_total(product_code)
                 
                 if total_stock > 0:
                     self.stock_label.config(text=f"전체 재고: {total_stock}개 ({product_name})", fg="#4CAF50")
@@ -1942,13 +1990,11 @@ class StockManager:
             try:
                 if not self.df.empty:
                     # 해당 제품의 전체 재고 확인
-                    stock_mask = (self.df['제품코드'] == product_code)
-                    total_stock = len(self.df[stock_mask])
+                    total_stock = self.inventory.product_total(product_code)
                     
                     if total_stock > 0:
                         # 제품명 가져오기
-                        product_df = pd.DataFrame(self.df[stock_mask]).copy()
-                        product_name = str(product_df['제품명'].iloc[0]) if not product_df.empty else "알 수 없음"
+                        product_name = self.inventory.product_name(product_code)
                         self.stock_label.config(text=f"전체 재고: {total_stock}개 ({product_name})", fg="#4CAF50")
                     else:
                         self.stock_label.config(text="재고 없음", fg="#F44336")
@@ -2029,16 +2075,11 @@ class StockManager:
         if location and product_code:
             try:
                 # 해당 위치와 제품의 재고 확인
-                stock_mask = (
-                    (self.df['보관위치'] == location) & 
-                    (self.df['제품코드'] == product_code)
-                )
-                current_stock = len(self.df[stock_mask])
+                current_stock = self.inventory.stock(location, product_code)
                 
                 if current_stock > 0:
                     # 제품명 가져오기
-                    stock_df = pd.DataFrame(self.df[stock_mask]).copy()
-                    product_name = str(stock_df['제품명'].iloc[0]) if not stock_df.empty else "알 수 없음"
+                    product_name = self.inventory.product_name(product_code)
                     self.stock_label.config(text=f"현재 재고: {current_stock}개 ({product_name})", fg="#4CAF50")
                 else:
                     self.stock_label.config(text="재고 없음", fg="#F44336")
@@ -2083,35 +2124,24 @@ class StockManager:
             return
         
         # 재고 확인
-        stock_mask = (
-            (self.df['보관위치'] == location) & 
-            (self.df['제품코드'] == product_code)
-        )
-        current_stock = len(self.df[stock_mask])
+        current_stock = self.inventory.stock(location, product_code)
         
         if current_stock < quantity:
             messagebox.showerror("오류", f"재고가 부족합니다.\n현재 재고: {current_stock}개\n요청 수량: {quantity}개")
             return
         
         # 출고 확인
-        stock_df = pd.DataFrame(self.df[stock_mask]).copy()
-        product_name = str(stock_df['제품명'].iloc[0]) if not stock_df.empty else "알 수 없음"
+        product_name = self.inventory.product_name(product_code)
         
         # 관리품 출고 제한 확인
-        category_column = '구분' if '구분' in stock_df.columns else 'category'
-        if category_column in stock_df.columns:
-            # 해당 제품의 구분 확인
-            item_categories = stock_df[category_column].dropna().unique()
-            
-            # 관리품이 포함되어 있는지 확인
-            if '관리품' in item_categories:
-                messagebox.showerror("출고 제한", 
-                                   f"❌ 관리품은 출고할 수 없습니다.\n\n"
-                                   f"제품코드: {product_code}\n"
-                                   f"제품명: {product_name}\n"
-                                   f"보관위치: {location}\n\n"
-                                   f"관리품은 샘플재고만 출고 가능합니다.")
-                return
+        if self.inventory.is_management_item(location, product_code):
+            messagebox.showerror("출고 제한", 
+                               f"❌ 관리품은 출고할 수 없습니다.\n\n"
+                               f"제품코드: {product_code}\n"
+                               f"제품명: {product_name}\n"
+                               f"보관위치: {location}\n\n"
+                               f"관리품은 샘플재고만 출고 가능합니다.")
+            return
         
         result = messagebox.askyesno("출고 확인", 
                                    f"다음 항목을 출고하시겠습니까?\n\n"
@@ -2141,57 +2171,62 @@ class StockManager:
     def perform_outbound(self, location, product_code, quantity, outbounder):
         """실제 출고 처리 및 출고내역 저장"""
         try:
-            # 발행 이력 파일 다시 로드
-            if os.path.exists(history_file):
-                df = pd.read_excel(history_file)
-            else:
-                raise Exception("발행 이력 파일이 없습니다.")
+            # 다른 프로그램의 발행/출고 내역 반영
+            self.sync_inventory()
             
             # 해당 위치와 제품의 항목들 찾기
-            stock_mask = (
-                (df['보관위치'] == location) & 
-                (df['제품코드'] == product_code)
-            )
-            matching_items = pd.DataFrame(df[stock_mask]).copy()
-            
-            if len(matching_items) < quantity:
-                raise Exception(f"재고가 부족합니다. (요청: {quantity}개, 보유: {len(matching_items)}개)")
+            current_stock = self.inventory.stock(location, product_code)
+            if current_stock < quantity:
+                raise Exception(f"재고가 부족합니다. (요청: {quantity}개, 보유: {current_stock}개)")
             
             # 출고할 항목들 선택 (가장 오래된 것부터)
-            items_to_remove = matching_items.head(quantity)
-            
-            # 출고내역 저장
-            outbound_history_file = os.path.join(os.path.dirname(history_file), "outbound_history.xlsx")
-            if os.path.exists(outbound_history_file):
-                outbound_df = pd.read_excel(outbound_history_file)
-            else:
-                outbound_df = pd.DataFrame(columns=pd.Index(["출고일시", "보관위치", "제품코드", "제품명", "LOT", "구분", "출고수량", "반출자"]))
-            now = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
-            for _, row in items_to_remove.iterrows():
-                new_row = pd.DataFrame([{
-                    "출고일시": now,
-                    "보관위치": row["보관위치"],
-                    "제품코드": row["제품코드"],
-                    "제품명": row["제품명"],
-                    "LOT": row.get("LOT", ""),
-                    "구분": row.get("구분", ""),
-                    "출고수량": 1,
-                    "반출자": outbounder
-                }])
-                outbound_df = pd.concat([outbound_df, new_row], ignore_index=True)
-            outbound_df.to_excel(outbound_history_file, index=False)
-
-            # 선택된 항목들을 제거
-            df = df.drop(items_to_remove.index.tolist())
-            # 파일 저장
-            df.to_excel(history_file, index=False)
-            # 메모리 데이터 업데이트
-            self.df = df
+            row_ids = self.inventory.row_ids(location, product_code, quantity)
+            
+            # 출고내역 기록 및 재고 제거 (한 트랜잭션)
+            history_store.ship([(row_ids, outbounder)])
+            # 메모리 데이터 및 재고 인덱스 업데이트
+            self.inventory.remove_rows(row_ids)
+            self.locations.remove_rows(row_ids)
+            self.df = self.df.drop(row_ids)
             # 상태 업데이트
             self.update_status(f"출고 완료: {location} - {product_code} - {quantity}개 - {outbounder}")
         except Exception as e:
             raise Exception(f"출고 처리 실패: {e}")
 
+    def perform_batch_outbound(self, batch_items):
+        """일괄 출고 처리: 1회 로드, 메모리에서 출고 대상 선정, 1회 트랜잭션 기록
+
+        하나라도 재고가 부족하면 아무것도 기록하지 않는다.
+        반환값: (출고 라벨 수, 처리 시간(초))
+        """
+        start_time = time.perf_counter()
+        self.sync_inventory()
+        load_time = time.perf_counter() - start_time
+
+        # 재고 인덱스에서 출고 대상 선정 (같은 위치/제품이 여러 줄이면 이어서 선택)
+        used = {}
+        shipments = []
+        for item in batch_items:
+            key = (item['location'], item['product_code'])
+            row_ids = self.inventory.row_ids(*key)
+            offset = used.get(key, 0)
+            if len(row_ids) - offset < item['quantity']:
+                raise Exception(f"{item['location']} - {item.get('product_name', item['product_code'])}: "
+                                f"재고가 부족합니다. (요청: {item['quantity']}개, 보유: {len(row_ids) - offset}개)")
+            used[key] = offset + item['quantity']
+            shipments.append((row_ids[offset:offset + item['quantity']], item['outbounder']))
+
+        shipped_count = history_store.ship(shipments)
+        removed_ids = self.inventory.remove_rows([row_id for ids, _ in shipments for row_id in ids])
+        self.locations.remove_rows(removed_ids)
+        self.df = self.df.drop(removed_ids)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"일괄 출고 완료: {len(batch_items)}개 항목, {shipped_count}개 라벨, "
+              f"로드 {load_time * 1000:.1f}ms / 전체 {elapsed * 1000:.1f}ms")
+        self.update_status(f"일괄 출고 완료: {len(batch_items)}개 항목 ({shipped_count}개) - {elapsed * 1000:.0f}ms")
+        return shipped_count, elapsed
+
     def clear_outbound_form(self):
         """출고 폼 초기화"""
         self.location_var.set("")
@@ -2285,9 +2320,8 @@ class StockManager:
             if selected_item:
                 values = tree.item(selected_item[0])['values']
                 # 출고 내역 확인 창에서 출고 내역 파일을 다시 로드하여 상세 정보 표시
-                outbound_history_file = os.path.join(os.path.dirname(history_file), "outbound_history.xlsx")
-                if os.path.exists(outbound_history_file):
-                    outbound_df = pd.read_excel(outbound_history_file)
+                outbound_df = history_store.load_outbound_dataframe()
+                if not outbound_df.empty:
                     outbound_df = outbound_df[outbound_df["출고일시"] == values[0]] # 출고일시로 필터링
                     if not outbound_df.empty:
                         detail_window = tk.Toplevel(history_window)
@@ -2313,7 +2347,7 @@ class StockManager:
                     else:
                         messagebox.showinfo("정보", "해당 출고 내역의 상세 정보를 찾을 수 없습니다.")
                 else:
-                    messagebox.showinfo("정보", "출고 내역 파일이 없습니다.")
+                    messagebox.showinfo("정보", "출고 내역이 없습니다.")
         
         tree.bind('<Double-1>', on_double_click)
 
@@ -2327,8 +2361,8 @@ class StockManager:
     def load_outbound_history_data(self, tree):
         """출고 내역 데이터 로드 (출고일시, 보관위치, 제품코드, 제품명, LOT, 구분, 출고수량, 반출자)"""
         try:
-            if os.path.exists(os.path.join(os.path.dirname(history_file), "outbound_history.xlsx")):
-                outbound_df = pd.read_excel(os.path.join(os.path.dirname(history_file), "outbound_history.xlsx"))
+            outbound_df = history_store.load_outbound_dataframe()
+            if not outbound_df.empty:
                 for _, row in outbound_df.iterrows():
                     tree.insert("", "end", values=(
                         str(row['출고일시']),
@@ -2351,8 +2385,8 @@ class StockManager:
             self.load_outbound_history_data(tree)
             return
         try:
-            if os.path.exists(os.path.join(os.path.dirname(history_file), "outbound_history.xlsx")):
-                outbound_df = pd.read_excel(os.path.join(os.path.dirname(history_file), "outbound_history.xlsx"))
+            outbound_df = history_store.load_outbound_dataframe()
+            if not outbound_df.empty:
                 search_mask = (
                     outbound_df['출고일시'].astype(str).str.contains(search_term, case=False, na=False) |
                     outbound_df['보관위치'].astype(str).str.contains(search_term, case=False, na=False) |
@@ -2550,11 +2584,8 @@ class StockManager:
         # 제품명 조회
         product_name = "알 수 없음"
         try:
-            if not self.df.empty:
-                product_mask = (self.df['제품코드'] == product_code)
-                if len(self.df[product_mask]) > 0:
-                    product_df = pd.DataFrame(self.df[product_mask]).copy()
-                    product_name = str(product_df['제품명'].iloc[0])
+            if self.inventory.product_total(product_code) > 0:
+                product_name = self.inventory.product_name(product_code)
         except Exception as e:
             print(f"제품명 조회 오류: {e}")
 
@@ -2562,11 +2593,7 @@ class StockManager:
         stock_check = "재고 부족"
         try:
             if not self.df.empty:
-                stock_mask = (
-                    (self.df['보관위치'] == location) & 
-                    (self.df['제품코드'] == product_code)
-                )
-                current_stock = len(self.df[stock_mask])
+                current_stock = self.inventory.stock(location, product_code)
                 if current_stock >= quantity:
                     stock_check = f"재고 OK ({current_stock}개)"
                 else:
@@ -2618,21 +2645,13 @@ class StockManager:
         
         for item in self.batch_items:
             try:
-                stock_mask = (
-                    (self.df['보관위치'] == item['location']) & 
-                    (self.df['제품코드'] == item['product_code'])
-                )
-                current_stock = len(self.df[stock_mask])
+                current_stock = self.inventory.stock(item['location'], item['product_code'])
                 if current_stock < item['quantity']:
                     insufficient_items.append(f"{item['location']} - {item['product_name']} (요청: {item['quantity']}개, 재고: {current_stock}개)")
                 
                 # 관리품 출고 제한 확인
-                stock_df = pd.DataFrame(self.df[stock_mask]).copy()
-                category_column = '구분' if '구분' in stock_df.columns else 'category'
-                if category_column in stock_df.columns:
-                    item_categories = stock_df[category_column].dropna().unique()
-                    if '관리품' in item_categories:
-                        management_items.append(f"{item['location']} - {item['product_name']} (관리품)")
+                if self.inventory.is_management_item(item['location'], item['product_code']):
+                    management_items.append(f"{item['location']} - {item['product_name']} (관리품)")
                         
             except Exception as e:
                 insufficient_items.append(f"{item['location']} - {item['product_name']} (재고 확인 오류)")
@@ -2658,24 +2677,16 @@ class StockManager:
         if not result:
             return
 
-        # 일괄 출고 실행
-        success_count = 0
-        failed_items = []
-
-        for item in self.batch_items:
-            try:
-                self.perform_outbound(item['location'], item['product_code'], 
-                                   item['quantity'], item['outbounder'])
-                success_count += 1
-            except Exception as e:
-                failed_items.append(f"{item['location']} - {item['product_name']}: {e}")
+        # 일괄 출고 실행 (전체를 하나의 트랜잭션으로 처리)
+        try:
+            shipped_count, elapsed = self.perform_batch_outbound(self.batch_items)
+        except Exception as e:
+            messagebox.showerror("일괄 출고 실패", f"일괄 출고가 취소되었습니다. (변경 사항 없음)\n\n{e}")
+            return
 
-        # 결과 표시
-        if failed_items:
-            messagebox.showwarning("일괄 출고 완료", 
-                                 f"성공: {success_count}개\n실패: {len(failed_items)}개\n\n실패 항목:\n" + "\n".join(failed_items))
-        else:
-            messagebox.showinfo("일괄 출고 완료", f"모든 {success_count}개 항목이 성공적으로 출고되었습니다.")
+        messagebox.showinfo("일괄 출고 완료",
+                            f"모든 {len(self.batch_items)}개 항목({shipped_count}개 라벨)이 성공적으로 출고되었습니다.\n"
+                            f"처리 시간: {elapsed * 1000:.0f}ms")
 
         # 배치 목록 초기화
         self.batch_items = []
@@ -2796,11 +2807,8 @@ class StockManager:
 
         try:
             if not self.df.empty:
-                product_mask = (self.df['제품코드'] == product_code)
-                if len(self.df[product_mask]) > 0:
-                    product_df = pd.DataFrame(self.df[product_mask]).copy()
-                    product_name = str(product_df['제품명'].iloc[0])
-                    label.config(text=product_name)
+                if self.inventory.product_total(product_code) > 0:
+                    label.config(text=self.inventory.product_name(product_code))
                 else:
                     label.config(text="제품 없음")
         except Exception as e:
@@ -2839,13 +2847,11 @@ class StockManager:
             return
         
         try:
-            # SQL 쿼리를 사용하여 제품명 조회
-            df = call_query(q_boosters_items_for_barcode_reader.query, boosta_boosters)
-            product_mask = (df['제품코드'] == product_code)
-            filtered_df = df[product_mask]
+            # 제품 카탈로그 캐시에서 제품명 조회
+            products = product_catalog.load().products
             
-            if len(filtered_df) > 0:
-                product_name = str(filtered_df['제품명'].iloc[0])
+            if product_code in products:
+                product_name = str(products[product_code])
                 self.product_name_label.config(text=product_name, fg="#4CAF50")
             else:
                 self.product_name_label.config(text="제품 없음", fg="#F44336")
@@ -2974,80 +2980,76 @@ class StockManager:
         barcode_window.bind('<Escape>', lambda e: barcode_window.destroy())
 
     def load_barcode_mapping(self):
-        """SQL 쿼리를 사용하여 바코드-제품코드 매핑을 로드합니다."""
+        """제품 카탈로그 캐시에서 바코드-제품코드 매핑을 로드합니다."""
         try:
-            # SQL 쿼리를 사용하여 제품 정보 로드
-            df = call_query(q_boosters_items_for_barcode_reader.query, boosta_boosters)
-            df_limit_date = call_query(q_boosters_items_limit_date.query, boosta_boosters)
-            df = pd.merge(df, df_limit_date, on='제품코드', how='left')
-            
-            # 바코드-제품코드 매핑 생성
-            self.barcode_to_product = {}
-            if '바코드' in df.columns:
-                for _, row in df.iterrows():
-                    barcode = str(row['바코드']).strip()
-                    if barcode and barcode != 'nan':
-                        self.barcode_to_product[barcode] = str(row['제품코드'])
-            
-            print(f"바코드 매핑 로드: {len(self.barcode_to_product)}개 항목")
-            
-            # 디버깅을 위해 일부 바코드 정보 출력
-            if self.barcode_to_product:
-                sample_barcodes = list(self.barcode_to_product.keys())[:3]
-                print(f"샘플 바코드: {sample_barcodes}")
-                for barcode in sample_barcodes:
-                    print(f"  {barcode} -> {self.barcode_to_product[barcode]}")
-            
+            self.set_barcode_mapping(product_catalog.load().barcodes)
         except Exception as e:
             messagebox.showerror("오류", f"바코드 매핑을 로드하는 중 오류가 발생했습니다: {e}")
             self.barcode_to_product = {}
             print(f"바코드 매핑 로드 오류: {e}")
+
+    def set_barcode_mapping(self, barcode_to_product):
+        """바코드-제품코드 매핑 적용"""
+        self.barcode_to_product = barcode_to_product
+        
+        print(f"바코드 매핑 로드: {len(self.barcode_to_product)}개 항목")
+        
+        # 디버깅을 위해 일부 바코드 정보 출력
+        if self.barcode_to_product:
+            sample_barcodes = list(self.barcode_to_product.keys())[:3]
+            print(f"샘플 바코드: {sample_barcodes}")
+            for barcode in sample_barcodes:
+                print(f"  {barcode} -> {self.barcode_to_product[barcode]}")
     
     def load_zone_config(self):
         """구역 설정 로드"""
         try:
-            zone_config_file = "barcode_label/zone_config.json"
-            print(f"구역 설정 파일 경로: {os.path.abspath(zone_config_file)}")
-            print(f"파일 존재 여부: {os.path.exists(zone_config_file)}")
-            
-            if os.path.exists(zone_config_file):
-                with open(zone_config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    print(f"구역 설정 로드 성공: {len(config.get('zones', {}))}개 구역")
-                    return config
-            else:
-                print("구역 설정 파일이 없어서 기본 설정을 사용합니다.")
-                # 기본 설정 (기존 A, B 구역)
-                return {
-                    "zones": {
-                        "A": {
-                            "name": "A 구역",
-                            "color": "#2196F3",
-                            "sections": {
-                                "rows": 5,
-                                "columns": 3,
-                                "description": "A 구역 5x3 섹션"
-                            }
-                        },
-                        "B": {
-                            "name": "B 구역", 
-                            "color": "#FF9800",
-                            "sections": {
-                                "rows": 5,
-                                "columns": 3,
-                                "description": "B 구역 5x3 섹션"
-                            }
-                        }
-                    },
-                    "default_location_format": "{zone}-{row:02d}-{col:02d}",
-                    "max_zones": 10,
-                    "max_sections_per_zone": 10
-                }
+            return self.read_zone_config()
         except Exception as e:
             print(f"구역 설정 로드 오류: {e}")
             messagebox.showerror("구역 설정 오류", f"구역 설정을 로드할 수 없습니다: {e}")
             return {"zones": {}}
 
+    def read_zone_config(self):
+        """구역 설정 파일 읽기 (오류는 호출 측에서 처리, 작업 스레드에서도 호출 가능)"""
+        zone_config_file = "barcode_label/zone_config.json"
+        print(f"구역 설정 파일 경로: {os.path.abspath(zone_config_file)}")
+        print(f"파일 존재 여부: {os.path.exists(zone_config_file)}")
+        
+        if os.path.exists(zone_config_file):
+            with open(zone_config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                print(f"구역 설정 로드 성공: {len(config.get('zones', {}))}개 구역")
+                return config
+        else:
+            print("구역 설정 파일이 없어서 기본 설정을 사용합니다.")
+            # 기본 설정 (기존 A, B 구역)
+            return {
+                "zones": {
+                    "A": {
+                        "name": "A 구역",
+                        "color": "#2196F3",
+                        "sections": {
+                            "rows": 5,
+                            "columns": 3,
+                            "description": "A 구역 5x3 섹션"
+                        }
+                    },
+                    "B": {
+                        "name": "B 구역", 
+                        "color": "#FF9800",
+                        "sections": {
+                            "rows": 5,
+                            "columns": 3,
+                            "description": "B 구역 5x3 섹션"
+                        }
+                    }
+                },
+                "default_location_format": "{zone}-{row:02d}-{col:02d}",
+                "max_zones": 10,
+                "max_sections_per_zone": 10
+            }
+
 def main():
     root = tk.Tk()
     app = StockManager(root)
@@ -8,12 +8,9 @@ import streamlit as st
 import os
 import sys
 import pandas as pd
-import sqlite3
 from datetime import datetime, timedelta
 import json
 from PIL import Image, ImageDraw, ImageFont
-import barcode
-from barcode.writer import ImageWriter
 import io
 import base64
 import subprocess
@@ -32,60 +29,9 @@ except:
 pd.set_option('display.encoding', 'utf-8')
 
 def get_korean_font(size):
-    """한글을 지원하는 폰트를 찾아서 반환 (Streamlit Cloud 최적화)"""
-    import platform
-    import urllib.request
-    import tempfile
-
-    # 현재 파일의 디렉토리 경로
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # 1순위: 앱에 포함된 폰트 파일 사용
-    font_path = os.path.join(current_dir, "fonts", "NotoSansKR-Regular.ttf")
-    print(f"1순위 폰트 경로 확인: {font_path}")
-
-    if os.path.exists(font_path):
-        try:
-            print(f"앱에 포함된 폰트를 사용합니다: {font_path}")
-            return ImageFont.truetype(font_path, size)
-        except Exception as e:
-            print(f"앱 포함 폰트 로드 실패: {e}")
-
-    # 2순위: Streamlit Cloud 환경에서 웹 폰트 다운로드 (비상용)
-    if os.environ.get('STREAMLIT_CLOUD', False):
-        font_url = "https://github.com/google/fonts/raw/main/ofl/notosanskr/NotoSansKR-Regular.ttf"
-        try:
-            # 임시 디렉토리에 폰트 저장
-            font_filename = os.path.basename(font_url)
-            temp_font_path = os.path.join(tempfile.gettempdir(), font_filename)
-            
-            if not os.path.exists(temp_font_path):
-                print(f"웹 폰트를 다운로드합니다... ({font_url})")
-                urllib.request.urlretrieve(font_url, temp_font_path)
-            
-            print(f"다운로드한 웹 폰트를 사용합니다: {temp_font_path}")
-            return ImageFont.truetype(temp_font_path, size)
-        except Exception as e:
-            print(f"웹 폰트 다운로드 또는 로드 실패: {e}")
-
-    # 3순위: 로컬 환경(Windows, macOS 등)에서 시스템 폰트 탐색
-    system = platform.system()
-    if system == "Windows":
-        font_name = "malgun.ttf"  # 맑은 고딕
-    elif system == "Darwin": # macOS
-        font_name = "AppleGothic.ttf"
-    elif system == "Linux":
-        # Linux에서는 다양한 경로를 확인해야 할 수 있음
-        font_name = "/usr/share/fonts/truetype/nanum/NanumGothic.ttf"
-    
-    try:
-        return ImageFont.truetype(font_name, size)
-    except Exception:
-        pass # 시스템 폰트 못찾으면 다음으로 넘어감
-
-    # 최후의 수단: 기본 폰트 사용 (한글 깨짐)
-    print("경고: 한글 지원 폰트를 찾지 못했습니다. 기본 폰트를 사용합니다.")
-    return ImageFont.load_default()
+    """한글을 지원하는 폰트 반환 (font_provider 공용 캐시, 경로 탐색/다운로드는 프로세스당 한 번)"""
+    from font_provider import get_font
+    return get_font(size)
 
 def safe_text(text):
     """한글 텍스트를 안전하게 처리"""
@@ -100,13 +46,10 @@ def draw_korean_text_with_fallback(draw, position, text, font, fill="black"):
     if not text:
         return
         
-    print(f"텍스트 그리기 시도: '{text}' (폰트: {font})")
-    
     try:
         # 먼저 지정된 폰트로 시도
         if font:
             draw.text(position, text, fill=fill, font=font)
-            print(f"폰트로 텍스트 그리기 성공: {text}")
             return
     except Exception as e:
         print(f"한글 텍스트 그리기 실패 (폰트: {font}): {e}")
@@ -198,9 +141,18 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 sys.path.insert(0, current_dir)
 
 # 기존 모듈들 import
+from issue_history_store import history_store, SHEETS_COLUMNS
+from label_registry import label_registry
+from product_catalog import product_catalog
+from text_layout import wrap_words
+import code128
+from print_queue import get_print_queue
+from sync_outbox import sync_outbox, SHEETS_ROWS
+
 try:
     from google_sheets_manager import sheets_manager
     GOOGLE_SERVICES_AVAILABLE = True
+    sync_outbox.register(SHEETS_ROWS, sheets_manager.append_rows_to_sheets, batch=True)
 except ImportError as e:
     GOOGLE_SERVICES_AVAILABLE = False
     st.warning(f"구글 스프레드시트 연동 모듈을 불러올 수 없습니다: {e}")
@@ -283,14 +235,11 @@ if 'zone_config' not in st.session_state:
     st.session_state.zone_config = {}
 
 def load_products():
-    """제품 정보 로드"""
+    """제품 정보 로드 (공용 제품 카탈로그 캐시)"""
     try:
-        products_file = os.path.join(current_dir, 'products.xlsx')
-        if os.path.exists(products_file):
-            df = pd.read_excel(products_file, engine='openpyxl')
-            products_dict = dict(zip(df['제품코드'], df['제품명']))
-            st.session_state.products = products_dict
-            return products_dict
+        products_dict = product_catalog.load().products
+        st.session_state.products = products_dict
+        return products_dict
     except Exception as e:
         st.error(f"제품 정보 로드 실패: {e}")
     return {}
@@ -311,64 +260,24 @@ def load_zone_config():
 def init_serial_database():
     """일련번호 데이터베이스 초기화"""
     try:
-        db_path = os.path.join(current_dir, 'label_serial.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS label_info (
-                serial_number INTEGER PRIMARY KEY,
-                product_code TEXT,
-                lot TEXT,
-                expiry TEXT,
-                version TEXT,
-                location TEXT,
-                category TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
+        label_registry.initialize()
         return True
     except Exception as e:
         st.error(f"데이터베이스 초기화 실패: {e}")
         return False
 
-def get_next_serial_number():
-    """다음 일련번호 생성"""
+def get_current_serial_number():
+    """마지막으로 발급된 일련번호"""
     try:
-        db_path = os.path.join(current_dir, 'label_serial.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT MAX(serial_number) FROM label_info')
-        result = cursor.fetchone()
-        next_serial = (result[0] or 0) + 1
-        
-        conn.close()
-        return next_serial
+        return label_registry.current_serial()
     except Exception as e:
-        st.error(f"일련번호 생성 실패: {e}")
-        return 1
+        st.error(f"일련번호 조회 실패: {e}")
+        return 0
 
 def save_label_info(product_code, lot, expiry, version, location, category):
-    """라벨 정보 저장"""
+    """라벨 정보 저장 (일련번호 발급과 저장을 한 트랜잭션으로 처리)"""
     try:
-        serial_number = get_next_serial_number()
-        db_path = os.path.join(current_dir, 'label_serial.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO label_info 
-            (serial_number, product_code, lot, expiry, version, location, category)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (serial_number, product_code, lot, expiry, version, location, category))
-        
-        conn.commit()
-        conn.close()
-        return serial_number
+        return label_registry.register(product_code, lot, expiry, version, location, category)
     except Exception as e:
         st.error(f"라벨 정보 저장 실패: {e}")
         return None
@@ -379,11 +288,6 @@ def create_barcode_image(serial_number, product_code, lot, expiry, version, loca
         # 제품명 조회
         product_name = st.session_state.products.get(product_code, "Unknown Product")
         
-        # 바코드 생성
-        barcode_class = barcode.get_barcode_class('code128')
-        barcode_image = barcode_class(str(serial_number), writer=ImageWriter())
-        barcode_img = barcode_image.render({'write_text': False})
-        
         # 라벨 크기 설정 (30mm x 20mm, 4배 확대된 해상도)
         LABEL_WIDTH = 480  # 30mm * 4 * 4 = 480px
         LABEL_HEIGHT = 320  # 20mm * 4 * 4 = 320px
@@ -392,80 +296,18 @@ def create_barcode_image(serial_number, product_code, lot, expiry, version, loca
         label = Image.new('RGB', (LABEL_WIDTH, LABEL_HEIGHT), 'white')
         draw = ImageDraw.Draw(label)
         
-        # 한글 폰트 설정 (30x20 라벨에 맞는 크기)
-        print("한글 폰트 로딩 시작...")
-        try:
-            font_large = get_korean_font(20)    # 제품명용
-            font_medium = get_korean_font(16)   # 구분용
-            font_small = get_korean_font(14)    # 상세정보용
-            font_tiny = get_korean_font(12)     # 바코드 텍스트용
-            
-            print(f"폰트 로딩 결과:")
-            print(f"  font_large: {font_large}")
-            print(f"  font_medium: {font_medium}")
-            print(f"  font_small: {font_small}")
-            print(f"  font_tiny: {font_tiny}")
-            
-            # 폰트가 None인 경우 기본 폰트 사용
-            if font_large is None:
-                print("font_large가 None이므로 기본 폰트 사용")
-                font_large = ImageFont.load_default()
-            if font_medium is None:
-                print("font_medium이 None이므로 기본 폰트 사용")
-                font_medium = ImageFont.load_default()
-            if font_small is None:
-                print("font_small이 None이므로 기본 폰트 사용")
-                font_small = ImageFont.load_default()
-            if font_tiny is None:
-                print("font_tiny가 None이므로 기본 폰트 사용")
-                font_tiny = ImageFont.load_default()
-        except Exception as e:
-            print(f"폰트 로딩 오류: {e}")
-            import traceback
-            traceback.print_exc()
-            # 모든 폰트를 기본 폰트로 설정
-            font_large = font_medium = font_small = font_tiny = ImageFont.load_default()
-        
-        # 폰트 로드 상태 확인 (디버그용)
-        if hasattr(font_large, 'path'):
-            print(f"폰트 로드 성공: {font_large.path}")
-        else:
-            print("기본 폰트 사용 중 (한글 지원 제한적)")
+        # 한글 폰트 설정 (30x20 라벨에 맞는 크기, 공용 캐시)
+        font_large = get_korean_font(20)    # 제품명용
+        font_medium = get_korean_font(16)   # 구분용
+        font_small = get_korean_font(14)    # 상세정보용
+        font_tiny = get_korean_font(12)     # 바코드 텍스트용
         
         # 텍스트 줄바꿈 함수 (30x20 라벨에 최적화)
         def draw_multiline_text(draw, text, position, font, max_width, fill="black", max_lines=2):
             """텍스트를 여러 줄로 나누어 그리기 (30x20 라벨에 최적화)"""
             x, y = position
-            words = text.split()
-            lines = []
-            current_line = []
-            
-            for word in words:
-                test_line = ' '.join(current_line + [word])
-                bbox = draw.textbbox((0, 0), test_line, font=font)
-                text_width = bbox[2] - bbox[0]
-                
-                if text_width <= max_width:
-                    current_line.append(word)
-                else:
-                    if current_line:
-                        lines.append(' '.join(current_line))
-                        current_line = [word]
-                    else:
-                        # 단어가 너무 길면 강제로 줄바꿈 (15자 단위)
-                        if len(word) > 15:
-                            lines.append(word[:15])
-                            current_line = [word[15:]]
-                        else:
-                            lines.append(word)
-            
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            # 최대 줄 수 제한 (30x20 라벨에 맞게 2줄)
-            if len(lines) > max_lines:
-                lines = lines[:max_lines-1]
-                lines.append("...")  # 잘린 부분 표시
+            # 단어 폭은 한 번만 재고 결과는 (텍스트, 폰트, 폭)별 캐시, 긴 단어는 15자 단위, 최대 줄 수 넘으면 "..."
+            lines = wrap_words(text, font, max_width, max_lines)
             
             for line in lines:
                 draw_korean_text_with_fallback(draw, (x, y), line, font, fill)
@@ -494,10 +336,10 @@ def create_barcode_image(serial_number, product_code, lot, expiry, version, loca
         # 보관위치
         draw_korean_text_with_fallback(draw, (margin, y_pos), f"보관위치: {location}", font_small)
         
-        # 바코드 이미지 리사이즈 및 배치 (하단에 고정)
+        # 바코드 직접 래스터화 (정수 모듈 폭 1비트, 리샘플링 없음) 및 배치 (하단에 고정)
         barcode_height = 100
         barcode_width = LABEL_WIDTH - 30
-        barcode_img = barcode_img.resize((barcode_width, barcode_height), Image.Resampling.LANCZOS)
+        barcode_img = code128.render(str(serial_number), barcode_width, barcode_height)
         barcode_x = 4
         barcode_y = LABEL_HEIGHT - barcode_height - 60
         label.paste(barcode_img, (barcode_x, barcode_y))
@@ -517,6 +359,17 @@ def create_barcode_image(serial_number, product_code, lot, expiry, version, loca
 
 def print_label_image(label_image, filename):
     """라벨 이미지 인쇄"""
+    # 라벨 프린터가 설정되어 있으면 임시 파일 없이 인쇄 대기열로 바로 전송
+    printer_queue = get_print_queue()
+    if printer_queue:
+        try:
+            job_id = printer_queue.submit_image(label_image, filename)
+            print(f"인쇄 대기열 추가: 작업 {job_id} ({printer_queue.transport})")
+            return True
+        except Exception as e:
+            print(f"인쇄 대기열 추가 실패: {e}")
+            return False
+
     try:
         import platform
         import tempfile
@@ -637,45 +490,13 @@ def save_issue_history(product_code, lot, expiry, version, location, filename, c
             '발행일시': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         }
         
-        # Excel 파일에 저장
-        excel_file = os.path.join(current_dir, 'issue_history.xlsx')
-        
-        # 컬럼 순서 정의 (구글 스프레드시트와 동일)
-        column_order = [
-            '일련번호', '구분', '제품코드', '제품명', 'LOT', 
-            '유통기한', '폐기일자', '보관위치', '버전', '발행일시'
-        ]
-        
-        if os.path.exists(excel_file):
-            df = pd.read_excel(excel_file, engine='openpyxl')
-        else:
-            df = pd.DataFrame(columns=column_order)
-        
-        # 새 데이터 추가
-        new_row = pd.DataFrame([issue_data])
-        df = pd.concat([df, new_row], ignore_index=True)
-        
-        # 컬럼 순서에 맞게 정렬
-        df = df.reindex(columns=column_order)
-        df.to_excel(excel_file, index=False, engine='openpyxl')
+        # 발행 이력 저장소에 1행 추가 (엑셀은 내보내기 전용)
+        history_store.append(dict(issue_data, 파일명=filename))
         
-        # 구글 스프레드시트에 저장 (가능한 경우)
+        # 구글 스프레드시트는 동기화 대기열에 추가 (전송은 백그라운드 작업 스레드에서 묶어서)
         if GOOGLE_SERVICES_AVAILABLE:
-            try:
-                print(f"Google Sheets 저장 시도: {issue_data}")
-                # 개별 행을 스프레드시트에 추가
-                result = sheets_manager.add_row_to_sheets(issue_data)
-                print(f"Google Sheets 저장 결과: {result}")
-                
-                if result:
-                    st.success("구글 스프레드시트에 저장되었습니다!")
-                else:
-                    st.warning("구글 스프레드시트 저장에 실패했습니다. 로그를 확인하세요.")
-            except Exception as e:
-                print(f"Google Sheets 저장 예외: {e}")
-                import traceback
-                traceback.print_exc()
-                st.warning(f"구글 스프레드시트 저장 실패: {e}")
+            sync_outbox.enqueue(SHEETS_ROWS, issue_data)
+            st.info(f"구글 스프레드시트 동기화 대기열에 추가되었습니다. (대기 {sync_outbox.pending_count()}건)")
         else:
             print("Google Sheets 서비스가 사용 불가능합니다.")
         
@@ -707,6 +528,9 @@ def main():
             "기능 선택",
             ["🏷️ 라벨 생성", "📊 발행 내역 조회", "⚙️ 설정", "📈 대시보드"]
         )
+        if GOOGLE_SERVICES_AVAILABLE:
+            pending = sync_outbox.pending_count()
+            st.caption(f"구글 동기화 대기 {pending}건" if pending else "구글 동기화: 모두 전송됨")
     
     # 메인 컨텐츠
     if menu_option == "🏷️ 라벨 생성":
@@ -874,11 +698,14 @@ def show_history_page():
     st.markdown('<h2 class="section-header">📊 발행 내역 조회</h2>', unsafe_allow_html=True)
     
     # 발행 내역 로드
-    excel_file = os.path.join(current_dir, 'issue_history.xlsx')
+    try:
+        df = history_store.load_dataframe(columns=SHEETS_COLUMNS)
+    except Exception as e:
+        df = None
+        st.error(f"발행 내역 로드 실패: {e}")
     
-    if os.path.exists(excel_file):
+    if df is not None:
         try:
-            df = pd.read_excel(excel_file, engine='openpyxl')
             
             if not df.empty:
                 # 필터링 옵션
@@ -936,8 +763,6 @@ def show_history_page():
                 
         except Exception as e:
             st.error(f"발행 내역 로드 실패: {e}")
-    else:
-        st.info("발행 내역 파일이 없습니다.")
 
 def show_settings_page():
     """설정 페이지"""
@@ -957,6 +782,7 @@ def show_settings_page():
                     if sheets_manager.spreadsheet_id:
                         st.info(f"연결된 스프레드시트 ID: {sheets_manager.spreadsheet_id}")
                         st.info(f"스프레드시트 URL: {sheets_manager.get_spreadsheet_url()}")
+                        st.caption(sheets_manager.api_call_report())
                     else:
                         st.warning("스프레드시트 ID가 설정되지 않았습니다. secrets.toml에서 설정하세요.")
                 else:
@@ -976,9 +802,9 @@ def show_settings_page():
     
     with col1:
         st.info(f"""
-        **데이터베이스**: {'✅ 연결됨' if os.path.exists(os.path.join(current_dir, 'label_serial.db')) else '❌ 연결 안됨'}
+        **데이터베이스**: {'✅ 연결됨' if os.path.exists(label_registry.db_path) else '❌ 연결 안됨'}
         
-        **제품 정보**: {'✅ 로드됨' if st.session_state.products else '❌ 로드 안됨'}
+        **제품 정보**: {'✅ ' + product_catalog.describe() if st.session_state.products else '❌ 로드 안됨'}
         
         **구역 설정**: {'✅ 로드됨' if st.session_state.zone_config else '❌ 로드 안됨'}
         """)
@@ -989,7 +815,7 @@ def show_settings_page():
         
         **MySQL 데이터베이스**: {'✅ 사용 가능' if MYSQL_AVAILABLE else '❌ 사용 불가'}
         
-        **현재 일련번호**: {get_next_serial_number() - 1}
+        **현재 일련번호**: {get_current_serial_number()}
         """)
 
 def show_dashboard_page():
@@ -997,11 +823,14 @@ def show_dashboard_page():
     st.markdown('<h2 class="section-header">📈 대시보드</h2>', unsafe_allow_html=True)
     
     # 발행 내역 로드
-    excel_file = os.path.join(current_dir, 'issue_history.xlsx')
+    try:
+        df = history_store.load_dataframe(columns=SHEETS_COLUMNS)
+    except Exception as e:
+        df = None
+        st.error(f"발행 내역 로드 실패: {e}")
     
-    if os.path.exists(excel_file):
+    if df is not None:
         try:
-            df = pd.read_excel(excel_file, engine='openpyxl')
             
             if not df.empty:
                 # 날짜별 발행 현황
@@ -1031,8 +860,6 @@ def show_dashboard_page():
                 
         except Exception as e:
             st.error(f"대시보드 데이터 로드 실패: {e}")
-    else:
-        st.info("발행 내역 파일이 없습니다.")
 
 if __name__ == "__main__":
     main()
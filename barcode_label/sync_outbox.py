@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+구글 스프레드시트/드라이브 동기화 대기열 (outbox)
+라벨 발행 경로는 동기화할 내용을 로컬 SQLite 대기열(sync_outbox.db)에 넣기만 하고
+백그라운드 작업 스레드가 구글 API로 전송 (네트워크가 느리거나 실패해도 발행은 기다리지 않음)
+
+- 종류(kind)별 처리 함수를 register()로 등록 (batch=True면 대기 중인 항목을 한 번에 묶어서 전달)
+  예: 발행 내역 여러 행 -> append_rows 요청 1번
+- 같은 종류/키로 다시 넣으면 이전에 대기 중이던 항목은 지움 (같은 파일 업로드를 여러 번 하지 않음)
+- 실패하면 지수 백오프로 재시도, 할당량 초과(429)는 최소 QUOTA_BACKOFF초 대기
+  묶음 처리 종류는 가장 오래된 항목이 재시도 대기 중이면 뒤 항목도 기다려서 순서 유지
+- 일시적인 오류(429, 5xx, 네트워크 오류)는 계속 재시도, 그 밖의 오류(4xx, 잘못된 데이터로 인한 ValueError 등)가
+  MAX_ATTEMPTS번 반복되면 failed로 남김 (retry_failed()로 다시 시도)
+  묶음 전송이 일시적이지 않은 오류로 실패하면 반씩 나눠 다시 보내서 문제 항목만 골라냄
+  (문제 항목 하나 때문에 뒤 항목이 계속 막히지 않음)
+- 프로그램이 종료되어도 대기 중인 항목은 DB에 남아 다음 실행 때 이어서 전송
+- label_gui/streamlit_app이 같은 sync_outbox.db를 함께 쓰므로 처리할 항목은 트랜잭션 안에서
+  sending으로 바꿔 가져감(claim), 같은 종류가 다른 곳에서 전송 중이면 기다림 (중복 전송 없이 순서 유지)
+  전송 중 종료되어 CLAIM_TIMEOUT이 지난 항목은 다시 대기 상태로
+"""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 대기열 종류
+SHEETS_ROWS = "sheets_rows"    # 발행 내역 1행 (dict)
+DRIVE_LABEL = "drive_label"    # 라벨 이미지 업로드 {"path": ...}
+DRIVE_ZPL = "drive_zpl"        # ZPL 파일 업로드 {"path": ...}
+
+# 한 번에 가져올 최대 항목 수
+BATCH_SIZE = 500
+
+# 재시도 (2초, 4초, 8초 ... 최대 10분), 할당량 초과 시 최소 60초
+BACKOFF_BASE = 2.0
+BACKOFF_MAX = 600.0
+QUOTA_BACKOFF = 60.0
+MAX_ATTEMPTS = 10
+
+# 전송 중(sending) 상태로 이 시간이 지나면 가져간 프로그램이 종료된 것으로 보고 다시 대기 상태로
+CLAIM_TIMEOUT = 300.0
+
+PENDING, SENDING, FAILED = "pending", "sending", "failed"
+
+# 상태 코드 없이 발생하는 네트워크 오류 (구글 라이브러리를 import하지 않고 클래스 이름으로 확인)
+TRANSIENT_ERRORS = {"TransportError", "HttpLib2Error", "ServerNotFoundError"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    coalesce_key TEXT,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL DEFAULT 0,
+    last_error TEXT,
+    claimed_by TEXT,
+    claimed_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_status ON outbox(status, id);
+CREATE INDEX IF NOT EXISTS idx_outbox_key ON outbox(kind, coalesce_key);
+"""
+
+
+def _status_code(error):
+    """gspread APIError / googleapiclient HttpError의 HTTP 상태 코드 (없으면 None)"""
+    # requests.Response는 4xx/5xx이면 bool()이 False이므로 or 대신 None인지 비교
+    response = getattr(error, "response", None)
+    if response is None:
+        response = getattr(error, "resp", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        status = getattr(response, "status", None)
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_transient(error):
+    """다시 시도하면 성공할 수 있는 오류인지 (할당량 초과, 서버 오류, 네트워크 오류)"""
+    status = _status_code(error)
+    if status is not None:
+        return status in (408, 429) or status >= 500
+    return isinstance(error, OSError) or any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+class SyncOutbox:
+    def __init__(self, db_path=None, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                 quota_backoff=QUOTA_BACKOFF, max_attempts=MAX_ATTEMPTS):
+        self.db_path = db_path or os.path.join(SCRIPT_DIR, "sync_outbox.db")
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.quota_backoff = quota_backoff
+        self.max_attempts = max_attempts
+        self._handlers = {}
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._worker = None
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{id(self):x}"
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.executescript(SCHEMA)
+                    self._migrate(conn)
+                    self._initialized = True
+        return conn
+
+    @staticmethod
+    def _migrate(conn):
+        """이전 버전 sync_outbox.db에 claim 컬럼 추가"""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(outbox)")}
+        for name, kind in (("claimed_by", "TEXT"), ("claimed_at", "REAL")):
+            if name not in columns:
+                try:
+                    conn.execute(f"ALTER TABLE outbox ADD COLUMN {name} {kind}")
+                except sqlite3.OperationalError:
+                    pass  # 다른 프로그램이 먼저 추가함
+
+    def register(self, kind, handler, batch=False):
+        """처리 함수 등록 후 작업 스레드 시작
+
+        batch=False: handler(payload), batch=True: handler([payload, ...]) (대기열 순서)
+        실패하면 예외를 발생시켜야 재시도됨
+        """
+        self._handlers[kind] = (handler, batch)
+        self.start()
+        self._wakeup.set()
+
+    def enqueue(self, kind, payload, key=None):
+        """항목 추가 (key가 같은 대기 항목은 새 항목으로 대체), 항목 번호 반환"""
+        data = json.dumps(payload, ensure_ascii=False, default=str)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if key is not None:
+                conn.execute("DELETE FROM outbox WHERE kind = ? AND coalesce_key = ? AND status = ?",
+                             (kind, key, PENDING))
+            cursor = conn.execute(
+                "INSERT INTO outbox (created_at, kind, coalesce_key, payload) VALUES (?, ?, ?, ?)",
+                (datetime.now().strftime("%Y-%m-%d %H:%M:%S"), kind, key, data)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def pending_count(self):
+        """대기 중이거나 전송 중인 항목 수"""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM outbox WHERE status IN (?, ?)", (PENDING, SENDING)
+        ).fetchone()[0]
+
+    def stats(self):
+        """{(종류, 상태): 개수}"""
+        rows = self._connect().execute("SELECT kind, status, COUNT(*) FROM outbox GROUP BY kind, status")
+        return {(kind, status): count for kind, status, count in rows}
+
+    def retry_failed(self):
+        self._connect().execute(
+            "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = 0 WHERE status = ?", (PENDING, FAILED)
+        )
+        self._wakeup.set()
+
+    def start(self):
+        """작업 스레드 시작 (이미 실행 중이면 무시)"""
+        if self._worker is None or not self._worker.is_alive():
+            self._stopping.clear()
+            self._worker = threading.Thread(target=self._run, name="sync-outbox", daemon=True)
+            self._worker.start()
+
+    def stop(self, timeout=5):
+        self._stopping.set()
+        self._wakeup.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    def wait_idle(self, timeout=None):
+        """처리 함수가 등록된 대기 항목이 모두 전송될 때까지 대기 (재시도 대기 포함), 끝나면 True"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending_registered():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.02)
+        return True
+
+    def _pending_registered(self):
+        kinds = list(self._handlers)
+        if not kinds:
+            return 0
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM outbox WHERE status IN (?, ?) AND kind IN ({', '.join('?' for _ in kinds)})",
+            [PENDING, SENDING] + kinds
+        ).fetchone()[0]
+
+    def _claim_rows(self, limit=BATCH_SIZE):
+        """지금 처리할 항목을 가져감 [(id, kind, payload, attempts)]
+
+        트랜잭션 안에서 sending으로 바꾸므로 다른 프로그램의 작업 스레드는 같은 항목을 가져가지 못함
+        다른 곳에서 전송 중인 종류와 가장 오래된 항목이 재시도 대기 중인 묶음 처리 종류는 건너뜀 (순서 유지)
+        """
+        kinds = list(self._handlers)
+        if not kinds:
+            return []
+        now = time.time()
+        placeholders = ", ".join("?" for _ in kinds)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 가져간 프로그램이 전송 중에 종료된 항목은 다시 대기 상태로
+            conn.execute(
+                "UPDATE outbox SET status = ?, claimed_by = NULL, claimed_at = NULL "
+                "WHERE status = ? AND claimed_at < ?", (PENDING, SENDING, now - CLAIM_TIMEOUT)
+            )
+            blocked = {kind for (kind,) in conn.execute(
+                f"SELECT DISTINCT kind FROM outbox WHERE status = ? AND kind IN ({placeholders})", [SENDING] + kinds
+            )}
+            rows = conn.execute(
+                f"SELECT id, kind, payload, attempts, next_attempt_at FROM outbox "
+                f"WHERE status = ? AND kind IN ({placeholders}) ORDER BY id LIMIT ?",
+                [PENDING] + kinds + [limit * 4]
+            ).fetchall()
+            due = []
+            for row_id, kind, payload, attempts, next_attempt_at in rows:
+                if kind in blocked:
+                    continue
+                if next_attempt_at > now:
+                    if self._handlers[kind][1]:
+                        blocked.add(kind)
+                    continue
+                due.append((row_id, kind, payload, attempts))
+                if len(due) >= limit:
+                    break
+            for start in range(0, len(due), 500):
+                chunk = [row[0] for row in due[start:start + 500]]
+                conn.execute(
+                    f"UPDATE outbox SET status = ?, claimed_by = ?, claimed_at = ? "
+                    f"WHERE id IN ({', '.join('?' for _ in chunk)})",
+                    [SENDING, self.owner, now] + chunk
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return due
+
+    def _next_wait(self):
+        """등록된 종류의 다음 재시도까지 남은 시간 (최대 5초, 다른 곳에서 전송 중이면 1초)"""
+        kinds = list(self._handlers)
+        if not kinds:
+            return 5.0
+        placeholders = ", ".join("?" for _ in kinds)
+        conn = self._connect()
+        if conn.execute(f"SELECT 1 FROM outbox WHERE status = ? AND kind IN ({placeholders}) LIMIT 1",
+                        [SENDING] + kinds).fetchone():
+            return 1.0
+        row = conn.execute(
+            f"SELECT MIN(next_attempt_at) FROM outbox WHERE status = ? AND kind IN ({placeholders})",
+            [PENDING] + kinds
+        ).fetchone()
+        if row[0] is None:
+            return 5.0
+        return min(5.0, max(0.05, row[0] - time.time()))
+
+    def _mark_done(self, row_ids):
+        conn = self._connect()
+        for start in range(0, len(row_ids), 500):
+            chunk = row_ids[start:start + 500]
+            conn.execute(f"DELETE FROM outbox WHERE id IN ({', '.join('?' for _ in chunk)})", chunk)
+
+    def _release(self, rows):
+        """가져간 항목 중 아직 전송 중으로 남은 것을 다시 대기 상태로"""
+        conn = self._connect()
+        for start in range(0, len(rows), 500):
+            chunk = [row[0] for row in rows[start:start + 500]]
+            conn.execute(
+                f"UPDATE outbox SET status = ?, claimed_by = NULL, claimed_at = NULL "
+                f"WHERE status = ? AND claimed_by = ? AND id IN ({', '.join('?' for _ in chunk)})",
+                [PENDING, SENDING, self.owner] + chunk
+            )
+
+    def _mark_failed(self, rows, error):
+        """실패 처리: 재시도 시각 설정, 일시적이지 않은 오류가 반복되면 failed"""
+        status = _status_code(error)
+        permanent = not _is_transient(error)
+        attempts = max(row[3] for row in rows) + 1
+        delay = min(self.backoff_base * 2 ** (attempts - 1), self.backoff_max)
+        if status == 429:
+            delay = max(delay, self.quota_backoff)
+        new_status = FAILED if permanent and attempts >= self.max_attempts else PENDING
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for row in rows:
+                conn.execute(
+                    "UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ?, status = ?, "
+                    "claimed_by = NULL, claimed_at = NULL WHERE id = ?",
+                    (attempts, time.time() + delay, str(error), new_status, row[0])
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        print(f"동기화 실패 ({rows[0][1]} {len(rows)}건, {attempts}회째): {error}"
+              + (f", {delay:.0f}초 후 재시도" if new_status == PENDING else " -> 실패 처리"))
+
+    def _process(self, rows):
+        """같은 종류 항목 처리 (묶음 처리면 한 번에, 아니면 하나씩)"""
+        handler, batch = self._handlers[rows[0][1]]
+        if not batch:
+            for row in rows:
+                try:
+                    handler(json.loads(row[2]))
+                except Exception as e:
+                    self._mark_failed([row], e)
+                    continue
+                self._mark_done([row[0]])
+            return
+        if not self._send_batch(handler, rows):
+            # 실패한 항목 뒤에서 보내지 못한 항목은 다시 대기 상태로 (순서 유지)
+            self._release(rows)
+
+    def _send_batch(self, handler, rows):
+        """묶음 전송, 모두 보냈으면 True
+
+        일시적이지 않은 오류면 앞 절반부터 나눠 다시 보내서 문제 항목만 실패 처리하고 그 뒤는 보내지 않음
+        """
+        try:
+            handler([json.loads(row[2]) for row in rows])
+        except Exception as e:
+            if len(rows) == 1 or _is_transient(e):
+                self._mark_failed(rows, e)
+                return False
+            middle = len(rows) // 2
+            return self._send_batch(handler, rows[:middle]) and self._send_batch(handler, rows[middle:])
+        self._mark_done([row[0] for row in rows])
+        return True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            try:
+                due = self._claim_rows()
+            except Exception as e:
+                print(f"동기화 대기열 읽기 오류: {e}")
+                self._stopping.wait(1.0)
+                continue
+            if not due:
+                self._wakeup.wait(self._next_wait())
+                self._wakeup.clear()
+                continue
+
+            by_kind = {}
+            for row in due:
+                by_kind.setdefault(row[1], []).append(row)
+            for rows in by_kind.values():
+                try:
+                    self._process(rows)
+                except Exception as e:
+                    print(f"동기화 처리 오류: {e}")
+                    self._release(rows)
+                    self._stopping.wait(1.0)
+
+
+# 공용 동기화 대기열 (처리 함수는 각 화면에서 register)
+sync_outbox = SyncOutbox()
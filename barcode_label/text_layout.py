@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+라벨 텍스트 줄바꿈
+글자 폭(font.getlength)을 한 번만 재고 누적 폭에서 이분 탐색으로 줄바꿈 위치를 찾음
+같은 (텍스트, 폰트, 폭) 조합은 결과를 캐시하므로 같은 제품 라벨을 여러 장 찍을 때 다시 계산하지 않음
+"""
+
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate
+
+
+@lru_cache(maxsize=8192)
+def _char_width(font, char):
+    """글자 하나의 진행 폭 (폰트별 캐시)"""
+    try:
+        return font.getlength(char)
+    except Exception:
+        # 폰트 측정이 실패하면 대략적인 계산 (한글/영문)
+        return 13 if ord(char) > 127 else 9
+
+
+def text_width(text, font):
+    """문자열 폭 (글자 폭 합계)"""
+    return sum(_char_width(font, char) for char in text)
+
+
+@lru_cache(maxsize=1024)
+def wrap_text(text, font, max_width):
+    """글자 단위 줄바꿈 (줄 목록을 튜플로 반환)
+
+    각 줄은 max_width를 넘지 않는 가장 긴 접두어, 한 글자가 폭보다 넓으면 그 글자만 한 줄
+    """
+    if not text:
+        return ()
+    offsets = [0.0] + list(accumulate(_char_width(font, char) for char in text))
+    lines = []
+    start = 0
+    while start < len(text):
+        # offsets[end] - offsets[start] <= max_width 를 만족하는 가장 큰 end
+        end = bisect_right(offsets, offsets[start] + max_width) - 1
+        end = max(end, start + 1)
+        lines.append(text[start:end])
+        start = end
+    return tuple(lines)
+
+
+@lru_cache(maxsize=1024)
+def wrap_words(text, font, max_width, max_lines=None, max_word_chars=15):
+    """단어 단위 줄바꿈 (streamlit 30x20 라벨용, 줄 목록 튜플)
+
+    너무 긴 단어는 max_word_chars 글자에서 강제로 자르고,
+    max_lines를 넘으면 마지막 줄을 "..."으로 표시
+    """
+    space = _char_width(font, " ")
+    lines = []
+    current, current_width = [], 0.0
+    for word in text.split():
+        word_width = text_width(word, font)
+        test_width = current_width + (space if current else 0) + word_width
+        if test_width <= max_width:
+            current.append(word)
+            current_width = test_width
+        elif current:
+            lines.append(" ".join(current))
+            current, current_width = [word], word_width
+        elif len(word) > max_word_chars:
+            lines.append(word[:max_word_chars])
+            current = [word[max_word_chars:]]
+            current_width = text_width(current[0], font)
+        else:
+            lines.append(word)
+    if current:
+        lines.append(" ".join(current))
+
+    if max_lines and len(lines) > max_lines:
+        lines = lines[:max_lines - 1] + ["..."]
+    return tuple(lines)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ZPL 저장 포맷(^DF/^XF) 라벨
+라벨 레이아웃(^FO 위치, 폰트, 바코드 정의)을 프린터 메모리에 한 번만 내려보내고(^DF)
+라벨마다 ^XF로 포맷을 불러와 바뀌는 필드(^FN)만 전송
+
+일괄 발행에서는 배치 전체에서 값이 같은 줄(제품명, 구분 등)은 포맷에 고정 텍스트로 넣고
+라벨마다 달라지는 줄(일련번호, LOT/유통기한, 보관위치 등)만 ^FN 필드로 보냄
+배치 전체를 하나의 작업 스트림(문자열)으로 이어 붙여 한 번에 전송/저장
+"""
+
+import os
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 프린터 메모리에 저장할 포맷 이름 (R: = DRAM, 전원을 끄면 지워짐)
+FORMAT_NAME = "R:LABEL4030.ZPL"
+
+# 40x30 라벨 레이아웃 (필드 이름, ^FO 위치, 폰트 크기), 바코드는 BARCODE_FIELD
+LINES_40X30 = [
+    ("product", (25, 25), 24),
+    ("category", (25, 60), 24),
+    ("lot_line", (25, 95), 24),
+    ("location", (25, 130), 24),
+    ("code_line", (25, 440), 20),
+]
+BARCODE_FIELD = ("serial", (25, 230), 150)  # Code128, 높이 150 dot
+
+
+def _fd(text):
+    """^FD 데이터 (_, ^, ~가 있으면 ^FH_로 16진수 이스케이프)"""
+    text = str(text)
+    if not any(char in text for char in "_^~"):
+        return f"^FD{text}"
+    return "^FH_^FD" + text.replace("_", "_5F").replace("^", "_5E").replace("~", "_7E")
+
+
+def label_fields(product_code, product_name, category, lot, expiry, version, location, serial_number):
+    """라벨 한 장의 줄별 텍스트"""
+    return {
+        "product": f"Product: {product_name}",
+        "category": f"Category: {category}",
+        "lot_line": f"LOT: {lot}    Expiry: {expiry}    Version: {version}",
+        "location": f"Location: {location}",
+        "code_line": f"{product_code}-{lot}-{expiry}-{version}",
+        "serial": str(serial_number),
+    }
+
+
+def _layout(values, numbers=None):
+    """레이아웃 본문 (numbers에 있는 필드는 ^FN, 나머지는 values의 고정 텍스트)"""
+    numbers = numbers or {}
+    lines = ["^PW640", "^LL480", "^CI28"]
+
+    def data(name):
+        return f"^FN{numbers[name]}" if name in numbers else _fd(values[name])
+
+    for name, (x, y), size in LINES_40X30:
+        lines.append(f"^FO{x},{y}^A0N,{size},{size}{data(name)}^FS")
+    name, (x, y), height = BARCODE_FIELD
+    lines.append(f"^FO{x},{y}^BY4^BCN,{height},N,N,N{data(name)}^FS")
+    return lines
+
+
+def full_label(product_code, product_name, category, lot, expiry, version, location, serial_number):
+    """포맷 전체를 포함한 라벨 한 장 (기존 create_zpl_label 방식)"""
+    values = label_fields(product_code, product_name, category, lot, expiry, version, location, serial_number)
+    return "\n".join(["^XA"] + _layout(values) + ["^XZ"])
+
+
+def batch_job(labels, format_name=FORMAT_NAME):
+    """라벨 여러 장을 저장 포맷 + 라벨별 ^XF 필드로 이어 붙인 작업 스트림
+
+    labels: [{'product_code', 'product_name', 'category', 'lot', 'expiry', 'version', 'location', 'serial_number'}, ...]
+    """
+    rows = [label_fields(label['product_code'], label['product_name'], label['category'], label['lot'],
+                         label['expiry'], label['version'], label['location'], label['serial_number'])
+            for label in labels]
+    if not rows:
+        return ""
+
+    # 배치 전체에서 값이 달라지는 줄만 ^FN 필드로 (일련번호는 항상)
+    variable = [name for name in rows[0] if name == "serial" or any(row[name] != rows[0][name] for row in rows)]
+    numbers = {name: number for number, name in enumerate(variable, 1)}
+
+    parts = ["^XA", f"^DF{format_name}^FS"] + _layout(rows[0], numbers) + ["^XZ"]
+    for row in rows:
+        fields = "".join(f"^FN{numbers[name]}{_fd(row[name])}^FS" for name in variable)
+        parts.append(f"^XA^XF{format_name}^FS{fields}^XZ")
+    return "\n".join(parts)
+
+
+def save_job(job, zpl_dir=None):
+    """작업 스트림을 zpl 폴더에 파일 하나로 저장 후 경로 반환"""
+    zpl_dir = zpl_dir or os.path.join(SCRIPT_DIR, "zpl")
+    os.makedirs(zpl_dir, exist_ok=True)
+    filename = os.path.join(zpl_dir, f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zpl")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(job)
+    return filename
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ZPL 그래픽(^GFA) 인코더
+PIL 이미지를 1비트 비트맵으로 바꿔 행 단위로 묶고(NumPy packbits) ^GFA 데이터로 변환
+디스크에 저장했다가 다시 읽지 않고 메모리의 라벨 이미지를 바로 사용
+
+- ascii: 16진수 + ZPL 압축 (반복 문자 G~Y/g~z, 행 끝 0은 ',', 1은 '!', 이전 행 반복 ':')
+- z64: zlib 압축 + base64, 끝에 CRC-16 (:Z64:데이터:CRC)
+"""
+
+import base64
+import binascii
+import zlib
+
+import numpy as np
+from PIL import Image
+
+ASCII = "ascii"
+Z64 = "z64"
+
+# ZPL 반복 횟수 문자 (G=1 ... Y=19, g=20 ... z=400)
+_REPEAT_SMALL = {n: chr(ord("G") + n - 1) for n in range(1, 20)}
+_REPEAT_LARGE = {n * 20: chr(ord("g") + n - 1) for n in range(1, 21)}
+
+
+def pack_bitmap(image, threshold=128):
+    """이미지 -> (행당 바이트 수, uint8 배열[행, 바이트]) (1 = 검은 점)"""
+    if image.mode == "1":
+        dots = ~np.asarray(image, dtype=bool)
+    else:
+        dots = np.asarray(image.convert("L")) < threshold
+    return (dots.shape[1] + 7) // 8, np.packbits(dots, axis=1)
+
+
+def _repeat_prefix(count):
+    """반복 횟수 -> ZPL 반복 문자 (최대 419)"""
+    prefix = ""
+    if count >= 20:
+        prefix = _REPEAT_LARGE[count // 20 * 20]
+        count %= 20
+    if count:
+        prefix += _REPEAT_SMALL[count]
+    return prefix
+
+
+def _compress_row(hex_row):
+    """16진수 한 행 ZPL 압축"""
+    stripped = hex_row.rstrip("0")
+    if len(stripped) < len(hex_row):
+        tail = ","
+    else:
+        stripped = hex_row.rstrip("F")
+        tail = "!" if len(stripped) < len(hex_row) else ""
+    if not stripped:
+        return tail
+
+    parts = []
+    i = 0
+    while i < len(stripped):
+        char = stripped[i]
+        j = i
+        while j < len(stripped) and stripped[j] == char:
+            j += 1
+        count = j - i
+        while count > 0:
+            chunk = min(count, 419)
+            parts.append(char if chunk == 1 else _repeat_prefix(chunk) + char)
+            count -= chunk
+        i = j
+    return "".join(parts) + tail
+
+
+def encode_ascii(rows):
+    """비트맵 행 -> ZPL 압축 16진수 문자열"""
+    parts = []
+    previous = None
+    for row in rows:
+        raw = row.tobytes()
+        if raw == previous:
+            parts.append(":")
+            continue
+        parts.append(_compress_row(raw.hex().upper()))
+        previous = raw
+    return "".join(parts)
+
+
+def encode_z64(rows):
+    """비트맵 행 -> :Z64:base64(zlib):CRC"""
+    data = base64.b64encode(zlib.compress(rows.tobytes(), 9))
+    return f":Z64:{data.decode('ascii')}:{binascii.crc_hqx(data, 0):04X}"
+
+
+def image_to_gfa(image, compression=ASCII, threshold=128):
+    """이미지 -> ^GFA 명령 문자열"""
+    bytes_per_row, rows = pack_bitmap(image, threshold)
+    total = rows.size
+    data = encode_z64(rows) if compression == Z64 else encode_ascii(rows)
+    return f"^GFA,{total},{total},{bytes_per_row},{data}"
+
+
+def image_to_zpl(image, compression=ASCII, width=None, height=None, threshold=128):
+    """이미지 한 장을 인쇄하는 ZPL 라벨 (^XA ... ^XZ)
+
+    width/height가 주어지고 이미지 크기와 다르면 리사이즈 후 변환
+    """
+    if width and height and image.size != (width, height):
+        image = image.convert("L").resize((width, height), Image.Resampling.LANCZOS)
+    width, height = image.size
+    return f"^XA\n^PW{width}\n^LL{height}\n^FO0,0{image_to_gfa(image, compression, threshold)}^FS\n^XZ"